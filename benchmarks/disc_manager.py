@@ -0,0 +1,119 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+"""
+Benchmark de discManager: backend pydsk frente a idsk.
+
+Crea un disco con varios ficheros y mide las operaciones más usadas con
+cada backend. Si idsk no está instalado solo se mide pydsk.
+
+Uso:
+    python benchmarks/disc_manager.py [--files N] [--repeat N] [--idsk RUTA]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from cpcready.pydsk import DSK
+from cpcready.utils.manager import discManager
+
+BASIC_SOURCE = b"".join(
+    f'{n * 10} PRINT "LINE {n}":GOTO {n * 10 + 10}\r\n'.encode() for n in range(1, 60)
+)
+
+
+def make_disc(path, count):
+    """Crea un disco con *count* programas BASIC y binarios."""
+    dsk = DSK()
+    dsk.create(nb_tracks=40, nb_sectors=9, format_type=DSK.FORMAT_DATA)
+    workdir = os.path.dirname(path)
+    for i in range(count):
+        src = os.path.join(workdir, f"PROG{i}.BAS")
+        with open(src, "wb") as f:
+            f.write(BASIC_SOURCE)
+        dsk.write_file(src, file_type=-1)
+        src = os.path.join(workdir, f"CODE{i}.BIN")
+        with open(src, "wb") as f:
+            f.write(os.urandom(2048))
+        dsk.write_file(src, file_type=2, load_addr=0x4000, exec_addr=0x4000)
+    dsk.save(path)
+
+
+def operations(manager, disc):
+    return {
+        "cat": lambda: manager.cat(disc),
+        "cat_list": lambda: manager.cat_list(disc),
+        "get *.BAS": lambda: manager.get(disc, "*.BAS"),
+        "list_basic": lambda: manager.list_basic(disc, "PROG0.BAS"),
+        "list_hex": lambda: manager.list_hex(disc, "CODE0.BIN"),
+        "file_type": lambda: manager.file_type(disc, "CODE0.BIN"),
+    }
+
+
+def measure(func, repeat):
+    """Mejor tiempo de *repeat* ejecuciones, en milisegundos."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare discManager backends")
+    parser.add_argument("--files", type=int, default=8, help="BASIC/BIN pairs on the disc")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per operation (best is kept)")
+    parser.add_argument("--idsk", default="idsk20", help="idsk executable")
+    args = parser.parse_args()
+
+    backends = {"pydsk": discManager(args.idsk, backend="pydsk")}
+    if shutil.which(args.idsk):
+        backends["idsk"] = discManager(args.idsk, backend="idsk")
+    else:
+        print(f"{args.idsk} not found, measuring pydsk only\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        disc = os.path.join(tmp, "bench.dsk")
+        make_disc(disc, args.files)
+        out = os.path.join(tmp, "out")
+        os.makedirs(out)
+        cwd = os.getcwd()
+        os.chdir(out)
+        try:
+            results = {
+                name: {op: measure(func, args.repeat) for op, func in operations(manager, disc).items()}
+                for name, manager in backends.items()
+            }
+        finally:
+            os.chdir(cwd)
+
+    names = list(results)
+    print(f"{'operation':<12}" + "".join(f"{n:>12}" for n in names) + ("     speedup" if len(names) > 1 else ""))
+    for op in results["pydsk"]:
+        row = f"{op:<12}" + "".join(f"{results[n][op]:>10.2f}ms" for n in names)
+        if len(names) > 1:
+            row += f"{results['idsk'][op] / results['pydsk'][op]:>11.1f}x"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
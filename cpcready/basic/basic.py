@@ -0,0 +1,213 @@
+# Copyright (C) 2025 David CH.F (destroyer)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import click
+import time
+from pathlib import Path
+from cpcready.utils import DriveManager, SystemCPM
+from cpcready.utils.click_custom import CustomCommand, CustomGroup
+from cpcready.utils.console import info2, ok, debug, warn, error, blank_line
+from cpcready.pydsk.dsk import DSK
+from cpcready.pydsk.basic_tokenizer import BasicTokenizeError
+from cpcready.pydsk.basic_crunch import crunch_program, load_program
+from cpcready.pydsk.basic_lint import lint_lines
+from cpcready.list.list import read_program
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+console = Console()
+
+
+# Grupo de herramientas para programas BASIC
+@click.group(cls=CustomGroup, name='basic')
+def basic_group():
+    """Locomotive BASIC tools."""
+    pass
+
+
+def read_host_program(dsk, file_name):
+    """Lee un programa del host, quitando la cabecera AMSDOS si la tiene."""
+    raw = Path(file_name).read_bytes()
+    if len(raw) >= 128 and dsk._check_amsdos_header(raw):
+        length = raw[0x18] | (raw[0x19] << 8)
+        return raw[0x12], raw[128:128 + length]
+    return None, raw
+
+
+def show_report(report, name):
+    """Tabla con el tamaño y las líneas antes y después."""
+    table = Table(title=f"[bold]{name}[/bold]", border_style="bright_blue", box=box.ROUNDED)
+    table.add_column("", style="bold yellow")
+    table.add_column("Before", justify="right", style="white")
+    table.add_column("After", justify="right", style="green")
+    table.add_row("Size (bytes)", str(report.size_before), str(report.size_after))
+    table.add_row("Lines", str(report.lines_before), str(report.lines_after))
+    console.print(table)
+
+    saved = report.size_before - report.size_after
+    percent = saved * 100 // report.size_before if report.size_before else 0
+    info2(f"Comments removed: {report.comments_removed}, variables renamed: {report.variables_renamed}")
+    info2(f"Saved {saved} bytes ({percent}%)")
+
+
+@basic_group.command(cls=CustomCommand, name='crunch')
+@click.argument("file_name", required=True)
+@click.option("-o", "--output", metavar="NAME", help="Name of the crunched program on the disc (default: FILE_NAME)")
+@click.option("--host", is_flag=True, help="Read FILE_NAME from the host instead of the disc")
+@click.option("--no-rename", is_flag=True, help="Keep the variable names")
+@click.option("--no-merge", is_flag=True, help="Keep one statement line per source line")
+@click.option("--start", type=click.IntRange(1, 65535), default=1, show_default=True, help="First line number")
+@click.option("--step", type=click.IntRange(1, 65535), default=1, show_default=True, help="Line number increment")
+@click.option("-A", "--drive-a", is_flag=True, help="Use disc in drive A")
+@click.option("-B", "--drive-b", is_flag=True, help="Use disc in drive B")
+def crunch(file_name, output, host, no_rename, no_merge, start, step, drive_a, drive_b):
+    """Crunch a BASIC program so it takes less memory and runs faster.
+
+    Strips REM and ' comments and spaces, merges the lines that are never
+    jumped to, shortens variable names and renumbers the program. The
+    result is written into the disc as tokenized BASIC.
+
+    \b
+    Examples:
+      cpc basic crunch game.bas
+      cpc basic crunch game.bas -o gamec.bas --no-rename
+      cpc basic crunch src/game.bas --host --start 10 --step 10
+    """
+    drive_manager = DriveManager()
+    system_cpm = SystemCPM()
+
+    disc_name = drive_manager.get_disc_name(drive_a, drive_b)
+    if disc_name is None:
+        error("No disc inserted in the specified drive.")
+        return
+
+    user_number = system_cpm.get_user_number()
+    if host and not Path(file_name).exists():
+        blank_line(1)
+        error(f"File '{file_name}' not found.")
+        blank_line(1)
+        return
+
+    output = (output or Path(file_name).name).upper()
+    debug(f"crunch {file_name} -> {output} (host={host}, rename={not no_rename}, merge={not no_merge})")
+
+    blank_line(1)
+    try:
+        dsk = DSK(disc_name)
+        if host:
+            file_type, data = read_host_program(dsk, file_name)
+        else:
+            file_type, data = read_program(dsk, file_name, user_number)
+
+        if file_type not in (None, 0):
+            error(f"Not a BASIC program: {file_name}")
+            blank_line(1)
+            return
+
+        info2(f"Crunching '{file_name}'...")
+        report = crunch_program(data, rename=not no_rename, merge=not no_merge,
+                                start=start, step=step)
+        if not report.renumbered:
+            warn("Program uses ERL: lines are not merged nor renumbered.")
+
+        dsk.write_bytes(report.program, output, file_type=0, user=int(user_number), force=True)
+        dsk.save()
+    except BasicTokenizeError as e:
+        error(str(e))
+        blank_line(1)
+        return
+    except Exception as e:
+        error(f"Error crunching file: {e}")
+        blank_line(1)
+        return
+
+    blank_line(1)
+    show_report(report, output)
+    ok(f"Crunched program saved as '{output}'.")
+    blank_line(1)
+
+
+@basic_group.command(cls=CustomCommand, name='lint')
+@click.argument("file_name", required=True)
+@click.option("--host", is_flag=True, help="Read FILE_NAME from the host instead of the disc")
+@click.option("--top", type=click.IntRange(1), default=20, show_default=True, help="Number of hotspots to show")
+@click.option("-A", "--drive-a", is_flag=True, help="Use disc in drive A")
+@click.option("-B", "--drive-b", is_flag=True, help="Use disc in drive B")
+def lint(file_name, host, top, drive_a, drive_b):
+    """Find slow constructs in a BASIC program.
+
+    Looks for float FOR counters, jumps to lines far down the program,
+    string concatenation inside loops and repeated expressions. Each
+    hotspot is ranked by an estimated cost that grows with the loop
+    nesting, with a suggested fix.
+
+    \b
+    Examples:
+      cpc basic lint game.bas
+      cpc basic lint src/game.bas --host --top 5
+    """
+    blank_line(1)
+    try:
+        if host:
+            if not Path(file_name).exists():
+                error(f"File '{file_name}' not found.")
+                blank_line(1)
+                return
+            file_type, data = read_host_program(DSK(), file_name)
+        else:
+            disc_name = DriveManager().get_disc_name(drive_a, drive_b)
+            if disc_name is None:
+                error("No disc inserted in the specified drive.")
+                return
+            dsk = DSK(disc_name)
+            file_type, data = read_program(dsk, file_name, SystemCPM().get_user_number())
+
+        if file_type not in (None, 0):
+            error(f"Not a BASIC program: {file_name}")
+            blank_line(1)
+            return
+
+        start = time.perf_counter()
+        lines = load_program(data)
+        findings = lint_lines(lines)
+        debug(f"Analysed {len(lines)} lines in {(time.perf_counter() - start) * 1000:.1f} ms")
+    except BasicTokenizeError as e:
+        error(str(e))
+        blank_line(1)
+        return
+    except Exception as e:
+        error(f"Error analysing file: {e}")
+        blank_line(1)
+        return
+
+    if not findings:
+        ok(f"No hotspots found in '{file_name}' ({len(lines)} lines).")
+        blank_line(1)
+        return
+
+    table = Table(title=f"[bold]{Path(file_name).name.upper()}[/bold]", border_style="bright_blue",
+                  box=box.ROUNDED)
+    table.add_column("Cost", justify="right", style="bold red")
+    table.add_column("Line", justify="right", style="bold yellow")
+    table.add_column("Hotspot", style="white")
+    table.add_column("Suggestion", style="green")
+    for finding in findings[:top]:
+        table.add_row(str(finding.cost), str(finding.line), finding.message, finding.suggestion)
+    console.print(table)
+
+    if len(findings) > top:
+        info2(f"{len(findings) - top} more hotspot(s) not shown, use --top to see them.")
+    blank_line(1)
@@ -0,0 +1,281 @@
+# Copyright (C) 2025 David CH.F (destroyer)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import click
+import fnmatch
+import os
+import shlex
+import sys
+from pathlib import Path
+from cpcready.utils import DriveManager, SystemCPM
+from cpcready.utils.click_custom import CustomCommand
+from cpcready.utils.console import info2, ok, debug, warn, error, blank_line
+from cpcready.pydsk import DSK, DSKError
+from cpcready.save.save import save, store_file
+from cpcready.era.era import era
+from cpcready.ren.ren import ren
+from cpcready.drive.drive import drive
+
+
+class BatchError(Exception):
+    """Error al ejecutar una línea del lote."""
+    pass
+
+
+class BatchSession:
+    """
+    Disc images opened once for the whole batch.
+
+    Every operation works on the in-memory DSK; images are only written
+    back to the host on commit().
+    """
+
+    def __init__(self):
+        self.drive_manager = DriveManager()
+        self.user = SystemCPM().get_user_number()
+        # Imágenes abiertas: ruta real -> DSK
+        self.discs = {}
+        self.dirty = set()
+
+    def disc(self, drive_a=False, drive_b=False):
+        """Devuelve (ruta, DSK) del disco de la unidad indicada, cargándolo una vez."""
+        if drive_a and drive_b:
+            raise BatchError("Cannot specify both -A and -B options. Choose one drive.")
+        disc_name = self.drive_manager.get_disc_name(drive_a, drive_b)
+        if not disc_name:
+            raise BatchError("No disc inserted in the specified drive.")
+
+        path = os.path.realpath(disc_name)
+        if path not in self.discs:
+            try:
+                self.discs[path] = DSK(path)
+            except (DSKError, OSError) as e:
+                raise BatchError(f"Cannot open disc '{disc_name}': {e}")
+            debug(f"Disc loaded: {path}")
+        return path, self.discs[path]
+
+    def commit(self):
+        """Guarda en el host las imágenes modificadas."""
+        saved = []
+        for path in sorted(self.dirty):
+            self.discs[path].save()
+            saved.append(path)
+        self.dirty.clear()
+        return saved
+
+    def rollback(self):
+        """Descarta los cambios pendientes recargando las imágenes modificadas."""
+        for path in self.dirty:
+            self.discs.pop(path, None)
+        self.dirty.clear()
+
+
+def _run_save(session, params):
+    file_name = params["file_name"]
+    if not Path(file_name).exists():
+        raise BatchError(f"File '{file_name}' not found.")
+    path, dsk = session.disc(params["drive_a"], params["drive_b"])
+    try:
+        store_file(dsk, file_name, params["type_file"], params["load_addr"],
+                   params["exec_addr"], user=session.user, tokenize=params["tokenize"])
+    except (ValueError, DSKError) as e:
+        raise BatchError(str(e))
+    session.dirty.add(path)
+    return f"Saved {Path(file_name).name.upper()}"
+
+
+def _run_era(session, params):
+    path, dsk = session.disc(params["drive_a"], params["drive_b"])
+    available_files = [
+        entry.full_name.strip() for entry in dsk.get_directory_entries()
+        if entry.user == session.user and entry.num_page == 0
+    ]
+
+    files_to_delete = set()
+    for pattern in params["file_patterns"]:
+        pattern_upper = pattern.upper()
+        if '*' in pattern or '?' in pattern:
+            matches = fnmatch.filter(available_files, pattern_upper)
+            if not matches:
+                raise BatchError(f"No files match pattern: {pattern}")
+            files_to_delete.update(matches)
+        elif pattern_upper not in available_files:
+            raise BatchError(f"File not found: {pattern_upper}")
+        else:
+            files_to_delete.add(pattern_upper)
+
+    for filename in sorted(files_to_delete):
+        try:
+            dsk.delete_file(filename, user=session.user)
+        except DSKError as e:
+            raise BatchError(f"Error erasing {filename}: {e}")
+    session.dirty.add(path)
+    return f"Erased {', '.join(sorted(files_to_delete))}"
+
+
+def _run_ren(session, params):
+    path, dsk = session.disc(params["drive_a"], params["drive_b"])
+    try:
+        dsk.rename_file(params["file_old"], params["file_new"], user=session.user)
+    except DSKError as e:
+        raise BatchError(f"Error renaming file: {e}")
+    session.dirty.add(path)
+    return f"Renamed {params['file_old']} → {params['file_new']}"
+
+
+def _run_drive(session, params):
+    action = (params["action"] or "status").lower()
+    config = session.drive_manager.config
+
+    if action in ("a", "b"):
+        if not config.get("drive", f"drive_{action}", ""):
+            raise BatchError(f"Drive {action.upper()}: disc missing")
+        config.set("drive", "selected_drive", action)
+        return f"Drive {action.upper()} selected"
+
+    if action == "eject":
+        if params["drive_a"] == params["drive_b"]:
+            raise BatchError("Please specify a drive using -A or -B option.")
+        letter = "a" if params["drive_a"] else "b"
+        if not config.get("drive", f"drive_{letter}", ""):
+            raise BatchError(f"There is no disc in the drive {letter.upper()}")
+        config.set("drive", f"drive_{letter}", "")
+        return f"Disc ejected from drive {letter.upper()}"
+
+    return "Nothing to do"
+
+
+# Comandos admitidos: el parser de click del comando original valida los
+# argumentos, y el handler aplica la operación sobre el DSK en memoria.
+BATCH_COMMANDS = {
+    "save": (save, _run_save),
+    "era": (era, _run_era),
+    "ren": (ren, _run_ren),
+    "drive": (drive, _run_drive),
+}
+
+
+def read_lines(stream):
+    """Devuelve (número de línea, argumentos) de cada línea útil del lote."""
+    for lineno, raw in enumerate(stream, start=1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            args = shlex.split(line, comments=True)
+        except ValueError as e:
+            yield lineno, line, e
+            continue
+        # Permitir líneas copiadas de la shell: "cpc save ..."
+        if args and args[0] == "cpc":
+            args = args[1:]
+        if args:
+            yield lineno, line, args
+
+
+def run_line(session, args):
+    """
+    Run one batch line against the session.
+
+    Returns:
+        Status message for the line
+
+    Raises:
+        BatchError: If the line is invalid or the operation fails
+    """
+    name = args[0].lower()
+    if name not in BATCH_COMMANDS:
+        raise BatchError(f"Unknown batch command '{args[0]}'. Use: {', '.join(BATCH_COMMANDS)}, commit")
+    command, handler = BATCH_COMMANDS[name]
+    try:
+        ctx = command.make_context(name, list(args[1:]))
+    except click.exceptions.Exit:
+        return "Nothing to do"
+    except click.ClickException as e:
+        raise BatchError(e.format_message())
+    return handler(session, ctx.params)
+
+
+@click.command(cls=CustomCommand)
+@click.argument("script", type=click.File("r"), required=True)
+@click.option("--strict", is_flag=True, help="Stop with a non-zero exit code on the first error")
+def batch(script, strict):
+    """Run several disc commands in one go.
+
+    Reads one command per line from SCRIPT (or stdin with '-') and runs
+    them against in-memory disc images. Each image is loaded once and
+    written back only at the end, or at each 'commit' line. Listings are
+    not printed per line.
+
+    \b
+    Supported lines:
+      save FILE [a|b|p] [LOAD] [EXEC] [--tokenize] [-A|-B]
+      era PATTERN... [-A|-B]
+      ren OLD NEW [-A|-B]
+      drive a|b|eject [-A|-B]
+      commit
+
+    \b
+    Examples:
+      cpc batch build.cpc
+      printf 'save main.bas\\nsave game.bin b 0x4000\\n' | cpc batch -
+    """
+    session = BatchSession()
+    done = 0
+    failed = 0
+
+    blank_line(1)
+    for lineno, line, args in read_lines(script):
+        if isinstance(args, Exception):
+            status = f"Invalid line: {args}"
+        elif args[0].lower() == "commit":
+            try:
+                for path in session.commit():
+                    info2(f"{lineno:>4}: Disc saved: {path}")
+                ok(f"{lineno:>4}: commit")
+                done += 1
+                continue
+            except (DSKError, OSError) as e:
+                status = f"Error saving disc: {e}"
+        else:
+            try:
+                ok(f"{lineno:>4}: {run_line(session, args)}")
+                done += 1
+                continue
+            except BatchError as e:
+                status = str(e)
+
+        failed += 1
+        error(f"{lineno:>4}: {line} → {status}")
+        if strict:
+            # Descartar lo pendiente desde el último commit
+            session.rollback()
+            blank_line(1)
+            error("Batch aborted, pending changes discarded.")
+            blank_line(1)
+            sys.exit(1)
+
+    try:
+        for path in session.commit():
+            info2(f"Disc saved: {path}")
+    except (DSKError, OSError) as e:
+        error(f"Error saving disc: {e}")
+        sys.exit(1)
+
+    blank_line(1)
+    ok(f"{done} line(s) OK")
+    if failed:
+        warn(f"{failed} line(s) failed")
+    blank_line(1)
@@ -0,0 +1,276 @@
+# Copyright (C) 2025 David CH.F (destroyer)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import click
+import json
+import os
+import sys
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+# Python 3.11+ tiene tomllib incluido, versiones anteriores necesitan tomli
+try:
+    import tomllib
+except ModuleNotFoundError:
+    import tomli as tomllib
+
+from cpcready.utils.click_custom import CustomCommand
+from cpcready.utils.console import info2, ok, debug, warn, error, blank_line
+from cpcready.utils.system import file_digest
+from cpcready.pydsk import DSK, DSKError
+from cpcready.save.save import store_file, parse_address
+
+MANIFEST_FILE = "cpcready.toml"
+CACHE_FILE = Path(".cpcready") / "build.json"
+
+FORMATS = {
+    'DATA': DSK.FORMAT_DATA,
+    'SYSTEM': DSK.FORMAT_SYSTEM,
+    'VENDOR': DSK.FORMAT_VENDOR
+}
+
+
+class BuildEntry(NamedTuple):
+    """Fichero declarado en el manifiesto."""
+    src: Path
+    name: str
+    type_file: Optional[str]
+    load_addr: Optional[int]
+    exec_addr: Optional[int]
+    user: int
+
+    @property
+    def key(self):
+        return f"{self.user}:{self.name}"
+
+    @property
+    def convert(self):
+        """Solo los ficheros de texto se convierten a CRLF."""
+        return self.type_file == "a" or (self.type_file is None and self.src.suffix.lower() == ".bas")
+
+    def digest(self):
+        """Hash del contenido y de los parámetros con los que se graba."""
+        params = json.dumps([self.type_file, self.load_addr, self.exec_addr, self.convert])
+        return file_digest(self.src, params.encode())
+
+
+class BuildManifest(NamedTuple):
+    base_dir: Path
+    disc: Path
+    format: str
+    entries: list
+
+
+def load_manifest(path):
+    """
+    Read the [build] section of a project file.
+
+    Raises:
+        ValueError: If the manifest is missing or malformed
+    """
+    path = Path(path)
+    if not path.exists():
+        raise ValueError(f"Manifest '{path}' not found.")
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+
+    section = data.get("build")
+    if not isinstance(section, dict):
+        raise ValueError(f"No [build] section in '{path}'.")
+    if "disc" not in section:
+        raise ValueError("Missing 'disc' in [build] section.")
+
+    base_dir = path.resolve().parent
+    fmt = str(section.get("format", "DATA")).upper()
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid format '{fmt}'. Use: {', '.join(FORMATS)}")
+
+    entries = []
+    seen = set()
+    for i, item in enumerate(section.get("files", []), start=1):
+        if "src" not in item:
+            raise ValueError(f"File #{i}: missing 'src'.")
+        src = base_dir / item["src"]
+        type_file = item.get("type")
+        if type_file not in (None, "a", "b", "p"):
+            raise ValueError(f"File #{i}: invalid type '{type_file}'. Use a, b or p.")
+        load_addr = parse_address(item.get("load"))
+        exec_addr = parse_address(item.get("exec"))
+        if type_file == "b" and load_addr is None:
+            raise ValueError(f"File #{i}: binary type 'b' requires 'load'.")
+        user = int(item.get("user", 0))
+        if not 0 <= user <= 15:
+            raise ValueError(f"File #{i}: user must be 0-15.")
+        # Nombre AMSDOS normalizado (8.3 en mayúsculas)
+        name = DSK()._get_amsdos_filename(item.get("name", src.name))
+        entry = BuildEntry(src, name, type_file, load_addr, exec_addr, user)
+        if entry.key in seen:
+            raise ValueError(f"File #{i}: '{name}' (user {user}) declared twice.")
+        seen.add(entry.key)
+        entries.append(entry)
+
+    disc = base_dir / section["disc"]
+    if disc.suffix.lower() != ".dsk":
+        disc = disc.with_suffix(".dsk")
+    return BuildManifest(base_dir, disc, fmt, entries)
+
+
+def read_cache(path):
+    """Lee el cache de la última construcción (vacío si no existe o está corrupto)."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_cache(path, data):
+    """Escribe el cache de forma atómica."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def plan_build(manifest, cache, clean=False):
+    """
+    Compute the changes needed to bring the disc up to date.
+
+    Returns:
+        Tuple (to_write, to_delete, digests, reason) where reason explains
+        a full rebuild or is None for an incremental one
+    """
+    for entry in manifest.entries:
+        if not entry.src.exists():
+            raise ValueError(f"Source file '{entry.src}' not found.")
+    digests = {entry.key: entry.digest() for entry in manifest.entries}
+    previous = cache.get("files", {})
+
+    reason = None
+    if clean:
+        reason = "clean build"
+    elif not manifest.disc.exists():
+        reason = "disc does not exist"
+    elif cache.get("disc") != str(manifest.disc) or cache.get("disc_hash") != file_digest(manifest.disc):
+        # La imagen ha cambiado fuera de 'cpc build': no fiarse del cache
+        reason = "disc changed outside build"
+
+    if reason:
+        to_write = list(manifest.entries)
+    else:
+        to_write = [e for e in manifest.entries if previous.get(e.key) != digests[e.key]]
+    to_delete = sorted(k for k in previous if k not in digests)
+    return to_write, to_delete, digests, reason
+
+
+@click.command(cls=CustomCommand)
+@click.option("-m", "--manifest", default=MANIFEST_FILE, show_default=True,
+              help="Project file with the [build] section")
+@click.option("--clean", is_flag=True, help="Rebuild the disc from an empty image")
+@click.option("--dry-run", is_flag=True, help="Show what would change without writing")
+def build(manifest, clean, dry_run):
+    """Build a disc image from a project manifest.
+
+    Only the files whose content or parameters changed since the last
+    build are written, in a single pass over the image. When nothing
+    changed the image is left untouched.
+
+    \b
+    Manifest (cpcready.toml in the project directory):
+      [build]
+      disc = "game.dsk"
+      format = "DATA"          # DATA, SYSTEM or VENDOR
+
+      [[build.files]]
+      src = "src/loader.bas"   # type auto-detected as in 'cpc save'
+
+      [[build.files]]
+      src = "bin/game.bin"
+      name = "GAME.BIN"
+      type = "b"               # a, b or p
+      load = "0x4000"
+      exec = "0x4000"
+      user = 0
+
+    \b
+    Examples:
+      cpc build
+      cpc build --dry-run
+      cpc build -m release.toml --clean
+    """
+    try:
+        project = load_manifest(manifest)
+        cache_path = project.base_dir / CACHE_FILE
+        cache = {} if clean else read_cache(cache_path)
+        to_write, to_delete, digests, reason = plan_build(project, cache, clean)
+    except (ValueError, OSError, tomllib.TOMLDecodeError) as e:
+        blank_line(1)
+        error(str(e))
+        blank_line(1)
+        sys.exit(1)
+
+    blank_line(1)
+    if not to_write and not to_delete:
+        ok(f"{project.disc.name} is up to date.")
+        blank_line(1)
+        return
+
+    if reason:
+        info2(f"Full rebuild: {reason}")
+    for entry in to_write:
+        info2(f"+ {entry.name} (user {entry.user})")
+    for key in to_delete:
+        user, name = key.split(":", 1)
+        info2(f"- {name} (user {user})")
+
+    if dry_run:
+        blank_line(1)
+        return
+
+    try:
+        dsk = DSK()
+        if clean or not project.disc.exists():
+            dsk.create(nb_tracks=40, nb_sectors=9, format_type=FORMATS[project.format])
+        else:
+            dsk.load(str(project.disc))
+
+        for key in to_delete:
+            user, name = key.split(":", 1)
+            try:
+                dsk.delete_file(name, user=int(user))
+            except DSKError:
+                debug(f"{name} already gone from disc")
+
+        for entry in to_write:
+            store_file(dsk, str(entry.src), entry.type_file, entry.load_addr,
+                       entry.exec_addr, user=entry.user, dsk_filename=entry.name,
+                       convert=entry.convert)
+
+        dsk.save(str(project.disc))
+    except (ValueError, DSKError, OSError) as e:
+        error(f"Build failed: {e}")
+        blank_line(1)
+        sys.exit(1)
+
+    write_cache(cache_path, {
+        "disc": str(project.disc),
+        "disc_hash": file_digest(project.disc),
+        "files": digests,
+    })
+
+    ok(f"{project.disc.name} built: {len(to_write)} written, {len(to_delete)} removed.")
+    blank_line(1)
+    dsk.list_files(simple=False, use_rich=True)
@@ -29,7 +29,16 @@ from cpcready.mode.mode import mode
 from cpcready.run import run
 from cpcready.rvm.rvm import rvm_group
 from cpcready.emu.emu import emu
-# from cpcready.m4.m4 import m4 as m4_group
+from cpcready.batch import batch
+from cpcready.build import build
+from cpcready.sync import sync
+from cpcready.basic import basic_group
+from cpcready.screens import screens_group
+from cpcready.gfx import gfx_group
+from cpcready.pack import pack
+from cpcready.tape import tape_group
+from cpcready.snapshot import snapshot
+from cpcready.m4.m4 import m4 as m4_group
 # from cpcready.header import header
 from cpcready.utils.click_custom import CustomGroup, CustomCommand
 from cpcready.utils.console import message, blank_line
@@ -69,7 +78,16 @@ cli.add_command(mode)
 cli.add_command(run)
 cli.add_command(emu)
 cli.add_command(rvm_group)
-# cli.add_command(m4_group)
+cli.add_command(batch)
+cli.add_command(build)
+cli.add_command(sync)
+cli.add_command(basic_group)
+cli.add_command(screens_group)
+cli.add_command(gfx_group)
+cli.add_command(pack)
+cli.add_command(tape_group)
+cli.add_command(snapshot)
+cli.add_command(m4_group)
 # cli.add_command(header)
 
 if __name__ == "__main__":
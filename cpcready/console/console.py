@@ -18,8 +18,11 @@ CPCReady Interactive Console with bottom toolbar
 """
 
 import click
+import os
 import subprocess
 import shlex
+import threading
+from html import escape
 from pathlib import Path
 from typing import Tuple
 from prompt_toolkit import PromptSession
@@ -28,78 +31,180 @@ from prompt_toolkit.formatted_text import HTML
 
 from cpcready.utils.toml_config import ConfigManager
 from cpcready.utils.click_custom import CustomCommand
+from cpcready.pydsk import DSK
 
 
-def get_bottom_toolbar():
-    """Get bottom toolbar with system status"""
-    config = ConfigManager()
-    parts = []
-    
-    # Logo Amstrad: ● en rojo, verde y azul (igual que los iconos de unidad)
-    logo = '<style fg="ansired">●</style><style fg="ansigreen">●</style><style fg="ansiblue">●</style>'
-    # Model info first
-    try:
-        model = config.get("system", "model", "464")
-        if model == "464":
-            kb="64K"
-        elif model == "664":
-            kb="64K"
-        elif model == "6128":
-            kb="128K"
-        else:
-            kb="N/A"
+class ToolbarState:
+    """
+    Cached snapshot of the status shown in the bottom toolbar.
+
+    prompt_toolkit redraws the toolbar on every keystroke, so the render
+    path must never touch the filesystem. The snapshot is rebuilt only when
+    the config file or one of the mounted disc images changes, detected by
+    polling their mtimes from a background thread.
+    """
+
+    POLL_INTERVAL = 1.0
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL):
+        self.config = ConfigManager()
+        self.poll_interval = poll_interval
+        self._stamps = None
+        self._config_stamp = None
+        self._settings = {}
+        # Catálogo cacheado por imagen: path -> (stamp, (ficheros, KB libres))
+        self._catalogs = {}
+        self._toolbar = HTML("")
+        # refresh() se llama desde el prompt y desde el hilo de sondeo
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.refresh()
+
+    @staticmethod
+    def _stamp(path):
+        """Devuelve (mtime_ns, size) del fichero o None si no existe."""
+        if not path:
+            return None
+        try:
+            st = os.stat(path)
+        except (OSError, ValueError):
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _catalog(self, path, stamp):
+        """Número de ficheros y KB libres de una imagen, cacheado por mtime."""
+        cached = self._catalogs.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        try:
+            dsk = DSK(path)
+            files = sum(
+                1 for entry in dsk.get_directory_entries()
+                if not entry.is_deleted and entry.num_page == 0
+            )
+            info = (files, dsk.get_free_space())
+        except Exception:
+            info = None
+        self._catalogs[path] = (stamp, info)
+        return info
+
+    def refresh(self) -> bool:
+        """
+        Rebuild the snapshot if anything it depends on changed.
+
+        Returns:
+            True if the toolbar content was rebuilt
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        """refresh() con el lock tomado: cachés y snapshot sólo se tocan aquí."""
+        config_stamp = self._stamp(self.config.config_path)
+        if config_stamp != self._config_stamp or self._stamps is None:
+            try:
+                self._settings = self.config.get_all()
+            except Exception:
+                self._settings = {}
+            self._config_stamp = config_stamp
+
+        drive = self._settings.get("drive", {})
+        path_a = drive.get("drive_a", "")
+        path_b = drive.get("drive_b", "")
+        stamps = (config_stamp, self._stamp(path_a), self._stamp(path_b))
+        if stamps == self._stamps:
+            return False
+
+        self._toolbar = self._render(stamps)
+        self._stamps = stamps
+        return True
+
+    def _render(self, stamps):
+        """Compone el HTML de la barra a partir del snapshot."""
+        settings = self._settings
+        system = settings.get("system", {})
+        drive = settings.get("drive", {})
+        parts = []
+
+        # Logo Amstrad: ● en rojo, verde y azul (igual que los iconos de unidad)
+        logo = '<style fg="ansired">●</style><style fg="ansigreen">●</style><style fg="ansiblue">●</style>'
+        model = str(system.get("model", "464"))
+        kb = {"464": "64K", "664": "64K", "6128": "128K"}.get(model, "N/A")
         parts.append(f"{logo} Amstrad CPC {model} {kb}")
-    except:
-        parts.append(f"{logo} CPC: N/A")
-    
-    # Drive A info
-    try:
-        drive_select = config.get("drive", "selected_drive", "a").upper()
-        drive_a_path = config.get("drive", "drive_a", "N/A")
-        disk_a_path = Path(drive_a_path)
-        disk_a_name = disk_a_path.name if disk_a_path.exists() else "Empty"
-        disk_a_status = "✓" if disk_a_path.exists() else "○"
-        # Icon change for selected/not selected
-        icon_a = '●' if drive_select == "A" else '○'
-        parts.append(f"A:{icon_a} {disk_a_status} {disk_a_name}")
-    except:
-        parts.append("A: N/A")
-    
-    # Drive B info
-    try:
-        drive_select = config.get("drive", "selected_drive", "a").upper()
-        drive_b_path = config.get("drive", "drive_b", "N/A")
-        disk_b_path = Path(drive_b_path)
-        disk_b_name = disk_b_path.name if disk_b_path.exists() else "Empty"
-        disk_b_status = "✓" if disk_b_path.exists() else "○"
-        # Icon change for selected/not selected
-        icon_b = '●' if drive_select == "B" else '○'
-        parts.append(f"B:{icon_b} {disk_b_status} {disk_b_name}")
-    except:
-        parts.append("B: N/A")
-    
-    # Emulator info
-    try:
-        emulator = config.get("emulator", "selected", "N/A")
+
+        drive_select = str(drive.get("selected_drive", "a")).upper()
+        for letter, stamp in (("A", stamps[1]), ("B", stamps[2])):
+            path = drive.get(f"drive_{letter.lower()}", "")
+            # Icon change for selected/not selected
+            icon = '●' if drive_select == letter else '○'
+            if stamp is None:
+                parts.append(f"{letter}:{icon} ○ Empty")
+                continue
+            text = f"{letter}:{icon} ✓ {escape(Path(path).name)}"
+            info = self._catalog(path, stamp)
+            if info is not None:
+                text += f" ({info[0]}F {info[1]}K)"
+            parts.append(text)
+
+        # Emulator info
+        emulator = settings.get("emulator", {}).get("selected", "N/A")
         if emulator == "RetroVirtualMachine":
             parts.append("Emulator: RVM")
         elif emulator == "M4Board":
-            m4_ip = config.get("m4board", "ip", "Not configured")
-            parts.append(f"Emulator: M4 ({m4_ip})")
+            m4_ip = settings.get("emulator", {}).get("m4board_ip") or "Not configured"
+            parts.append(f"Emulator: M4 ({escape(str(m4_ip))})")
         else:
-            parts.append(f"Emulator: {emulator}")
-    except:
-        parts.append("Emulator: N/A")
-    
-    # Video mode from [system] section
-    try:
-        video_mode = config.get("system", "mode", 2)
-        parts.append(f"Mode: {video_mode}")
-    except:
-        parts.append("Mode: N/A")
-    
-        # Concatenar el logo al principio del HTML
-    return HTML(f"<b>{' │ '.join(parts)}</b>")
+            parts.append(f"Emulator: {escape(str(emulator))}")
+
+        # Video mode from [system] section
+        parts.append(f"Mode: {system.get('mode', 2)}")
+
+        return HTML(f"<b>{' │ '.join(parts)}</b>")
+
+    def get(self):
+        """Devuelve la barra cacheada (sin acceso a disco)."""
+        return self._toolbar
+
+    def start(self, on_change=None):
+        """
+        Start polling for changes in a daemon thread.
+
+        Args:
+            on_change: Callback invoked after the snapshot is rebuilt
+        """
+        if self._thread is not None:
+            return
+
+        def poll():
+            while not self._stop.wait(self.poll_interval):
+                try:
+                    changed = self.refresh()
+                except Exception:
+                    continue
+                if changed and on_change:
+                    on_change()
+
+        self._thread = threading.Thread(target=poll, name="cpc-toolbar", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo de sondeo."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+
+_toolbar_state = None
+
+
+def get_bottom_toolbar():
+    """Get bottom toolbar with system status"""
+    global _toolbar_state
+    if _toolbar_state is None:
+        _toolbar_state = ToolbarState()
+    return _toolbar_state.get()
 
 
 class CommandParser:
@@ -246,6 +351,8 @@ def console():
     from prompt_toolkit.history import FileHistory
     import os
     history_path = os.path.expanduser("~/.config/cpcready/console_history.txt")
+    global _toolbar_state
+    _toolbar_state = ToolbarState()
     session = PromptSession(
         completer=completer,
         complete_while_typing=True,
@@ -253,10 +360,9 @@ def console():
         history=FileHistory(history_path),
     )
     
-    # Welcome message based on CPC model
-    config = ConfigManager()
-    model = config.get("system", "model", "464")
-    
+    # Redibujar la barra solo cuando cambie la config o un disco montado
+    _toolbar_state.start(on_change=session.app.invalidate)
+
     # Limpiar la consola al arrancar (usando print builtin)
     import builtins
     builtins.print("\033[2J\033[H", end="")
@@ -300,9 +406,6 @@ def console():
 
             cmd_type, args = parser.parse(command_line)
 
-            # Guardar modelo antes de ejecutar
-            old_model = config.get("system", "model", "464")
-
             if cmd_type == 'empty':
                 continue
 
@@ -318,6 +421,8 @@ def console():
 
             elif cmd_type == 'cpc':
                 parser.execute_cpc(args)
+                # El comando puede haber cambiado discos o config
+                _toolbar_state.refresh()
 
             elif cmd_type == 'system':
                 # Manejar cd de forma especial
@@ -337,3 +442,5 @@ def console():
         except Exception as e:
             print(f"Error: {e}")
             continue
+
+    _toolbar_state.stop()
@@ -0,0 +1,144 @@
+# Copyright (C) 2025 David CH.F (destroyer)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import click
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from cpcready.utils import DriveManager, SystemCPM
+from cpcready.utils.click_custom import CustomCommand, CustomGroup
+from cpcready.utils.console import info2, ok, debug, error, blank_line
+from cpcready.pydsk.dsk import DSK
+from cpcready.pydsk.gfx import convert_image
+from cpcready.save.save import parse_address
+from cpcready.screens.screens import parse_inks
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+console = Console()
+
+SCREEN_ADDRESS = 0xC000
+SPRITE_ADDRESS = 0x4000
+
+
+# Grupo de herramientas gráficas
+@click.group(cls=CustomGroup, name='gfx')
+def gfx_group():
+    """Graphics conversion tools."""
+    pass
+
+
+def disc_name_for(image, sprite):
+    """Nombre AMSDOS por defecto: el de la imagen con extensión .SCR o .SPR."""
+    stem = Path(image).name.split(".")[0]
+    return f"{stem[:8].upper()}.{'SPR' if sprite else 'SCR'}"
+
+
+@gfx_group.command(cls=CustomCommand, name='convert')
+@click.argument("images", nargs=-1, required=True)
+@click.option("-m", "--mode", type=click.Choice(['0', '1', '2']), help="Screen mode (default: configured mode)")
+@click.option("-s", "--sprite", is_flag=True, help="Write linear sprite data instead of a full screen")
+@click.option("--dither", is_flag=True, help="Ordered dithering for colours between palette levels")
+@click.option("--inks", callback=parse_inks, metavar="LIST", help="Firmware inks of pens 0, 1, 2... (default: most used colours)")
+@click.option("--no-size", is_flag=True, help="Do not start sprites with their width (bytes) and height")
+@click.option("-o", "--output", metavar="NAME", help="Name on the disc (only with one image)")
+@click.option("--load", metavar="ADDRESS", help="Load address (default: &C000 for screens, &4000 for sprites)")
+@click.option("-j", "--jobs", type=click.IntRange(1), help="Worker processes (default: one per CPU)")
+@click.option("-A", "--drive-a", is_flag=True, help="Use disc in drive A")
+@click.option("-B", "--drive-b", is_flag=True, help="Use disc in drive B")
+def convert(images, mode, sprite, dither, inks, no_size, output, load, jobs, drive_a, drive_b):
+    """Convert PNG images to CPC screens or sprites and save them to the disc.
+
+    Colours are matched to the 27-colour hardware palette and reduced to
+    16, 4 or 2 inks for modes 0, 1 and 2. Screens are scaled to the mode
+    resolution and stored as a 16 KB SCREEN$; sprites keep their size and
+    are stored row by row. Several images are converted in parallel.
+
+    \b
+    Examples:
+      cpc gfx convert title.png --mode 0 --dither
+      cpc gfx convert hero.png enemy.png --sprite --mode 1
+      cpc gfx convert logo.png -o logo.bin --inks 0,26,13,6
+    """
+    drive_manager = DriveManager()
+    disc_name = drive_manager.get_disc_name(drive_a, drive_b)
+    if disc_name is None:
+        error("No disc inserted in the specified drive.")
+        return
+
+    blank_line(1)
+    if output and len(images) > 1:
+        error("--output can only be used with one image.")
+        blank_line(1)
+        return
+    missing = [image for image in images if not Path(image).exists()]
+    if missing:
+        error(f"File not found: {', '.join(missing)}")
+        blank_line(1)
+        return
+
+    system_cpm = SystemCPM()
+    mode = int(mode if mode is not None else system_cpm.get_mode())
+    user_number = int(system_cpm.get_user_number())
+    try:
+        load_addr = parse_address(load) if load else (SPRITE_ADDRESS if sprite else SCREEN_ADDRESS)
+    except ValueError:
+        error(f"Invalid load address: {load}")
+        blank_line(1)
+        return
+
+    info2(f"Converting {len(images)} image(s) to mode {mode} {'sprites' if sprite else 'screens'}...")
+    start = time.perf_counter()
+    args = (mode, sprite, dither, inks, not no_size)
+    workers = min(jobs or os.cpu_count() or 1, len(images))
+    try:
+        if workers == 1:
+            results = [convert_image(image, *args) for image in images]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(convert_image, image, *args) for image in images]
+                results = [future.result() for future in futures]
+    except (ValueError, OSError) as e:
+        error(f"Error converting image: {e}")
+        blank_line(1)
+        return
+    debug(f"Converted {len(images)} image(s) with {workers} worker(s) in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+    table = Table(border_style="bright_blue", box=box.ROUNDED)
+    table.add_column("File", style="bold yellow")
+    table.add_column("Size", justify="right", style="white")
+    table.add_column("Pixels", justify="right", style="white")
+    table.add_column("Inks", style="green")
+    try:
+        # La escritura en el disco es secuencial y se guarda una sola vez
+        dsk = DSK(disc_name)
+        for image, result in zip(images, results):
+            name = (output or disc_name_for(image, sprite)).upper()
+            dsk.write_bytes(result.data, name, file_type=2, load_addr=load_addr,
+                            user=user_number, force=True)
+            table.add_row(name, str(len(result.data)), f"{result.width}x{result.height}",
+                          ",".join(str(ink) for ink in result.inks))
+        dsk.save()
+    except Exception as e:
+        error(f"Error saving to disc: {e}")
+        blank_line(1)
+        return
+
+    console.print(table)
+    ok(f"{len(results)} file(s) saved to disc '{Path(disc_name).name}' at &{load_addr:04X}.")
+    blank_line(1)
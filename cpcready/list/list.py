@@ -13,6 +13,8 @@
 # and limitations under the License.
 
 import click
+import itertools
+import re
 from pathlib import Path
 import shutil
 from cpcready.utils import console, system, DriveManager, discManager, SystemCPM
@@ -20,18 +22,116 @@ from cpcready.utils.click_custom import CustomCommand, CustomGroup
 from cpcready.utils.console import info2, ok, debug, warn, error, message,blank_line,banner
 from cpcready.utils.version import add_version_option_to_group
 from cpcready.pydsk import DSK
-from cpcready.pydsk.basic_viewer import view_basic, detect_basic_format, view_basic_ascii, detokenize_basic
+from cpcready.pydsk.basic_viewer import detect_basic_format, view_basic_ascii, iter_basic_lines
+from cpcready.pydsk.file_viewer import iter_hex_dump, iter_ascii_text
+from cpcready.pydsk.z80 import disassembly_lines
+from cpcready.save.save import parse_address
 from rich.console import Console
 from rich.panel import Panel
 from rich.syntax import Syntax
 console = Console()
 
+# Número de línea al principio de una línea de BASIC ASCII
+_LINE_NUMBER = re.compile(r"\s*(\d+)")
+
+
+def read_program(dsk, file_name, user):
+    """
+    Read a file once and split its AMSDOS header.
+
+    Returns:
+        Tuple (AMSDOS file type or None if headerless, data without header)
+    """
+    raw = dsk.read_file(file_name, keep_header=True, user=user)
+    if len(raw) >= 128 and dsk._check_amsdos_header(raw):
+        length = raw[0x18] | (raw[0x19] << 8)
+        return raw[0x12], raw[128:128 + length]
+    return None, raw
+
+
+def read_code(dsk, file_name, user):
+    """
+    Read a file for disassembly.
+
+    Returns:
+        Tuple (load address, exec address or None, data without header).
+        Headerless files are loaded at address 0.
+    """
+    raw = dsk.read_file(file_name, keep_header=True, user=user)
+    if len(raw) >= 128 and dsk._check_amsdos_header(raw):
+        length = raw[0x18] | (raw[0x19] << 8)
+        load = raw[0x15] | (raw[0x16] << 8)
+        entry = raw[0x1A] | (raw[0x1B] << 8)
+        return load, entry, raw[128:128 + length]
+    return 0, None, raw
+
+
+def _iter_ascii_lines(text, first=None, last=None):
+    """Líneas de un BASIC ASCII como (número, texto) filtradas por rango."""
+    for line in text.splitlines():
+        match = _LINE_NUMBER.match(line)
+        number = int(match.group(1)) if match else None
+        if first is not None or last is not None:
+            if number is None or (first is not None and number < first):
+                continue
+            if last is not None and number > last:
+                return
+        yield number, line
+
+
+def iter_listing(data, first=None, last=None, search=None):
+    """
+    Decode a BASIC program lazily, tokenized or ASCII.
+
+    Only the lines between *first* and *last* are decoded; *search* keeps
+    the lines containing the text (case-insensitive).
+    """
+    is_tokenized, fmt = detect_basic_format(data)
+    if is_tokenized:
+        lines = iter_basic_lines(data, first, last)
+    else:
+        lines = _iter_ascii_lines(view_basic_ascii(data), first, last)
+    if search:
+        needle = search.upper()
+        lines = (line for line in lines if needle in line[1].upper())
+    return lines
+
+
 @click.command(cls=CustomCommand)
 @click.argument("file_name", required=True)
+@click.option("--from", "first", type=int, metavar="LINE", help="First BASIC line to list")
+@click.option("--to", "last", type=int, metavar="LINE", help="Last BASIC line to list")
+@click.option("-s", "--search", metavar="TEXT", help="Only list lines containing TEXT")
+@click.option("--pager", is_flag=True, help="Show the listing through the system pager")
+@click.option("--plain", is_flag=True, help="Plain text output, streamed line by line")
+@click.option("-d", "--disasm", is_flag=True, help="Disassemble the file as Z80 code")
+@click.option("-x", "--hex", "hex_dump", is_flag=True, help="Hex dump of the file")
+@click.option("-a", "--ascii", "ascii_text", is_flag=True, help="Show the file as ASCII text")
+@click.option("--offset", metavar="N", help="First byte to show with --hex/--ascii")
+@click.option("--length", metavar="N", help="Number of bytes to show with --hex/--ascii")
+@click.option("--start", metavar="ADDR", help="First address to disassemble (&4000, 0x4000 or 16384)")
+@click.option("--end", metavar="ADDR", help="Last address to disassemble")
+@click.option("--follow", is_flag=True, help="Follow the code from the exec address and show the rest as data")
 @click.option("-A", "--drive-a", is_flag=True, help="Insert disc into drive A")
 @click.option("-B", "--drive-b", is_flag=True, help="Insert disc into drive B")
-def list(file_name, drive_a, drive_b):
-    """List BASIC file from virtual disc."""
+def list(file_name, first, last, search, pager, plain, disasm, hex_dump, ascii_text, offset, length,
+         start, end, follow, drive_a, drive_b):
+    """List BASIC file from virtual disc.
+
+    With --disasm the file is disassembled as Z80 code from its AMSDOS
+    load address. --hex and --ascii stream any file through the pager
+    (or straight to the terminal with --plain).
+
+    \b
+    Examples:
+      cpc list game.bas
+      cpc list game.bas --from 1000 --to 1200
+      cpc list game.bas --search GOSUB --plain
+      cpc list game.bas --pager
+      cpc list game.bin --disasm --start &4000 --end &40FF
+      cpc list game.bin --disasm --follow --pager
+      cpc list game.bin --hex --offset &100 --length 256
+    """
     # Obtener el nombre del disco usando DriveManager
     drive_manager = DriveManager()
     system_cpm = SystemCPM()
@@ -45,48 +145,87 @@ def list(file_name, drive_a, drive_b):
     # Obtener el user number actual
     user_number = system_cpm.get_user_number()
     
-    blank_line(1)
+    if not plain:
+        blank_line(1)
     
     try:
         dsk = DSK(disc_name)
         
-        # Leer archivo con cabecera para verificar el tipo
-        data_with_header = dsk.read_file(file_name, keep_header=True, user=user_number)
+        if hex_dump or ascii_text:
+            # Se lee bloque a bloque: memoria constante aunque el archivo sea grande
+            chunks = dsk.iter_file_chunks(file_name, user_number, keep_header=False)
+            offset = parse_address(offset) or 0
+            length = parse_address(length)
+            if hex_dump:
+                output = (f"{row}\n" for row in iter_hex_dump(chunks, offset, length))
+            else:
+                output = iter_ascii_text(chunks, offset, length)
+            if plain:
+                for text in output:
+                    click.echo(text, nl=False)
+            else:
+                click.echo_via_pager(output)
+            return
         
-        # Verificar si tiene cabecera AMSDOS válida
-        if len(data_with_header) >= 128 and dsk._check_amsdos_header(data_with_header):
-            file_type = data_with_header[0x12]  # Byte de tipo de archivo
-            
-            # Tipo 2 = BINARY
-            if file_type == 2:
-                error(f"Cannot list binary file: {file_name}")
-                blank_line(1)
-                return
-            
-            # Tipo 22 = SCREEN$
-            if file_type == 22:
-                error(f"Cannot list screen file: {file_name}")
+        if disasm:
+            origin, entry, data = read_code(dsk, file_name, user_number)
+            entries = None
+            if follow:
+                if entry is None:
+                    warn(f"{file_name} has no AMSDOS header, there is no entry point to follow")
+                else:
+                    entries = [entry]
+            lines = disassembly_lines(data, origin, parse_address(start), parse_address(end), entries)
+            # Salida en streaming: el desensamblado no se guarda entero en memoria
+            if pager:
+                click.echo_via_pager(f"{line}\n" for line in lines)
+            else:
+                for line in lines:
+                    click.echo(line)
+            if not plain:
                 blank_line(1)
-                return
+            return
         
-        # Leer archivo sin cabecera para procesarlo
-        data = dsk.read_file(file_name, keep_header=False, user=user_number)
+        # Leer el archivo una sola vez y comprobar el tipo en la cabecera
+        file_type, data = read_program(dsk, file_name, user_number)
         
-        # Intentar visualizar como BASIC - auto detectar formato
-        listing = view_basic(data, auto_detect=True)
+        # Tipo 2 = BINARY
+        if file_type == 2:
+            error(f"Cannot list binary file: {file_name}")
+            blank_line(1)
+            return
         
-        # Si el listing está vacío, no es BASIC
-        if not listing or not listing.strip():
-            error(f"File does not appear to be a valid BASIC program: {file_name}")
+        # Tipo 22 = SCREEN$
+        if file_type == 22:
+            error(f"Cannot list screen file: {file_name}")
             blank_line(1)
             return
         
-        # Mostrar el listado directamente sin más validaciones
-        syntax = Syntax(listing, "basic", theme="monokai", line_numbers=True)
-        console.print(Panel(syntax, title=f"Listing '{file_name}'", border_style="bright_blue"))
+        lines = iter_listing(data, first, last, search)
+        head = next(lines, None)
+        
+        # Sin ninguna línea: no es BASIC, o el filtro no encuentra nada
+        if head is None:
+            if first is None and last is None and not search:
+                error(f"File does not appear to be a valid BASIC program: {file_name}")
+            else:
+                warn(f"No lines match in {file_name}")
+            blank_line(1)
+            return
+        
+        lines = itertools.chain([head], lines)
+        if pager:
+            click.echo_via_pager(f"{text}\n" for _, text in lines)
+        elif plain:
+            for _, text in lines:
+                click.echo(text)
+            return
+        else:
+            listing = "\n".join(text for _, text in lines)
+            syntax = Syntax(listing, "basic", theme="monokai", line_numbers=True)
+            console.print(Panel(syntax, title=f"Listing '{file_name}'", border_style="bright_blue"))
         
     except Exception as e:
         error(f"Error listing file: {e}")
     
     blank_line(1)
-
@@ -16,20 +16,33 @@
 
 
 from rich.console import Console
+from rich.table import Table
+from rich import box
+import asyncio
 import sys
+import os
+import posixpath
+import time
 
 import click
 import questionary
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
 from cpcready.utils.click_custom import CustomCommand, CustomGroup
-from cpcready.utils.console import info2, ok, error, warn, blank_line
+from cpcready.utils.console import info2, ok, debug, error, warn, blank_line
+from cpcready.utils.system import file_digest
 from cpcready.utils.toml_config import ConfigManager
-from cpcready.utils.m4board import M4Board
+from cpcready.utils.m4board import M4Board, configured_ip, parse_listing
+from cpcready.build.build import read_cache, write_cache
+
+SYNC_MANIFEST = Path(".cpcready") / "m4sync.json"
 
 console = Console()
 
 
 
+# Los subcomandos que aún no funcionan se registran ocultos (hidden=True)
 @click.group(cls=CustomGroup)
 def m4():
     """M4Board management commands."""
@@ -37,43 +50,43 @@ def m4():
 
 
 @m4.command(cls=CustomCommand)
-def status():
-    """Check M4Board connection status."""
+@click.argument("folder", default="/")
+@click.option("--ip", help="M4Board IP address (default: the one set with cpc settings)")
+def status(folder, ip):
+    """Check M4Board connection status.
+
+    Probes the board and walks FOLDER on the SD card (default: /) to
+    count the files it holds.
+    """
     blank_line(1)
-    
-    console.print("[bold yellow]\n⚠️ This feature is under development.\nExiting...\n[/bold yellow]")
-    sys.exit(0)
-    
-    # Obtener configuración
-    config = ConfigManager()
-    ip = config.get("m4board", "ip", "")
-    
-    if not ip:
-        error("M4Board IP not configured.")
-        error("Use 'cpc m4 config' to configure the IP address.")
+    try:
+        board = M4Board(ip)
+    except ValueError as e:
+        error(str(e))
         blank_line(1)
         return
-    
-    info2(f"M4Board IP: {ip}")
-    
-    # Verificar conexión
-    try:
-        m4 = M4Board(ip)
-        if m4.check_connection():
-            ok("M4Board is reachable and ready.")
-        else:
+
+    info2(f"M4Board IP: {board.ip}")
+    with board:
+        if not board.check_connection():
             error("M4Board is not reachable.")
             error("Check that:")
             error("  - M4Board is powered on")
             error("  - Network connection is working")
             error("  - IP address is correct")
-    except Exception as e:
-        error(f"Error: {e}")
-    
+            blank_line(1)
+            return
+        ok("M4Board is reachable and ready.")
+        try:
+            files = board.walk(folder)
+        except (OSError, asyncio.TimeoutError) as e:
+            error(f"Cannot read the SD card: {e}")
+        else:
+            info2(f"SD card {folder}: {len(files)} file(s)")
     blank_line(1)
 
 
-@m4.command(cls=CustomCommand)
+@m4.command(cls=CustomCommand, hidden=True)
 def config():
     """Configure M4Board IP address."""
     blank_line(1)
@@ -81,7 +94,7 @@ def config():
     sys.exit(0)
     # Obtener configuración actual
     config_manager = ConfigManager()
-    current_ip = config_manager.get("m4board", "ip", "")
+    current_ip = config_manager.get("emulator", "m4board_ip", "")
     
     if current_ip:
         info2(f"Current IP: {current_ip}")
@@ -110,7 +123,7 @@ def config():
             ok("Connection successful!")
             
             # Guardar configuración
-            config_manager.set("m4board", "ip", ip)
+            config_manager.set("emulator", "m4board_ip", ip)
             blank_line(1)
             ok(f"M4Board IP configured: {ip}")
         else:
@@ -123,7 +136,7 @@ def config():
     blank_line(1)
 
 
-@m4.command(cls=CustomCommand)
+@m4.command(cls=CustomCommand, hidden=True)
 def reset_m4():
     """Reset M4Board."""
     blank_line(1)
@@ -138,7 +151,7 @@ def reset_m4():
     blank_line(1)
 
 
-@m4.command(cls=CustomCommand)
+@m4.command(cls=CustomCommand, hidden=True)
 def reset_cpc():
     """Reset CPC."""
     blank_line(1)
@@ -153,7 +166,7 @@ def reset_cpc():
     blank_line(1)
 
 
-@m4.command(cls=CustomCommand)
+@m4.command(cls=CustomCommand, hidden=True)
 @click.argument("file_path", type=click.Path(exists=True))
 @click.option("-d", "--destination", default="/", help="Destination directory on SD card")
 @click.option("-h", "--header", is_flag=True, help="Add AMSDOS header")
@@ -174,7 +187,7 @@ def push(file_path, destination, header):
     blank_line(1)
 
 
-@m4.command(cls=CustomCommand)
+@m4.command(cls=CustomCommand, hidden=True)
 @click.argument("cpc_path")
 @click.option("-o", "--output", default=None, help="Local output file path")
 def pull(cpc_path, output):
@@ -194,7 +207,7 @@ def pull(cpc_path, output):
     blank_line(1)
 
 
-@m4.command(cls=CustomCommand)
+@m4.command(cls=CustomCommand, hidden=True)
 @click.argument("cpc_file")
 def exec(cpc_file):
     """Execute a file on CPC.
@@ -213,7 +226,7 @@ def exec(cpc_file):
     blank_line(1)
 
 
-@m4.command(cls=CustomCommand)
+@m4.command(cls=CustomCommand, hidden=True)
 @click.argument("file_path", type=click.Path(exists=True))
 @click.option("-d", "--destination", default="/tmp", help="Destination directory (default: /tmp)")
 def run(file_path, destination):
@@ -239,7 +252,7 @@ def run(file_path, destination):
     blank_line(1)
 
 
-@m4.command(cls=CustomCommand)
+@m4.command(cls=CustomCommand, hidden=True)
 @click.argument("folder")
 def mkdir(folder):
     """Create a directory on M4Board SD card.
@@ -258,7 +271,7 @@ def mkdir(folder):
     blank_line(1)
 
 
-@m4.command(cls=CustomCommand)
+@m4.command(cls=CustomCommand, hidden=True)
 @click.argument("folder")
 def cd(folder):
     """Change current directory on CPC.
@@ -277,7 +290,7 @@ def cd(folder):
     blank_line(1)
 
 
-@m4.command(cls=CustomCommand)
+@m4.command(cls=CustomCommand, hidden=True)
 @click.argument("cpc_file")
 def rm(cpc_file):
     """Remove a file or empty directory on CPC.
@@ -296,7 +309,7 @@ def rm(cpc_file):
     blank_line(1)
 
 
-@m4.command(cls=CustomCommand)
+@m4.command(cls=CustomCommand, hidden=True)
 def pause():
     """Pause CPC execution."""
     blank_line(1)
@@ -313,21 +326,229 @@ def pause():
 
 @m4.command(cls=CustomCommand)
 @click.argument("folder", default="")
-def ls(folder):
+@click.option("-r", "--recursive", is_flag=True, help="List every file under FOLDER, subfolders included")
+@click.option("--ip", help="M4Board IP address (default: the one set with cpc settings)")
+def ls(folder, recursive, ip):
     """List files in a directory on CPC.
     
-    FOLDER: Directory to list (default: current directory)
+    FOLDER: Directory to list (default: current directory, / with --recursive)
+
+    \b
+    Examples:
+      cpc m4 ls /games
+      cpc m4 ls /games --recursive
     """
     blank_line(1)
-    console.print("[bold yellow]\n⚠️ This feature is under development.\nExiting...\n[/bold yellow]")
-    sys.exit(0)
     try:
-        m4 = M4Board()
-        listing = m4.ls(folder)
-        
-        if listing:
-            print(listing)
-    except Exception as e:
-        error(f"Error: {e}")
-    
+        board = M4Board(ip)
+    except ValueError as e:
+        error(str(e))
+        blank_line(1)
+        return
+
+    if recursive:
+        if not board.check_connection():
+            error("Cannot connect to M4Board")
+            blank_line(1)
+            return
+        # Las subcarpetas se recorren a la vez (M4Board.walk)
+        try:
+            with board:
+                files = board.walk(folder or "/")
+        except (OSError, asyncio.TimeoutError) as e:
+            error(f"Error: {e}")
+            blank_line(1)
+            return
+        for path in files:
+            console.print(path)
+        info2(f"{len(files)} file(s)")
+        blank_line(1)
+        return
+
+    with board:
+        listing = board.ls(folder)
+    if listing is None:
+        blank_line(1)
+        return
+    table = Table(border_style="bright_blue", box=box.ROUNDED)
+    table.add_column("Name", style="bold yellow")
+    table.add_column("Size", justify="right", style="green")
+    for entry in parse_listing(listing):
+        table.add_row(entry.name + ("/" if entry.is_dir else ""), "<DIR>" if entry.is_dir else entry.size)
+    console.print(table)
+    blank_line(1)
+
+
+class SyncPlan(NamedTuple):
+    """Cambios para dejar el directorio remoto igual que el local."""
+    upload: list
+    delete: list
+    directories: list
+    files: dict
+
+
+def scan_tree(local_dir, previous):
+    """
+    (size, mtime, hash) de cada fichero bajo local_dir, con rutas relativas
+    POSIX. Si el tamaño y la fecha no han cambiado se reutiliza el hash del
+    manifiesto y el fichero no se vuelve a leer.
+    """
+    files = {}
+    for root, dirs, names in os.walk(local_dir):
+        # Sin directorios ocultos (.git, .cpcready...)
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(names):
+            if name.startswith("."):
+                continue
+            path = Path(root) / name
+            rel = path.relative_to(local_dir).as_posix()
+            stat = path.stat()
+            old = previous.get(rel)
+            if old and old[0] == stat.st_size and old[1] == stat.st_mtime_ns:
+                files[rel] = old
+            else:
+                files[rel] = [stat.st_size, stat.st_mtime_ns, file_digest(path)]
+    return files
+
+
+def plan_sync(local_dir, previous):
+    """
+    Compare the local tree with the manifest of the last sync.
+
+    Returns:
+        SyncPlan with the files to upload and delete, the remote
+        directories that may not exist yet and the new manifest entries
+    """
+    files = scan_tree(local_dir, previous)
+    upload = [rel for rel, entry in files.items()
+              if rel not in previous or previous[rel][::2] != entry[::2]]
+    delete = sorted(rel for rel in previous if rel not in files)
+    known = {posixpath.dirname(rel) for rel in previous}
+    directories = sorted({posixpath.dirname(rel) for rel in upload} - known - {""})
+    return SyncPlan(upload, delete, directories, files)
+
+
+def sync_tree(board, local_dir, remote_dir, previous, jobs=2, delete=True):
+    """
+    Apply a sync plan to the M4Board.
+
+    Returns:
+        Tuple (plan, manifest, failed): the new manifest only records the
+        files that reached the board, so failed ones are retried next time
+    """
+    plan = plan_sync(local_dir, previous)
+    manifest = {rel: entry for rel, entry in previous.items() if rel in plan.files}
+    if not delete:
+        manifest.update({rel: previous[rel] for rel in plan.delete})
+    failed = []
+
+    # Los directorios se crean antes de subir nada, de padre a hijo
+    for directory in plan.directories:
+        parts = directory.split("/")
+        for depth in range(1, len(parts) + 1):
+            board.mkdir(posixpath.join(remote_dir, *parts[:depth]))
+
+    def upload(rel):
+        destination = posixpath.join(remote_dir, posixpath.dirname(rel))
+        return rel, board.upload_file(Path(local_dir) / rel, destination)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for rel, done in pool.map(upload, plan.upload):
+            if done:
+                manifest[rel] = plan.files[rel]
+            else:
+                manifest.pop(rel, None)
+                failed.append(rel)
+
+    if delete and plan.delete:
+        # Los borrados son independientes: se envían juntos (M4Board.batch)
+        try:
+            removed = board.batch([("rm", posixpath.join(remote_dir, rel)) for rel in plan.delete])
+        except (OSError, asyncio.TimeoutError) as e:
+            debug(f"m4 sync rm: {e}")
+            removed = [False] * len(plan.delete)
+        for rel, done in zip(plan.delete, removed):
+            if not done:
+                manifest[rel] = previous[rel]
+                failed.append(rel)
+    return plan, manifest, failed
+
+
+@m4.command(cls=CustomCommand)
+@click.argument("local_dir", type=click.Path(exists=True, file_okay=False))
+@click.argument("remote_dir", default="/")
+@click.option("-j", "--jobs", type=click.IntRange(1, 8), default=2, show_default=True,
+              help="Concurrent uploads")
+@click.option("--no-delete", is_flag=True, help="Keep remote files removed from LOCAL_DIR")
+@click.option("--full", is_flag=True, help="Upload every file, ignoring the last sync")
+@click.option("--dry-run", is_flag=True, help="Show what would change without touching the board")
+@click.option("--ip", help="M4Board IP address (default: the one set with cpc settings)")
+def sync(local_dir, remote_dir, jobs, no_delete, full, dry_run, ip):
+    """Mirror a local directory onto the M4Board SD card.
+
+    A manifest of the last sync (size and SHA-256 of every file) is kept
+    in LOCAL_DIR/.cpcready for each board and remote directory. Only new
+    and changed files are uploaded, over JOBS connections, and files
+    removed locally are deleted from the card. Hidden files are skipped.
+
+    \b
+    Examples:
+      cpc m4 sync build /games/mygame
+      cpc m4 sync . /dev --dry-run
+      cpc m4 sync dist / -j 1 --no-delete
+    """
+    blank_line(1)
+    if not remote_dir.startswith("/"):
+        remote_dir = "/" + remote_dir
+
+    manifest_path = Path(local_dir) / SYNC_MANIFEST
+    cache = read_cache(manifest_path)
+    # La simulación no abre la placa: la IP solo sirve para elegir el manifiesto
+    ip = ip or configured_ip()
+    target = f"{ip}:{remote_dir}"
+    previous = {} if full or not ip else cache.get(target, {})
+
+    if dry_run:
+        plan = plan_sync(local_dir, previous)
+        if not plan.upload and not (plan.delete and not no_delete):
+            ok(f"{target} is up to date.")
+        for directory in plan.directories:
+            info2(f"mkdir {posixpath.join(remote_dir, directory)}")
+        for rel in plan.upload:
+            info2(f"+ {rel} ({plan.files[rel][0]} bytes)")
+        for rel in ([] if no_delete else plan.delete):
+            info2(f"- {rel}")
+        blank_line(1)
+        return
+
+    try:
+        board = M4Board(ip, pool_size=jobs)
+    except ValueError as e:
+        error(str(e))
+        blank_line(1)
+        return
+
+    if not board.check_connection():
+        error("Cannot connect to M4Board")
+        blank_line(1)
+        return
+
+    start = time.perf_counter()
+    with board:
+        plan, manifest, failed = sync_tree(board, local_dir, remote_dir, previous,
+                                           jobs=jobs, delete=not no_delete)
+    elapsed = time.perf_counter() - start
+
+    cache[target] = manifest
+    write_cache(manifest_path, cache)
+    debug(f"m4 sync {target}: {len(plan.upload)} up, {len(plan.delete)} down in {elapsed * 1000:.0f} ms")
+
+    blank_line(1)
+    deleted = 0 if no_delete else len(plan.delete)
+    if failed:
+        error(f"{len(failed)} file(s) failed: {', '.join(failed)}")
+    elif not plan.upload and not deleted:
+        ok(f"{target} is up to date.")
+    else:
+        ok(f"{target} synced: {len(plan.upload)} uploaded, {deleted} removed in {elapsed:.1f} s.")
     blank_line(1)
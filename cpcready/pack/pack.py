@@ -0,0 +1,148 @@
+# Copyright (C) 2025 David CH.F (destroyer)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import click
+import time
+from pathlib import Path
+from cpcready.utils import DriveManager, SystemCPM
+from cpcready.utils.click_custom import CustomCommand
+from cpcready.utils.console import info2, ok, debug, error, blank_line
+from cpcready.pydsk.dsk import DSK
+from cpcready.pydsk.zx0 import DEFAULT_CHAIN, ZX0Error, compress, decompress
+from cpcready.list.list import read_code
+from cpcready.save.save import parse_address
+
+# Dirección de carga por defecto de los datos comprimidos
+PACKED_ADDRESS = 0x4000
+
+
+def read_host_data(dsk, file_name):
+    """Lee un fichero del host, quitando la cabecera AMSDOS si la tiene."""
+    raw = Path(file_name).read_bytes()
+    if len(raw) >= 128 and dsk._check_amsdos_header(raw):
+        length = raw[0x18] | (raw[0x19] << 8)
+        return raw[128:128 + length]
+    return raw
+
+
+def packed_name(file_name, disc):
+    """Nombre por defecto: el del fichero con extensión .ZX0 (.zx0 en el host)."""
+    stem = Path(file_name).name.split(".")[0]
+    return f"{stem[:8].upper()}.ZX0" if disc else f"{stem}.zx0"
+
+
+@click.command(cls=CustomCommand)
+@click.argument("file_name", required=True)
+@click.option("-o", "--output", metavar="NAME", help="Output file (default: FILE_NAME with .zx0 extension)")
+@click.option("--host", is_flag=True, help="Read FILE_NAME from the host instead of the disc")
+@click.option("--disc", "to_disc", is_flag=True, help="Save the packed data into the disc with an AMSDOS header")
+@click.option("--load", metavar="ADDRESS", help="Load address of the packed file on the disc (default: &4000)")
+@click.option("--exec", "exec_addr", metavar="ADDRESS", help="Entry address of the packed file on the disc")
+@click.option("--chain", type=click.IntRange(1, 4096), default=DEFAULT_CHAIN, show_default=True,
+              help="Matches tried per position (higher packs better but slower)")
+@click.option("--no-verify", is_flag=True, help="Do not unpack the result to check it")
+@click.option("-A", "--drive-a", is_flag=True, help="Use disc in drive A")
+@click.option("-B", "--drive-b", is_flag=True, help="Use disc in drive B")
+def pack(file_name, output, host, to_disc, load, exec_addr, chain, no_verify, drive_a, drive_b):
+    """Compress a file with ZX0 for the standard Z80 depacker.
+
+    The data (without its AMSDOS header) is packed with an optimal parse
+    and unpacked again to check it. The result is written to the host as
+    raw data, or into the disc as a binary file with --disc, ready to be
+    loaded and unpacked with dzx0 on the CPC.
+
+    \b
+    Examples:
+      cpc pack title.scr
+      cpc pack title.scr --disc --load &4000
+      cpc pack build/game.bin --host -o game.zx0 --chain 256
+    """
+    system_cpm = SystemCPM()
+
+    # Solo hace falta un disco para leer el fichero de él o para guardar en él
+    disc_name = None
+    if to_disc or not host:
+        disc_name = DriveManager().get_disc_name(drive_a, drive_b)
+        if not disc_name:
+            error("No disc inserted in the specified drive.")
+            return
+
+    user_number = int(system_cpm.get_user_number())
+    blank_line(1)
+    if host and not Path(file_name).exists():
+        error(f"File '{file_name}' not found.")
+        blank_line(1)
+        return
+    try:
+        load_addr = parse_address(load) if load else PACKED_ADDRESS
+        entry = parse_address(exec_addr) if exec_addr else 0
+    except ValueError:
+        error(f"Invalid address: {load if load else exec_addr}")
+        blank_line(1)
+        return
+
+    try:
+        dsk = DSK(disc_name) if disc_name else DSK()
+        if host:
+            data = read_host_data(dsk, file_name)
+        else:
+            _, _, data = read_code(dsk, file_name, user_number)
+    except Exception as e:
+        error(f"Error reading file: {e}")
+        blank_line(1)
+        return
+    if not data:
+        error(f"File '{file_name}' is empty.")
+        blank_line(1)
+        return
+
+    info2(f"Packing '{file_name}' ({len(data)} bytes)...")
+    start = time.perf_counter()
+    packed = compress(data, max_chain=chain)
+    elapsed = time.perf_counter() - start
+    debug(f"zx0 {file_name}: {len(data)} -> {len(packed)} bytes in {elapsed * 1000:.0f} ms (chain {chain})")
+
+    if not no_verify:
+        try:
+            unpacked = decompress(packed)
+        except ZX0Error as e:
+            unpacked = None
+            debug(f"Verification failed: {e}")
+        if unpacked != data:
+            error("Verification failed: packed data does not unpack to the original.")
+            blank_line(1)
+            return
+
+    output = output or packed_name(file_name, to_disc)
+    try:
+        if to_disc:
+            output = output.upper()
+            dsk.write_bytes(packed, output, file_type=2, load_addr=load_addr, exec_addr=entry,
+                            user=user_number, force=True)
+            dsk.save()
+        else:
+            Path(output).write_bytes(packed)
+    except Exception as e:
+        error(f"Error saving packed file: {e}")
+        blank_line(1)
+        return
+
+    ratio = len(packed) * 100 / len(data)
+    info2(f"{len(data)} -> {len(packed)} bytes ({ratio:.1f}%) in {elapsed:.2f} s"
+          f"{'' if no_verify else ', verified'}")
+    where = f"disc at &{load_addr:04X}" if to_disc else "host"
+    ok(f"Packed file saved as '{output}' ({where}).")
+    blank_line(1)
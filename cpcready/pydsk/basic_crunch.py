@@ -0,0 +1,342 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+
+"""
+Compactador de programas Locomotive BASIC
+
+Aplica a mano lo que se hacía para que un programa ocupe menos y corra más
+en el CPC: quitar comentarios y espacios, unir líneas a las que nadie salta,
+acortar nombres de variables y renumerar.
+
+Todas las transformaciones trabajan sobre los lexemas de basic_tokenizer,
+así que da igual que el programa de partida esté tokenizado o en ASCII.
+"""
+
+import itertools
+from collections import Counter
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from .basic_tokenizer import (
+    FUNCTIONS, KEYWORDS, BasicTokenizeError, Lexeme, encode_line, encode_lexemes,
+    iter_source_lines, iter_tokenized_lines,
+)
+from .basic_viewer import detect_basic_format
+
+Line = Tuple[int, List[Lexeme]]
+
+MAX_LINE_LENGTH = 255
+
+_SEPARATOR = Lexeme("sep", ":")
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+_NAME_CHARS = _LETTERS + "0123456789"
+# Con DEFINT/DEFSTR/DEFREAL el tipo depende de la primera letra del nombre
+_DEF_TYPES = frozenset({"DEFINT", "DEFSTR", "DEFREAL"})
+
+
+class BasicCrunchError(BasicTokenizeError):
+    """El programa no se puede compactar sin cambiar su comportamiento."""
+    pass
+
+
+class CrunchReport(NamedTuple):
+    """Resultado de crunch_program."""
+    program: bytes
+    size_before: int
+    size_after: int
+    lines_before: int
+    lines_after: int
+    comments_removed: int
+    variables_renamed: int
+    renumbered: bool
+
+
+def load_program(data: bytes) -> List[Line]:
+    """
+    Read a tokenized or ASCII BASIC program as (line number, lexemes).
+
+    Args:
+        data: Program data without AMSDOS header
+
+    Raises:
+        BasicTokenizeError: If the ASCII listing has invalid lines
+    """
+    is_tokenized, _ = detect_basic_format(data)
+    if is_tokenized:
+        return list(iter_tokenized_lines(data))
+    # Un fichero ASCII leído del disco acaba en EOF (Ctrl+Z) o relleno de ceros
+    text = data.split(b"\x1a", 1)[0].split(b"\x00", 1)[0].decode("latin-1")
+    # Igual que al teclear: ordenadas y la última versión de cada línea
+    lines = dict(iter_source_lines(text))
+    return [(number, lines[number]) for number in sorted(lines)]
+
+
+def encode_program(lines: List[Line]) -> bytes:
+    """Programa tokenizado terminado en 0x0000."""
+    return b"".join(encode_line(number, lexemes) for number, lexemes in lines) + b"\x00\x00"
+
+
+def _uses_keyword(lines: List[Line], names) -> bool:
+    return any(lexeme.kind == "keyword" and lexeme.text in names
+               for _, lexemes in lines for lexeme in lexemes)
+
+
+def _is_reference(lexeme: Lexeme) -> bool:
+    """Número de línea de un salto; ON ERROR GOTO 0 y RESUME 0 no apuntan a ninguna."""
+    return lexeme.kind == "linenum" and lexeme.value != 0
+
+
+def jump_targets(lines: List[Line]) -> Set[int]:
+    """Líneas referenciadas por GOTO, GOSUB, THEN, ELSE, RESTORE, RESUME..."""
+    return {lexeme.value for _, lexemes in lines for lexeme in lexemes if _is_reference(lexeme)}
+
+
+def _strip_comment(lexemes: List[Lexeme]) -> Tuple[List[Lexeme], bool]:
+    """Quita el REM o ' de una línea y el separador que lo precede."""
+    for i, lexeme in enumerate(lexemes):
+        if lexeme.kind == "keyword" and lexeme.text in ("REM", "'"):
+            head = lexemes[:i]
+            while head and head[-1].kind in ("space", "sep"):
+                head.pop()
+            # 'IF a THEN REM' necesita algo detrás del THEN
+            if head and head[-1].kind == "keyword" and head[-1].text in ("THEN", "ELSE"):
+                return lexemes, False
+            return head, True
+    return lexemes, False
+
+
+def strip_comments(lines: List[Line], targets: Set[int]) -> Tuple[List[Line], Dict[int, int], int]:
+    """
+    Remove REM and ' comments.
+
+    Lines left empty disappear; jumps to them are redirected to the next
+    line, which is what the interpreter would have run anyway.
+
+    Returns:
+        Tuple (lines, redirections old -> new line, comments removed)
+    """
+    removed = 0
+    result: List[Line] = []
+    redirect: Dict[int, int] = {}
+    following: Optional[int] = None
+    # De atrás hacia delante para saber cuál es la siguiente línea que queda
+    for number, lexemes in reversed(lines):
+        lexemes, stripped = _strip_comment(lexemes)
+        removed += stripped
+        if any(lexeme.kind != "space" for lexeme in lexemes):
+            result.append((number, lexemes))
+            following = number
+        elif following is not None:
+            redirect[number] = following
+        elif number in targets:
+            # Última línea y destino de un salto: se queda vacía
+            result.append((number, []))
+            following = number
+    result.reverse()
+    return result, redirect, removed
+
+
+def strip_spaces(lexemes: List[Lexeme]) -> List[Lexeme]:
+    """Los espacios fuera de strings, REM y DATA no hacen falta tokenizados."""
+    result = []
+    for lexeme in lexemes:
+        if lexeme.kind == "space":
+            continue
+        if lexeme.kind == "data":
+            lexeme = lexeme._replace(text=lexeme.text.lstrip(" "))
+        result.append(lexeme)
+    return result
+
+
+def _split_name(text: str) -> Tuple[str, str]:
+    if text[-1] in "$%!":
+        return text[:-1], text[-1]
+    return text, ""
+
+
+def _variable_positions(lexemes: List[Lexeme]) -> Iterator[int]:
+    """Posiciones de las variables, sin las letras de DEFINT/DEFSTR/DEFREAL."""
+    in_def = False
+    for i, lexeme in enumerate(lexemes):
+        if lexeme.kind == "keyword":
+            in_def = lexeme.text in _DEF_TYPES
+        elif lexeme.kind == "sep":
+            in_def = False
+        elif lexeme.kind == "var" and not in_def:
+            yield i
+
+
+def _variables(lexemes: List[Lexeme]) -> Iterator[Lexeme]:
+    return (lexemes[i] for i in _variable_positions(lexemes))
+
+
+def _short_names(first: Optional[str] = None) -> Iterator[str]:
+    """Nombres de variable válidos de menor a mayor longitud."""
+    letters = first or _LETTERS
+    for length in itertools.count(1):
+        for head in letters:
+            for tail in itertools.product(_NAME_CHARS, repeat=length - 1):
+                name = head + "".join(tail)
+                upper = name.upper()
+                if upper in KEYWORDS or upper in FUNCTIONS or upper.startswith("FN"):
+                    continue
+                yield name
+
+
+def rename_variables(lines: List[Line]) -> Tuple[List[Line], int]:
+    """
+    Give the most used variables the shortest names.
+
+    The type suffix is kept, so a$ and a% stay different variables. When
+    the program uses DEFINT/DEFSTR/DEFREAL the first letter is kept too,
+    since it decides the type of variables without suffix.
+
+    Returns:
+        Tuple (lines, number of names that changed)
+    """
+    uses = Counter(_split_name(lexeme.text)[0].upper()
+                   for _, lexemes in lines for lexeme in _variables(lexemes))
+    keep_first = _uses_keyword(lines, _DEF_TYPES)
+
+    mapping: Dict[str, str] = {}
+    generators: Dict[Optional[str], Iterator[str]] = {}
+    for name, _ in sorted(uses.items(), key=lambda item: (-item[1], item[0])):
+        key = name[0].lower() if keep_first else None
+        if key not in generators:
+            generators[key] = _short_names(key)
+        mapping[name] = next(generators[key])
+
+    result = []
+    for number, lexemes in lines:
+        renamed = list(lexemes)
+        for i in _variable_positions(lexemes):
+            base, suffix = _split_name(lexemes[i].text)
+            renamed[i] = lexemes[i]._replace(text=mapping[base.upper()] + suffix)
+        result.append((number, renamed))
+    changed = sum(1 for old, new in mapping.items() if old != new.upper())
+    return result, changed
+
+
+def merge_lines(lines: List[Line], targets: Set[int]) -> List[Line]:
+    """
+    Append each line that is never jumped to onto the previous one.
+
+    A line after an IF is never merged, because it would become part of
+    the condition, and no line grows beyond 255 bytes.
+    """
+    result: List[Line] = []
+    for number, lexemes in lines:
+        if result and number not in targets:
+            previous_number, previous = result[-1]
+            if not _uses_keyword([result[-1]], ("IF",)):
+                merged = previous + [_SEPARATOR] + lexemes if previous else lexemes
+                if len(encode_lexemes(merged)) + 5 <= MAX_LINE_LENGTH:
+                    result[-1] = (previous_number, merged)
+                    continue
+        result.append((number, lexemes))
+    return result
+
+
+def renumber(lines: List[Line], start: int = 1, step: int = 1,
+             redirect: Optional[Dict[int, int]] = None) -> List[Line]:
+    """
+    Renumber lines and every line reference.
+
+    Args:
+        lines: Program lines
+        start: First line number
+        step: Increment between lines
+        redirect: Removed lines and the line that replaces them
+
+    Raises:
+        BasicCrunchError: If a reference points to a missing line or the
+            numbers do not fit
+    """
+    redirect = redirect or {}
+    numbers = {number: start + i * step for i, (number, _) in enumerate(lines)}
+    if lines and start + (len(lines) - 1) * step > 65535:
+        raise BasicCrunchError(f"Cannot renumber {len(lines)} lines from {start} step {step}")
+
+    result = []
+    for number, lexemes in lines:
+        updated = []
+        for lexeme in lexemes:
+            if _is_reference(lexeme):
+                target = redirect.get(lexeme.value, lexeme.value)
+                if target not in numbers:
+                    raise BasicCrunchError(f"Line {number}: reference to missing line {lexeme.value}")
+                lexeme = lexeme._replace(text=str(numbers[target]), value=numbers[target])
+            updated.append(lexeme)
+        result.append((numbers[number], updated))
+    return result
+
+
+def redirect_references(lines: List[Line], redirect: Dict[int, int]) -> List[Line]:
+    """Redirige los saltos a líneas borradas sin tocar la numeración."""
+    return [
+        (number, [lexeme._replace(text=str(redirect[lexeme.value]), value=redirect[lexeme.value])
+                  if _is_reference(lexeme) and lexeme.value in redirect else lexeme
+                  for lexeme in lexemes])
+        for number, lexemes in lines
+    ]
+
+
+def crunch_program(data: bytes, rename: bool = True, merge: bool = True,
+                   start: int = 1, step: int = 1) -> CrunchReport:
+    """
+    Crunch a BASIC program: strip comments and spaces, shorten variable
+    names, merge lines and renumber.
+
+    Programs that use ERL compare line numbers, so they keep their lines
+    and numbering.
+
+    Args:
+        data: Tokenized or ASCII program, without AMSDOS header
+        rename: Shorten variable names
+        merge: Merge lines that are never jumped to
+        start: First line number after renumbering
+        step: Increment between line numbers
+
+    Returns:
+        CrunchReport with the tokenized program and the size statistics
+
+    Raises:
+        BasicTokenizeError: If the program cannot be read or rebuilt
+    """
+    lines = load_program(data)
+    if not lines:
+        raise BasicCrunchError("No BASIC lines found")
+    size_before = len(encode_program(lines))
+    lines_before = len(lines)
+    keep_numbers = _uses_keyword(lines, ("ERL",))
+
+    lines, redirect, comments = strip_comments(lines, jump_targets(lines))
+    lines = [(number, strip_spaces(lexemes)) for number, lexemes in lines]
+
+    renamed = 0
+    if rename:
+        lines, renamed = rename_variables(lines)
+
+    if not keep_numbers:
+        targets = {redirect.get(target, target) for target in jump_targets(lines)}
+        if merge:
+            lines = merge_lines(lines, targets)
+        lines = renumber(lines, start, step, redirect)
+    elif redirect:
+        lines = redirect_references(lines, redirect)
+
+    program = encode_program(lines)
+    return CrunchReport(program, size_before, len(program), lines_before, len(lines),
+                        comments, renamed, not keep_numbers)
+
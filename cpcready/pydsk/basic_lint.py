@@ -0,0 +1,265 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+
+"""
+Análisis estático de rendimiento para Locomotive BASIC
+
+Busca los patrones que hacen lento un programa en el CPC y los ordena por
+un coste estimado: coste de la construcción multiplicado por un factor por
+cada nivel de bucle (FOR/NEXT, WHILE/WEND o salto hacia atrás) que la
+contiene.
+
+Es una estimación estática: no sigue las ramas de IF ni los GOSUB, solo la
+estructura del listado. Todo se resuelve en un par de pasadas lineales.
+"""
+
+from collections import Counter
+from typing import Dict, Iterator, List, NamedTuple, Set, Tuple
+
+from .basic_tokenizer import Lexeme
+
+Line = Tuple[int, List[Lexeme]]
+
+# Multiplicador por nivel de bucle
+LOOP_WEIGHT = 10
+MAX_LOOP_DEPTH = 4
+
+# Coste de cada construcción, en unidades arbitrarias
+FLOAT_LOOP_COST = 20
+STRING_CONCAT_COST = 30
+REPEATED_EXPRESSION_COST = 10
+# Un salto recorre la lista de líneas: cada línea saltada cuesta 1
+FAR_JUMP_LINES = 20
+
+_JUMP_KEYWORDS = frozenset({"GOTO", "GOSUB", "THEN", "ELSE"})
+_LOOP_JUMP_KEYWORDS = frozenset({"GOTO", "THEN", "ELSE"})
+# Funciones cuyo resultado cambia entre llamadas: repetirlas no es un error
+_VOLATILE_FUNCTIONS = frozenset({
+    "RND", "INKEY", "INKEY$", "JOY", "TIME", "INP", "EOF", "REMAIN", "FRE",
+    "XPOS", "YPOS", "POS", "VPOS", "ERR", "DERR", "COPYCHR$", "TEST", "TESTR",
+})
+
+
+class Finding(NamedTuple):
+    """Punto caliente encontrado por lint_lines."""
+    line: int
+    rule: str
+    message: str
+    suggestion: str
+    cost: int
+
+
+class ProgramIndex(NamedTuple):
+    """
+    Índice de control de flujo de un programa.
+
+    positions: número de línea -> posición en el listado
+    callers: línea destino -> líneas que saltan a ella
+    refs: por posición, (palabra clave, línea) de cada referencia
+    jump_depth: por posición, cuántos saltos hacia atrás la contienen
+    """
+    positions: Dict[int, int]
+    callers: Dict[int, List[int]]
+    refs: List[List[Tuple[str, int]]]
+    jump_depth: List[int]
+
+
+def split_statements(lexemes: List[Lexeme]) -> Iterator[List[Lexeme]]:
+    """Sentencias de una línea, sin espacios ni separadores."""
+    statement: List[Lexeme] = []
+    for lexeme in lexemes:
+        if lexeme.kind == "sep":
+            if statement:
+                yield statement
+            statement = []
+        elif lexeme.kind != "space":
+            statement.append(lexeme)
+    if statement:
+        yield statement
+
+
+def _line_refs(lexemes: List[Lexeme]) -> Iterator[Tuple[str, int]]:
+    """(palabra clave, línea) de cada referencia a una línea."""
+    keyword = None
+    for lexeme in lexemes:
+        if lexeme.kind == "keyword":
+            keyword = lexeme.text
+        elif lexeme.kind == "linenum":
+            yield keyword, lexeme.value
+
+
+def build_index(lines: List[Line]) -> ProgramIndex:
+    """
+    Build the line-target index and the loops formed by backward jumps.
+
+    A GOTO/THEN/ELSE to an earlier (or the same) line repeats every line
+    in between, so those lines get one more loop level.
+    """
+    positions = {number: i for i, (number, _) in enumerate(lines)}
+    callers: Dict[int, List[int]] = {}
+    refs = [list(_line_refs(lexemes)) for _, lexemes in lines]
+    # Diferencias acumuladas: +1 al empezar el bucle, -1 al acabar
+    delta = [0] * (len(lines) + 1)
+    for i, (number, _) in enumerate(lines):
+        for keyword, target in refs[i]:
+            callers.setdefault(target, []).append(number)
+            start = positions.get(target)
+            if keyword in _LOOP_JUMP_KEYWORDS and start is not None and start <= i:
+                delta[start] += 1
+                delta[i + 1] -= 1
+
+    jump_depth = []
+    depth = 0
+    for i in range(len(lines)):
+        depth += delta[i]
+        jump_depth.append(depth)
+    return ProgramIndex(positions, callers, refs, jump_depth)
+
+
+def _weight(depth: int) -> int:
+    return LOOP_WEIGHT ** min(depth, MAX_LOOP_DEPTH)
+
+
+def _integer_letters(statements: List[List[List[Lexeme]]]) -> Set[str]:
+    """Letras declaradas con DEFINT (p.ej. 'DEFINT a-z' o 'DEFINT i,j')."""
+    letters: Set[str] = set()
+    for line_statements in statements:
+        for statement in line_statements:
+            if statement[0].kind != "keyword" or statement[0].text != "DEFINT":
+                continue
+            names = [lexeme.text for lexeme in statement[1:]]
+            for i, name in enumerate(names):
+                if name == "-" and 0 < i < len(names) - 1:
+                    first, last = names[i - 1][0].lower(), names[i + 1][0].lower()
+                    letters.update(chr(c) for c in range(ord(first), ord(last) + 1))
+                elif name[0].isalpha():
+                    letters.add(name[0].lower())
+    return letters
+
+
+def _float_loop(statement, depth, integer_letters):
+    """FOR con un contador real."""
+    if len(statement) < 2 or statement[1].kind != "var":
+        return None
+    name = statement[1].text
+    if name[-1] in "%$" or (name[-1] != "!" and name[0].lower() in integer_letters):
+        return None
+    return (f"FOR counter '{name}' is a float",
+            f"Use an integer counter ({name.rstrip('!')}% or DEFINT {name[0].lower()})",
+            FLOAT_LOOP_COST * _weight(depth + 1))
+
+
+def _string_concat(statement, depth):
+    """Asignación de una cadena construida con + dentro de un bucle."""
+    if depth == 0:
+        return None
+    if statement[0].kind == "keyword" and statement[0].text == "LET":
+        statement = statement[1:]
+    if (len(statement) < 3 or statement[0].kind != "var" or not statement[0].text.endswith("$")
+            or statement[1].text != "="):
+        return None
+    if not any(lexeme.kind == "op" and lexeme.text == "+" for lexeme in statement[2:]):
+        return None
+    name = statement[0].text
+    return (f"String '{name}' concatenated inside a loop",
+            "Build the string once outside the loop or update a preallocated string with MID$",
+            STRING_CONCAT_COST * _weight(depth))
+
+
+def _calls(lexemes: List[Lexeme]) -> Iterator[str]:
+    """Texto de cada llamada a función con argumentos, p.ej. 'SIN(a*2)'."""
+    for i, lexeme in enumerate(lexemes):
+        if (lexeme.kind != "function" or lexeme.text in _VOLATILE_FUNCTIONS
+                or i + 1 >= len(lexemes) or lexemes[i + 1].text != "("):
+            continue
+        level = 0
+        for j in range(i + 1, len(lexemes)):
+            text = lexemes[j].text
+            if lexemes[j].kind == "char":
+                level += (text == "(") - (text == ")")
+                if level == 0:
+                    yield "".join(lexeme.text for lexeme in lexemes[i:j + 1])
+                    break
+
+
+def lint_lines(lines: List[Line]) -> List[Finding]:
+    """
+    Find performance hotspots in a BASIC program.
+
+    Args:
+        lines: Program as (line number, lexemes), see basic_crunch.load_program
+
+    Returns:
+        Findings sorted by estimated cost, highest first
+    """
+    index = build_index(lines)
+    statements = [list(split_statements(lexemes)) for _, lexemes in lines]
+    integer_letters = _integer_letters(statements)
+    findings: List[Finding] = []
+    loops = 0
+
+    for i, (number, lexemes) in enumerate(lines):
+        # Saltos lejanos: el intérprete busca la línea recorriendo el listado
+        for keyword, target in index.refs[i]:
+            start = index.positions.get(target)
+            if keyword not in _JUMP_KEYWORDS or start is None:
+                continue
+            scanned = start if start <= i else start - i
+            if scanned >= FAR_JUMP_LINES:
+                subroutine = keyword == "GOSUB"
+                findings.append(Finding(
+                    number, "far-gosub" if subroutine else "far-jump",
+                    f"{keyword} {target} searches {scanned} lines",
+                    "Move the subroutine near the start of the program" if subroutine
+                    else "Move the loop or jump target closer to the start of the program",
+                    scanned * _weight(loops + index.jump_depth[i])))
+
+        deepest = 0
+        for statement in statements[i]:
+            depth = loops + index.jump_depth[i]
+            deepest = max(deepest, depth)
+            head = statement[0]
+            keyword = head.text if head.kind == "keyword" else None
+
+            if keyword == "FOR":
+                found = _float_loop(statement, depth, integer_letters)
+                if found:
+                    findings.append(Finding(number, "float-loop", *found))
+            else:
+                found = _string_concat(statement, depth)
+                if found:
+                    findings.append(Finding(number, "string-concat", *found))
+
+            # La nueva profundidad vale para las sentencias siguientes
+            if keyword in ("FOR", "WHILE"):
+                loops += 1
+            elif keyword == "NEXT":
+                closed = sum(1 for lexeme in statement if lexeme.kind == "var")
+                loops = max(0, loops - max(1, closed))
+            elif keyword == "WEND":
+                loops = max(0, loops - 1)
+
+        # Solo merece la pena buscar repeticiones con dos funciones o más
+        functions = [lexeme for lexeme in lexemes if lexeme.kind == "function"]
+        calls = _calls([lexeme for lexeme in lexemes if lexeme.kind != "space"]) if len(functions) > 1 else ()
+        for expression, count in Counter(calls).items():
+            if count > 1:
+                findings.append(Finding(
+                    number, "repeated-expression", f"{expression} computed {count} times",
+                    "Compute it once into a variable",
+                    REPEATED_EXPRESSION_COST * (count - 1) * _weight(deepest)))
+
+    findings.sort(key=lambda finding: (-finding.cost, finding.line))
+    return findings
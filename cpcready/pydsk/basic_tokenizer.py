@@ -0,0 +1,486 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+
+"""
+Tokenizador de Locomotive BASIC (Amstrad CPC)
+Convierte un listado ASCII al formato tokenizado que guarda el CPC
+
+Formato de cada línea:
+    [longitud (2 bytes)][número de línea (2 bytes)][tokens...][0x00]
+La longitud incluye los 4 bytes de cabecera y el 0x00 final. El programa
+termina con una longitud 0x0000.
+"""
+
+import math
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .basic_viewer import BASIC_TOKENS, BASIC_FUNCTIONS, basic_line_index
+
+
+class BasicTokenizeError(ValueError):
+    """Error de sintaxis al tokenizar un listado BASIC."""
+    pass
+
+
+class Lexeme(NamedTuple):
+    """
+    Pieza de una línea de BASIC.
+
+    kind es uno de: keyword, function, number, linenum, string, var, rem,
+    data, sep, op, char, space, rsx. value guarda el token (keyword, op,
+    function) o el valor numérico (number, linenum).
+    """
+    kind: str
+    text: str
+    value: object = None
+
+
+# Palabras clave: nombre -> token (0x80-0xFE). Se omiten los huecos (#E2...)
+# y los operadores, que se reconocen aparte.
+KEYWORDS: Dict[str, int] = {
+    name: 0x80 + i for i, name in enumerate(BASIC_TOKENS)
+    if name[0].isalpha() and not name.startswith("ON ")
+}
+
+# Funciones: nombre -> byte tras el prefijo 0xFF
+FUNCTIONS: Dict[str, int] = {name: i for i, name in enumerate(BASIC_FUNCTIONS) if name}
+
+# Operadores, de más largo a más corto
+OPERATORS = {">=": 0xF0, "<>": 0xF2, "<=": 0xF3, ">": 0xEE, "=": 0xEF, "<": 0xF1,
+             "+": 0xF4, "-": 0xF5, "*": 0xF6, "/": 0xF7, "^": 0xF8, "\\": 0xF9}
+
+# Palabras clave compuestas que empiezan por ON
+ON_PHRASES = (
+    (re.compile(r"\s*ERROR\s+GOTO\b", re.I), "ON ERROR GOTO"),
+    (re.compile(r"\s*BREAK\b", re.I), "ON BREAK"),
+    (re.compile(r"\s*SQ\b", re.I), "ON SQ"),
+)
+
+# Tras estas palabras los enteros son números de línea (token 0x1E)
+LINE_REF_KEYWORDS = frozenset({
+    "GOTO", "GOSUB", "THEN", "ELSE", "RESTORE", "RUN", "LIST", "DELETE",
+    "RENUM", "EDIT", "AUTO", "RESUME", "ON ERROR GOTO",
+})
+
+# El intérprete espera un separador 0x01 antes de ELSE y del comentario '
+# (salvo al principio de la línea)
+NEEDS_SEPARATOR = frozenset({"ELSE", "'"})
+
+QUOTE_REM_TOKEN = 0x80 + BASIC_TOKENS.index("'")
+_SEPARATED_TOKENS = frozenset(0x80 + BASIC_TOKENS.index(word) for word in NEEDS_SEPARATOR)
+FN_TOKEN = KEYWORDS["FN"]
+
+_LINE_START = re.compile(r"\s*(\d+) ?")
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9.]*[$%!]?")
+_NUMBER = re.compile(r"(\d+\.?\d*|\.\d+)(E[+-]?\d+)?", re.I)
+_HEX = re.compile(r"&H?([0-9A-F]+)", re.I)
+_BINARY = re.compile(r"&X([01]+)", re.I)
+_RSX = re.compile(r"\|([A-Za-z][A-Za-z0-9.]*)")
+_SPACES = re.compile(r" +")
+_DATA_BODY = re.compile(r'(?:"[^"]*"?|[^:"])*')
+
+# Tipo de variable según su sufijo
+VARIABLE_TOKENS = {"%": 0x02, "$": 0x03, "!": 0x04, "": 0x0D}
+
+
+def _statement_keyword(lexemes: List[Lexeme]) -> Optional[str]:
+    """Última palabra clave significativa antes de un número."""
+    for lexeme in reversed(lexemes):
+        if lexeme.kind in ("space", "linenum") or lexeme.text in (",", "-"):
+            continue
+        return lexeme.text if lexeme.kind == "keyword" else None
+    return None
+
+
+def lex_line(source: str) -> Tuple[int, List[Lexeme]]:
+    """
+    Split one line of ASCII BASIC into lexemes.
+
+    Args:
+        source: Line text, starting with its line number
+
+    Returns:
+        Tuple (line number, lexemes)
+
+    Raises:
+        BasicTokenizeError: If the line has no valid line number
+    """
+    match = _LINE_START.match(source)
+    if not match:
+        raise BasicTokenizeError(f"Line without number: {source.strip()!r}")
+    number = int(match.group(1))
+    if not 1 <= number <= 65535:
+        raise BasicTokenizeError(f"Line number out of range: {number}")
+
+    lexemes: List[Lexeme] = []
+    text = source.rstrip()
+    pos = match.end()
+    size = len(text)
+
+    while pos < size:
+        c = text[pos]
+
+        if c == " ":
+            end = _SPACES.match(text, pos).end()
+            lexemes.append(Lexeme("space", text[pos:end]))
+            pos = end
+
+        elif c == '"':
+            end = text.find('"', pos + 1)
+            end = size if end == -1 else end + 1
+            lexemes.append(Lexeme("string", text[pos:end]))
+            pos = end
+
+        elif c == ":":
+            lexemes.append(Lexeme("sep", ":"))
+            pos += 1
+
+        elif c == "'":
+            lexemes.append(Lexeme("keyword", "'", QUOTE_REM_TOKEN))
+            lexemes.append(Lexeme("rem", text[pos + 1:]))
+            pos = size
+
+        elif c == "|":
+            m = _RSX.match(text, pos)
+            if m:
+                lexemes.append(Lexeme("rsx", "|" + m.group(1).upper()))
+                pos = m.end()
+            else:
+                lexemes.append(Lexeme("char", c))
+                pos += 1
+
+        elif c == "&":
+            m = _BINARY.match(text, pos) or _HEX.match(text, pos)
+            if not m:
+                lexemes.append(Lexeme("char", c))
+                pos += 1
+                continue
+            base = 2 if m.re is _BINARY else 16
+            value = int(m.group(1), base)
+            if value > 0xFFFF:
+                raise BasicTokenizeError(f"Line {number}: overflow in {m.group(0)}")
+            prefix = "&X" if base == 2 else "&"
+            lexemes.append(Lexeme("number", f"{prefix}{m.group(1).upper()}", value))
+            pos = m.end()
+
+        elif c.isdigit() or (c == "." and pos + 1 < size and text[pos + 1].isdigit()):
+            m = _NUMBER.match(text, pos)
+            literal = m.group(0)
+            if "." in literal or "E" in literal.upper():
+                value = float(literal)
+            else:
+                value = int(literal)
+            if (isinstance(value, int) and value <= 65535
+                    and _statement_keyword(lexemes) in LINE_REF_KEYWORDS):
+                lexemes.append(Lexeme("linenum", literal, value))
+            else:
+                lexemes.append(Lexeme("number", literal, value))
+            pos = m.end()
+
+        elif c.isalpha():
+            m = _WORD.match(text, pos)
+            word = m.group(0)
+            upper = word.upper()
+            pos = m.end()
+
+            if upper == "ON":
+                for pattern, phrase in ON_PHRASES:
+                    phrase_match = pattern.match(text, pos)
+                    if phrase_match:
+                        lexemes.append(Lexeme("keyword", phrase, 0x80 + BASIC_TOKENS.index(phrase)))
+                        pos = phrase_match.end()
+                        break
+                else:
+                    lexemes.append(Lexeme("keyword", "ON", KEYWORDS["ON"]))
+            elif upper in KEYWORDS:
+                lexemes.append(Lexeme("keyword", upper, KEYWORDS[upper]))
+                if upper == "REM":
+                    lexemes.append(Lexeme("rem", text[pos:]))
+                    pos = size
+                elif upper == "DATA":
+                    end = _DATA_BODY.match(text, pos).end()
+                    lexemes.append(Lexeme("data", text[pos:end]))
+                    pos = end
+            elif upper in FUNCTIONS:
+                lexemes.append(Lexeme("function", upper, FUNCTIONS[upper]))
+            elif upper[-1] in "$%!" and (upper[:-1] in KEYWORDS or upper[:-1] in FUNCTIONS):
+                # Palabra clave seguida de un sufijo suelto (p.ej. 'PRINT!')
+                pos -= 1
+                base = upper[:-1]
+                if base in KEYWORDS:
+                    lexemes.append(Lexeme("keyword", base, KEYWORDS[base]))
+                else:
+                    lexemes.append(Lexeme("function", base, FUNCTIONS[base]))
+            elif upper.startswith("FN") and len(word) > 2:
+                # DEF FNnombre / FNnombre(...): token FN seguido de la variable
+                lexemes.append(Lexeme("keyword", "FN", FN_TOKEN))
+                lexemes.append(Lexeme("var", word[2:]))
+            else:
+                lexemes.append(Lexeme("var", word))
+
+        else:
+            op = text[pos:pos + 2]
+            if op not in OPERATORS:
+                op = c
+            if op in OPERATORS:
+                lexemes.append(Lexeme("op", op, OPERATORS[op]))
+                pos += len(op)
+            else:
+                lexemes.append(Lexeme("char", c))
+                pos += 1
+
+    return number, lexemes
+
+
+# Token -> operador, para leer programas ya tokenizados
+_OPERATOR_TEXT = {token: text for text, token in OPERATORS.items()}
+_TOKEN_VARIABLES = {0x02: "%", 0x03: "$", 0x04: "!", 0x0B: "", 0x0C: "", 0x0D: ""}
+_REM_TOKENS = (QUOTE_REM_TOKEN, KEYWORDS["REM"])
+_DATA_TOKEN = KEYWORDS["DATA"]
+
+
+def _decode_name(body: bytes, pos: int) -> Tuple[str, int]:
+    """Nombre de variable o RSX: termina en el byte con el bit 7 activo."""
+    end = pos
+    while end < len(body) and body[end] < 0x80:
+        end += 1
+    name = bytes(b & 0x7F for b in body[pos:end + 1]).decode("ascii")
+    return name, end + 1
+
+
+def _decode_float(raw: bytes) -> float:
+    if raw[4] == 0:
+        return 0.0
+    mantissa = int.from_bytes(raw[:4], "little")
+    value = (1.0 + (mantissa & 0x7FFFFFFF) / 0x80000000) * 2.0 ** (raw[4] - 129)
+    return -value if mantissa & 0x80000000 else value
+
+
+def lex_tokenized_line(number: int, body: bytes) -> List[Lexeme]:
+    """
+    Split the tokens of one stored line into lexemes.
+
+    This is the counterpart of lex_line for programs saved by the CPC, so
+    they can be rewritten without going through the listing text.
+
+    Args:
+        number: Line number (only used in error messages)
+        body: Tokens of the line, without length, number and terminator
+
+    Raises:
+        BasicTokenizeError: If the line contains resolved line pointers
+    """
+    lexemes: List[Lexeme] = []
+    append = lexemes.append
+    pos = 0
+    size = len(body)
+
+    while pos < size:
+        token = body[pos]
+        pos += 1
+
+        if token == 0x01:
+            # El separador implícito de ELSE y ' no es un ':' del listado
+            if pos >= size or body[pos] not in _SEPARATED_TOKENS:
+                append(Lexeme("sep", ":"))
+        elif token in _TOKEN_VARIABLES:
+            name, pos = _decode_name(body, pos + 2)
+            append(Lexeme("var", name + _TOKEN_VARIABLES[token]))
+        elif 0x0E <= token <= 0x18:
+            append(Lexeme("number", str(token - 0x0E), token - 0x0E))
+        elif token in (0x19, 0x1A, 0x1B, 0x1C, 0x1E):
+            width = 1 if token == 0x19 else 2
+            value = int.from_bytes(body[pos:pos + width], "little")
+            pos += width
+            if token == 0x1B:
+                append(Lexeme("number", f"&X{value:b}", value))
+            elif token == 0x1C:
+                append(Lexeme("number", f"&{value:X}", value))
+            elif token == 0x1E:
+                append(Lexeme("linenum", str(value), value))
+            else:
+                append(Lexeme("number", str(value), value))
+        elif token == 0x1D:
+            raise BasicTokenizeError(f"Line {number}: program saved with resolved line pointers")
+        elif token == 0x1F:
+            value = _decode_float(body[pos:pos + 5])
+            pos += 5
+            append(Lexeme("number", f"{value:f}".rstrip("0").rstrip("."), value))
+        elif token == 0x20:
+            start = pos - 1
+            while pos < size and body[pos] == 0x20:
+                pos += 1
+            append(Lexeme("space", " " * (pos - start)))
+        elif token == 0x22:
+            end = body.find(b'"', pos)
+            end = size if end == -1 else end + 1
+            append(Lexeme("string", body[pos - 1:end].decode("latin-1")))
+            pos = end
+        elif token == 0x7C:
+            name, pos = _decode_name(body, pos + 1)
+            append(Lexeme("rsx", "|" + name))
+        elif token == 0xFF:
+            if pos < size:
+                append(Lexeme("function", BASIC_FUNCTIONS[body[pos] & 0x7F], body[pos]))
+            pos += 1
+        elif token in _OPERATOR_TEXT:
+            append(Lexeme("op", _OPERATOR_TEXT[token], token))
+        elif token >= 0x80:
+            append(Lexeme("keyword", BASIC_TOKENS[token & 0x7F], token))
+            if token in _REM_TOKENS:
+                append(Lexeme("rem", body[pos:].decode("latin-1")))
+                pos = size
+            elif token == _DATA_TOKEN:
+                # DATA llega hasta el separador, salvo dentro de comillas
+                end = pos
+                quoted = False
+                while end < size and (quoted or body[end] != 0x01):
+                    quoted ^= body[end] == 0x22
+                    end += 1
+                append(Lexeme("data", body[pos:end].decode("latin-1")))
+                pos = end
+        else:
+            append(Lexeme("char", chr(token)))
+
+    return lexemes
+
+
+def iter_tokenized_lines(data: bytes) -> Iterator[Tuple[int, List[Lexeme]]]:
+    """Recorre un programa tokenizado como (número de línea, lexemas)."""
+    for number, offset in basic_line_index(data):
+        length = data[offset] | (data[offset + 1] << 8)
+        # Sin la cabecera de 4 bytes ni el 0x00 final
+        yield number, lex_tokenized_line(number, data[offset + 4:offset + length - 1])
+
+
+def _encode_float(value: float) -> bytes:
+    """Real de 5 bytes: mantisa de 31 bits + signo y exponente con sesgo 129."""
+    if value == 0:
+        return bytes(5)
+    mantissa, exponent = math.frexp(abs(value))
+    fraction = round((mantissa * 2 - 1) * 0x80000000)
+    exponent += 128
+    if fraction == 0x80000000:
+        fraction = 0
+        exponent += 1
+    if not 1 <= exponent <= 255:
+        raise BasicTokenizeError(f"Overflow: {value}")
+    if value < 0:
+        fraction |= 0x80000000
+    return fraction.to_bytes(4, "little") + bytes([exponent])
+
+
+def _encode_number(lexeme: Lexeme) -> bytes:
+    value = lexeme.value
+    if lexeme.text.startswith("&X"):
+        return b"\x1b" + value.to_bytes(2, "little")
+    if lexeme.text.startswith("&"):
+        return b"\x1c" + value.to_bytes(2, "little")
+    if isinstance(value, float) or value > 32767:
+        return b"\x1f" + _encode_float(float(value))
+    if value <= 10:
+        return bytes([0x0E + value])
+    if value <= 255:
+        return bytes([0x19, value])
+    return b"\x1a" + value.to_bytes(2, "little")
+
+
+def _encode_name(name: str) -> bytes:
+    """Nombre en ASCII con el bit 7 activo en el último carácter."""
+    raw = bytearray(name.encode("ascii"))
+    raw[-1] |= 0x80
+    return bytes(raw)
+
+
+def encode_lexemes(lexemes: Iterable[Lexeme]) -> bytes:
+    """
+    Encode lexemes as the token bytes of one line (without the line
+    length, number or terminator).
+
+    ELSE and ' always get their own hidden separator, so an explicit ':'
+    before them is kept (':' + hidden separator, as the CPC stores it).
+    """
+    out = bytearray()
+    for lexeme in lexemes:
+        kind = lexeme.kind
+        if kind == "keyword":
+            if lexeme.text in NEEDS_SEPARATOR and out:
+                out.append(0x01)
+            out.append(lexeme.value)
+        elif kind == "function":
+            out += bytes([0xFF, lexeme.value])
+        elif kind == "op":
+            out.append(lexeme.value)
+        elif kind == "sep":
+            out.append(0x01)
+        elif kind == "number":
+            out += _encode_number(lexeme)
+        elif kind == "linenum":
+            out += b"\x1e" + lexeme.value.to_bytes(2, "little")
+        elif kind == "var":
+            suffix = lexeme.text[-1] if lexeme.text[-1] in "%$!" else ""
+            name = lexeme.text[:-1] if suffix else lexeme.text
+            out.append(VARIABLE_TOKENS[suffix])
+            out += b"\x00\x00" + _encode_name(name)
+        elif kind == "rsx":
+            out += b"\x7c\x00" + _encode_name(lexeme.text[1:])
+        else:
+            # string, rem, data, space, char: texto tal cual
+            out += lexeme.text.encode("latin-1", errors="replace")
+    return bytes(out)
+
+
+def encode_line(number: int, lexemes: Iterable[Lexeme]) -> bytes:
+    """
+    Build one tokenized line: [length][number][tokens][0x00].
+
+    Raises:
+        BasicTokenizeError: If the line is longer than 255 bytes
+    """
+    body = encode_lexemes(lexemes)
+    length = len(body) + 5
+    if length > 255:
+        raise BasicTokenizeError(f"Line {number} too long ({length} bytes)")
+    return length.to_bytes(2, "little") + number.to_bytes(2, "little") + body + b"\x00"
+
+
+def iter_source_lines(source: str) -> Iterator[Tuple[int, List[Lexeme]]]:
+    """Recorre las líneas no vacías de un listado ASCII ya separadas en lexemas."""
+    for raw in source.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        # EOF de AMSDOS (Ctrl+Z)
+        raw = raw.split("\x1a", 1)[0]
+        if raw.strip():
+            yield lex_line(raw)
+
+
+def tokenize_basic(source: str) -> bytes:
+    """
+    Tokenize an ASCII Locomotive BASIC listing.
+
+    As when typing a program on the CPC, lines are sorted by number and a
+    repeated number replaces the previous line.
+
+    Args:
+        source: Program text (LF or CRLF line endings)
+
+    Returns:
+        Tokenized program, ready to be stored with an AMSDOS BASIC header
+
+    Raises:
+        BasicTokenizeError: On invalid lines
+    """
+    lines = {number: lexemes for number, lexemes in iter_source_lines(source)}
+    return b"".join(encode_line(n, lines[n]) for n in sorted(lines)) + b"\x00\x00"
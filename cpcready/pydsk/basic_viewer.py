@@ -18,7 +18,11 @@ Módulo para visualización de programas BASIC de Amstrad CPC
 Soporta detokenización de BASIC tokenizado y muestra de BASIC ASCII
 """
 
-from typing import Optional, Tuple
+import bisect
+import re
+from typing import Iterator, List, Optional, Tuple
+
+from .file_viewer import iter_ascii_text
 
 # Tabla de comandos BASIC (0x80-0xFF, índice 0-0x7F)
 # Basado en el código C++ de iDSK
@@ -29,7 +33,7 @@ BASIC_TOKENS = [
     "ELSE", "END", "ENT", "ENV", "ERASE", "ERROR", "EVERY", "FOR",
     "GOSUB", "GOTO", "IF", "INK", "INPUT", "KEY", "LET", "LINE", "LIST",
     "LOAD", "LOCATE", "MEMORY", "MERGE", "MID$", "MODE", "MOVE", "MOVER",
-    "NEXT", "NEW", "ON", "ON BREAK", "ON ERROR GOTO", "SQ", "OPENIN",
+    "NEXT", "NEW", "ON", "ON BREAK", "ON ERROR GOTO", "ON SQ", "OPENIN",
     "OPENOUT", "ORIGIN", "OUT", "PAPER", "PEN", "PLOT", "PLOTR", "POKE",
     "PRINT", "'", "RAD", "RANDOMIZE", "READ", "RELEASE", "REM", "RENUM",
     "RESTORE", "RESUME", "RETURN", "RUN", "SAVE", "SOUND", "SPEED", "STOP",
@@ -107,244 +111,275 @@ def detect_basic_format(data: bytes) -> Tuple[bool, str]:
     return False, "BASIC ASCII o texto"
 
 
-def detokenize_basic(data: bytes) -> str:
+# --- Detokenizador ---
+#
+# Cada byte del programa se resuelve con una tabla de 256 entradas: un texto
+# fijo (palabras clave, dígitos, caracteres) o una función que consume los
+# bytes de datos que siguen al token y devuelve la nueva posición.
+
+# Nombres de variables y RSX: 7 bits, el último carácter lleva el bit 7
+_NAME = re.compile(rb'[\x00-\x7f]*[\x80-\xff]?')
+_LOW7 = bytes(b & 0x7F for b in range(256))
+# Dentro de strings los bytes >= 0x80 se muestran como espacio
+_STRING_CHARS = bytes(b if b < 0x80 else 0x20 for b in range(256))
+
+
+def _skip(data, pos, parts):
+    return pos
+
+
+def _string(data, pos, parts):
+    """Copia un literal hasta la comilla de cierre o el fin de línea."""
+    end = data.find(b'"', pos)
+    stop = data.find(b'\x00', pos, len(data) if end == -1 else end)
+    if stop != -1:
+        end = stop
+    elif end == -1:
+        end = len(data)
+    else:
+        end += 1
+    parts.append('"' + data[pos:end].translate(_STRING_CHARS).decode('ascii'))
+    return end
+
+
+def _name(data, pos, parts):
+    end = _NAME.match(data, pos).end()
+    parts.append(data[pos:end].translate(_LOW7).decode('ascii'))
+    return end
+
+
+def _variable(suffix):
+    """Variable: 2 bytes de offset y el nombre, con el sufijo de tipo."""
+    def handler(data, pos, parts):
+        pos = _name(data, pos + 2, parts)
+        if suffix:
+            parts.append(suffix)
+        return pos
+    return handler
+
+
+def _rsx(data, pos, parts):
+    parts.append('|')
+    return _name(data, pos + 1, parts)
+
+
+def _after_separator(text):
+    """ELSE y ' se guardan con un 0x01 delante que no se lista."""
+    def handler(data, pos, parts):
+        if parts[-1].endswith(':'):
+            parts[-1] = parts[-1][:-1]
+        parts.append(text)
+        return pos
+    return handler
+
+
+def _int8(data, pos, parts):
+    if pos < len(data):
+        parts.append(str(data[pos]))
+        pos += 1
+    return pos
+
+
+def _int16(data, pos, parts):
+    if pos + 1 < len(data):
+        parts.append(str(int.from_bytes(data[pos:pos + 2], 'little', signed=True)))
+        pos += 2
+    return pos
+
+
+def _line_ref(data, pos, parts):
+    if pos + 1 < len(data):
+        parts.append(str(data[pos] | (data[pos + 1] << 8)))
+        pos += 2
+    return pos
+
+
+def _binary(data, pos, parts):
+    if pos + 1 < len(data):
+        parts.append(f"&X{data[pos] | (data[pos + 1] << 8):b}")
+        pos += 2
+    return pos
+
+
+def _hex(data, pos, parts):
+    if pos + 1 < len(data):
+        parts.append(f"&{data[pos] | (data[pos + 1] << 8):X}")
+        pos += 2
+    return pos
+
+
+def _float(data, pos, parts):
+    """Real de 5 bytes: mantisa de 4 bytes (bit 31 = signo) y exponente."""
+    if pos + 4 < len(data):
+        mantissa = int.from_bytes(data[pos:pos + 4], 'little')
+        f = 1.0 + ((mantissa & 0x7FFFFFFF) / 0x80000000)
+        if mantissa & 0x80000000:
+            f = -f
+        result = f * (2 ** (data[pos + 4] - 129))
+        # Formatear eliminando ceros innecesarios
+        parts.append(f"{result:f}".rstrip('0').rstrip('.'))
+        pos += 5
+    return pos
+
+
+# Texto de las funciones extendidas (0xFF + byte)
+_FUNCTION_TEXT = [
+    (BASIC_FUNCTIONS[i] or f"[FN#{i:02X}]") if i < 0x80 else chr(i & 0x7F)
+    for i in range(256)
+]
+
+
+def _function(data, pos, parts):
+    if pos < len(data):
+        parts.append(_FUNCTION_TEXT[data[pos]])
+        pos += 1
+    return pos
+
+
+def _build_token_table():
+    table = [_skip] * 256
+    # Caracteres imprimibles (0x20-0x7B)
+    for token in range(0x20, 0x7C):
+        table[token] = chr(token)
+    table[ord('"')] = _string
+    # Números pequeños (0x0E-0x18 = 0-10)
+    for token in range(0x0E, 0x19):
+        table[token] = str(token - 0x0E)
+    # Comandos y operadores (0x80-0xFE)
+    for token in range(0x80, 0xFF):
+        table[token] = BASIC_TOKENS[token & 0x7F]
+    table[0x97] = _after_separator("ELSE")
+    table[0xC0] = _after_separator("'")
+    table[0x01] = ':'
+    table[0x02] = _variable('%')
+    table[0x03] = _variable('$')
+    table[0x04] = _variable('!')
+    for token in (0x0B, 0x0C, 0x0D):
+        table[token] = _variable('')
+    table[0x19] = _int8
+    table[0x1A] = _int16
+    table[0x1B] = _binary
+    table[0x1C] = _hex
+    table[0x1E] = _line_ref
+    table[0x1F] = _float
+    table[0x7C] = _rsx
+    table[0xFF] = _function
+    return table
+
+
+TOKEN_TABLE = _build_token_table()
+
+
+def basic_line_index(data: bytes) -> List[Tuple[int, int]]:
     """
-    Detokeniza un programa BASIC tokenizado de Amstrad CPC.
-    Implementación basada en el código C++ de iDSK.
-    
+    Construye el índice de líneas siguiendo la cadena de longitudes.
+
+    Cada línea empieza con su longitud total, así que se puede saltar de
+    una a otra sin detokenizar nada.
+
     Args:
         data: Datos del programa BASIC tokenizado (sin cabecera AMSDOS)
-        
+
     Returns:
-        str: Listado del programa BASIC
-        
-    Raises:
-        ValueError: Si el formato no es válido
+        Lista de tuplas (número de línea, offset) en orden
     """
-    listing = []
+    index = []
     pos = 0
-    
-    while pos < len(data):
-        # Leer longitud de línea (2 bytes, little-endian)
-        if pos + 2 > len(data):
+    size = len(data)
+    while pos + 4 <= size:
+        length = data[pos] | (data[pos + 1] << 8)
+        # Longitud 0 = fin del programa; menos de 5 bytes = cadena rota
+        if length < 5:
             break
-            
-        line_length = data[pos] | (data[pos + 1] << 8)
-        pos += 2
-        
+        index.append((data[pos + 2] | (data[pos + 3] << 8), pos))
+        pos += length
+    return index
+
+
+def iter_basic_lines(data: bytes, first: Optional[int] = None,
+                     last: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Recorre un programa BASIC tokenizado línea a línea.
+
+    Args:
+        data: Datos del programa BASIC tokenizado (sin cabecera AMSDOS)
+        first: Primer número de línea a listar (None = desde el principio)
+        last: Último número de línea a listar (None = hasta el final)
+
+    Yields:
+        Tuplas (número de línea, texto de la línea tal como se lista)
+    """
+    if not isinstance(data, (bytes, bytearray)):
+        data = bytes(data)
+    size = len(data)
+    table = TOKEN_TABLE
+    pos = 0
+
+    # Saltar directamente a la primera línea pedida usando el índice
+    if first is not None:
+        index = basic_line_index(data)
+        i = bisect.bisect_left([number for number, _ in index], first)
+        if i == len(index):
+            return
+        pos = index[i][1]
+
+    while pos + 2 <= size:
         # Longitud 0 = fin del programa
-        if line_length == 0:
-            break
-        
-        # Leer número de línea (2 bytes, little-endian)
-        if pos + 2 > len(data):
-            break
-            
+        if data[pos] == 0 and data[pos + 1] == 0:
+            return
+        pos += 2
+
+        if pos + 2 > size:
+            return
         line_num = data[pos] | (data[pos + 1] << 8)
         pos += 2
-        
-        # Construir línea
-        line = f"{line_num} "
-        in_string = False
-        
-        while pos < len(data):
+        if last is not None and line_num > last:
+            return
+
+        parts = [f"{line_num} "]
+        append = parts.append
+        while pos < size:
             token = data[pos]
             pos += 1
-            
             if token == 0:  # Fin de línea
                 break
-            
-            # Dentro de string, copiar literal
-            if in_string:
-                line += chr(token) if token < 128 else ' '
-                if token == ord('"'):
-                    in_string = False
-                continue
-            
-            # Tokens de comandos (0x80-0xFE)
-            if 0x80 <= token <= 0xFE:
-                idx = token & 0x7F
-                # Eliminar ':' antes de ELSE (token 0x97)
-                if token == 0x97 and line.endswith(':'):
-                    line = line[:-1]
-                if idx < len(BASIC_TOKENS):
-                    line += BASIC_TOKENS[idx]
-                continue
-            
-            # Números pequeños (0x0E-0x18 = 0-10)
-            if 0x0E <= token <= 0x18:
-                line += str(token - 0x0E)
-                continue
-            
-            # Caracteres imprimibles (0x20-0x7B)
-            if 0x20 <= token < 0x7C:
-                line += chr(token)
-                if token == ord('"'):
-                    in_string = True
-                continue
-            
-            # Tokens especiales
-            if token == 0x01:  # Separador ':'
-                line += ':'
-                
-            elif token == 0x02:  # Variable entera (%)
-                pos += 2  # Saltar dirección
-                while pos < len(data):
-                    b = data[pos]
-                    pos += 1
-                    line += chr(b & 0x7F)
-                    if b & 0x80:
-                        break
-                line += '%'
-                
-            elif token == 0x03:  # Variable string ($)
-                pos += 2
-                while pos < len(data):
-                    b = data[pos]
-                    pos += 1
-                    line += chr(b & 0x7F)
-                    if b & 0x80:
-                        break
-                line += '$'
-                
-            elif token == 0x04:  # Variable float (!)
-                pos += 2
-                while pos < len(data):
-                    b = data[pos]
-                    pos += 1
-                    line += chr(b & 0x7F)
-                    if b & 0x80:
-                        break
-                line += '!'
-                
-            elif token in (0x0B, 0x0C, 0x0D):  # Variable estándar
-                pos += 2
-                while pos < len(data):
-                    b = data[pos]
-                    pos += 1
-                    line += chr(b & 0x7F)
-                    if b & 0x80:
-                        break
-                        
-            elif token == 0x19:  # Entero 8-bit
-                if pos < len(data):
-                    line += str(data[pos])
-                    pos += 1
-                    
-            elif token == 0x1A or token == 0x1E:  # Entero 16-bit decimal
-                if pos + 1 < len(data):
-                    val = data[pos] | (data[pos + 1] << 8)
-                    # Convertir a signed si es negativo
-                    if val >= 32768:
-                        val = val - 65536
-                    line += str(val)
-                    pos += 2
-                    
-            elif token == 0x1B:  # Hexadecimal binario (&X)
-                if pos + 1 < len(data):
-                    val = data[pos] | (data[pos + 1] << 8)
-                    line += f"&X{val:X}"
-                    pos += 2
-                    
-            elif token == 0x1C:  # Hexadecimal (&)
-                if pos + 1 < len(data):
-                    val = data[pos] | (data[pos + 1] << 8)
-                    line += f"&{val:X}"
-                    pos += 2
-                    
-            elif token == 0x1F:  # Floating point (5 bytes)
-                if pos + 4 < len(data):
-                    # Leer mantisa (4 bytes) y exponente (1 byte)
-                    mantissa = (data[pos] | 
-                               (data[pos + 1] << 8) | 
-                               (data[pos + 2] << 16) | 
-                               ((data[pos + 3] & 0x7F) << 24))
-                    f = 1.0 + (mantissa / 0x80000000)
-                    
-                    # Signo
-                    if data[pos + 3] & 0x80:
-                        f = -f
-                    
-                    # Exponente
-                    exp = data[pos + 4] - 129
-                    result = f * (2 ** exp)
-                    
-                    # Formatear eliminando ceros innecesarios
-                    s = f"{result:f}"
-                    s = s.rstrip('0').rstrip('.')
-                    line += s
-                    pos += 5
-                    
-            elif token == 0x7C:  # RSX (|comando)
-                line += '|'
-                pos += 1  # Saltar un byte
-                while pos < len(data):
-                    b = data[pos]
-                    pos += 1
-                    line += chr(b & 0x7F)
-                    if b & 0x80:
-                        break
-                        
-            elif token == 0xFF:  # Funciones extendidas
-                if pos < len(data):
-                    func_token = data[pos]
-                    pos += 1
-                    if func_token < 0x80:
-                        # Funciones definidas
-                        if func_token < len(BASIC_FUNCTIONS) and BASIC_FUNCTIONS[func_token]:
-                            line += BASIC_FUNCTIONS[func_token]
-                        else:
-                            line += f"[FN#{func_token:02X}]"
-                    else:
-                        # Carácter especial
-                        line += chr(func_token & 0x7F)
-        
-        listing.append(line.rstrip())
+            handler = table[token]
+            if handler.__class__ is str:
+                append(handler)
+            else:
+                pos = handler(data, pos, parts)
+
+        yield line_num, "".join(parts).rstrip()
+
+
+def detokenize_basic(data: bytes) -> str:
+    """
+    Detokeniza un programa BASIC tokenizado de Amstrad CPC.
+    Implementación basada en el código C++ de iDSK.
     
-    return '\n'.join(listing)
+    Args:
+        data: Datos del programa BASIC tokenizado (sin cabecera AMSDOS)
+        
+    Returns:
+        str: Listado del programa BASIC
+    """
+    return '\n'.join(text for _, text in iter_basic_lines(data))
 
 
 def view_basic_ascii(data: bytes) -> str:
     """
     Muestra un programa BASIC en formato ASCII.
     
+    El texto termina en el EOF de AMSDOS (0x1A) o en el relleno de ceros
+    del último bloque; los caracteres de control se descartan.
+    
     Args:
         data: Datos del BASIC ASCII (sin cabecera AMSDOS)
         
     Returns:
         Contenido del programa
     """
-    try:
-        # Buscar el final real del programa (0x1A = EOF o secuencia de 0x00)
-        end_pos = len(data)
-        
-        # Buscar EOF (Ctrl+Z)
-        if 0x1A in data:
-            end_pos = min(end_pos, data.index(0x1A))
-        
-        # Buscar secuencia larga de 0x00 (relleno)
-        zero_count = 0
-        for i, byte in enumerate(data):
-            if byte == 0:
-                zero_count += 1
-                if zero_count >= 10:  # 10 ceros seguidos = fin
-                    end_pos = min(end_pos, i - 9)
-                    break
-            else:
-                zero_count = 0
-        
-        # Tomar solo hasta el final detectado
-        text_data = data[:end_pos]
-        
-        # Intentar decodificar como ASCII/UTF-8
-        text = text_data.decode('ascii', errors='replace')
-        
-        # Limpiar caracteres no imprimibles excepto newlines/tabs
-        text = ''.join(c if c.isprintable() or c in '\n\r\t' else '' for c in text)
-        
-        return text.strip()
-    except:
-        return "[Error decodificando archivo]"
+    return "".join(iter_ascii_text([data])).strip()
 
 
 def view_basic(data: bytes, auto_detect: bool = True) -> str:
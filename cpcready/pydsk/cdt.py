@@ -0,0 +1,478 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+
+"""
+Imágenes de cinta CDT (formato TZX) para el Amstrad CPC
+
+El firmware graba cada fichero en bloques de 2 KB. Cada bloque son dos
+registros: uno de cabecera (sincronismo &2C) con 64 bytes de datos del
+fichero y otro de datos (sincronismo &16). Un registro es un tono guía de
+unos, un bit 0 de sincronismo, el byte de sincronismo, los datos en
+segmentos de 256 bytes seguidos de su CRC-16 y una cola de 32 unos.
+
+En el CDT cada registro es un bloque TZX "turbo" (ID &11) con las
+duraciones de los pulsos en T-states de 3,5 MHz. La velocidad estándar
+del firmware es 1000 o 2000 baudios: un bit 0 es un pulso de 1/(3*baudios)
+segundos por semiciclo y un bit 1 dura el doble.
+
+La escritura es secuencial, registro a registro, y la lectura devuelve
+cada fichero en cuanto se completa su último bloque. iter_signal recorre
+los bloques como tramos de pulsos (tono, sincronismo, bits, pausa) para
+convertir la cinta en audio (ver wav.py).
+"""
+
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from .dsk import DSK
+from .structures import AMSDOS_HEADER_SIZE
+
+TZX_SIGNATURE = b"ZXTape!\x1a"
+TZX_VERSION = (1, 20)
+CPU_CLOCK = 3500000
+
+BLOCK_SIZE = 2048
+SEGMENT_SIZE = 256
+HEADER_SIZE = 64
+HEADER_SYNC = 0x2C
+DATA_SYNC = 0x16
+PILOT_PULSES = 4096
+TRAILER = b"\xff" * 4
+
+STANDARD_SPEEDS = (1000, 2000)
+DEFAULT_SPEED = 2000
+# Pausas (ms) tras la cabecera de un bloque, tras sus datos y tras el fichero
+HEADER_PAUSE = 20
+DATA_PAUSE = 500
+FILE_PAUSE = 2000
+
+# Tipos de fichero del firmware
+TYPE_BASIC = 0
+TYPE_BASIC_PROTECTED = 1
+TYPE_BINARY = 2
+TYPE_ASCII = 0x16
+
+# Longitud de cada bloque TZX tras el ID: ID -> función(datos, pos)
+_BLOCK_LENGTHS = {
+    0x10: lambda data, pos: 4 + struct.unpack_from("<H", data, pos + 2)[0],
+    0x11: lambda data, pos: 18 + int.from_bytes(data[pos + 15:pos + 18], "little"),
+    0x14: lambda data, pos: 10 + int.from_bytes(data[pos + 7:pos + 10], "little"),
+    0x15: lambda data, pos: 8 + int.from_bytes(data[pos + 5:pos + 8], "little"),
+    0x12: lambda data, pos: 4,
+    0x13: lambda data, pos: 1 + data[pos] * 2,
+    0x20: lambda data, pos: 2,
+    0x21: lambda data, pos: 1 + data[pos],
+    0x22: lambda data, pos: 0,
+    0x24: lambda data, pos: 2,
+    0x25: lambda data, pos: 0,
+    0x2A: lambda data, pos: 4,
+    0x2B: lambda data, pos: 5,
+    0x30: lambda data, pos: 1 + data[pos],
+    0x31: lambda data, pos: 2 + data[pos + 1],
+    0x32: lambda data, pos: 2 + struct.unpack_from("<H", data, pos)[0],
+    0x33: lambda data, pos: 1 + data[pos] * 3,
+    0x35: lambda data, pos: 20 + struct.unpack_from("<I", data, pos + 16)[0],
+    0x5A: lambda data, pos: 9,
+}
+# Donde empiezan los bytes grabados en los bloques de datos
+_DATA_OFFSETS = {0x10: 4, 0x11: 18, 0x14: 10}
+
+
+class CDTError(ValueError):
+    """La imagen de cinta o las opciones de grabación no son válidas."""
+    pass
+
+
+class Timing(NamedTuple):
+    """Duración en T-states (3,5 MHz) de los pulsos de un registro."""
+    zero: int
+    one: int
+    pilot: int
+    pilot_pulses: int = PILOT_PULSES
+
+    @property
+    def baud(self) -> int:
+        """Velocidad media, con tantos ceros como unos."""
+        return round(CPU_CLOCK / (self.zero + self.one))
+
+
+class TapeFile(NamedTuple):
+    """Fichero de la cinta: tipo del firmware, direcciones y contenido."""
+    name: str
+    file_type: int
+    load: int
+    exec: int
+    data: bytes
+
+
+def timing_for(baud: int) -> Timing:
+    """
+    Pulse lengths of the firmware encoding at a given speed.
+
+    1000 and 2000 baud are the firmware speeds; higher (turbo) speeds
+    need a loader that accepts them.
+
+    Raises:
+        CDTError: If the speed is out of range
+    """
+    if not 300 <= baud <= 8000:
+        raise CDTError(f"Invalid speed {baud} baud (300-8000)")
+    zero = round(CPU_CLOCK / (3 * baud))
+    return Timing(zero, 2 * zero, 2 * zero)
+
+
+def _crc_table() -> Tuple[int, ...]:
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = (crc << 1 ^ 0x1021) if crc & 0x8000 else crc << 1
+        table.append(crc & 0xFFFF)
+    return tuple(table)
+
+
+_CRC_TABLE = _crc_table()
+
+
+def crc16(data: bytes) -> int:
+    """CRC de un segmento: CCITT (&1021), valor inicial &FFFF, complementado."""
+    crc = 0xFFFF
+    for byte in data:
+        crc = (crc << 8 & 0xFF00) ^ _CRC_TABLE[(crc >> 8) ^ byte]
+    return crc ^ 0xFFFF
+
+
+def encode_record(sync: int, payload: bytes) -> bytes:
+    """Byte de sincronismo, segmentos de 256 bytes con su CRC y la cola."""
+    record = bytearray((sync,))
+    for pos in range(0, max(len(payload), 1), SEGMENT_SIZE):
+        segment = payload[pos:pos + SEGMENT_SIZE].ljust(SEGMENT_SIZE, b"\x00")
+        record += segment + struct.pack(">H", crc16(segment))
+    return bytes(record + TRAILER)
+
+
+def decode_record(record: bytes) -> Tuple[int, bytes]:
+    """
+    Split a record into its sync byte and data, checking every CRC.
+
+    Raises:
+        CDTError: If the record is too short or a CRC does not match
+    """
+    if len(record) < 1 + SEGMENT_SIZE + 2:
+        raise CDTError(f"Record too short ({len(record)} bytes)")
+    payload = bytearray()
+    for pos in range(1, len(record) - SEGMENT_SIZE - 1, SEGMENT_SIZE + 2):
+        segment = record[pos:pos + SEGMENT_SIZE]
+        stored, = struct.unpack_from(">H", record, pos + SEGMENT_SIZE)
+        if crc16(segment) != stored:
+            raise CDTError(f"CRC error in segment {len(payload) // SEGMENT_SIZE + 1}")
+        payload += segment
+    return record[0], bytes(payload)
+
+
+def tape_header(file: TapeFile, number: int, offset: int, length: int) -> bytes:
+    """Los 64 bytes de cabecera del bloque `number` (desde 1) de un fichero."""
+    header = bytearray(HEADER_SIZE)
+    name = file.name.encode("ascii", "replace")[:16]
+    header[:len(name)] = name
+    last = offset + length >= len(file.data)
+    struct.pack_into("<BBBHHBHH", header, 16, number, 0xFF if last else 0, file.file_type,
+                     length, (file.load + offset) & 0xFFFF, 0xFF if number == 1 else 0,
+                     len(file.data) & 0xFFFF, file.exec)
+    return bytes(header)
+
+
+def file_records(file: TapeFile) -> Iterator[Tuple[int, bytes]]:
+    """Registros (sincronismo, datos) de un fichero, bloque a bloque."""
+    size = len(file.data)
+    for number, offset in enumerate(range(0, max(size, 1), BLOCK_SIZE), start=1):
+        chunk = file.data[offset:offset + BLOCK_SIZE]
+        yield HEADER_SYNC, tape_header(file, number, offset, len(chunk))
+        yield DATA_SYNC, chunk
+
+
+class CDTWriter:
+    """
+    Write a CDT image block by block.
+
+    Every record is written as soon as it is encoded, so whole discs can be
+    put on tape without building the image in memory.
+    """
+
+    def __init__(self, output: BinaryIO, timing: Optional[Timing] = None):
+        self.output = output
+        self.timing = timing or timing_for(DEFAULT_SPEED)
+        output.write(TZX_SIGNATURE + bytes(TZX_VERSION))
+
+    def write_record(self, sync: int, payload: bytes, pause: int) -> None:
+        """Un registro como bloque TZX &11 (velocidad turbo)."""
+        data = encode_record(sync, payload)
+        t = self.timing
+        self.output.write(struct.pack("<BHHHHHHBH", 0x11, t.pilot, t.zero, t.zero, t.zero, t.one,
+                                      t.pilot_pulses, 8, pause))
+        self.output.write(struct.pack("<I", len(data))[:3] + data)
+
+    def write_text(self, text: str) -> None:
+        """Bloque &30 con una descripción."""
+        encoded = text.encode("ascii", "replace")[:255]
+        self.output.write(bytes((0x30, len(encoded))) + encoded)
+
+    def add(self, file: TapeFile) -> None:
+        """Graba un fichero completo."""
+        records = list(file_records(file))
+        for index, (sync, payload) in enumerate(records):
+            if sync == HEADER_SYNC:
+                pause = HEADER_PAUSE
+            else:
+                pause = FILE_PAUSE if index == len(records) - 1 else DATA_PAUSE
+            self.write_record(sync, payload, pause)
+
+
+def write_cdt(path: Union[str, Path], files: Iterable[TapeFile], timing: Optional[Timing] = None) -> int:
+    """
+    Write files to a new CDT image.
+
+    Returns:
+        Number of files written
+    """
+    count = 0
+    with open(path, "wb") as f:
+        writer = CDTWriter(f, timing)
+        for file in files:
+            writer.add(file)
+            count += 1
+    return count
+
+
+def iter_blocks(data: bytes) -> Iterator[Tuple[int, bytes]]:
+    """
+    Blocks of a TZX image as (block ID, block body after the ID).
+
+    Raises:
+        CDTError: If the image is not a TZX file, is truncated or has an
+            unknown block
+    """
+    if not data.startswith(TZX_SIGNATURE):
+        raise CDTError("Not a CDT/TZX image")
+    pos = len(TZX_SIGNATURE) + 2
+    while pos < len(data):
+        block_id = data[pos]
+        if block_id not in _BLOCK_LENGTHS:
+            raise CDTError(f"Unsupported TZX block &{block_id:02X} at offset {pos}")
+        try:
+            length = _BLOCK_LENGTHS[block_id](data, pos + 1)
+        except (IndexError, struct.error):
+            length = len(data)
+        if pos + 1 + length > len(data):
+            raise CDTError(f"Truncated block &{block_id:02X} at offset {pos}")
+        yield block_id, data[pos + 1:pos + 1 + length]
+        pos += 1 + length
+
+
+def iter_records(data: bytes) -> Iterator[Tuple[int, bytes]]:
+    """
+    Data blocks of a TZX image as (block index, record bytes).
+
+    Raises:
+        CDTError: If the image is not a TZX file or has an unknown block
+    """
+    index = 0
+    for block_id, body in iter_blocks(data):
+        if block_id in _DATA_OFFSETS:
+            index += 1
+            yield index, body[_DATA_OFFSETS[block_id]:]
+
+
+class Tone(NamedTuple):
+    """`count` pulsos iguales (tono guía)."""
+    length: int
+    count: int
+
+
+class Pulses(NamedTuple):
+    """Pulsos de longitudes dadas (sincronismo)."""
+    lengths: Tuple[int, ...]
+
+
+class Bits(NamedTuple):
+    """Bytes codificados con dos pulsos por bit, del bit 7 al 0."""
+    zero: int
+    one: int
+    data: bytes
+    used_bits: int
+
+
+class Pause(NamedTuple):
+    """Silencio en milisegundos."""
+    ms: int
+
+
+Signal = Union[Tone, Pulses, Bits, Pause]
+
+
+def iter_signal(data: bytes) -> Iterator[Signal]:
+    """
+    The pulses of a TZX image, block by block, as Tone, Pulses, Bits and
+    Pause segments (lengths in T-states at 3.5 MHz).
+
+    Raises:
+        CDTError: On malformed images or blocks that cannot be played
+            (direct recordings)
+    """
+    for block_id, body in iter_blocks(data):
+        if block_id == 0x10:
+            # Velocidad estándar del Spectrum: los tiempos son fijos
+            pause, = struct.unpack_from("<H", body)
+            payload = body[4:]
+            yield Tone(2168, 8063 if payload and payload[0] < 0x80 else 3223)
+            yield Pulses((667, 735))
+            yield Bits(855, 1710, payload, 8)
+        elif block_id == 0x11:
+            pilot, sync1, sync2, zero, one, count, used, pause = struct.unpack_from("<HHHHHHBH", body)
+            yield Tone(pilot, count)
+            yield Pulses((sync1, sync2))
+            yield Bits(zero, one, body[18:], used)
+        elif block_id == 0x12:
+            yield Tone(*struct.unpack_from("<HH", body))
+            continue
+        elif block_id == 0x13:
+            yield Pulses(struct.unpack_from(f"<{body[0]}H", body, 1))
+            continue
+        elif block_id == 0x14:
+            zero, one, used, pause = struct.unpack_from("<HHBH", body)
+            yield Bits(zero, one, body[10:], used)
+        elif block_id == 0x15:
+            raise CDTError("Direct recording blocks (&15) cannot be played")
+        elif block_id == 0x20:
+            pause, = struct.unpack_from("<H", body)
+        else:
+            continue
+        if pause:
+            yield Pause(pause)
+
+
+def read_cdt(source: Union[str, Path, bytes]) -> Iterator[TapeFile]:
+    """
+    Files recorded with the firmware format in a CDT image.
+
+    Each file is yielded as soon as its last block is read. Blocks that
+    are not firmware records (e.g. turbo loaders' own data) are skipped.
+
+    Raises:
+        CDTError: On CRC errors, missing blocks or a malformed image
+    """
+    data = source if isinstance(source, bytes) else Path(source).read_bytes()
+    header = None
+    current: Optional[dict] = None
+    for index, record in iter_records(data):
+        if not record or record[0] not in (HEADER_SYNC, DATA_SYNC):
+            header = None
+            continue
+        try:
+            sync, payload = decode_record(record)
+        except CDTError as e:
+            raise CDTError(f"Block {index}: {e}")
+        if sync == HEADER_SYNC:
+            header = payload[:HEADER_SIZE]
+            continue
+        if header is None:
+            continue
+
+        name = header[:16].split(b"\x00", 1)[0].decode("ascii", "replace").strip()
+        number, last, file_type, length, load, first, total, entry = \
+            struct.unpack_from("<BBBHHBHH", header, 16)
+        header = None
+        if first:
+            current = {"name": name, "type": file_type, "load": load, "exec": entry,
+                       "total": total, "next": 1, "data": bytearray()}
+        if current is None or current["name"] != name or current["next"] != number:
+            raise CDTError(f"Block {index}: block {number} of '{name}' out of order")
+        current["data"] += payload[:length]
+        current["next"] += 1
+        if last:
+            # La longitud total solo cabe en 16 bits: vale la suma de los bloques
+            yield TapeFile(current["name"], current["type"], current["load"], current["exec"],
+                           bytes(current["data"]))
+            current = None
+    if current is not None:
+        raise CDTError(f"File '{current['name']}' is incomplete")
+
+
+def _amsdos_type(file_type: int) -> int:
+    """Tipo de DSK.write_bytes / _create_amsdos_header para un tipo del firmware."""
+    if file_type == TYPE_ASCII:
+        return -1
+    return file_type if file_type in (TYPE_BASIC, TYPE_BASIC_PROTECTED) else 2
+
+
+def from_amsdos(name: str, raw: bytes, file_type: Optional[int] = None,
+                load: Optional[int] = None, exec_addr: Optional[int] = None) -> TapeFile:
+    """
+    Build a tape file from file contents as stored on a disc or the host.
+
+    With an AMSDOS header its type and addresses are kept (unless given).
+    Without one the file is ASCII, or binary when file_type or a load
+    address is given; the addresses then follow the defaults of
+    DSK._create_amsdos_header.
+    """
+    dsk = DSK()
+    if len(raw) >= AMSDOS_HEADER_SIZE and dsk._check_amsdos_header(raw):
+        length, = struct.unpack_from("<H", raw, 0x18)
+        header_type = raw[0x12]
+        header_load, = struct.unpack_from("<H", raw, 0x15)
+        header_exec, = struct.unpack_from("<H", raw, 0x1A)
+        return TapeFile(name, header_type if file_type is None else file_type,
+                        header_load if load is None else load,
+                        header_exec if exec_addr is None else exec_addr,
+                        bytes(raw[AMSDOS_HEADER_SIZE:AMSDOS_HEADER_SIZE + length]))
+
+    if file_type is None:
+        file_type = TYPE_BINARY if load is not None else TYPE_ASCII
+    if file_type == TYPE_ASCII:
+        # Sin cabecera el disco rellena el último registro: hasta ^Z o los ceros finales
+        return TapeFile(name, TYPE_ASCII, 0, 0, bytes(raw).split(b"\x1a", 1)[0].rstrip(b"\x00"))
+    header = dsk._create_amsdos_header(name, bytearray(raw), load or 0, exec_addr or 0,
+                                       _amsdos_type(file_type))
+    return TapeFile(name, file_type, *struct.unpack_from("<H", header, 0x15),
+                    *struct.unpack_from("<H", header, 0x1A), bytes(raw))
+
+
+def to_amsdos(file: TapeFile) -> bytes:
+    """Contents of a tape file for the disc or the host, with AMSDOS header unless ASCII."""
+    if file.file_type == TYPE_ASCII:
+        return file.data
+    dsk = DSK()
+    contents = dsk._create_amsdos_header(dsk._get_amsdos_filename(file.name), bytearray(file.data),
+                                         file.load, file.exec, _amsdos_type(file.file_type))
+    # Se respetan el tipo y las direcciones de la cinta, aunque sean 0
+    contents[0x12] = file.file_type
+    struct.pack_into("<H", contents, 0x15, file.load)
+    struct.pack_into("<H", contents, 0x1A, file.exec)
+    struct.pack_into("<H", contents, 0x43, sum(contents[:67]) & 0xFFFF)
+    return bytes(contents)
+
+
+def write_to_disc(dsk: DSK, file: TapeFile, user: int = 0, name: Optional[str] = None) -> str:
+    """
+    Store a tape file in a loaded disc, without saving the image.
+
+    Returns:
+        AMSDOS name used on the disc
+    """
+    name = dsk._get_amsdos_filename(name or file.name)
+    # La cabecera ya va en los datos: se graban tal cual
+    dsk.write_bytes(to_amsdos(file), name, file_type=-1, user=user, force=True)
+    return name
@@ -0,0 +1,267 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+
+"""
+Clasificación de archivos de un DSK sin leerlos enteros
+
+El tipo sale de la cabecera AMSDOS y de una muestra de los primeros bytes
+(el primer bloque del archivo). El catálogo se lee una sola vez por disco.
+Catálogo y resultados se guardan por instancia de DSK mientras no se
+modifique: sirven para varias consultas sobre el mismo objeto (un
+comando que clasifica varios archivos), no entre procesos.
+"""
+
+import math
+import re
+import struct
+import weakref
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .basic_viewer import detect_basic_format
+from .dsk import DSK
+from .exceptions import DSKFileNotFoundError
+from .structures import AMSDOS_HEADER_SIZE
+
+# Bytes de datos (tras la cabecera) que se analizan de cada archivo
+SAMPLE_SIZE = 512
+
+# Tipos que devuelve la clasificación
+BASIC_TOKENIZED = "BASIC-TOKENIZED"
+BASIC_PROTECTED = "BASIC-PROTECTED"
+BASIC_ASCII = "BASIC-ASCII"
+ASCII = "ASCII"
+DAMS = "DAMS"
+BINARY = "BINARY"
+SCREEN = "SCREEN"
+PACKED = "PACKED"
+RAW = "RAW"
+
+# Contenido según los bits 1-3 del byte de tipo AMSDOS (el bit 0 es protegido)
+_CONTENT_BASIC, _CONTENT_BINARY, _CONTENT_SCREEN, _CONTENT_ASCII = range(4)
+
+# Pantalla completa: 16 KB en &C000 (algunas se graban sin los 384 bytes finales)
+SCREEN_ADDRESS = 0xC000
+SCREEN_MIN_LENGTH = 16000
+# Datos comprimidos: casi 8 bits de entropía por byte
+PACKED_ENTROPY = 7.2
+PACKED_MIN_SAMPLE = 256
+
+# Quitando los imprimibles y los saltos de línea solo queda lo binario
+_TEXT_BYTES = bytes(range(0x20, 0x7F)) + b"\t\r\n"
+_NUMBERED_LINE = re.compile(rb"\s*\d{1,5} ?[A-Za-z'?]")
+
+
+class FileInfo(NamedTuple):
+    """Resultado de clasificar un archivo del disco."""
+    name: str
+    user: int
+    kind: str
+    amsdos_type: Optional[int]
+    load: Optional[int]
+    exec: Optional[int]
+    length: int
+
+
+class _CatalogEntry(NamedTuple):
+    name: str
+    user: int
+    first_block: int
+    records: int
+
+
+class _DiscState(NamedTuple):
+    revision: int
+    catalog: Dict[Tuple[int, str], _CatalogEntry]
+    results: Dict[Tuple[int, str], FileInfo]
+
+
+# Catálogo y resultados por instancia de DSK, válidos mientras no cambie su revisión
+_cache: "weakref.WeakKeyDictionary[DSK, _DiscState]" = weakref.WeakKeyDictionary()
+
+
+def entropy(data: bytes) -> float:
+    """Entropía de Shannon en bits por byte."""
+    if not data:
+        return 0.0
+    total = len(data)
+    return -sum(count / total * math.log2(count / total) for count in Counter(data).values())
+
+
+def _is_dams(sample: bytes) -> bool:
+    """
+    Fuente de DAMS: líneas acabadas solo en CR, con los mnemónicos
+    guardados como un byte >= 0x80 y el resto texto de 7 bits.
+    """
+    if b"\n" in sample or b"\r" not in sample:
+        return False
+    tokens = sum(1 for b in sample if b >= 0x80)
+    rest = sample.translate(None, bytes(range(0x80, 0x100)) + _TEXT_BYTES)
+    return tokens * 16 >= len(sample) and len(rest) * 20 <= len(sample)
+
+
+def _text_kind(sample: bytes) -> Optional[str]:
+    """BASIC-ASCII, DAMS o ASCII si la muestra parece texto."""
+    if _NUMBERED_LINE.match(sample):
+        return BASIC_ASCII
+    if _is_dams(sample):
+        return DAMS
+    binary = len(sample.translate(None, _TEXT_BYTES))
+    if binary * 5 <= len(sample):
+        return ASCII
+    return None
+
+
+def classify_sample(sample: bytes, header: Optional[bytes] = None) -> str:
+    """
+    Classify a file from its first bytes.
+
+    Args:
+        sample: First bytes of the file data, without AMSDOS header
+        header: 128-byte AMSDOS header, if the file has one
+
+    Returns:
+        One of BASIC-TOKENIZED, BASIC-PROTECTED, BASIC-ASCII, ASCII, DAMS,
+        BINARY, SCREEN, PACKED or RAW
+    """
+    if header is not None:
+        file_type = header[0x12]
+        content_type = (file_type >> 1) & 0x07
+        load, = struct.unpack("<H", header[0x15:0x17])
+        length, = struct.unpack("<H", header[0x18:0x1A])
+        if content_type == _CONTENT_BASIC:
+            return BASIC_PROTECTED if file_type & 1 else BASIC_TOKENIZED
+        if content_type == _CONTENT_SCREEN:
+            return SCREEN
+        if content_type == _CONTENT_BINARY:
+            if load == SCREEN_ADDRESS and length >= SCREEN_MIN_LENGTH:
+                return SCREEN
+            if len(sample) >= PACKED_MIN_SAMPLE and entropy(sample) >= PACKED_ENTROPY:
+                return PACKED
+            return BINARY
+        # ASCII con cabecera (y tipos desconocidos): se mira el contenido
+
+    # El relleno de ceros del final no cuenta
+    content = sample.rstrip(b"\x00")
+    if not content:
+        return RAW
+    is_tokenized, _ = detect_basic_format(content)
+    if is_tokenized and header is None:
+        return BASIC_TOKENIZED
+    text = content.split(b"\x1a", 1)[0]
+    kind = _text_kind(text) if text else None
+    if kind:
+        return kind
+    if len(content) >= PACKED_MIN_SAMPLE and entropy(content) >= PACKED_ENTROPY:
+        return PACKED
+    return BINARY
+
+
+def _catalog(entries) -> Dict[Tuple[int, str], _CatalogEntry]:
+    """Primer bloque y registros totales de cada archivo, en una pasada."""
+    files: Dict[Tuple[int, str], _CatalogEntry] = {}
+    for entry in entries:
+        if entry.is_deleted:
+            continue
+        key = (entry.user, entry.full_name)
+        found = files.get(key)
+        if found is None:
+            first = entry.blocks[0] if entry.num_page == 0 and entry.nb_pages else 0
+            files[key] = _CatalogEntry(entry.full_name, entry.user, first, entry.nb_pages)
+        else:
+            if entry.num_page == 0 and entry.nb_pages:
+                found = found._replace(first_block=entry.blocks[0])
+            files[key] = found._replace(records=found.records + entry.nb_pages)
+    return files
+
+
+def _classify_entry(dsk: DSK, entry: _CatalogEntry) -> FileInfo:
+    """Clasifica un archivo leyendo solo su primer bloque."""
+    size = entry.records * 128
+    if not entry.first_block:
+        return FileInfo(entry.name, entry.user, RAW, None, None, None, size)
+
+    block = dsk.read_block(entry.first_block)
+    if dsk._check_amsdos_header(block):
+        header = bytes(block[:AMSDOS_HEADER_SIZE])
+        length = struct.unpack("<H", header[0x18:0x1A])[0]
+        sample = bytes(block[AMSDOS_HEADER_SIZE:AMSDOS_HEADER_SIZE + min(SAMPLE_SIZE, length)])
+        return FileInfo(entry.name, entry.user, classify_sample(sample, header), header[0x12],
+                        struct.unpack("<H", header[0x15:0x17])[0],
+                        struct.unpack("<H", header[0x1A:0x1C])[0], length)
+    sample = bytes(block[:min(SAMPLE_SIZE, size)])
+    return FileInfo(entry.name, entry.user, classify_sample(sample), None, None, None, size)
+
+
+def _state(dsk: DSK, entries=None) -> _DiscState:
+    """
+    Catálogo y resultados de la imagen para su revisión actual. Si el
+    llamador ya tiene las entradas del directorio se usan sin releerlas.
+    """
+    state = _cache.get(dsk)
+    if state is None or state.revision != dsk._revision:
+        if entries is None:
+            entries = dsk.get_directory_entries()
+        state = _DiscState(dsk._revision, _catalog(entries), {})
+        _cache[dsk] = state
+    return state
+
+
+def classify_file(dsk: DSK, filename: str, user: int = 0, entries=None) -> FileInfo:
+    """
+    Classify one file of the disc.
+
+    Args:
+        entries: Directory entries already read from `dsk`, to avoid
+            reading the catalog again
+
+    Raises:
+        DSKFileNotFoundError: If the file does not exist
+    """
+    state = _state(dsk, entries)
+    key = (user, dsk._get_amsdos_filename(filename))
+    if key not in state.results:
+        entry = state.catalog.get(key)
+        if entry is None:
+            raise DSKFileNotFoundError(f"Archivo {filename} no encontrado (usuario {user})")
+        state.results[key] = _classify_entry(dsk, entry)
+    return state.results[key]
+
+
+def classify_disc(dsk: DSK) -> List[FileInfo]:
+    """
+    Classify every file of the disc, in catalog order.
+
+    The catalog is read once and only the first block of each file.
+    """
+    state = _state(dsk)
+    for key, entry in state.catalog.items():
+        if key not in state.results:
+            state.results[key] = _classify_entry(dsk, entry)
+    return [state.results[key] for key in state.catalog]
+
+
+def classify_discs(paths: Iterable[str]) -> Iterator[Tuple[str, List[FileInfo]]]:
+    """
+    Classify the files of several disc images, one image at a time.
+
+    Yields:
+        (path, files) for each image
+
+    Raises:
+        DSKError: If an image cannot be read
+    """
+    for path in paths:
+        yield path, classify_disc(DSK(path))
@@ -27,8 +27,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from pydsk.dsk import DSK
-from pydsk.exceptions import DSKError
+from pydsk.exceptions import DSKError, DSKFileNotFoundError
 from pydsk.basic_viewer import view_basic, detect_basic_format
+from pydsk.classify import classify_disc, classify_file
 
 # Importar Rich si está disponible
 try:
@@ -385,97 +386,32 @@ def cmd_basic(args):
 
 
 def cmd_filetype(args):
-    """Muestra el tipo de archivo (BASIC/ASCII/BINARY/RAW)"""
+    """Muestra el tipo de archivo (BASIC/ASCII/BINARY/SCREEN/DAMS/PACKED/RAW)"""
     try:
         dsk = DSK(args.dskfile)
         
+        # Sin archivos: todos los del disco, leyendo el catálogo una vez
         if not args.files:
-            print("❌ Error: Debe especificar al menos un archivo", file=sys.stderr)
-            return 1
+            for info in classify_disc(dsk):
+                print(f"{info.name}: {info.kind}")
+            return 0
+        
+        entries = dsk.get_directory_entries()
+        deleted = {entry.full_name for entry in entries
+                   if entry.is_deleted and entry.num_page == 0}
         
         for filename in args.files:
             try:
-                # Normalizar nombre para búsqueda
-                amsdos_name = dsk._get_amsdos_filename(filename)
-                
-                # Verificar si el archivo existe y si está eliminado
-                entries = dsk.get_directory_entries()
-                file_found = False
-                is_deleted = False
-                
-                # Primero buscar archivo no eliminado
-                for entry in entries:
-                    if (entry.full_name == amsdos_name and 
-                        entry.user == args.user and
-                        not entry.is_deleted and
-                        entry.num_page == 0):
-                        file_found = True
-                        break
-                
-                # Si no se encuentra no eliminado, buscar eliminado
-                if not file_found:
-                    for entry in entries:
-                        if (entry.full_name == amsdos_name and 
-                            entry.is_deleted and
-                            entry.num_page == 0):
-                            is_deleted = True
-                            break
-                
-                if is_deleted:
+                info = classify_file(dsk, filename, args.user, entries)
+                print(f"{filename}: {info.kind}")
+            except DSKFileNotFoundError as e:
+                # Si solo queda la entrada borrada, se indica
+                if dsk._get_amsdos_filename(filename) in deleted:
                     print(f"{filename}: DELETED")
                     continue
-                
-                # Leer archivo (sin cabecera AMSDOS)
-                data = dsk.read_file(filename, args.user, keep_header=False)
-                
-                # Determinar tipo de archivo
-                file_type = "RAW"  # Default
-                
-                # Verificar si es BASIC
-                is_tokenized, fmt = detect_basic_format(data)
-                
-                if fmt == "BASIC tokenizado":
-                    file_type = "BASIC-TOKENIZED"
-                elif fmt == "BASIC ASCII":
-                    file_type = "BASIC-ASCII"
-                else:
-                    # Verificar si parece ASCII o BINARY
-                    # Buscar el último byte no-cero para ignorar padding
-                    last_nonzero = len(data) - 1
-                    while last_nonzero > 0 and data[last_nonzero] == 0:
-                        last_nonzero -= 1
-                    
-                    content = data[:last_nonzero + 1]
-                    if len(content) > 0:
-                        # Verificar líneas numeradas (BASIC ASCII)
-                        try:
-                            text = content[:min(200, len(content))].decode('ascii', errors='ignore')
-                            lines = text.split('\n')
-                            valid_lines = 0
-                            for line in lines[:5]:
-                                line = line.strip()
-                                if line and line[0].isdigit():
-                                    parts = line.split(None, 1)
-                                    if parts and parts[0].isdigit():
-                                        valid_lines += 1
-                            
-                            if valid_lines > 0:
-                                file_type = "BASIC-ASCII"
-                            else:
-                                # Verificar si es mayormente texto ASCII
-                                printable = sum(1 for b in content[:min(100, len(content))] 
-                                              if (b >= 0x20 and b < 0x7F) or b in (0x09, 0x0A, 0x0D))
-                                total = min(100, len(content))
-                                if printable >= total * 0.8:  # 80% o más imprimible = ASCII
-                                    file_type = "ASCII"
-                                else:
-                                    file_type = "BINARY"
-                        except:
-                            file_type = "BINARY"
-                
-                # Mostrar resultado
-                print(f"{filename}: {file_type}")
-                
+                print(f"❌ Error con {filename}: {e}", file=sys.stderr)
+                if not args.force:
+                    return 1
             except DSKError as e:
                 print(f"❌ Error con {filename}: {e}", file=sys.stderr)
                 if not args.force:
@@ -845,7 +781,7 @@ def main():
     # Comando: filetype
     parser_filetype = subparsers.add_parser(
         'filetype',
-        help='Mostrar tipo de archivo (BASIC/ASCII/BINARY/RAW)'
+        help='Mostrar tipo de archivo (BASIC/ASCII/BINARY/SCREEN/DAMS/PACKED/RAW)'
     )
     parser_filetype.add_argument(
         'dskfile',
@@ -853,8 +789,8 @@ def main():
     )
     parser_filetype.add_argument(
         'files',
-        nargs='+',
-        help='Archivo(s) a analizar'
+        nargs='*',
+        help='Archivo(s) a analizar (por defecto todos los del disco)'
     )
     parser_filetype.add_argument(
         '-u', '--user',
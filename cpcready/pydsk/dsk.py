@@ -19,7 +19,7 @@ Clase principal DSK para gestión de imágenes de disco Amstrad CPC
 
 import os
 import struct
-from typing import Optional, List, Tuple
+from typing import Iterator, Optional, List, Tuple
 from pathlib import Path
 
 from .structures import (
@@ -61,6 +61,9 @@ class DSK:
         self.filename = filename
         self.data = bytearray()
         self.header: Optional[CPCEMUHeader] = None
+        # Se incrementa con cada cambio de la imagen; invalida los caches
+        # calculados sobre su contenido (p.ej. pydsk.classify)
+        self._revision = 0
         
         if filename:
             if not os.path.exists(filename):
@@ -116,6 +119,7 @@ class DSK:
         # Formatear cada pista
         for track in range(nb_tracks):
             self._format_track(track, format_type, nb_sectors)
+        self._revision += 1
     
     def _format_track(self, track_num: int, min_sect: int, nb_sectors: int) -> None:
         """
@@ -207,6 +211,7 @@ class DSK:
             raise DSKFormatError("Archivo DSK con formato inválido (magic string incorrecto)")
         
         self.filename = filename
+        self._revision += 1
     
     def save(self, filename: Optional[str] = None) -> None:
         """
@@ -705,12 +710,38 @@ class DSK:
             raise DSKFileNotFoundError(f"Archivo no encontrado: {host_filename}")
         
         with open(host_filename, 'rb') as f:
-            file_data = bytearray(f.read())
+            file_data = f.read()
         
         # Determinar nombre AMSDOS
         if dsk_filename is None:
             dsk_filename = os.path.basename(host_filename)
         
+        self.write_bytes(file_data, dsk_filename, file_type, load_addr, exec_addr,
+                         user, system, read_only, force)
+    
+    def write_bytes(self, data: bytes, dsk_filename: str, file_type: int = 0,
+                    load_addr: int = 0, exec_addr: int = 0, user: int = 0,
+                    system: bool = False, read_only: bool = False,
+                    force: bool = False) -> None:
+        """
+        Escribe en el DSK un archivo a partir de datos en memoria
+        
+        Args:
+            data: Contenido del archivo
+            dsk_filename: Nombre del archivo en el DSK
+            file_type: Tipo de archivo (ver write_file)
+            load_addr: Dirección de carga (solo para binarios)
+            exec_addr: Dirección de ejecución (solo para binarios)
+            user: Número de usuario (0-15)
+            system: Marcar como archivo de sistema
+            read_only: Marcar como solo lectura
+            force: Sobrescribir si existe
+        
+        Raises:
+            DSKFileExistsError: Si el archivo ya existe en el DSK y force=False
+            DSKNoSpaceError: Si no hay espacio suficiente
+        """
+        file_data = bytearray(data)
         amsdos_name = self._get_amsdos_filename(dsk_filename)
         
         # Verificar si el archivo ya existe
@@ -1028,6 +1059,7 @@ class DSK:
         
         pos2 = self._get_sector_position(track, sect + min_sect, physical=True)
         self.data[pos2:pos2 + 512] = data[512:1024]
+        self._revision += 1
     
     def _write_directory_entry(self, entry_num: int, name: str, ext: bytearray,
                               user: int, page_num: int, nb_records: int,
@@ -1084,6 +1116,7 @@ class DSK:
         
         # Escribir entrada
         self.data[pos:pos + 32] = entry
+        self._revision += 1
     
     def _remove_file_by_index(self, index: int) -> None:
         """
@@ -1122,6 +1155,7 @@ class DSK:
                 
                 # Marcar como eliminada (byte 0 = 0xE5)
                 self.data[entry_pos] = USER_DELETED
+        self._revision += 1
     
     def read_file(self, dsk_filename: str, user: int = 0, 
                   keep_header: bool = True) -> Optional[bytes]:
@@ -1139,6 +1173,30 @@ class DSK:
         Raises:
             DSKFileNotFoundError: Si el archivo no existe
         """
+        return b"".join(self.iter_file_chunks(dsk_filename, user, keep_header))
+    
+    def iter_file_chunks(self, dsk_filename: str, user: int = 0,
+                         keep_header: bool = True) -> Iterator[bytes]:
+        """
+        Recorre un archivo del DSK bloque a bloque (1 KB) sin juntarlo en memoria
+        
+        Args:
+            dsk_filename: Nombre del archivo en el DSK
+            user: Número de usuario (0-15)
+            keep_header: Si True, mantiene la cabecera AMSDOS; si False, la
+                quita y corta el último bloque a la longitud de la cabecera
+        
+        Returns:
+            Iterador de bloques de datos
+        
+        Raises:
+            DSKFileNotFoundError: Si el archivo no existe (al llamar, no al
+                empezar a iterar)
+        """
+        return self._iter_blocks(self._file_blocks(dsk_filename, user), keep_header)
+    
+    def _file_blocks(self, dsk_filename: str, user: int) -> List[int]:
+        """Bloques de un archivo en orden, recorriendo todas sus páginas."""
         # Normalizar nombre AMSDOS
         amsdos_name = self._get_amsdos_filename(dsk_filename)
         
@@ -1157,10 +1215,8 @@ class DSK:
         if file_entry_index == -1:
             raise DSKFileNotFoundError(f"Archivo {dsk_filename} no encontrado (usuario {user})")
         
-        # Leer todas las páginas del archivo
-        file_data = bytearray()
-        current_entry = entries[file_entry_index]
-        current_name = current_entry.full_name
+        blocks = []
+        current_name = entries[file_entry_index].full_name
         i = file_entry_index
         
         # Iterar por todas las páginas (extents) del archivo
@@ -1173,26 +1229,29 @@ class DSK:
                 entry.user != user):
                 break
             
-            # Leer bloques de esta página
-            num_blocks = (entry.nb_pages + 7) >> 3  # Bloques = páginas / 8 (redondeado)
-            
-            for j in range(num_blocks):
-                block_num = entry.blocks[j]
-                if block_num > 0:
-                    block_data = self.read_block(block_num)
-                    file_data.extend(block_data)
-            
+            # Bloques de esta página = páginas / 8 (redondeado)
+            num_blocks = (entry.nb_pages + 7) >> 3
+            blocks.extend(b for b in entry.blocks[:num_blocks] if b > 0)
             i += 1
         
-        # Procesar cabecera AMSDOS si existe
-        if not keep_header and len(file_data) >= AMSDOS_HEADER_SIZE:
-            if self._check_amsdos_header(file_data):
-                # Obtener tamaño real del archivo desde la cabecera
-                file_length = struct.unpack('<H', file_data[0x18:0x1A])[0]
-                # Retornar solo los datos sin cabecera
-                return bytes(file_data[AMSDOS_HEADER_SIZE:AMSDOS_HEADER_SIZE + file_length])
-        
-        return bytes(file_data)
+        return blocks
+    
+    def _iter_blocks(self, blocks: List[int], keep_header: bool) -> Iterator[bytes]:
+        remaining = None
+        for index, block_num in enumerate(blocks):
+            data = self.read_block(block_num)
+            # Procesar cabecera AMSDOS si existe
+            if index == 0 and not keep_header and self._check_amsdos_header(data):
+                # Tamaño real del archivo según la cabecera
+                remaining = struct.unpack('<H', data[0x18:0x1A])[0]
+                data = data[AMSDOS_HEADER_SIZE:]
+            if remaining is not None:
+                data = data[:remaining]
+                remaining -= len(data)
+            if data:
+                yield bytes(data)
+            if remaining == 0:
+                return
     
     def export_file(self, dsk_filename: str, host_filename: str, 
                    user: int = 0, keep_header: bool = True) -> None:
@@ -1353,6 +1412,7 @@ class DSK:
         
         # Actualizar extensión (bytes 9-11)
         self.data[entry_pos + 9:entry_pos + 12] = extension
+        self._revision += 1
     
     def delete_file(self, filename: str, user: int = 0) -> int:
         """
@@ -1437,6 +1497,7 @@ class DSK:
         
         # Marcar como eliminada (byte 0 = 0xE5)
         self.data[entry_pos] = USER_DELETED
+        self._revision += 1
     
     def __repr__(self) -> str:
         """Representación string del objeto DSK"""
@@ -0,0 +1,119 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+
+"""
+Visores de archivos en streaming: volcado hexadecimal y texto ASCII
+
+Trabajan sobre un iterador de trozos (p.ej. DSK.iter_file_chunks), así que
+la memoria usada no depende del tamaño del archivo.
+"""
+
+from typing import Iterable, Iterator, Optional
+
+# Columna ASCII del volcado: los no imprimibles se muestran como '.'
+_ASCII_COLUMN = bytes(b if 0x20 <= b < 0x7F else 0x2E for b in range(256))
+# Caracteres de control que no se muestran en texto (salvo \t, \n y \r)
+_CONTROL = bytes(b for b in range(0x20) if b not in (0x09, 0x0A, 0x0D)) + b"\x7f"
+
+EOF_MARK = b"\x1a"
+# 10 ceros seguidos = relleno tras el final del texto
+ZERO_RUN = bytes(10)
+
+
+def slice_chunks(chunks: Iterable[bytes], offset: int = 0,
+                 length: Optional[int] = None) -> Iterator[bytes]:
+    """Recorta un flujo de trozos a [offset, offset + length)."""
+    for chunk in chunks:
+        if offset:
+            if offset >= len(chunk):
+                offset -= len(chunk)
+                continue
+            chunk = chunk[offset:]
+            offset = 0
+        if length is not None:
+            if length <= len(chunk):
+                if length:
+                    yield chunk[:length]
+                return
+            length -= len(chunk)
+        yield chunk
+
+
+def iter_hex_dump(chunks: Iterable[bytes], offset: int = 0, length: Optional[int] = None,
+                  width: int = 16) -> Iterator[str]:
+    """
+    Hex dump rows: '#offset  XX XX ...  ascii'.
+
+    Args:
+        chunks: File data as an iterable of byte strings
+        offset: First byte to dump
+        length: Number of bytes to dump (None = up to the end)
+        width: Bytes per row
+
+    Yields:
+        One formatted row at a time
+    """
+    pending = b""
+    address = offset
+    pad = width * 3 - 1
+    for chunk in slice_chunks(chunks, offset, length):
+        data = pending + chunk
+        full = len(data) - len(data) % width
+        for pos in range(0, full, width):
+            row = data[pos:pos + width]
+            yield (f"#{address:04X}  {row.hex(' ').upper()}  "
+                   f"{row.translate(_ASCII_COLUMN).decode('ascii')}")
+            address += width
+        pending = data[full:]
+    if pending:
+        yield (f"#{address:04X}  {pending.hex(' ').upper():<{pad}}  "
+               f"{pending.translate(_ASCII_COLUMN).decode('ascii')}")
+
+
+def _text_end(data: bytes) -> int:
+    """Posición del EOF (0x1A) o del relleno de ceros, -1 si no hay."""
+    ends = [pos for pos in (data.find(EOF_MARK), data.find(ZERO_RUN)) if pos != -1]
+    return min(ends) if ends else -1
+
+
+def iter_ascii_text(chunks: Iterable[bytes], offset: int = 0,
+                    length: Optional[int] = None) -> Iterator[str]:
+    """
+    Text of an ASCII file, up to the AMSDOS EOF (0x1A) or the zero padding.
+
+    Control characters other than tab and line breaks are dropped.
+
+    Yields:
+        Pieces of text, in file order
+    """
+    # Los últimos bytes de cada trozo se guardan por si una racha de ceros
+    # queda partida entre dos trozos
+    keep = len(ZERO_RUN) - 1
+    pending = b""
+    for chunk in slice_chunks(chunks, offset, length):
+        data = pending + chunk
+        end = _text_end(data)
+        if end != -1:
+            yield data[:end].translate(None, _CONTROL).decode("ascii", errors="replace")
+            return
+        cut = max(len(data) - keep, 0)
+        yield data[:cut].translate(None, _CONTROL).decode("ascii", errors="replace")
+        pending = data[cut:]
+    yield pending.translate(None, _CONTROL).decode("ascii", errors="replace")
+
+
+def hex_dump(data: bytes, width: int = 16) -> str:
+    """Volcado hexadecimal completo de unos datos en memoria."""
+    return "\n".join(iter_hex_dump([data], width=width))
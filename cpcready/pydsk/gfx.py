@@ -0,0 +1,184 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+
+"""
+Conversión de imágenes PNG a pantallas y sprites del CPC
+
+La paleta hardware es una rejilla de 3 niveles (0, &80, &FF) por canal, así
+que el color más cercano se calcula canal a canal con una tabla, sin
+distancias. Después se eligen los inks más usados (16, 4 o 2 según el modo)
+y cada color se lleva al ink más cercano con bytes.translate.
+
+Con NumPy la cuantización y el tramado se hacen sobre toda la imagen.
+"""
+
+from collections import Counter
+from typing import List, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+from .png import Image, read_png
+from .screen import (
+    HEIGHT, MODE_WIDTHS, Screen, ScreenError, encode_pixels, encode_screen, firmware_rgb,
+    pixels_per_byte, scale_factors,
+)
+
+# Inks disponibles por modo
+MAX_INKS = {0: 16, 1: 4, 2: 2}
+
+# Nivel de la paleta (0, 1, 2) más cercano a cada valor de un canal
+_LEVEL_OF = bytes(0 if value < 0x40 else 1 if value < 0xC0 else 2 for value in range(256))
+# Tramado ordenado con una matriz de Bayer 4x4. El desplazamiento cubre la
+# distancia entre dos niveles (&80) para repartir los colores intermedios
+_BAYER = (0, 8, 2, 10, 12, 4, 14, 6, 3, 11, 1, 9, 15, 7, 13, 5)
+_DITHER_OFFSETS = tuple(round(((t + 0.5) / 16 - 0.5) * 0x80) for t in _BAYER)
+
+
+class Artwork(NamedTuple):
+    """Imagen cuantizada: los pens de cada píxel y el ink de cada pen."""
+    screen: Screen
+    inks: List[int]
+
+
+class Converted(NamedTuple):
+    """Resultado de convert_image, listo para grabar en el disco."""
+    data: bytes
+    inks: List[int]
+    width: int
+    height: int
+
+
+def resize(image: Image, width: int, height: int) -> Image:
+    """
+    Scale an image by whole factors, repeating or skipping pixels.
+
+    Raises:
+        ScreenError: If a side cannot be scaled by a whole factor
+    """
+    if (image.width, image.height) == (width, height):
+        return image
+    repeat_x, step_x = scale_factors(image.width, width)
+    rows = [y * image.height // height for y in range(height)]
+    scale_factors(image.height, height)  # solo para validar el alto
+    stride = image.width * 3
+    result = bytearray()
+    for y in rows:
+        line = image.rgb[y * stride:(y + 1) * stride]
+        for x in range(0, image.width, step_x):
+            result += line[x * 3:x * 3 + 3] * repeat_x
+    return Image(width, height, bytes(result))
+
+
+def hardware_colours(image: Image, dither: bool = False) -> bytes:
+    """Nearest hardware colour (firmware number 0-26) of every pixel."""
+    if np is not None:
+        rgb = np.frombuffer(image.rgb, dtype=np.uint8).reshape(image.height, image.width, 3)
+        if dither:
+            offsets = np.array(_DITHER_OFFSETS, dtype=np.int16).reshape(4, 4)
+            tiled = np.tile(offsets, (image.height // 4 + 1, image.width // 4 + 1))
+            rgb = np.clip(rgb + tiled[:image.height, :image.width, None], 0, 255)
+        levels = np.frombuffer(_LEVEL_OF, dtype=np.uint8)[rgb]
+        return (levels[:, :, 1] * 9 + levels[:, :, 0] * 3 + levels[:, :, 2]).astype(np.uint8).tobytes()
+
+    if not dither:
+        levels = image.rgb.translate(_LEVEL_OF)
+        return bytes(levels[i + 1] * 9 + levels[i] * 3 + levels[i + 2] for i in range(0, len(levels), 3))
+    colours = bytearray()
+    for y in range(image.height):
+        offsets = _DITHER_OFFSETS[(y % 4) * 4:(y % 4) * 4 + 4]
+        base = y * image.width * 3
+        for x in range(image.width):
+            offset = offsets[x % 4]
+            pixel = image.rgb[base + x * 3:base + x * 3 + 3]
+            r, g, b = (_LEVEL_OF[min(255, max(0, value + offset))] for value in pixel)
+            colours.append(g * 9 + r * 3 + b)
+    return bytes(colours)
+
+
+def choose_inks(colours: bytes, limit: int) -> List[int]:
+    """Los colores más usados; el más frecuente queda en el pen 0 (fondo)."""
+    counts = Counter(colours)
+    return [colour for colour, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]]
+
+
+def _pen_map(inks: Sequence[int]) -> bytes:
+    """Tabla para translate: color hardware -> pen con el ink más cercano."""
+    palette = [firmware_rgb(ink) for ink in inks]
+    table = bytearray(256)
+    for colour in range(27):
+        rgb = firmware_rgb(colour)
+        table[colour] = min(range(len(palette)),
+                            key=lambda pen: sum((a - b) ** 2 for a, b in zip(rgb, palette[pen])))
+    return bytes(table)
+
+
+def quantize(image: Image, mode: int, inks: Optional[Sequence[int]] = None,
+             dither: bool = False) -> Artwork:
+    """
+    Reduce an image to the inks of a screen mode.
+
+    Args:
+        image: RGB image, at the final size
+        mode: Screen mode (0, 1 or 2)
+        inks: Firmware inks of the pens; default: the most used colours
+        dither: Use ordered dithering for colours between palette levels
+
+    Raises:
+        ScreenError: If the mode is not valid or there are too many inks
+    """
+    if mode not in MAX_INKS:
+        raise ScreenError(f"Invalid mode {mode} (0, 1 or 2)")
+    colours = hardware_colours(image, dither)
+    if inks:
+        if len(inks) > MAX_INKS[mode]:
+            raise ScreenError(f"Mode {mode} has only {MAX_INKS[mode]} inks")
+        inks = list(inks)
+    else:
+        inks = choose_inks(colours, MAX_INKS[mode])
+    pixels = colours.translate(_pen_map(inks))
+    return Artwork(Screen(mode, image.width, image.height, pixels), inks)
+
+
+def convert_image(path: str, mode: int, sprite: bool = False, dither: bool = False,
+                  inks: Optional[Sequence[int]] = None, size_header: bool = True) -> Converted:
+    """
+    Convert a PNG file to a SCREEN$ or to linear sprite data.
+
+    Screens are scaled to the native size of the mode (e.g. a 640x400
+    export becomes 320x200 in mode 1). Sprites keep their size; with
+    size_header the data starts with the width in bytes and the height.
+
+    Raises:
+        PNGError: If the file is not a supported PNG
+        ScreenError: If the image does not fit the mode
+    """
+    with open(path, "rb") as f:
+        image = read_png(f)
+    if not sprite:
+        image = resize(image, MODE_WIDTHS[mode], HEIGHT)
+    artwork = quantize(image, mode, inks, dither)
+    if not sprite:
+        return Converted(encode_screen(artwork.screen), artwork.inks, image.width, image.height)
+
+    data = encode_pixels(artwork.screen.pixels, image.width, mode)
+    if size_header:
+        width_bytes = image.width // pixels_per_byte(mode)
+        if width_bytes > 255 or image.height > 255:
+            raise ScreenError(f"Sprite {image.width}x{image.height} is too big for a size header")
+        data = bytes((width_bytes, image.height)) + data
+    return Converted(data, artwork.inks, image.width, image.height)
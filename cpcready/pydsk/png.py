@@ -0,0 +1,207 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+
+"""
+Lectura y escritura mínima de PNG con zlib de la librería estándar
+
+El escritor genera RGB de 8 bits y comprime las filas según llegan, sin
+juntar la imagen en memoria. El lector acepta los PNG no entrelazados de
+8 bits (gris, RGB, paleta de 1-8 bits, con o sin alfa) y devuelve RGB.
+"""
+
+import struct
+import zlib
+from typing import BinaryIO, Iterable, List, NamedTuple, Union
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Tamaño de cada chunk IDAT
+_IDAT_SIZE = 64 * 1024
+
+# Tipos de color: muestras por píxel
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+class PNGError(ValueError):
+    """El archivo no es un PNG o usa una variante no soportada."""
+    pass
+
+
+class Image(NamedTuple):
+    """Imagen RGB de 8 bits, fila a fila."""
+    width: int
+    height: int
+    rgb: bytes
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def write_png(stream: BinaryIO, width: int, height: int, rows: Iterable[bytes],
+              level: int = 6) -> None:
+    """
+    Write an 8-bit RGB PNG.
+
+    Args:
+        stream: Binary file to write to
+        width: Image width in pixels
+        height: Image height in pixels
+        rows: Exactly `height` rows of width * 3 bytes (R, G, B)
+        level: zlib compression level
+
+    Raises:
+        ValueError: If a row has the wrong size or the row count is wrong
+    """
+    stream.write(PNG_SIGNATURE)
+    # Profundidad 8, tipo de color 2 (RGB), sin entrelazado
+    stream.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+
+    compressor = zlib.compressobj(level)
+    pending = b""
+    count = 0
+    for row in rows:
+        if len(row) != width * 3:
+            raise ValueError(f"Row {count} has {len(row)} bytes, expected {width * 3}")
+        # Filtro 0 (None) delante de cada fila
+        pending += compressor.compress(b"\x00" + bytes(row))
+        count += 1
+        if len(pending) >= _IDAT_SIZE:
+            stream.write(_chunk(b"IDAT", pending))
+            pending = b""
+    if count != height:
+        raise ValueError(f"Got {count} rows, expected {height}")
+    stream.write(_chunk(b"IDAT", pending + compressor.flush()))
+    stream.write(_chunk(b"IEND", b""))
+
+
+def save_png(path: str, width: int, height: int, rows: Iterable[bytes]) -> None:
+    """Guarda una imagen RGB como archivo PNG."""
+    with open(path, "wb") as f:
+        write_png(f, width, height, rows)
+
+
+def _paeth(a: int, b: int, c: int) -> int:
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def _unfilter(raw: bytes, stride: int, height: int, bpp: int) -> List[bytearray]:
+    """Deshace los filtros de cada fila (None, Sub, Up, Average, Paeth)."""
+    rows = []
+    previous = bytearray(stride)
+    pos = 0
+    for y in range(height):
+        kind = raw[pos]
+        line = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += stride + 1
+        if len(line) != stride:
+            raise PNGError("Truncated image data")
+        if kind == 1:
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xFF
+        elif kind == 2:
+            line = bytearray((a + b) & 0xFF for a, b in zip(line, previous))
+        elif kind == 3:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + ((left + previous[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                up_left = previous[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + _paeth(left, previous[i], up_left)) & 0xFF
+        elif kind != 0:
+            raise PNGError(f"Unknown filter {kind} in row {y}")
+        rows.append(line)
+        previous = line
+    return rows
+
+
+def read_png(source: Union[bytes, BinaryIO]) -> Image:
+    """
+    Read a PNG image as 8-bit RGB.
+
+    Pixels with alpha below 128 become black.
+
+    Args:
+        source: PNG data or a binary file
+
+    Raises:
+        PNGError: If the data is not a PNG or uses an unsupported variant
+            (16-bit samples, interlacing)
+    """
+    data = source if isinstance(source, (bytes, bytearray)) else source.read()
+    if data[:8] != PNG_SIGNATURE:
+        raise PNGError("Not a PNG file")
+
+    header = None
+    palette = b""
+    idat = []
+    pos = 8
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        pos += length + 12
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"PLTE":
+            palette = body
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+    if header is None or not idat:
+        raise PNGError("Missing IHDR or IDAT chunk")
+
+    width, height, depth, colour_type, _, _, interlace = header
+    if colour_type not in _CHANNELS:
+        raise PNGError(f"Unknown colour type {colour_type}")
+    if interlace:
+        raise PNGError("Interlaced PNG files are not supported")
+    if depth != 8 and not (colour_type == 3 and depth in (1, 2, 4)):
+        raise PNGError(f"Unsupported bit depth {depth}")
+
+    channels = _CHANNELS[colour_type]
+    stride = (width * channels * depth + 7) // 8
+    try:
+        raw = zlib.decompress(b"".join(idat))
+    except zlib.error as e:
+        raise PNGError(f"Corrupt image data: {e}")
+    rows = _unfilter(raw, stride, height, max(1, channels * depth // 8))
+
+    rgb = bytearray()
+    for line in rows:
+        if colour_type == 3:
+            if depth < 8:
+                per_byte = 8 // depth
+                mask = (1 << depth) - 1
+                line = bytes((line[x // per_byte] >> (8 - depth * (x % per_byte + 1))) & mask
+                             for x in range(width))
+            for index in line[:width]:
+                rgb += palette[index * 3:index * 3 + 3] or b"\x00\x00\x00"
+            continue
+        if colour_type in (4, 6):
+            # Sin alfa: los píxeles transparentes quedan en negro
+            colour = channels - 1
+            pixels = [line[i:i + colour] if line[i + colour] >= 128 else bytes(colour)
+                      for i in range(0, len(line), channels)]
+            line = b"".join(pixels)
+        if colour_type in (0, 4):
+            line = bytes(value for value in line for _ in range(3))
+        rgb += line
+    return Image(width, height, bytes(rgb))
@@ -0,0 +1,272 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+
+"""
+Decodificador de pantallas SCREEN$ del CPC (volcados de &C000-&FFFF)
+
+La memoria de vídeo está entrelazada: la fila y empieza en
+(y % 8) * &800 + (y // 8) * 80. Cada byte guarda 2, 4 u 8 píxeles según el
+modo, con los bits de cada pen repartidos por el byte.
+
+Con NumPy se (des)empaquetan los bits de toda la pantalla de una vez; sin
+NumPy se usa una tabla de 256 entradas por modo. encode_screen y
+encode_pixels hacen el camino inverso para pantallas y sprites.
+"""
+
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+from .png import save_png
+
+SCREEN_SIZE = 0x4000
+LINE_BYTES = 80
+HEIGHT = 200
+MODE_WIDTHS = {0: 160, 1: 320, 2: 640}
+
+# Todos los modos salen a 640x400 para respetar la forma de los píxeles
+FULL_SIZE = (640, 400)
+THUMB_SIZE = (160, 100)
+
+# Bits de cada píxel dentro del byte, del bit 0 del pen al más alto.
+# Índice i = bit 7 - i, el orden de numpy.unpackbits
+_PEN_BITS = {
+    0: ((0, 4, 2, 6), (1, 5, 3, 7)),
+    1: tuple((p, p + 4) for p in range(4)),
+    2: tuple((p,) for p in range(8)),
+}
+
+# Inks del firmware al arrancar (los pens 14 y 15 parpadean: se usa el primero)
+DEFAULT_INKS = {
+    0: (1, 24, 20, 6, 26, 0, 2, 8, 10, 12, 14, 16, 18, 22, 1, 16),
+    1: (1, 24, 20, 6),
+    2: (1, 24),
+}
+
+_ROW_OFFSETS = [(y % 8) * 0x800 + (y // 8) * LINE_BYTES for y in range(HEIGHT)]
+_LEVELS = (0x00, 0x80, 0xFF)
+
+
+class ScreenError(ValueError):
+    """Los datos o las opciones no forman una pantalla válida."""
+    pass
+
+
+class Screen(NamedTuple):
+    """Pantalla decodificada: un pen por píxel, fila a fila."""
+    mode: int
+    width: int
+    height: int
+    pixels: bytes
+
+
+def firmware_rgb(colour: int) -> bytes:
+    """RGB de un color del firmware (0-26): colour = 9*verde + 3*rojo + azul."""
+    if not 0 <= colour <= 26:
+        raise ScreenError(f"Invalid ink {colour} (0-26)")
+    return bytes((_LEVELS[colour // 3 % 3], _LEVELS[colour // 9], _LEVELS[colour % 3]))
+
+
+@lru_cache(maxsize=None)
+def _pen_table(mode: int) -> Tuple[bytes, ...]:
+    """Pens de los píxeles de cada uno de los 256 valores de byte."""
+    table = []
+    for value in range(256):
+        bits = [(value >> (7 - i)) & 1 for i in range(8)]
+        table.append(bytes(sum(bits[i] << weight for weight, i in enumerate(indexes))
+                           for indexes in _PEN_BITS[mode]))
+    return tuple(table)
+
+
+def _decode_python(data: bytes, mode: int) -> bytes:
+    table = _pen_table(mode)
+    return b"".join(b"".join(map(table.__getitem__, data[offset:offset + LINE_BYTES]))
+                    for offset in _ROW_OFFSETS)
+
+
+def _decode_numpy(data: bytes, mode: int) -> bytes:
+    memory = np.frombuffer(data, dtype=np.uint8).reshape(8, 0x800)[:, :25 * LINE_BYTES]
+    # (banco, fila de caracteres, byte) -> (fila de píxeles, byte)
+    rows = memory.reshape(8, 25, LINE_BYTES).transpose(1, 0, 2).reshape(HEIGHT, LINE_BYTES)
+    bits = np.unpackbits(rows, axis=1).reshape(HEIGHT, LINE_BYTES, 8)
+    pens = np.zeros((HEIGHT, LINE_BYTES, len(_PEN_BITS[mode])), dtype=np.uint8)
+    for pixel, indexes in enumerate(_PEN_BITS[mode]):
+        for weight, i in enumerate(indexes):
+            pens[:, :, pixel] |= bits[:, :, i] << weight
+    return pens.reshape(HEIGHT, -1).tobytes()
+
+
+def decode_screen(data: bytes, mode: int, use_numpy: Optional[bool] = None) -> Screen:
+    """
+    Decode a SCREEN$ memory dump.
+
+    Args:
+        data: Screen data without AMSDOS header; shorter dumps (e.g. saved
+            without the last 48 bytes) are padded with zeros
+        mode: Screen mode (0, 1 or 2)
+        use_numpy: Force (True) or avoid (False) NumPy; default: use it if
+            installed
+
+    Raises:
+        ScreenError: If the mode is not valid or there is no data
+    """
+    if mode not in MODE_WIDTHS:
+        raise ScreenError(f"Invalid mode {mode} (0, 1 or 2)")
+    if not data:
+        raise ScreenError("Empty screen")
+    data = bytes(data[:SCREEN_SIZE]).ljust(SCREEN_SIZE, b"\x00")
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ScreenError("NumPy is not installed")
+    pixels = _decode_numpy(data, mode) if use_numpy else _decode_python(data, mode)
+    return Screen(mode, MODE_WIDTHS[mode], HEIGHT, pixels)
+
+
+@lru_cache(maxsize=None)
+def _byte_table(mode: int) -> dict:
+    """Inversa de _pen_table: pens de los píxeles -> byte."""
+    return {pens: value for value, pens in enumerate(_pen_table(mode))}
+
+
+def pixels_per_byte(mode: int) -> int:
+    """Píxeles que caben en un byte: 2, 4 u 8."""
+    return len(_PEN_BITS[mode])
+
+
+def encode_pixels(pixels: bytes, width: int, mode: int, use_numpy: Optional[bool] = None) -> bytes:
+    """
+    Pack pens into CPC video bytes, row by row (linear sprite layout).
+
+    Args:
+        pixels: One pen per pixel, row-major
+        width: Row width in pixels, a multiple of the pixels per byte
+        mode: Screen mode (0, 1 or 2)
+        use_numpy: Force (True) or avoid (False) NumPy; default: use it if
+            installed
+
+    Raises:
+        ScreenError: If the width does not fit the mode or a pen is too high
+    """
+    if mode not in MODE_WIDTHS:
+        raise ScreenError(f"Invalid mode {mode} (0, 1 or 2)")
+    per_byte = pixels_per_byte(mode)
+    if width % per_byte:
+        raise ScreenError(f"Width {width} is not a multiple of {per_byte} pixels in mode {mode}")
+    if pixels and max(pixels) >= 1 << (8 // per_byte):
+        raise ScreenError(f"Mode {mode} only has {1 << (8 // per_byte)} pens")
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ScreenError("NumPy is not installed")
+
+    if use_numpy:
+        pens = np.frombuffer(bytes(pixels), dtype=np.uint8).reshape(-1, per_byte)
+        bits = np.zeros((len(pens), 8), dtype=np.uint8)
+        for pixel, indexes in enumerate(_PEN_BITS[mode]):
+            for weight, i in enumerate(indexes):
+                bits[:, i] = (pens[:, pixel] >> weight) & 1
+        return np.packbits(bits, axis=1).tobytes()
+
+    table = _byte_table(mode)
+    return bytes(table[bytes(pixels[i:i + per_byte])] for i in range(0, len(pixels), per_byte))
+
+
+def encode_screen(screen: Screen, use_numpy: Optional[bool] = None) -> bytes:
+    """
+    Build the 16 KB interleaved memory dump of a full screen.
+
+    Raises:
+        ScreenError: If the screen is not the native size of its mode
+    """
+    if (screen.width, screen.height) != (MODE_WIDTHS.get(screen.mode), HEIGHT):
+        raise ScreenError(f"A mode {screen.mode} screen must be {MODE_WIDTHS.get(screen.mode)}x{HEIGHT}")
+    linear = encode_pixels(screen.pixels, screen.width, screen.mode, use_numpy)
+    memory = bytearray(SCREEN_SIZE)
+    for y, offset in enumerate(_ROW_OFFSETS):
+        memory[offset:offset + LINE_BYTES] = linear[y * LINE_BYTES:(y + 1) * LINE_BYTES]
+    return bytes(memory)
+
+
+def palette_for(mode: int, inks: Optional[Sequence[int]] = None) -> List[bytes]:
+    """RGB de cada pen: los inks dados y, para el resto, los del firmware."""
+    defaults = DEFAULT_INKS[mode]
+    inks = list(inks or ())[:len(defaults)]
+    return [firmware_rgb(ink) for ink in inks + list(defaults[len(inks):])]
+
+
+def scale_factors(source: int, target: int) -> Tuple[int, int]:
+    """(repetición, salto) para pasar de source a target píxeles."""
+    if target >= source and target % source == 0:
+        return target // source, 1
+    if source % target == 0:
+        return 1, source // target
+    raise ScreenError(f"Cannot scale {source} pixels to {target}")
+
+
+def render_rgb(screen: Screen, inks: Optional[Sequence[int]] = None,
+               size: Tuple[int, int] = FULL_SIZE) -> Iterator[bytes]:
+    """
+    RGB rows of a decoded screen, scaled to `size` by repeating or
+    skipping pixels.
+
+    Yields:
+        size[1] rows of size[0] * 3 bytes
+    """
+    width, height = size
+    repeat, step = scale_factors(screen.width, width)
+    rows = [y * screen.height // height for y in range(height)]
+    palette = palette_for(screen.mode, inks)
+
+    if np is not None:
+        colours = np.frombuffer(b"".join(palette), dtype=np.uint8).reshape(-1, 3)
+        pens = np.frombuffer(screen.pixels, dtype=np.uint8).reshape(screen.height, screen.width)
+        pens = np.repeat(pens[:, ::step], repeat, axis=1)
+        for y in rows:
+            yield colours[pens[y]].tobytes()
+        return
+
+    wide = [colour * repeat for colour in palette]
+    previous, line = -1, b""
+    for y in rows:
+        # Al ampliar en vertical se repite la misma fila
+        if y != previous:
+            pixels = screen.pixels[y * screen.width:(y + 1) * screen.width][::step]
+            line = b"".join(map(wide.__getitem__, pixels))
+            previous = y
+        yield line
+
+
+def export_screen(data: bytes, mode: int, path: str, inks: Optional[Sequence[int]] = None,
+                  thumbnail: bool = True) -> List[str]:
+    """
+    Write a screen as a full-size PNG and, optionally, a thumbnail next to it
+    ('name.png' and 'name.thumb.png').
+
+    Returns:
+        Paths of the written files
+    """
+    screen = decode_screen(data, mode)
+    save_png(path, *FULL_SIZE, render_rgb(screen, inks, FULL_SIZE))
+    written = [path]
+    if thumbnail:
+        thumb = path[:-4] + ".thumb.png" if path.lower().endswith(".png") else path + ".thumb.png"
+        save_png(thumb, *THUMB_SIZE, render_rgb(screen, inks, THUMB_SIZE))
+        written.append(thumb)
+    return written
@@ -0,0 +1,268 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+
+"""
+Snapshots SNA del CPC (formato de CPCEMU, versiones 1 y 3)
+
+Un SNA es una cabecera de 256 bytes con el estado del Z80, el gate array,
+el CRTC, el PPI y el PSG, seguida del volcado de la RAM (64 o 128 KB).
+La versión 3 añade el modelo de CPC y puede guardar la memoria en
+bloques MEM0-MEM8 comprimidos con RLE; aquí se leen, pero se escribe
+siempre el volcado sin comprimir, que entienden todos los emuladores.
+
+build_snapshot coloca los binarios en memoria según su dirección de
+carga y deja el PC en la dirección de ejecución. Sin snapshot base la
+máquina queda "desnuda": ROMs desconectadas, interrupciones desactivadas
+y el CRTC y la paleta con los valores del firmware tras el arranque. Los
+programas que llamen al firmware necesitan como base un snapshot tomado
+con la máquina ya arrancada: de ella se conserva todo salvo el PC y la
+memoria que ocupan los ficheros.
+"""
+
+import struct
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+
+from .screen import DEFAULT_INKS
+
+SNA_SIGNATURE = b"MV - SNA"
+HEADER_SIZE = 0x100
+VERSIONS = (1, 2, 3)
+DEFAULT_VERSION = 3
+
+# Modelo -> (tipo de CPC en la cabecera, KB de RAM)
+MODELS = {"464": (0, 64), "664": (1, 64), "6128": (2, 128)}
+
+# Valores del firmware tras el arranque (pantalla en &C000)
+CRTC_DEFAULTS = (63, 40, 46, 0x8E, 38, 0, 25, 30, 0, 7, 0, 0, 0x30, 0x00, 0, 0, 0, 0)
+BORDER_INK = 1
+# PPI puerto B: fabricante Amstrad, 50 Hz, impresora libre
+PPI_B = 0x5E
+PPI_CONTROL = 0x82
+# PSG: todos los canales y el ruido desactivados
+PSG_MIXER = 0x3F
+# Gate array: bit 7 = registro RMR, bits 2-3 = ROM baja/alta desconectadas
+RMR_COMMAND = 0x80
+ROMS_OFF = 0x0C
+DEFAULT_STACK = 0xC000
+# EI: RET en &0038 para que un EI del programa no salte a memoria vacía
+INTERRUPT_STUB = b"\xFB\xC9"
+INTERRUPT_VECTOR = 0x0038
+
+# Color hardware (0-31) de cada color del firmware (0-26)
+FIRMWARE_TO_HARDWARE = (
+    0x14, 0x04, 0x15, 0x1C, 0x18, 0x1D, 0x0C, 0x05, 0x0D,
+    0x16, 0x06, 0x17, 0x1E, 0x00, 0x1F, 0x0E, 0x07, 0x0F,
+    0x12, 0x02, 0x13, 0x1A, 0x19, 0x1B, 0x0A, 0x03, 0x0B,
+)
+
+# Posiciones en la cabecera
+_VERSION = 0x10
+_Z80 = 0x11          # F A C B E D L H R I IFF0 IFF1 IX IY SP PC IM F' A' C' B' E' D' L' H'
+_SP = 0x21
+_PC = 0x23
+_GA_PALETTE = 0x2F
+_GA_RMR = 0x40
+_CRTC = 0x43
+_PPI = 0x56
+_PSG = 0x5B
+_DUMP_SIZE = 0x6B
+_CPC_TYPE = 0x6D
+_MULTIMODE = 0x6F
+_Z80_FORMAT = "<BBBBBBBBBBBBHHHHB"
+
+
+class SNAError(ValueError):
+    """El snapshot no es válido o los ficheros no caben en memoria."""
+    pass
+
+
+class Segment(NamedTuple):
+    """Bloque de datos que se carga en memoria."""
+    name: str
+    load: int
+    data: bytes
+
+
+class Snapshot(NamedTuple):
+    """Datos básicos de un SNA leído."""
+    version: int
+    model: Optional[str]
+    pc: int
+    sp: int
+    mode: int
+    interrupts: bool
+    memory: bytes
+
+
+def _unpack_rle(data: bytes) -> bytes:
+    """Bloques MEMx de la versión 3: &E5 n b repite b n veces; &E5 0 es un &E5."""
+    output = bytearray()
+    pos = 0
+    while pos < len(data):
+        value = data[pos]
+        if value != 0xE5:
+            output.append(value)
+            pos += 1
+        elif pos + 1 < len(data) and data[pos + 1] == 0:
+            output.append(0xE5)
+            pos += 2
+        elif pos + 2 < len(data):
+            output += bytes((data[pos + 2],)) * data[pos + 1]
+            pos += 3
+        else:
+            raise SNAError("Truncated compressed memory block")
+    return bytes(output)
+
+
+def _chunk_memory(data: bytes) -> bytes:
+    """Memoria de los bloques MEM0-MEM8 que siguen a la cabecera."""
+    memory = bytearray()
+    pos = HEADER_SIZE
+    while pos + 8 <= len(data):
+        name, length = data[pos:pos + 4], struct.unpack_from("<I", data, pos + 4)[0]
+        body = data[pos + 8:pos + 8 + length]
+        if name.startswith(b"MEM") and name[3:4].isdigit():
+            bank = int(name[3:4]) * 0x10000
+            block = _unpack_rle(body) if len(body) != 0x10000 else body
+            if len(block) != 0x10000:
+                raise SNAError(f"Memory block {name.decode()} is not 64 KB")
+            if len(memory) < bank + 0x10000:
+                memory += bytes(bank + 0x10000 - len(memory))
+            memory[bank:bank + 0x10000] = block
+        pos += 8 + length
+    return bytes(memory)
+
+
+def read_snapshot(data: bytes) -> Snapshot:
+    """
+    Parse the header and memory of a SNA file.
+
+    Raises:
+        SNAError: If the data is not a snapshot or the memory is incomplete
+    """
+    if len(data) < HEADER_SIZE or not data.startswith(SNA_SIGNATURE):
+        raise SNAError("Not a SNA snapshot")
+    version = data[_VERSION]
+    dump_size = struct.unpack_from("<H", data, _DUMP_SIZE)[0] * 1024
+    if dump_size:
+        memory = data[HEADER_SIZE:HEADER_SIZE + dump_size]
+        if len(memory) != dump_size:
+            raise SNAError(f"Snapshot memory is truncated ({len(memory)} of {dump_size} bytes)")
+    else:
+        memory = _chunk_memory(data)
+        if not memory:
+            raise SNAError("Snapshot has no memory dump")
+    model = None
+    if version >= 2:
+        model = next((name for name, (kind, _) in MODELS.items() if kind == data[_CPC_TYPE]), None)
+    sp, pc = struct.unpack_from("<HH", data, _SP)
+    return Snapshot(version, model, pc, sp, data[_GA_RMR] & 3, bool(data[_Z80 + 11]), bytes(memory))
+
+
+def default_header(model: str, mode: int, inks: Optional[Sequence[int]] = None) -> bytearray:
+    """Cabecera con la máquina recién arrancada, sin ROMs y sin interrupciones."""
+    header = bytearray(HEADER_SIZE)
+    header[:len(SNA_SIGNATURE)] = SNA_SIGNATURE
+    # IM 1, interrupciones desactivadas
+    struct.pack_into(_Z80_FORMAT, header, _Z80, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+                     0, 0, DEFAULT_STACK, 0, 1)
+    inks = list(inks or ())[:16]
+    pens = inks + list(DEFAULT_INKS[0][len(inks):])
+    header[_GA_PALETTE:_GA_PALETTE + 17] = bytes(FIRMWARE_TO_HARDWARE[ink] for ink in pens + [BORDER_INK])
+    header[_GA_RMR] = RMR_COMMAND | ROMS_OFF | mode
+    header[_CRTC:_CRTC + len(CRTC_DEFAULTS)] = bytes(CRTC_DEFAULTS)
+    header[_PPI + 1] = PPI_B
+    header[_PPI + 3] = PPI_CONTROL
+    header[_PSG + 7] = PSG_MIXER
+    header[_CPC_TYPE] = MODELS[model][0]
+    header[_MULTIMODE:_MULTIMODE + 6] = bytes((mode,)) * 6
+    return header
+
+
+def layout_memory(memory: bytearray, segments: Iterable[Segment]) -> List[Segment]:
+    """
+    Copy the segments into memory at their load addresses.
+
+    Returns:
+        The segments, in order
+
+    Raises:
+        SNAError: If a segment goes past &FFFF or two segments overlap
+    """
+    placed: List[Segment] = []
+    for segment in segments:
+        end = segment.load + len(segment.data)
+        if end > 0x10000:
+            raise SNAError(f"{segment.name} (&{segment.load:04X}, {len(segment.data)} bytes) goes past &FFFF")
+        for other in placed:
+            if segment.load < other.load + len(other.data) and other.load < end:
+                raise SNAError(f"{segment.name} overlaps {other.name}")
+        memory[segment.load:end] = segment.data
+        placed.append(segment)
+    return placed
+
+
+def build_snapshot(segments: Iterable[Segment], entry: int, model: str = "6128", mode: int = 1,
+                   version: int = DEFAULT_VERSION, inks: Optional[Sequence[int]] = None,
+                   stack: int = DEFAULT_STACK, base: Optional[bytes] = None) -> bytes:
+    """
+    Build a SNA snapshot that starts running at `entry`.
+
+    Args:
+        segments: Data to place in memory (main 64 KB) at their load addresses
+        entry: Address the Z80 starts at
+        model: CPC model ('464', '664' or '6128'); sets the RAM size and,
+            from version 2, the CPC type
+        mode: Screen mode (0, 1 or 2)
+        version: SNA version to write (1, 2 or 3)
+        inks: Firmware inks of the pens (default: the firmware ones)
+        stack: Initial stack pointer (ignored with a base snapshot)
+        base: Snapshot whose machine state and memory are kept; only the PC
+            and the memory under the segments change
+
+    Raises:
+        SNAError: On invalid options, a bad base or segments that do not fit
+    """
+    if model not in MODELS:
+        raise SNAError(f"Unknown CPC model {model} ({', '.join(MODELS)})")
+    if mode not in (0, 1, 2):
+        raise SNAError(f"Invalid mode {mode} (0, 1 or 2)")
+    if version not in VERSIONS:
+        raise SNAError(f"Unsupported SNA version {version} (1, 2 or 3)")
+    if not 0 <= entry <= 0xFFFF:
+        raise SNAError(f"Invalid entry address {entry}")
+
+    if base is not None:
+        snapshot = read_snapshot(base)
+        header = bytearray(base[:HEADER_SIZE])
+        memory = bytearray(snapshot.memory)
+    else:
+        header = default_header(model, mode, inks)
+        struct.pack_into("<H", header, _SP, stack)
+        memory = bytearray(MODELS[model][1] * 1024)
+
+    placed = layout_memory(memory, segments)
+    if base is None and not any(s.load <= INTERRUPT_VECTOR < s.load + len(s.data) for s in placed):
+        memory[INTERRUPT_VECTOR:INTERRUPT_VECTOR + len(INTERRUPT_STUB)] = INTERRUPT_STUB
+
+    header[_VERSION] = version
+    struct.pack_into("<H", header, _PC, entry)
+    struct.pack_into("<H", header, _DUMP_SIZE, len(memory) // 1024)
+    if version == 1:
+        # La versión 1 acaba en el tamaño del volcado
+        header[_DUMP_SIZE + 2:] = bytes(HEADER_SIZE - _DUMP_SIZE - 2)
+    elif base is None or base[_VERSION] < 2:
+        header[_CPC_TYPE] = MODELS[model][0]
+    return bytes(header) + bytes(memory)
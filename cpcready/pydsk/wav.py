@@ -0,0 +1,182 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+
+"""
+Conversión de la señal de una cinta CDT/TZX a audio WAV
+
+Cada pulso es medio ciclo de la onda cuadrada: el nivel cambia al final
+de cada uno. Los tiempos se acumulan en T-states sobre un reloj global y
+cada flanco cae en la muestra floor(t * frecuencia / 3.5 MHz), así que el
+redondeo no se acumula aunque la cinta dure horas.
+
+Con NumPy cada tramo de la señal se convierte en un array de longitudes
+de pulso, las longitudes en número de muestras (diferencias de los
+flancos) y las muestras con np.repeat sobre los niveles. Sin NumPy se
+hace pulso a pulso con multiplicación de bytes. En los dos casos el WAV
+se escribe por trozos: la memoria depende de CHUNK_BYTES y no de la
+longitud de la cinta.
+"""
+
+import os
+import wave
+from typing import Iterable, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+from .cdt import CPU_CLOCK, Bits, CDTError, Pause, Pulses, Signal, Tone
+
+DEFAULT_RATE = 44100
+# Niveles de la onda en WAV de 8 bits sin signo
+HIGH = 0xE0
+LOW = 0x20
+# Bytes de datos que se convierten de una vez
+CHUNK_BYTES = 4096
+# Muestras de silencio que se escriben de una vez
+SILENCE_CHUNK = 1 << 16
+
+
+class _Renderer:
+    """Convierte tramos de señal en muestras y las va escribiendo."""
+
+    def __init__(self, output: wave.Wave_write, rate: int, use_numpy: bool):
+        self.output = output
+        self.rate = rate
+        self.use_numpy = use_numpy
+        self.clock = 0      # T-states desde el principio de la cinta
+        self.written = 0    # muestras escritas
+        self.high = True    # nivel del siguiente pulso
+
+    def _sample(self, clock: int) -> int:
+        return clock * self.rate // CPU_CLOCK
+
+    def pulses(self, lengths) -> None:
+        """Escribe pulsos de las longitudes dadas (T-states), alternando el nivel."""
+        if self.use_numpy:
+            lengths = np.asarray(lengths, dtype=np.int64)
+            if not len(lengths):
+                return
+            ends = self.clock + np.cumsum(lengths)
+            edges = ends * self.rate // CPU_CLOCK
+            counts = np.diff(edges, prepend=self.written)
+            levels = np.empty(len(lengths), dtype=np.uint8)
+            levels[0::2] = HIGH if self.high else LOW
+            levels[1::2] = LOW if self.high else HIGH
+            self.output.writeframesraw(np.repeat(levels, counts).tobytes())
+            self.clock = int(ends[-1])
+            self.written = int(edges[-1])
+            if len(lengths) % 2:
+                self.high = not self.high
+            return
+
+        high, low = bytes((HIGH,)), bytes((LOW,))
+        samples = bytearray()
+        clock, written, level = self.clock, self.written, self.high
+        for length in lengths:
+            clock += length
+            edge = clock * self.rate // CPU_CLOCK
+            samples += (high if level else low) * (edge - written)
+            written, level = edge, not level
+        self.output.writeframesraw(samples)
+        self.clock, self.written, self.high = clock, written, level
+
+    def tone(self, tone: Tone) -> None:
+        if self.use_numpy:
+            self.pulses(np.full(tone.count, tone.length, dtype=np.int64))
+        else:
+            self.pulses([tone.length] * tone.count)
+
+    def bits(self, bits: Bits) -> None:
+        """Dos pulsos por bit, del bit 7 al 0; en el último byte solo used_bits."""
+        data = bits.data
+        for start in range(0, len(data), CHUNK_BYTES):
+            chunk = data[start:start + CHUNK_BYTES]
+            count = len(chunk) * 8
+            if start + CHUNK_BYTES >= len(data):
+                count -= 8 - (bits.used_bits or 8)
+            if self.use_numpy:
+                values = np.unpackbits(np.frombuffer(chunk, dtype=np.uint8))[:count]
+                self.pulses(np.repeat(np.where(values, bits.one, bits.zero), 2))
+            else:
+                lengths = []
+                for index in range(count):
+                    length = bits.one if chunk[index >> 3] & (0x80 >> (index & 7)) else bits.zero
+                    lengths += (length, length)
+                self.pulses(lengths)
+
+    def pause(self, pause: Pause) -> None:
+        """Silencio a nivel bajo; el bloque siguiente empieza en alto."""
+        self.clock += pause.ms * (CPU_CLOCK // 1000)
+        edge = self._sample(self.clock)
+        low = bytes((LOW,))
+        while self.written < edge:
+            count = min(edge - self.written, SILENCE_CHUNK)
+            self.output.writeframesraw(low * count)
+            self.written += count
+        self.high = True
+
+
+def write_wav(path: str, signal: Iterable[Signal], sample_rate: int = DEFAULT_RATE,
+              use_numpy: Optional[bool] = None) -> float:
+    """
+    Render a tape signal (see cdt.iter_signal) as an 8-bit mono WAV file.
+
+    The file is written chunk by chunk to 'path.part' and renamed at the
+    end, so a bad block never leaves a half-written WAV behind.
+
+    Args:
+        path: Output WAV file
+        signal: Tone, Pulses, Bits and Pause segments
+        sample_rate: Samples per second
+        use_numpy: Force (True) or avoid (False) NumPy; default: use it if
+            installed
+
+    Returns:
+        Length of the audio in seconds
+
+    Raises:
+        CDTError: If the signal cannot be rendered
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise CDTError("NumPy is not installed")
+    if sample_rate <= 0:
+        raise CDTError(f"Invalid sample rate {sample_rate}")
+
+    temp = path + ".part"
+    try:
+        with wave.open(temp, "wb") as output:
+            output.setnchannels(1)
+            output.setsampwidth(1)
+            output.setframerate(sample_rate)
+            renderer = _Renderer(output, sample_rate, use_numpy)
+            for segment in signal:
+                if isinstance(segment, Tone):
+                    renderer.tone(segment)
+                elif isinstance(segment, Pulses):
+                    renderer.pulses(segment.lengths)
+                elif isinstance(segment, Bits):
+                    renderer.bits(segment)
+                elif isinstance(segment, Pause):
+                    renderer.pause(segment)
+        os.replace(temp, path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+    return renderer.written / sample_rate
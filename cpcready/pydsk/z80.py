@@ -0,0 +1,373 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+
+"""
+Desensamblador Z80
+
+Las tablas de decodificación (256 entradas por prefijo: sin prefijo, CB,
+ED, DD/FD y DDCB/FDCB) se generan una vez al importar el módulo a partir de
+los campos x/y/z/p/q del opcode. Cada entrada guarda el formato del texto,
+los operandos que siguen al opcode y cómo afecta al flujo del programa.
+
+Los números se muestran en hexadecimal con '&', como en el CPC.
+"""
+
+import re
+from typing import Iterator, NamedTuple, Optional, Set, Tuple
+
+_R = ["B", "C", "D", "E", "H", "L", "(HL)", "A"]
+_RP = ["BC", "DE", "HL", "SP"]
+_RP2 = ["BC", "DE", "HL", "AF"]
+_CC = ["NZ", "Z", "NC", "C", "PO", "PE", "P", "M"]
+_ALU = ["ADD A,", "ADC A,", "SUB ", "SBC A,", "AND ", "XOR ", "OR ", "CP "]
+_ROT = ["RLC", "RRC", "RL", "RR", "SLA", "SRA", "SLL", "SRL"]
+_IM = ["0", "0/1", "1", "2", "0", "0/1", "1", "2"]
+_BLOCK = [
+    ["LDI", "CPI", "INI", "OUTI"],
+    ["LDD", "CPD", "IND", "OUTD"],
+    ["LDIR", "CPIR", "INIR", "OTIR"],
+    ["LDDR", "CPDR", "INDR", "OTDR"],
+]
+
+# Tipos de flujo
+FLOW_NEXT = 0     # sigue en la instrucción siguiente
+FLOW_BRANCH = 1   # salto condicional o llamada: destino y siguiente
+FLOW_JUMP = 2     # salto incondicional: solo el destino
+FLOW_STOP = 3     # RET, JP (HL)...: no se sabe adónde va
+
+# RST del firmware del CPC seguidos de una dirección de 2 bytes
+# (&08 LOW JUMP, &10 SIDE CALL, &18 FAR CALL, &28 FIRM JUMP)
+CPC_RST_INLINE = {0x08: FLOW_STOP, 0x10: FLOW_NEXT, 0x18: FLOW_NEXT, 0x28: FLOW_STOP}
+
+_OPERAND = re.compile(r"\{(nn|n|e|d)\}")
+
+
+class Opcode(NamedTuple):
+    """Entrada de una tabla de decodificación."""
+    fmt: str                   # texto con '{}' en el lugar de cada operando
+    operands: Tuple[str, ...]  # 'n' byte, 'nn' palabra, 'e' relativo, 'd' desplazamiento
+    flow: int
+    target: Optional[int] = None  # destino fijo (RST)
+
+
+class Instruction(NamedTuple):
+    """Instrucción (o bloque de datos) desensamblada."""
+    address: int
+    data: bytes
+    text: str
+    target: Optional[int] = None
+    flow: int = FLOW_NEXT
+
+
+def _opcode(template: str) -> Opcode:
+    """Compila una plantilla como 'JR NZ,{e}' y deduce su efecto en el flujo."""
+    operands = tuple(_OPERAND.findall(template))
+    fmt = _OPERAND.sub("{}", template)
+    mnemonic, _, args = template.partition(" ")
+    flow = FLOW_NEXT
+    target = None
+    if mnemonic in ("JP", "JR"):
+        if args.startswith("("):
+            flow = FLOW_STOP
+        else:
+            flow = FLOW_BRANCH if "," in args else FLOW_JUMP
+    elif mnemonic in ("CALL", "DJNZ"):
+        flow = FLOW_BRANCH
+    elif mnemonic == "RST":
+        flow = FLOW_BRANCH
+        target = int(args[1:], 16)
+    elif mnemonic in ("RETI", "RETN") or template == "RET":
+        flow = FLOW_STOP
+    return Opcode(fmt, operands, flow, target)
+
+
+def _main_template(op: int) -> str:
+    x, y, z = op >> 6, (op >> 3) & 7, op & 7
+    p, q = y >> 1, y & 1
+    if x == 0:
+        if z == 0:
+            return ["NOP", "EX AF,AF'", "DJNZ {e}", "JR {e}"][y] if y < 4 else f"JR {_CC[y - 4]},{{e}}"
+        if z == 1:
+            return f"LD {_RP[p]},{{nn}}" if q == 0 else f"ADD HL,{_RP[p]}"
+        if z == 2:
+            return [["LD (BC),A", "LD (DE),A", "LD ({nn}),HL", "LD ({nn}),A"],
+                    ["LD A,(BC)", "LD A,(DE)", "LD HL,({nn})", "LD A,({nn})"]][q][p]
+        if z == 3:
+            return f"{'INC' if q == 0 else 'DEC'} {_RP[p]}"
+        if z == 4:
+            return f"INC {_R[y]}"
+        if z == 5:
+            return f"DEC {_R[y]}"
+        if z == 6:
+            return f"LD {_R[y]},{{n}}"
+        return ["RLCA", "RRCA", "RLA", "RRA", "DAA", "CPL", "SCF", "CCF"][y]
+    if x == 1:
+        return "HALT" if op == 0x76 else f"LD {_R[y]},{_R[z]}"
+    if x == 2:
+        return f"{_ALU[y]}{_R[z]}"
+    if z == 0:
+        return f"RET {_CC[y]}"
+    if z == 1:
+        return f"POP {_RP2[p]}" if q == 0 else ["RET", "EXX", "JP (HL)", "LD SP,HL"][p]
+    if z == 2:
+        return f"JP {_CC[y]},{{nn}}"
+    if z == 3:
+        return ["JP {nn}", "", "OUT ({n}),A", "IN A,({n})", "EX (SP),HL", "EX DE,HL", "DI", "EI"][y]
+    if z == 4:
+        return f"CALL {_CC[y]},{{nn}}"
+    if z == 5:
+        return f"PUSH {_RP2[p]}" if q == 0 else ["CALL {nn}", "", "", ""][p]
+    if z == 6:
+        return f"{_ALU[y]}{{n}}"
+    return f"RST &{y * 8:02X}"
+
+
+def _cb_template(op: int, operand: str) -> str:
+    x, y, z = op >> 6, (op >> 3) & 7, op & 7
+    if x == 0:
+        return f"{_ROT[y]} {operand}"
+    return f"{['', 'BIT', 'RES', 'SET'][x]} {y},{operand}"
+
+
+def _ed_template(op: int) -> Optional[str]:
+    x, y, z = op >> 6, (op >> 3) & 7, op & 7
+    p, q = y >> 1, y & 1
+    if x == 1:
+        if z == 0:
+            return "IN (C)" if y == 6 else f"IN {_R[y]},(C)"
+        if z == 1:
+            return "OUT (C),0" if y == 6 else f"OUT (C),{_R[y]}"
+        if z == 2:
+            return f"{'SBC' if q == 0 else 'ADC'} HL,{_RP[p]}"
+        if z == 3:
+            return f"LD ({{nn}}),{_RP[p]}" if q == 0 else f"LD {_RP[p]},({{nn}})"
+        if z == 4:
+            return "NEG"
+        if z == 5:
+            return "RETI" if y == 1 else "RETN"
+        if z == 6:
+            return f"IM {_IM[y]}"
+        return ["LD I,A", "LD R,A", "LD A,I", "LD A,R", "RRD", "RLD", "NOP", "NOP"][y]
+    if x == 2 and z <= 3 and y >= 4:
+        return _BLOCK[y - 4][z]
+    return None
+
+
+def _index_template(template: str, reg: str) -> Optional[str]:
+    """
+    Plantilla con prefijo DD/FD: HL pasa a IX/IY, (HL) a (IX+d) y H/L a
+    IXH/IXL. None si el prefijo no afecta a la instrucción.
+    """
+    if not template or template == "EX DE,HL":
+        return None
+    if template == "JP (HL)":
+        return f"JP ({reg})"
+    if "(HL)" in template:
+        # Con (IX+d) los registros H y L no cambian (LD H,(IX+d))
+        return template.replace("(HL)", f"({reg}{{d}})")
+    if re.search(r"\b(HL|H|L)\b", template):
+        template = re.sub(r"\bHL\b", reg, template)
+        return re.sub(r"\b([HL])\b", lambda m: reg + m.group(1), template)
+    return None
+
+
+def _index_cb_template(op: int, reg: str) -> str:
+    """DDCB d op: operan sobre (IX+d); si z != 6 copian además a un registro."""
+    x, z = op >> 6, op & 7
+    text = _cb_template(op, f"({reg}{{d}})")
+    if z != 6 and x != 1:
+        text += f",{_R[z]}"
+    return text
+
+
+def _build_tables():
+    main = [_opcode(_main_template(op)) for op in range(256)]
+    cb = [_opcode(_cb_template(op, _R[op & 7])) for op in range(256)]
+    ed = [_opcode(t) if t else None for t in (_ed_template(op) for op in range(256))]
+    index = {}
+    index_cb = {}
+    for prefix, reg in ((0xDD, "IX"), (0xFD, "IY")):
+        index[prefix] = [
+            _opcode(t) if t else None
+            for t in (_index_template(_main_template(op), reg) for op in range(256))
+        ]
+        index_cb[prefix] = [_opcode(_index_cb_template(op, reg)) for op in range(256)]
+    return main, cb, ed, index, index_cb
+
+
+MAIN_TABLE, CB_TABLE, ED_TABLE, INDEX_TABLES, INDEX_CB_TABLES = _build_tables()
+
+
+def _hex8(value: int) -> str:
+    return f"&{value:02X}"
+
+
+def _data_line(address: int, chunk: bytes) -> Instruction:
+    return Instruction(address, bytes(chunk), "DB " + ",".join(_hex8(b) for b in chunk))
+
+
+def decode(data: bytes, pos: int, origin: int = 0) -> Instruction:
+    """
+    Decode the instruction at data[pos].
+
+    Args:
+        data: Code bytes
+        pos: Offset of the instruction in data
+        origin: Address of data[0]
+
+    Returns:
+        Instruction; bytes that do not form a valid or complete
+        instruction are returned as a 'DB' line
+    """
+    size = len(data)
+    address = (origin + pos) & 0xFFFF
+    op = data[pos]
+    disp = None
+
+    if op == 0xCB:
+        entry, length = (CB_TABLE[data[pos + 1]] if pos + 1 < size else None), 2
+    elif op == 0xED:
+        entry, length = (ED_TABLE[data[pos + 1]] if pos + 1 < size else None), 2
+    elif op in (0xDD, 0xFD):
+        if pos + 1 < size and data[pos + 1] == 0xCB:
+            # DD CB d op: el desplazamiento va antes del opcode
+            entry = INDEX_CB_TABLES[op][data[pos + 3]] if pos + 3 < size else None
+            disp = data[pos + 2] if entry else None
+            length = 4
+        else:
+            entry, length = (INDEX_TABLES[op][data[pos + 1]] if pos + 1 < size else None), 2
+            if entry is None:
+                # El prefijo no afecta a lo que sigue: se muestra como dato
+                return _data_line(address, data[pos:pos + 1])
+    else:
+        entry, length = MAIN_TABLE[op], 1
+
+    if entry is None:
+        return _data_line(address, data[pos:pos + min(length, size - pos)])
+
+    values = []
+    target = entry.target
+    for kind in entry.operands:
+        if kind == "nn":
+            if pos + length + 1 >= size:
+                return _data_line(address, data[pos:])
+            value = data[pos + length] | (data[pos + length + 1] << 8)
+            length += 2
+            values.append(f"&{value:04X}")
+            if entry.flow in (FLOW_BRANCH, FLOW_JUMP):
+                target = value
+            continue
+        if kind == "d" and disp is not None:
+            value = disp
+        else:
+            if pos + length >= size:
+                return _data_line(address, data[pos:])
+            value = data[pos + length]
+            length += 1
+        if kind == "n":
+            values.append(_hex8(value))
+        else:
+            offset = value - 256 if value > 127 else value
+            if kind == "d":
+                values.append(f"{'+' if offset >= 0 else '-'}{_hex8(abs(offset))}")
+            else:
+                target = (address + length + offset) & 0xFFFF
+                values.append(f"&{target:04X}")
+
+    return Instruction(address, bytes(data[pos:pos + length]), entry.fmt.format(*values),
+                       target, entry.flow)
+
+
+def trace_code(data: bytes, origin: int, entries) -> Set[int]:
+    """
+    Follow the program flow from the entry points to find which offsets
+    start an instruction; what is never reached is treated as data.
+
+    Args:
+        data: Code bytes
+        origin: Address of data[0]
+        entries: Entry point addresses (usually the AMSDOS exec address)
+
+    Returns:
+        Set of offsets in data where a reachable instruction starts
+    """
+    size = len(data)
+    starts: Set[int] = set()
+    pending = [address - origin for address in entries]
+    while pending:
+        pos = pending.pop()
+        while 0 <= pos < size and pos not in starts:
+            starts.add(pos)
+            ins = decode(data, pos, origin)
+            if ins.text.startswith("DB "):
+                break
+            if ins.target is not None:
+                pending.append(ins.target - origin)
+            pos += len(ins.data)
+            if ins.flow == FLOW_BRANCH and ins.data[0] & 0xC7 == 0xC7:
+                # RST del firmware con dirección en línea
+                inline = CPC_RST_INLINE.get(ins.target)
+                if inline == FLOW_STOP:
+                    break
+                if inline == FLOW_NEXT:
+                    pos += 2
+            elif ins.flow in (FLOW_JUMP, FLOW_STOP):
+                break
+    return starts
+
+
+def disassemble(data: bytes, origin: int = 0, start: Optional[int] = None,
+                end: Optional[int] = None, entries=None) -> Iterator[Instruction]:
+    """
+    Disassemble Z80 code lazily.
+
+    Args:
+        data: Code bytes (without AMSDOS header)
+        origin: Load address of data[0]
+        start: First address to show (default: origin)
+        end: Last address to show, inclusive (default: end of data)
+        entries: Entry points to follow; when given, bytes not reached
+            from them are shown as DB data
+
+    Yields:
+        Instruction objects in address order
+    """
+    size = len(data)
+    code = trace_code(data, origin, entries) if entries else None
+    pos = 0 if start is None else max(0, start - origin)
+    stop = size if end is None else min(size, end - origin + 1)
+
+    while pos < stop:
+        if code is None or pos in code:
+            ins = decode(data, pos, origin)
+        else:
+            # Datos hasta la siguiente instrucción alcanzable (máx. 8 por línea)
+            chunk = pos + 1
+            while chunk < size and chunk - pos < 8 and chunk not in code:
+                chunk += 1
+            ins = _data_line((origin + pos) & 0xFFFF, data[pos:chunk])
+        yield ins
+        pos += len(ins.data)
+
+
+def format_instruction(ins: Instruction) -> str:
+    """Línea de listado: dirección, bytes y texto."""
+    return f"{ins.address:04X}  {ins.data.hex(' ').upper():<12} {ins.text}"
+
+
+def disassembly_lines(data: bytes, origin: int = 0, start: Optional[int] = None,
+                      end: Optional[int] = None, entries=None) -> Iterator[str]:
+    """Como disassemble, pero devuelve las líneas de texto ya formateadas."""
+    return (format_instruction(ins) for ins in disassemble(data, origin, start, end, entries))
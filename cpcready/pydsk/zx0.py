@@ -0,0 +1,340 @@
+# Copyright 2025 David CH.F (destroyer)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at:
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+
+
+"""
+Compresor LZ compatible con ZX0 (formato v2 de Einar Saukas)
+
+Los datos comprimidos se descomprimen en el CPC con el depacker estándar
+(dzx0_standard.asm). El flujo mezcla bits y bytes; hay tres bloques:
+
+    0 + gamma(n) + n bytes          literales
+    0 + gamma(n)                    copia desde el último offset (tras literales)
+    1 + gamma(msb) + lsb + gamma(n-1)   copia desde un offset nuevo
+
+La compresión es un parseo óptimo por programación dinámica sobre el
+modelo de costes de ZX0. Las coincidencias se buscan con cadenas hash de
+2 bytes de profundidad limitada y, para no guardar un estado por cada
+offset posible, cada posición conserva solo el mejor estado acabado en
+literales y el mejor acabado en copia. La memoria es lineal con el
+tamaño de la entrada.
+"""
+
+from typing import List, NamedTuple, Optional
+
+MAX_OFFSET = 32640
+INITIAL_OFFSET = 1
+END_MARKER = 256
+
+# Profundidad de las cadenas hash: más = mejor compresión y más lento
+DEFAULT_CHAIN = 32
+# Longitudes hasta las que se prueban todos los cortes de una coincidencia
+SHORT_LENGTHS = 32
+# A partir de aquí una coincidencia se acepta sin buscar dentro de ella
+NICE_LENGTH = 256
+
+_INFINITE = float("inf")
+
+
+class ZX0Error(ValueError):
+    """Los datos comprimidos están corruptos o incompletos."""
+    pass
+
+
+class Block(NamedTuple):
+    """Bloque del parseo: offset 0 = literales; repeat = copia del último offset."""
+    offset: int
+    length: int
+    repeat: bool = False
+
+
+def _gamma_bits(value: int) -> int:
+    """Bits de un código gamma de Elias entrelazado."""
+    return 2 * (value.bit_length() - 1) + 1
+
+
+def _match_length(data: bytes, source: int, target: int, limit: int) -> int:
+    """Bytes iguales desde source y target, hasta limit."""
+    length = 0
+    # Primero por trozos (comparación en C) y luego byte a byte
+    step = 32
+    while length + step <= limit and data[source + length:source + length + step] == \
+            data[target + length:target + length + step]:
+        length += step
+    while length < limit and data[source + length] == data[target + length]:
+        length += 1
+    return length
+
+
+def optimal_parse(data: bytes, max_chain: int = DEFAULT_CHAIN) -> List[Block]:
+    """
+    Split data into literal and copy blocks with the lowest ZX0 cost.
+
+    Args:
+        data: Data to compress
+        max_chain: Previous positions tried for each match
+
+    Returns:
+        Blocks in order; the first one is always a literal block
+    """
+    size = len(data)
+    gamma = [0] + [_gamma_bits(value) for value in range(1, size + 2)]
+
+    # Mejor llegada a cada posición acabando en literales / en copia:
+    # coste, último offset y cómo se llegó (longitud del bloque, repetición)
+    lit_cost = [_INFINITE] * (size + 1)
+    lit_offset = [INITIAL_OFFSET] * (size + 1)
+    lit_run = [0] * (size + 1)
+    match_cost = [_INFINITE] * (size + 1)
+    match_offset = [INITIAL_OFFSET] * (size + 1)
+    match_block: List[Optional[Block]] = [None] * (size + 1)
+    match_from_literal = [False] * (size + 1)
+    # El primer indicador de literales no se escribe
+    match_cost[0] = -1
+
+    head = {}
+    chain = [-1] * size
+    skip_until = 0
+
+    for pos in range(size):
+        # Literales: se abre un bloque tras una copia o se alarga el actual
+        cost = match_cost[pos] + 1 + gamma[1] + 8
+        run = lit_run[pos] + 1
+        extend = lit_cost[pos] + 8 + gamma[run] - gamma[run - 1]
+        if extend <= cost and lit_cost[pos] != _INFINITE:
+            cost, offset = extend, lit_offset[pos]
+        else:
+            run, offset = 1, match_offset[pos]
+        if cost < lit_cost[pos + 1]:
+            lit_cost[pos + 1], lit_offset[pos + 1], lit_run[pos + 1] = cost, offset, run
+
+        remaining = size - pos
+        if pos + 1 < size:
+            key = data[pos] | data[pos + 1] << 8
+            previous = head.get(key, -1)
+            chain[pos] = previous
+            head[key] = pos
+        else:
+            previous = -1
+        if remaining < 2 or pos < skip_until:
+            continue
+
+        # Copia desde el último offset, solo justo después de literales
+        if lit_cost[pos] != _INFINITE:
+            offset = lit_offset[pos]
+            if offset <= pos:
+                length = _match_length(data, pos - offset, pos, remaining)
+                base = lit_cost[pos] + 1
+                lengths = range(1, min(length, SHORT_LENGTHS) + 1)
+                for n in (*lengths, length) if length > SHORT_LENGTHS else lengths:
+                    cost = base + gamma[n]
+                    if cost < match_cost[pos + n]:
+                        match_cost[pos + n] = cost
+                        match_offset[pos + n] = offset
+                        match_block[pos + n] = Block(offset, n, True)
+                        match_from_literal[pos + n] = True
+
+        # Copias desde offsets nuevos: solo interesan las que alargan la mejor
+        from_literal = lit_cost[pos] < match_cost[pos]
+        base = min(lit_cost[pos], match_cost[pos]) + 1 + 8
+        best = 1
+        tries = max_chain
+        candidate = previous
+        while candidate >= 0 and tries:
+            offset = pos - candidate
+            if offset > MAX_OFFSET:
+                break
+            tries -= 1
+            if best < remaining and data[candidate + best] == data[pos + best]:
+                length = _match_length(data, candidate, pos, remaining)
+                if length > best:
+                    cost = base + gamma[(offset - 1) // 128 + 1]
+                    lengths = range(best + 1, min(length, SHORT_LENGTHS) + 1)
+                    for n in (*lengths, length) if length > SHORT_LENGTHS else lengths:
+                        total = cost + gamma[n - 1]
+                        if total < match_cost[pos + n]:
+                            match_cost[pos + n] = total
+                            match_offset[pos + n] = offset
+                            match_block[pos + n] = Block(offset, n)
+                            match_from_literal[pos + n] = from_literal
+                    best = length
+                    if best == remaining:
+                        break
+            candidate = chain[candidate]
+        if best >= NICE_LENGTH:
+            skip_until = pos + best - 1
+
+    # Reconstrucción desde el final: un bloque de literales viene siempre
+    # de una copia (o del principio) y una copia de donde se anotó
+    blocks: List[Block] = []
+    pos = size
+    literal = lit_cost[size] < match_cost[size]
+    while pos > 0:
+        if literal:
+            blocks.append(Block(0, lit_run[pos]))
+            pos -= lit_run[pos]
+            literal = False
+        else:
+            block = match_block[pos]
+            literal = match_from_literal[pos]
+            blocks.append(block)
+            pos -= block.length
+    blocks.reverse()
+    return blocks
+
+
+class _BitWriter:
+    """Flujo de ZX0: los bits van en bytes propios intercalados con los datos."""
+
+    def __init__(self):
+        self.output = bytearray()
+        self.bit_index = 0
+        self.bit_mask = 0
+        # El primer bit (indicador de literales) no se escribe
+        self.backtrack = True
+
+    def write_byte(self, value: int) -> None:
+        self.output.append(value)
+
+    def write_bit(self, value: int) -> None:
+        if self.backtrack:
+            # El bit va en el bit 0 del último byte de offset
+            if value:
+                self.output[-1] |= 1
+            self.backtrack = False
+            return
+        if not self.bit_mask:
+            self.bit_mask = 0x80
+            self.bit_index = len(self.output)
+            self.output.append(0)
+        if value:
+            self.output[self.bit_index] |= self.bit_mask
+        self.bit_mask >>= 1
+
+    def write_gamma(self, value: int, invert: bool = False) -> None:
+        """Gamma de Elias entrelazado: 0 + bit por cada bit tras el primero, 1 al final."""
+        for shift in range(value.bit_length() - 2, -1, -1):
+            self.write_bit(0)
+            self.write_bit(((value >> shift) & 1) ^ invert)
+        self.write_bit(1)
+
+
+def encode_blocks(data: bytes, blocks: List[Block]) -> bytes:
+    """Escribe los bloques del parseo en formato ZX0, con el marcador de fin."""
+    writer = _BitWriter()
+    pos = 0
+    for block in blocks:
+        if not block.offset:
+            writer.write_bit(0)
+            writer.write_gamma(block.length)
+            writer.output += data[pos:pos + block.length]
+        elif block.repeat:
+            writer.write_bit(0)
+            writer.write_gamma(block.length)
+        else:
+            writer.write_bit(1)
+            writer.write_gamma((block.offset - 1) // 128 + 1, invert=True)
+            writer.write_byte((127 - (block.offset - 1) % 128) << 1)
+            writer.backtrack = True
+            writer.write_gamma(block.length - 1)
+        pos += block.length
+    writer.write_bit(1)
+    writer.write_gamma(END_MARKER, invert=True)
+    return bytes(writer.output)
+
+
+def compress(data: bytes, max_chain: int = DEFAULT_CHAIN) -> bytes:
+    """
+    Compress data in ZX0 format.
+
+    Args:
+        data: Data to compress (at least one byte)
+        max_chain: Previous positions tried for each match; higher values
+            compress a bit better and run slower
+
+    Returns:
+        Compressed data, ready for a standard ZX0 depacker
+    """
+    if not data:
+        raise ZX0Error("Nothing to compress")
+    return encode_blocks(data, optimal_parse(bytes(data), max_chain))
+
+
+def decompress(packed: bytes) -> bytes:
+    """
+    Decompress ZX0 data.
+
+    Raises:
+        ZX0Error: If the data is corrupt or ends before the end marker
+    """
+    output = bytearray()
+    pos = 0
+    bit_mask = 0
+    bit_value = 0
+    backtrack = False
+    last_byte = 0
+
+    def read_byte():
+        nonlocal pos, last_byte
+        if pos >= len(packed):
+            raise ZX0Error("Unexpected end of compressed data")
+        last_byte = packed[pos]
+        pos += 1
+        return last_byte
+
+    def read_bit():
+        nonlocal bit_mask, bit_value, backtrack
+        if backtrack:
+            backtrack = False
+            return last_byte & 1
+        bit_mask >>= 1
+        if not bit_mask:
+            bit_mask = 0x80
+            bit_value = read_byte()
+        return 1 if bit_value & bit_mask else 0
+
+    def read_gamma(invert=False):
+        value = 1
+        while not read_bit():
+            value = value << 1 | (read_bit() ^ invert)
+            if value > 0x1FFFF:
+                raise ZX0Error("Invalid length code")
+        return value
+
+    def copy(offset, length):
+        if offset > len(output):
+            raise ZX0Error(f"Offset {offset} before the start of the data")
+        start = len(output) - offset
+        for i in range(length):
+            output.append(output[start + i])
+
+    last_offset = INITIAL_OFFSET
+    state = "literals"
+    while True:
+        if state == "literals":
+            length = read_gamma()
+            for _ in range(length):
+                output.append(read_byte())
+            state = "new" if read_bit() else "last"
+        elif state == "last":
+            copy(last_offset, read_gamma())
+            state = "new" if read_bit() else "literals"
+        else:
+            msb = read_gamma(invert=True)
+            if msb == END_MARKER:
+                return bytes(output)
+            last_offset = msb * 128 - (read_byte() >> 1)
+            backtrack = True
+            copy(last_offset, read_gamma() + 1)
+            state = "new" if read_bit() else "literals"
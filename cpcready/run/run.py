@@ -27,13 +27,20 @@ from cpcready.utils.retrovirtualmachine import RVM
 @click.argument("file_to_run", required=False)
 @click.option("-A", "--drive-a", is_flag=True, help="Use disk from drive A")
 @click.option("-B", "--drive-b", is_flag=True, help="Use disk from drive B")
-def run(file_to_run, drive_a, drive_b):
+@click.option("--kill-all", is_flag=True, help="Close every RetroVirtualMachine process, not only the last one launched")
+@click.option("--recheck", is_flag=True, help="Verify the emulator version again instead of using the cached result")
+@click.option("--snapshot", type=click.Path(exists=True, dir_okay=False),
+              help="Start from a SNA snapshot (see cpc snapshot) instead of loading from disk")
+def run(file_to_run, drive_a, drive_b, kill_all, recheck, snapshot):
     """Run a file from the selected drive in RetroVirtualMachine.
     
     FILE_TO_RUN: Name of the file to execute from the disk (e.g., DISC, GAME.BAS)
     
     If -A or -B is not specified, uses the currently selected drive.
     The file must exist in the disk of the selected drive.
+
+    With --snapshot the emulator starts from the snapshot and no disk is
+    needed: the program is running as soon as the window opens.
     """
     
     # Cargar configuración
@@ -58,6 +65,23 @@ def run(file_to_run, drive_a, drive_b):
         error("Check the path in configuration file.")
         return
     
+    if snapshot:
+        if file_to_run:
+            error("FILE_TO_RUN cannot be used with --snapshot.")
+            return
+        blank_line(1)
+        info2(f"Using snapshot: {Path(snapshot).name}")
+        info2(f"CPC Model: {modelo}")
+        rvm = RVM(ruta_rvm)
+        is_valid, version_info = rvm.check_version(recheck=recheck)
+        if not is_valid:
+            error("RetroVirtualMachine version check failed.")
+            error(version_info)
+            return
+        rvm.launch(modelo, archivo_snapshot=str(Path(snapshot).resolve()), kill_all=kill_all)
+        blank_line(1)
+        return
+
     # Obtener disco de la unidad seleccionada
     drive_manager = DriveManager()
     disc_name = drive_manager.get_disc_name(drive_a, drive_b)
@@ -106,12 +130,12 @@ def run(file_to_run, drive_a, drive_b):
     # Crear instancia de RVM y verificar versión
     rvm = RVM(ruta_rvm)
     
-    is_valid, version_info = rvm.check_version()
+    is_valid, version_info = rvm.check_version(recheck=recheck)
     if not is_valid:
         error("RetroVirtualMachine version check failed.")
         error(version_info)
         return
     
     # Lanzar emulador
-    rvm.launch(modelo, archivo_dsk=disc_name, archivo_ejecutar=file_to_run)
+    rvm.launch(modelo, archivo_dsk=disc_name, archivo_ejecutar=file_to_run, kill_all=kill_all)
     blank_line(1)
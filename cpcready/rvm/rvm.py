@@ -31,13 +31,15 @@ def rvm_group():
 
 
 @rvm_group.command(cls=CustomCommand, name='status')
-def status():
+@click.option("--recheck", is_flag=True, help="Run the emulator to verify the version even if it was checked before")
+def status(recheck):
     """Check RetroVirtualMachine installation and version.
     
     Verifies:
     - RVM path is configured
     - RVM executable exists at the configured path
-    - RVM version matches the required version
+    - RVM version matches the required version (cached until the
+      executable changes)
     """
     blank_line(1)
     
@@ -65,7 +67,7 @@ def status():
     
     # Verificar versión
     rvm = RVM(ruta_rvm)
-    is_valid, version_info = rvm.check_version()
+    is_valid, version_info = rvm.check_version(recheck=recheck)
     
     blank_line(1)
     
@@ -132,7 +134,7 @@ def config():
     
     # Crear instancia de RVM y verificar versión
     rvm = RVM(str(rvm_path))
-    is_valid, version_info = rvm.check_version()
+    is_valid, version_info = rvm.check_version(recheck=True)
     
     if not is_valid:
         blank_line(1)
@@ -15,6 +15,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import click
+import os
 from pathlib import Path
 import shutil
 import tempfile
@@ -25,6 +26,7 @@ from cpcready.utils.version import add_version_option_to_group
 from rich.console import Console
 from rich.panel import Panel
 from cpcready.pydsk.dsk import DSK
+from cpcready.pydsk.basic_tokenizer import tokenize_basic
 
 console = Console()
 
@@ -79,23 +81,154 @@ def is_header(ruta):
         
         return load_addr, exec_addr
 
+def parse_address(value):
+    """Convierte una dirección '0x4000', '&4000' o '16384' a entero."""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    value = value.strip()
+    if value.startswith(('0x', '0X')):
+        return int(value, 16)
+    if value.startswith('&'):
+        return int(value[1:], 16)
+    return int(value)
+
+
+def store_file(dsk, file_name, type_file=None, load_addr=None, exec_addr=None, user=0,
+               dsk_filename=None, convert=True, tokenize=False):
+    """
+    Write a host file into an already loaded DSK, without saving the image.
+
+    Applies the same rules as the ``save`` command (CRLF conversion, AMSDOS
+    header detection and type selection) so other commands can reuse them
+    on an in-memory disc.
+
+    Args:
+        dsk: Loaded DSK instance
+        file_name: Path of the host file
+        type_file: 'a', 'b', 'p' or None for auto-detection
+        load_addr: Load address for type 'b' (int or '0x'/'&' string)
+        exec_addr: Exec address for type 'b' (defaults to load_addr)
+        user: CP/M user number
+        dsk_filename: Name on the disc (defaults to the host file name)
+        convert: Convert line endings to CRLF before writing
+        tokenize: Tokenize an ASCII BASIC source and store it as a BASIC
+            program with AMSDOS header
+
+    Returns:
+        Tuple (load, exec) from the existing AMSDOS header, or (None, None)
+
+    Raises:
+        ValueError: Missing or invalid addresses, or BASIC syntax errors
+        DSKError: Error writing into the disc
+    """
+    if tokenize:
+        if type_file is not None:
+            raise ValueError("--tokenize cannot be combined with a file type.")
+        with open(file_name, "r", encoding="latin-1") as f:
+            program = tokenize_basic(f.read())
+        dsk.write_bytes(program, (dsk_filename or Path(file_name).name).upper(),
+                        file_type=0, user=int(user), force=True)
+        return None, None
+
+    if type_file == "b" and load_addr is None:
+        raise ValueError("Binary type 'b' requires load address. Usage: save file.bin b 0x4000 [0x4000]")
+
+    # Convertir archivo a formato DOS (CRLF)
+    dos_file = file_name
+    if convert:
+        dos_file = convert_to_dos(file_name)
+        if dos_file is None:
+            warn("Could not convert to DOS format, using original file")
+            dos_file = file_name
+        else:
+            debug(f"Converted to DOS format: {dos_file}")
+
+    try:
+        # Verificar si el archivo tiene cabecera AMSDOS
+        header_load_addr, header_exec_addr = is_header(dos_file)
+        file_base_name = (dsk_filename or Path(file_name).name).upper()
+        user = int(user)
+
+        if type_file is None:
+            # Si tiene cabecera AMSDOS, preservarla usando file_type=0 (binario)
+            # El método write_file detectará la cabecera existente y la preservará
+            if header_load_addr is not None:
+                debug(f"File has AMSDOS header (load=&{header_load_addr:04X}, exec=&{header_exec_addr:04X}), preserving it")
+                dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=0,
+                             user=user, force=True)
+            # Detectar tipo según extensión para archivos sin cabecera
+            elif file_base_name.endswith('.BAS'):
+                # BASIC ASCII (sin cabecera AMSDOS - guardar como RAW)
+                debug("Auto-detected as BASIC ASCII file (.BAS)")
+                dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=-1, user=user, force=True)
+            elif file_base_name.endswith('.BIN'):
+                # Binario sin cabecera - añadir cabecera AMSDOS
+                debug("Auto-detected as BINARY file (.BIN)")
+                dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=2,
+                             load_addr=0x4000, exec_addr=0x4000,
+                             user=user, force=True)
+            else:
+                # Por defecto: ASCII sin cabecera (RAW)
+                debug("Plain file without header, saving as RAW")
+                dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=-1,
+                             user=user, force=True)
+
+        elif type_file == "a":
+            # Modo -1 = RAW (sin cabecera AMSDOS)
+            dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=-1,
+                         user=user, force=True)
+
+        elif type_file == "p":
+            # Modo 0 = Binario con cabecera AMSDOS
+            dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=0,
+                         load_addr=header_load_addr or 0, exec_addr=header_exec_addr or 0,
+                         user=user, force=True, read_only=True)
+
+        elif type_file == "b":
+            load_address = parse_address(load_addr)
+            # Exec address: usar load_address si no se especifica
+            exec_address = load_address if exec_addr is None else parse_address(exec_addr)
+            debug(f"Load address: 0x{load_address:04X}, Exec address: 0x{exec_address:04X}")
+
+            # Modo 2 = Binario con cabecera AMSDOS
+            dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=2,
+                         load_addr=load_address, exec_addr=exec_address,
+                         user=user, force=True)
+
+        return header_load_addr, header_exec_addr
+    finally:
+        # Limpiar archivo temporal si se creó
+        if dos_file != file_name:
+            try:
+                os.unlink(dos_file)
+                debug(f"Temporary DOS file deleted: {dos_file}")
+            except OSError:
+                pass  # Ignorar errores al eliminar archivo temporal
+
+
 @click.command(cls=CustomCommand)
 @click.argument("file_name", required=True)
 @click.argument("type_file", required=False, type=click.Choice(["a", "b", "p"], case_sensitive=True))
 @click.argument("load_addr", required=False)
 @click.argument("exec_addr", required=False)
+@click.option("-t", "--tokenize", is_flag=True, help="Tokenize an ASCII BASIC source before saving")
 @click.option("-A", "--drive-a", is_flag=True, help="Insert disc into drive A")
 @click.option("-B", "--drive-b", is_flag=True, help="Insert disc into drive B")
-def save(file_name, type_file, load_addr, exec_addr, drive_a, drive_b):
+def save(file_name, type_file, load_addr, exec_addr, tokenize, drive_a, drive_b):
     """Save file to virtual disc.
     
     Type options:
       - a: ASCII/Data file (no AMSDOS header)
       - b: Binary file with AMSDOS header (requires load_addr and optional exec_addr)
       - p: Program file with AMSDOS header (preserves existing header if present)
+
+    With --tokenize an ASCII BASIC listing is converted to tokenized
+    BASIC, which loads faster and uses less memory on the CPC.
     """
     
-    debug(f"file={file_name}, type={type_file}, load={load_addr}, exec={exec_addr}")
+    debug(f"file={file_name}, type={type_file}, load={load_addr}, exec={exec_addr}, tokenize={tokenize}")
     
     # Verificar que el archivo existe
     if not Path(file_name).exists():
@@ -115,174 +248,52 @@ def save(file_name, type_file, load_addr, exec_addr, drive_a, drive_b):
         return
     
     # Obtener el user number (por defecto 0)
-    user_number = str(system_cpm.get_user_number())
+    user_number = system_cpm.get_user_number()
 
-    # Convertir archivo a formato DOS (CRLF)
-    info2("Converting file to DOS format (CRLF)...")
-    dos_file = convert_to_dos(file_name)
-    
-    if dos_file is None:
-        warn("Could not convert to DOS format, using original file")
-        dos_file = file_name
-        cleanup_temp = False
+    if tokenize:
+        info2("Tokenizing BASIC program...")
     else:
-        debug(f"Converted to DOS format: {dos_file}")
-        cleanup_temp = True
-    
+        info2("Converting file to DOS format (CRLF)...")
     try:
-        # Verificar si el archivo tiene cabecera AMSDOS
-        header_load_addr, header_exec_addr = is_header(dos_file)
-    
-        if header_load_addr is not None:
-            blank_line(1)
-            info2(f"File '{file_name}' has AMSDOS header.")
-            console.print(f"  [blue]Load address:[/blue] [yellow]&{header_load_addr:04X}[/yellow]")
-            console.print(f"  [blue]Exec address:[/blue] [yellow]&{header_exec_addr:04X}[/yellow]")
-            # Si el archivo tiene cabecera y no se especificó tipo, preservarla
-            # NO forzamos type_file aquí, dejamos que el usuario o el auto-detect decidan
-        else:
-            blank_line(1)
-            info2(f"File '{file_name}' has no AMSDOS header.")
-        
-        if type_file is None:
-            # Sin tipo especificado: detectar automáticamente
-            try:
-                dsk = DSK(disc_name)
-                
-                # Obtener nombre del archivo sin path
-                file_base_name = Path(file_name).name.upper()
-                
-                # Si tiene cabecera AMSDOS, preservarla usando file_type=0 (binario)
-                # El método write_file detectará la cabecera existente y la preservará
-                if header_load_addr is not None:
-                    debug(f"File has AMSDOS header (load=&{header_load_addr:04X}, exec=&{header_exec_addr:04X}), preserving it")
-                    dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=0, 
-                                 user=int(user_number), force=True)
-                # Detectar tipo según extensión para archivos sin cabecera
-                elif file_base_name.endswith('.BAS'):
-                    # BASIC ASCII (sin cabecera AMSDOS - guardar como RAW)
-                    debug("Auto-detected as BASIC ASCII file (.BAS)")
-                    dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=-1, user=int(user_number), force=True)
-                elif file_base_name.endswith('.BIN'):
-                    # Binario sin cabecera - añadir cabecera AMSDOS
-                    debug("Auto-detected as BINARY file (.BIN)")
-                    dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=2, 
-                                 load_addr=0x4000, exec_addr=0x4000, 
-                                 user=int(user_number), force=True)
-                else:
-                    # Por defecto: ASCII sin cabecera (RAW)
-                    debug("Plain file without header, saving as RAW")
-                    dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=-1, 
-                                 user=int(user_number), force=True)
-                
-                dsk.save()
-                ok(f"File '{file_name}' saved successfully.")
-                 
-                # Mostrar listado actualizado
-                blank_line(1)
-                dsk.list_files(simple=False, use_rich=True)
-            except Exception as e:
-                error(f"Failed to save file: {e}")
-                return
+        dsk = DSK(disc_name)
+        header_load_addr, header_exec_addr = store_file(
+            dsk, file_name, type_file, load_addr, exec_addr, user=user_number,
+            tokenize=tokenize
+        )
+    except ValueError as e:
+        error(str(e))
+        return
+    except Exception as e:
+        error(f"Failed to save file: {e}")
+        return
 
-        elif type_file == "a":
-            # ASCII/Data file sin cabecera AMSDOS
-            debug("Saved as type 'a' (ASCII/data) by user request.")
-            try:
-                dsk = DSK(disc_name)
-                file_base_name = Path(file_name).name.upper()
-                
-                # Modo -1 = RAW (sin cabecera AMSDOS)
-                dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=-1, 
-                             user=int(user_number), force=True)
-                dsk.save()
-                
-                ok(f"File '{file_name}' saved successfully.")
-                blank_line(1)
-                dsk.list_files(simple=False, use_rich=True)
-            except Exception as e:
-                error(f"Failed to save file: {e}")
-                return
-                
-        elif type_file == "p":
-            # Program file con cabecera AMSDOS
-            print("Saved as type 'p' (program) by user request.")
-            try:
-                dsk = DSK(disc_name)
-                file_base_name = Path(file_name).name.upper()
-                
-                # Modo 0 = Binario con cabecera AMSDOS
-                dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=0, 
-                             load_addr=header_load_addr or 0, exec_addr=header_exec_addr or 0,
-                             user=int(user_number), force=True, read_only=True)
-                dsk.save()
-                
-                ok(f"File '{file_name}' saved successfully.")
-                blank_line(1)
-                dsk.list_files(simple=False, use_rich=True)
-            except Exception as e:
-                error(f"Failed to save file: {e}")
-                return
-                
-        elif type_file == "b":
-            # Binary file con direcciones específicas
-            info2("Saved as type 'b' (binary) by user request.")
-            
-            # Validar que se proporcionaron las direcciones
-            if load_addr is None:
-                error("Binary type 'b' requires load address. Usage: save file.bin b 0x4000 [0x4000]")
-                return
-            
-            try:
-                dsk = DSK(disc_name)
-                file_base_name = Path(file_name).name.upper()
-                
-                # Convertir direcciones hexadecimales
-                if isinstance(load_addr, str):
-                    if load_addr.startswith(('0x', '0X')):
-                        load_address = int(load_addr, 16)
-                    elif load_addr.startswith('&'):
-                        load_address = int(load_addr[1:], 16)
-                    else:
-                        load_address = int(load_addr)
-                else:
-                    load_address = int(load_addr)
-                
-                # Exec address: usar load_address si no se especifica
-                if exec_addr is None:
-                    exec_address = load_address
-                elif isinstance(exec_addr, str):
-                    if exec_addr.startswith(('0x', '0X')):
-                        exec_address = int(exec_addr, 16)
-                    elif exec_addr.startswith('&'):
-                        exec_address = int(exec_addr[1:], 16)
-                    else:
-                        exec_address = int(exec_addr)
-                else:
-                    exec_address = int(exec_addr)
-                
-                debug(f"Load address: 0x{load_address:04X}, Exec address: 0x{exec_address:04X}")
-                
-                # Modo 2 = Binario con cabecera AMSDOS
-                dsk.write_file(dos_file, dsk_filename=file_base_name, file_type=2, 
-                             load_addr=load_address, exec_addr=exec_address,
-                             user=int(user_number), force=True)
-                dsk.save()
-                ok(f"File '{file_name}' saved successfully.")
-                blank_line(1)
-                dsk.list_files(simple=False, use_rich=True)
-            except Exception as e:
-                error(f"Failed to save file: {e}")
-                import traceback
-                traceback.print_exc()
-                return
-    finally:
-        # Limpiar archivo temporal si se creó
-        if cleanup_temp and dos_file and dos_file != file_name:
-            import os
-            try:
-                os.unlink(dos_file)
-                debug(f"Temporary DOS file deleted: {dos_file}")
-            except Exception:
-                pass  # Ignorar errores al eliminar archivo temporal
+    if header_load_addr is not None:
+        blank_line(1)
+        info2(f"File '{file_name}' has AMSDOS header.")
+        console.print(f"  [blue]Load address:[/blue] [yellow]&{header_load_addr:04X}[/yellow]")
+        console.print(f"  [blue]Exec address:[/blue] [yellow]&{header_exec_addr:04X}[/yellow]")
+    elif tokenize:
+        blank_line(1)
+        info2(f"File '{file_name}' saved as tokenized BASIC with AMSDOS header.")
+    else:
+        blank_line(1)
+        info2(f"File '{file_name}' has no AMSDOS header.")
+
+    if type_file == "a":
+        debug("Saved as type 'a' (ASCII/data) by user request.")
+    elif type_file == "p":
+        info2("Saved as type 'p' (program) by user request.")
+    elif type_file == "b":
+        info2("Saved as type 'b' (binary) by user request.")
+
+    try:
+        dsk.save()
+    except Exception as e:
+        error(f"Failed to save file: {e}")
+        return
+
+    ok(f"File '{file_name}' saved successfully.")
 
+    # Mostrar listado actualizado
+    blank_line(1)
+    dsk.list_files(simple=False, use_rich=True)
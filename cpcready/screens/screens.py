@@ -0,0 +1,162 @@
+# Copyright (C) 2025 David CH.F (destroyer)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import click
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from cpcready.utils import DriveManager, SystemCPM
+from cpcready.utils.click_custom import CustomCommand, CustomGroup
+from cpcready.utils.console import info2, ok, debug, warn, error, blank_line
+from cpcready.pydsk import DSK, DSKError
+from cpcready.pydsk.classify import SCREEN, classify_disc
+from cpcready.pydsk.screen import export_screen
+
+
+# Grupo de herramientas para pantallas SCREEN$
+@click.group(cls=CustomGroup, name='screens')
+def screens_group():
+    """SCREEN$ image tools."""
+    pass
+
+
+def parse_inks(ctx, param, value):
+    """Convierte '1,24,20,6' en la lista de inks del firmware."""
+    if not value:
+        return None
+    try:
+        inks = [int(ink) for ink in value.split(",")]
+    except ValueError:
+        raise click.BadParameter("use comma-separated numbers, e.g. 1,24,20,6")
+    if any(not 0 <= ink <= 26 for ink in inks):
+        raise click.BadParameter("inks must be between 0 and 26")
+    return inks
+
+
+def disc_paths(discs):
+    """Imágenes a procesar: los DSK indicados y los *.dsk de cada carpeta."""
+    paths = []
+    for disc in discs:
+        path = Path(disc)
+        if path.is_dir():
+            paths.extend(sorted(p for p in path.iterdir() if p.suffix.lower() == ".dsk"))
+        else:
+            paths.append(path)
+    return paths
+
+
+def collect_screens(paths, output):
+    """(datos, archivo PNG) de cada SCREEN$ de los discos."""
+    jobs = []
+    for path in paths:
+        dsk = DSK(str(path))
+        # Con varios discos cada uno va a su carpeta
+        folder = output / path.stem if len(paths) > 1 else output
+        for info in classify_disc(dsk):
+            if info.kind != SCREEN:
+                continue
+            data = dsk.read_file(info.name, info.user, keep_header=False)
+            jobs.append((data, str(folder / f"{info.name}.png")))
+    return jobs
+
+
+@screens_group.command(cls=CustomCommand, name='export')
+@click.argument("discs", nargs=-1)
+@click.option("-o", "--output", type=click.Path(file_okay=False), default=".", show_default=True,
+              help="Folder for the PNG files")
+@click.option("-m", "--mode", type=click.Choice(['0', '1', '2']), help="Screen mode (default: configured mode)")
+@click.option("--inks", callback=parse_inks, metavar="LIST", help="Firmware inks of pens 0, 1, 2... (e.g. 0,26,13,6)")
+@click.option("--thumbnails/--no-thumbnails", default=True, show_default=True, help="Also write 160x100 thumbnails")
+@click.option("-j", "--jobs", type=click.IntRange(1), help="Worker processes (default: one per CPU)")
+@click.option("-A", "--drive-a", is_flag=True, help="Use disc in drive A")
+@click.option("-B", "--drive-b", is_flag=True, help="Use disc in drive B")
+def export(discs, output, mode, inks, thumbnails, jobs, drive_a, drive_b):
+    """Export the SCREEN$ files of one or more discs as PNG.
+
+    Every screen found on the discs (or in the *.dsk files of a folder) is
+    written as a 640x400 PNG plus a 160x100 thumbnail. Screens are
+    rendered in parallel, one worker process per CPU.
+
+    \b
+    Examples:
+      cpc screens export -o shots
+      cpc screens export games/ -o shots --mode 0
+      cpc screens export title.dsk --inks 0,26,13,6 --no-thumbnails
+    """
+    if not discs:
+        disc_name = DriveManager().get_disc_name(drive_a, drive_b)
+        if disc_name is None:
+            error("No disc inserted in the specified drive.")
+            return
+        discs = (disc_name,)
+    mode = int(mode if mode is not None else SystemCPM().get_mode())
+
+    blank_line(1)
+    paths = disc_paths(discs)
+    missing = [str(path) for path in paths if not path.exists()]
+    if missing:
+        error(f"Disc not found: {', '.join(missing)}")
+        blank_line(1)
+        return
+
+    output = Path(output)
+    try:
+        screens = collect_screens(paths, output)
+    except DSKError as e:
+        error(f"Error reading disc: {e}")
+        blank_line(1)
+        return
+
+    if not screens:
+        warn("No SCREEN$ files found.")
+        blank_line(1)
+        return
+
+    for folder in {Path(png).parent for _, png in screens}:
+        folder.mkdir(parents=True, exist_ok=True)
+
+    info2(f"Exporting {len(screens)} screen(s) in mode {mode}...")
+    start = time.perf_counter()
+    workers = min(jobs or os.cpu_count() or 1, len(screens))
+    written, failed = [], 0
+    if workers == 1:
+        # Sin procesos extra para una sola pantalla o -j 1
+        for data, png in screens:
+            try:
+                written.extend(export_screen(data, mode, png, inks, thumbnails))
+            except (ValueError, OSError) as e:
+                error(f"{png}: {e}")
+                failed += 1
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(export_screen, data, mode, png, inks, thumbnails): png
+                       for data, png in screens}
+            for future in as_completed(futures):
+                try:
+                    written.extend(future.result())
+                except (ValueError, OSError) as e:
+                    error(f"{futures[future]}: {e}")
+                    failed += 1
+    debug(f"Rendered {len(screens)} screen(s) with {workers} worker(s) in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for png in sorted(written):
+        info2(png)
+    blank_line(1)
+    if failed:
+        warn(f"{failed} screen(s) could not be exported.")
+    ok(f"Exported {len(screens) - failed} screen(s) to '{output}'.")
+    blank_line(1)
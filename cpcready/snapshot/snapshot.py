@@ -0,0 +1,149 @@
+# Copyright (C) 2025 David CH.F (destroyer)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import click
+from pathlib import Path
+from cpcready.utils import DriveManager, SystemCPM
+from cpcready.utils.click_custom import CustomCommand
+from cpcready.utils.console import info2, ok, error, blank_line
+from cpcready.pydsk.dsk import DSK
+from cpcready.pydsk.sna import DEFAULT_STACK, DEFAULT_VERSION, MODELS, SNAError, Segment, build_snapshot
+from cpcready.list.list import read_code
+from cpcready.save.save import parse_address
+from cpcready.screens.screens import parse_inks
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+console = Console()
+
+
+def read_host_binary(path):
+    """(carga, ejecución, datos) de un binario del host con cabecera AMSDOS."""
+    raw = Path(path).read_bytes()
+    if not DSK()._check_amsdos_header(raw):
+        return 0, None, raw
+    length = raw[0x18] | (raw[0x19] << 8)
+    return raw[0x15] | (raw[0x16] << 8), raw[0x1A] | (raw[0x1B] << 8), raw[128:128 + length]
+
+
+@click.command(cls=CustomCommand)
+@click.argument("files", nargs=-1, required=True)
+@click.option("-o", "--output", metavar="FILE", help="Snapshot file (default: first file name with .sna)")
+@click.option("--host", is_flag=True, help="Read FILES from the host instead of the disc")
+@click.option("--exec", "exec_addr", metavar="ADDRESS", help="Start address (default: exec address of the first file that has one)")
+@click.option("--base", type=click.Path(exists=True, dir_okay=False),
+              help="Snapshot of a booted machine to load the files into (needed to call the firmware)")
+@click.option("--model", type=click.Choice(list(MODELS)), help="CPC model (default: configured model)")
+@click.option("-m", "--mode", type=click.Choice(['0', '1', '2']), help="Screen mode (default: configured mode)")
+@click.option("--inks", callback=parse_inks, metavar="LIST", help="Firmware inks of pens 0, 1, 2... (default: firmware inks)")
+@click.option("--stack", metavar="ADDRESS", help=f"Initial stack pointer (default: &{DEFAULT_STACK:04X})")
+@click.option("--sna-version", type=click.Choice(['1', '2', '3']), default=str(DEFAULT_VERSION), show_default=True,
+              help="SNA format version")
+@click.option("-A", "--drive-a", is_flag=True, help="Use disc in drive A")
+@click.option("-B", "--drive-b", is_flag=True, help="Use disc in drive B")
+def snapshot(files, output, host, exec_addr, base, model, mode, inks, stack, sna_version, drive_a, drive_b):
+    """Build a SNA snapshot that starts a program instantly.
+
+    Binaries are placed in memory at their AMSDOS load addresses and the
+    Z80 starts at the exec address, so the emulator skips the disc load.
+    The CRTC, palette and screen mode are set as the firmware leaves them
+    for the configured model and mode.
+
+    Without --base the ROMs are switched off and interrupts are disabled:
+    fine for code that drives the hardware directly. Programs that call
+    the firmware need --base with a snapshot saved after the machine
+    booted; everything but the PC and the loaded memory is kept from it.
+
+    \b
+    Examples:
+      cpc snapshot GAME.BIN
+      cpc snapshot LOADER.BIN GFX.BIN --exec &4000 -o game.sna
+      cpc snapshot build/main.bin --host --base boot.sna
+      cpc run --snapshot game.sna
+    """
+    system_cpm = SystemCPM()
+    blank_line(1)
+    addresses = {}
+    for option, value in (("exec", exec_addr), ("stack", stack)):
+        try:
+            addresses[option] = parse_address(value)
+        except ValueError:
+            error(f"Invalid {option} address: {value}")
+            blank_line(1)
+            return
+    entry = addresses["exec"]
+    stack_addr = DEFAULT_STACK if stack is None else addresses["stack"]
+
+    segments = []
+    try:
+        if host:
+            for file_name in files:
+                if not Path(file_name).exists():
+                    error(f"File '{file_name}' not found.")
+                    blank_line(1)
+                    return
+                segments.append((file_name, *read_host_binary(file_name)))
+        else:
+            disc_name = DriveManager().get_disc_name(drive_a, drive_b)
+            if disc_name is None:
+                error("No disc inserted in the specified drive.")
+                blank_line(1)
+                return
+            dsk = DSK(disc_name)
+            user_number = int(system_cpm.get_user_number())
+            for file_name in files:
+                segments.append((file_name.upper(), *read_code(dsk, file_name, user_number)))
+    except Exception as e:
+        error(f"Error reading file: {e}")
+        blank_line(1)
+        return
+
+    headerless = [name for name, _, start, _ in segments if start is None]
+    if headerless:
+        error(f"No AMSDOS header (load address unknown): {', '.join(headerless)}")
+        blank_line(1)
+        return
+    if entry is None:
+        entry = next((start for _, _, start, _ in segments if start), None)
+        if entry is None:
+            error("No file has an exec address: use --exec.")
+            blank_line(1)
+            return
+
+    model = model or str(system_cpm.get_model())
+    mode = int(mode if mode is not None else system_cpm.get_mode())
+    output = output or Path(files[0]).name.split(".")[0] + ".sna"
+    try:
+        data = build_snapshot([Segment(name, load, code) for name, load, _, code in segments], entry,
+                              model=model, mode=mode, version=int(sna_version), inks=inks,
+                              stack=stack_addr, base=Path(base).read_bytes() if base else None)
+        Path(output).write_bytes(data)
+    except (SNAError, OSError) as e:
+        error(f"Error building snapshot: {e}")
+        blank_line(1)
+        return
+
+    table = Table(border_style="bright_blue", box=box.ROUNDED)
+    table.add_column("File", style="bold yellow")
+    table.add_column("Load", justify="right", style="white")
+    table.add_column("End", justify="right", style="white")
+    table.add_column("Size", justify="right", style="green")
+    for name, load, _, code in segments:
+        table.add_row(Path(name).name, f"&{load:04X}", f"&{load + len(code) - 1:04X}", str(len(code)))
+    console.print(table)
+    info2(f"CPC {model}, mode {mode}, start at &{entry:04X}{', base ' + Path(base).name if base else ''}")
+    ok(f"Snapshot saved as '{output}' (SNA v{sna_version}). Start it with: cpc run --snapshot {output}")
+    blank_line(1)
@@ -0,0 +1,286 @@
+# Copyright (C) 2025 David CH.F (destroyer)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import click
+import fnmatch
+import os
+import sys
+import time
+from pathlib import Path
+from cpcready.utils import DriveManager, SystemCPM
+from cpcready.utils.click_custom import CustomCommand
+from cpcready.utils.console import info2, ok, debug, warn, error, blank_line
+from cpcready.utils.system import file_digest
+from cpcready.utils.toml_config import ConfigManager
+from cpcready.pydsk import DSK, DSKError
+from cpcready.save.save import store_file
+from cpcready.build.build import read_cache, write_cache
+
+# Ficheros que nunca se copian al disco
+IGNORED_PATTERNS = (".*", "*~", "*.dsk", "*.DSK", "*.tmp", "*.swp")
+
+# Lo enviado en syncs anteriores, por disco y usuario
+SYNC_MANIFEST = Path(".cpcready") / "sync.json"
+
+
+class DirectoryWatcher:
+    """
+    Detect changes in a directory by polling os.scandir().
+
+    A snapshot maps each file name to (mtime_ns, size); only files whose
+    stat changed are hashed afterwards.
+    """
+
+    def __init__(self, root, patterns=("*",)):
+        self.root = Path(root)
+        self.patterns = patterns
+
+    def _wanted(self, name):
+        if any(fnmatch.fnmatch(name, p) for p in IGNORED_PATTERNS):
+            return False
+        return any(fnmatch.fnmatch(name.lower(), p.lower()) for p in self.patterns)
+
+    def scan(self):
+        """Devuelve {nombre: (mtime_ns, size)} de los ficheros vigilados."""
+        snapshot = {}
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if not entry.is_file() or not self._wanted(entry.name):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                snapshot[entry.name] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def wait_for_changes(self, previous, interval, debounce):
+        """
+        Block until the directory differs from *previous* and then stays
+        unchanged for *debounce* seconds, so a burst of writes (editor
+        save, assembler output) is handled as a single change.
+
+        Returns:
+            The settled snapshot
+        """
+        while True:
+            time.sleep(interval)
+            current = self.scan()
+            if current != previous:
+                break
+        while True:
+            time.sleep(debounce)
+            again = self.scan()
+            if again == current:
+                return current
+            current = again
+
+
+class DiscSync:
+    """
+    Push changed host files into a disc image, one load/save per burst.
+
+    What was pushed is kept in DIRECTORY/.cpcready/sync.json, so a new run
+    only writes the files that changed since the last one.
+    """
+
+    def __init__(self, root, disc_name, user=0, delete=False):
+        self.root = Path(root)
+        self.disc_name = disc_name
+        self.user = int(user)
+        self.delete = delete
+        self.manifest_path = self.root / SYNC_MANIFEST
+        self.target = f"{Path(disc_name).resolve()}:{self.user}"
+        # Último contenido enviado: nombre -> sha256
+        self.pushed = self._load_pushed()
+
+    def _load_pushed(self):
+        """Manifiesto del último sync, sin los ficheros que ya no están en el disco."""
+        previous = read_cache(self.manifest_path).get(self.target, {})
+        if not previous:
+            return {}
+        try:
+            dsk = DSK(self.disc_name)
+            on_disc = {entry.full_name for entry in dsk.get_directory_entries()
+                       if not entry.is_deleted and entry.user == self.user}
+        except (DSKError, OSError, ValueError):
+            return {}
+        return {name: digest for name, digest in previous.items()
+                if dsk._get_amsdos_filename(name) in on_disc}
+
+    def pending(self, names):
+        """Filtra los ficheros cuyo contenido ha cambiado de verdad."""
+        changed = []
+        for name in sorted(names):
+            try:
+                digest = file_digest(self.root / name)
+            except OSError:
+                continue
+            if self.pushed.get(name) != digest:
+                changed.append((name, digest))
+        return changed
+
+    def push(self, changed, removed=()):
+        """
+        Write *changed* files and erase *removed* ones in a single pass.
+
+        The files are only recorded as pushed once the image is saved: if
+        anything fails they stay pending and the next push retries them.
+
+        Returns:
+            Number of files written or erased
+        """
+        removed = [n for n in removed if n in self.pushed] if self.delete else []
+        if not changed and not removed:
+            return 0
+
+        dsk = DSK(self.disc_name)
+        log = []
+        for name in removed:
+            try:
+                dsk.delete_file(dsk._get_amsdos_filename(name), user=self.user)
+                log.append(f"- {dsk._get_amsdos_filename(name)}")
+            except DSKError as e:
+                debug(f"Could not erase {name}: {e}")
+
+        for name, _ in changed:
+            store_file(dsk, str(self.root / name), user=self.user,
+                       convert=Path(name).suffix.lower() == ".bas")
+            log.append(f"+ {dsk._get_amsdos_filename(name)}")
+
+        dsk.save()
+        for name in removed:
+            self.pushed.pop(name, None)
+        self.pushed.update(changed)
+        cache = read_cache(self.manifest_path)
+        cache[self.target] = self.pushed
+        try:
+            write_cache(self.manifest_path, cache)
+        except OSError as e:
+            debug(f"Could not write {self.manifest_path}: {e}")
+        for line in log:
+            info2(line)
+        return len(changed) + len(removed)
+
+
+def relaunch_rvm(disc_name, file_to_run):
+    """Relanza RetroVirtualMachine con el disco actualizado."""
+    from cpcready.utils.retrovirtualmachine import RVM
+    config = ConfigManager()
+    ruta_rvm = config.get("emulator", "retro_virtual_machine_path", "")
+    if not ruta_rvm or not Path(ruta_rvm).exists():
+        warn("RetroVirtualMachine path not configured, skipping relaunch.")
+        return
+    modelo = config.get("system", "model", "6128")
+    RVM(ruta_rvm).launch(modelo, archivo_dsk=disc_name, archivo_ejecutar=file_to_run)
+
+
+def upload_m4(board, disc_name, destination):
+    """Sube la imagen actualizada a la M4Board; el llamador reutiliza la placa entre pushes."""
+    board.upload_file(disc_name, destination)
+
+
+@click.command(cls=CustomCommand)
+@click.argument("directory", type=click.Path(exists=True, file_okay=False), default=".")
+@click.option("-w", "--watch", is_flag=True, help="Keep watching and push every change")
+@click.option("-p", "--pattern", "patterns", multiple=True, default=("*",), show_default=True,
+              help="Only sync files matching this glob (repeatable)")
+@click.option("--delete", is_flag=True, help="Erase from the disc files removed from the directory")
+@click.option("--interval", default=0.5, show_default=True, type=float, help="Polling interval in seconds")
+@click.option("--debounce", default=0.3, show_default=True, type=float,
+              help="Quiet time before a burst of changes is pushed")
+@click.option("--run", "file_to_run", metavar="FILE", help="Relaunch RetroVirtualMachine running FILE after each push")
+@click.option("--m4", "m4_dest", metavar="REMOTE_DIR", help="Upload the disc image to the M4Board after each push")
+@click.option("-A", "--drive-a", is_flag=True, help="Use disc from drive A")
+@click.option("-B", "--drive-b", is_flag=True, help="Use disc from drive B")
+def sync(directory, watch, patterns, delete, interval, debounce, file_to_run, m4_dest, drive_a, drive_b):
+    """Sync a host directory into the disc in the selected drive.
+
+    Copies every matching file of DIRECTORY into the disc. With --watch it
+    keeps running and, after each burst of changes, writes only the files
+    whose content changed, loading and saving the image once. Files pushed
+    by a previous run (recorded in DIRECTORY/.cpcready/sync.json) are not
+    written again while they are unchanged and still on the disc.
+
+    \b
+    Examples:
+      cpc sync src
+      cpc sync src --watch --run MAIN.BAS
+      cpc sync build -p "*.bin" --watch --m4 /games
+    """
+    drive_manager = DriveManager()
+    disc_name = drive_manager.get_disc_name(drive_a, drive_b)
+    if not disc_name:
+        error("No disc inserted in the specified drive.")
+        sys.exit(1)
+
+    board = None
+    if m4_dest:
+        from cpcready.utils.m4board import M4Board
+        try:
+            board = M4Board()
+        except ValueError as e:
+            error(str(e))
+            sys.exit(1)
+
+    watcher = DirectoryWatcher(directory, patterns)
+    syncer = DiscSync(directory, disc_name, user=SystemCPM().get_user_number(), delete=delete)
+
+    def push(changed, removed=()):
+        """Devuelve False si el disco no se pudo actualizar."""
+        try:
+            count = syncer.push(changed, removed)
+        except (ValueError, DSKError, OSError) as e:
+            error(f"Sync failed: {e}")
+            return False
+        if not count:
+            return True
+        ok(f"{Path(disc_name).name}: {count} change(s) pushed at {time.strftime('%H:%M:%S')}")
+        if board:
+            upload_m4(board, disc_name, m4_dest)
+        if file_to_run:
+            relaunch_rvm(disc_name, file_to_run)
+        return True
+
+    blank_line(1)
+    try:
+        snapshot = watcher.scan()
+        # Ficheros de un push fallido: se reintentan con el siguiente cambio
+        retry_touched, retry_removed = set(), set()
+        if not push(syncer.pending(snapshot)):
+            retry_touched = set(snapshot)
+        if not watch:
+            blank_line(1)
+            return
+
+        info2(f"Watching {Path(directory).resolve()} (Ctrl+C to stop)")
+        while True:
+            # La instantánea siempre avanza: un fallo no se repite en bucle
+            current = watcher.wait_for_changes(snapshot, interval, debounce)
+            touched = {n for n in current if snapshot.get(n) != current[n]} | (retry_touched & set(current))
+            removed = ({n for n in snapshot if n not in current} | retry_removed) - set(current)
+            snapshot = current
+            if push(syncer.pending(touched), sorted(removed)):
+                retry_touched, retry_removed = set(), set()
+            else:
+                retry_touched, retry_removed = touched, removed
+                warn("The failed changes will be retried with the next change.")
+    except KeyboardInterrupt:
+        blank_line(1)
+        info2("Watch stopped.")
+        blank_line(1)
+    finally:
+        if board:
+            board.close()
@@ -0,0 +1,317 @@
+# Copyright (C) 2025 David CH.F (destroyer)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import click
+import fnmatch
+import time
+from pathlib import Path
+from cpcready.utils import DriveManager, SystemCPM
+from cpcready.utils.click_custom import CustomCommand, CustomGroup
+from cpcready.utils.console import ok, debug, error, blank_line
+from cpcready.pydsk.dsk import DSK
+from cpcready.pydsk.classify import classify_disc
+from cpcready.pydsk.cdt import (
+    CDTError, DEFAULT_SPEED, STANDARD_SPEEDS, TYPE_ASCII, TYPE_BASIC, TYPE_BASIC_PROTECTED,
+    TYPE_BINARY, Timing, from_amsdos, iter_signal, read_cdt, timing_for, to_amsdos, write_cdt,
+    write_to_disc,
+)
+from cpcready.pydsk.wav import DEFAULT_RATE, write_wav
+from cpcready.save.save import parse_address
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+console = Console()
+
+TYPE_NAMES = {
+    TYPE_BASIC: "BASIC",
+    TYPE_BASIC_PROTECTED: "BASIC+",
+    TYPE_BINARY: "BINARY",
+    TYPE_ASCII: "ASCII",
+}
+
+
+# Grupo de herramientas de cinta
+@click.group(cls=CustomGroup, name='tape')
+def tape_group():
+    """Cassette (CDT) image tools."""
+    pass
+
+
+def parse_pulses(ctx, param, value):
+    """Convierte '700,1400' en las duraciones (T-states) de los bits 0 y 1."""
+    if not value:
+        return None
+    try:
+        zero, one = (int(pulse) for pulse in value.split(","))
+    except ValueError:
+        raise click.BadParameter("use two T-state lengths, e.g. 700,1400")
+    if not 100 <= zero < one <= 10000:
+        raise click.BadParameter("lengths must be 100-10000 T-states, the 0 bit shorter than the 1 bit")
+    return Timing(zero, one, one)
+
+
+def speed_options(command):
+    """Opciones de velocidad comunes a los comandos que graban cintas."""
+    command = click.option("--pulses", callback=parse_pulses, metavar="ZERO,ONE",
+                           help="Custom pulse lengths in T-states (overrides --baud)")(command)
+    return click.option("--baud", type=click.IntRange(300, 8000), default=DEFAULT_SPEED, show_default=True,
+                        help="Speed; the firmware uses 1000 or 2000, higher needs a turbo loader")(command)
+
+
+def report_files(files, title):
+    """Tabla con los ficheros de una cinta."""
+    table = Table(title=f"[bold]{title}[/bold]", border_style="bright_blue", box=box.ROUNDED)
+    table.add_column("File", style="bold yellow")
+    table.add_column("Type", style="cyan")
+    table.add_column("Load", justify="right", style="white")
+    table.add_column("Exec", justify="right", style="white")
+    table.add_column("Size", justify="right", style="green")
+    for file in files:
+        binary = file.file_type != TYPE_ASCII
+        table.add_row(file.name, TYPE_NAMES.get(file.file_type, f"&{file.file_type:02X}"),
+                      f"&{file.load:04X}" if binary else "", f"&{file.exec:04X}" if binary else "",
+                      str(len(file.data)))
+    console.print(table)
+
+
+def write_tape(output, files, baud, pulses):
+    """Graba la cinta e informa del tiempo de carga aproximado."""
+    timing = pulses or timing_for(baud)
+    start = time.perf_counter()
+    written = []
+
+    def collect():
+        for file in files:
+            written.append(file)
+            yield file
+
+    write_cdt(output, collect(), timing)
+    debug(f"CDT written in {(time.perf_counter() - start) * 1000:.0f} ms")
+    report_files(written, Path(output).name)
+    if pulses:
+        speed = f"{pulses.zero}/{pulses.one} T-states, about {timing.baud} baud"
+    else:
+        speed = f"{baud} baud{'' if baud in STANDARD_SPEEDS else ', turbo'}"
+    ok(f"{len(written)} file(s) written to '{output}' ({speed}).")
+    blank_line(1)
+
+
+@tape_group.command(cls=CustomCommand, name='build')
+@click.argument("output", required=True)
+@click.argument("files", nargs=-1, required=True)
+@speed_options
+@click.option("--load", metavar="ADDRESS", help="Load address of files without AMSDOS header (stored as binary)")
+@click.option("--exec", "exec_addr", metavar="ADDRESS", help="Entry address of files without AMSDOS header")
+def build(output, files, baud, pulses, load, exec_addr):
+    """Build a CDT tape image from host files.
+
+    Files with an AMSDOS header keep their type and addresses. Files
+    without one are stored as ASCII, or as binaries when --load is given.
+    The image is written block by block.
+
+    \b
+    Examples:
+      cpc tape build game.cdt loader.bas game.bin
+      cpc tape build game.cdt title.scr --load &C000 --baud 1000
+      cpc tape build fast.cdt game.bin --pulses 500,1000
+    """
+    blank_line(1)
+    missing = [name for name in files if not Path(name).is_file()]
+    if missing:
+        error(f"File not found: {', '.join(missing)}")
+        blank_line(1)
+        return
+    try:
+        load_addr = parse_address(load) if load else None
+        entry = parse_address(exec_addr) if exec_addr else None
+    except ValueError:
+        error(f"Invalid address: {load if load else exec_addr}")
+        blank_line(1)
+        return
+
+    def host_files():
+        for name in files:
+            # Se lee cada fichero justo antes de grabarlo
+            yield from_amsdos(Path(name).name.upper(), Path(name).read_bytes(), load=load_addr,
+                              exec_addr=entry)
+
+    try:
+        write_tape(output, host_files(), baud, pulses)
+    except (CDTError, OSError) as e:
+        error(f"Error writing tape: {e}")
+        blank_line(1)
+
+
+@tape_group.command(cls=CustomCommand, name='from-disc')
+@click.argument("output", required=True)
+@click.argument("files", nargs=-1)
+@speed_options
+@click.option("-A", "--drive-a", is_flag=True, help="Use disc in drive A")
+@click.option("-B", "--drive-b", is_flag=True, help="Use disc in drive B")
+def from_disc(output, files, baud, pulses, drive_a, drive_b):
+    """Copy files from the disc to a CDT tape image.
+
+    Without FILES the whole disc (current user) is put on tape, in
+    directory order. Wildcards are allowed.
+
+    \b
+    Examples:
+      cpc tape from-disc game.cdt
+      cpc tape from-disc game.cdt LOADER.BAS "*.BIN" --baud 1000
+    """
+    drive_manager = DriveManager()
+    disc_name = drive_manager.get_disc_name(drive_a, drive_b)
+    if disc_name is None:
+        error("No disc inserted in the specified drive.")
+        return
+
+    blank_line(1)
+    user_number = int(SystemCPM().get_user_number())
+    try:
+        dsk = DSK(disc_name)
+        names = [info.name for info in classify_disc(dsk) if info.user == user_number]
+    except Exception as e:
+        error(f"Error reading disc: {e}")
+        blank_line(1)
+        return
+    if files:
+        patterns = [pattern.upper() for pattern in files]
+        names = [name for name in names if any(fnmatch.fnmatch(name, p) for p in patterns)]
+    if not names:
+        error("No files to put on tape.")
+        blank_line(1)
+        return
+
+    def disc_files():
+        for name in names:
+            yield from_amsdos(name, dsk.read_file(name, user=user_number, keep_header=True))
+
+    try:
+        write_tape(output, disc_files(), baud, pulses)
+    except (CDTError, OSError) as e:
+        error(f"Error writing tape: {e}")
+        blank_line(1)
+
+
+@tape_group.command(cls=CustomCommand, name='list')
+@click.argument("image", type=click.Path(exists=True, dir_okay=False))
+def list_tape(image):
+    """List the files of a CDT tape image."""
+    blank_line(1)
+    try:
+        files = list(read_cdt(image))
+    except CDTError as e:
+        error(f"Error reading tape: {e}")
+        blank_line(1)
+        return
+    report_files(files, Path(image).name)
+    blank_line(1)
+
+
+@tape_group.command(cls=CustomCommand, name='extract')
+@click.argument("image", type=click.Path(exists=True, dir_okay=False))
+@click.argument("files", nargs=-1)
+@click.option("-o", "--output", default=".", show_default=True, metavar="DIR",
+              help="Host directory for the extracted files")
+@click.option("--disc", "to_disc", is_flag=True, help="Save the files into the disc instead of the host")
+@click.option("-A", "--drive-a", is_flag=True, help="Use disc in drive A")
+@click.option("-B", "--drive-b", is_flag=True, help="Use disc in drive B")
+def extract(image, files, output, to_disc, drive_a, drive_b):
+    """Extract files from a CDT tape image.
+
+    Binaries and BASIC programs get an AMSDOS header; ASCII files are
+    written as they are. Without FILES every file is extracted.
+
+    \b
+    Examples:
+      cpc tape extract game.cdt -o out
+      cpc tape extract game.cdt "*.BIN" --disc
+    """
+    dsk = None
+    if to_disc:
+        disc_name = DriveManager().get_disc_name(drive_a, drive_b)
+        if disc_name is None:
+            error("No disc inserted in the specified drive.")
+            return
+        dsk = DSK(disc_name)
+
+    blank_line(1)
+    patterns = [pattern.upper() for pattern in files]
+    user_number = int(SystemCPM().get_user_number())
+    extracted = []
+    try:
+        for file in read_cdt(image):
+            if patterns and not any(fnmatch.fnmatch(file.name.upper(), p) for p in patterns):
+                continue
+            if dsk is not None:
+                name = write_to_disc(dsk, file, user=user_number)
+            else:
+                name = DSK()._get_amsdos_filename(file.name)
+                Path(output).mkdir(parents=True, exist_ok=True)
+                (Path(output) / name).write_bytes(to_amsdos(file))
+            extracted.append(file._replace(name=name))
+        if dsk is not None and extracted:
+            dsk.save()
+    except (CDTError, OSError) as e:
+        error(f"Error extracting tape: {e}")
+        blank_line(1)
+        return
+    except Exception as e:
+        error(f"Error saving to disc: {e}")
+        blank_line(1)
+        return
+
+    if not extracted:
+        error("No matching files on the tape.")
+        blank_line(1)
+        return
+    report_files(extracted, Path(image).name)
+    where = f"disc '{Path(disc_name).name}'" if dsk is not None else f"'{output}'"
+    ok(f"{len(extracted)} file(s) extracted to {where}.")
+    blank_line(1)
+
+
+@tape_group.command(cls=CustomCommand, name='wav')
+@click.argument("image", type=click.Path(exists=True, dir_okay=False))
+@click.option("-o", "--output", metavar="FILE", help="WAV file (default: the image name with .wav)")
+@click.option("-r", "--rate", type=click.IntRange(8000, 192000), default=DEFAULT_RATE, show_default=True,
+              help="Sample rate in Hz")
+def wav(image, output, rate):
+    """Render a CDT/TZX tape image as a WAV file.
+
+    The audio is an 8-bit mono square wave that can be played into a
+    real CPC through its tape input. 44100 Hz is enough for standard
+    speeds; use 48000 Hz or more for fast turbo loaders.
+
+    \b
+    Examples:
+      cpc tape wav game.cdt
+      cpc tape wav game.cdt -o game.wav --rate 48000
+    """
+    output = output or str(Path(image).with_suffix(".wav"))
+    blank_line(1)
+    start = time.perf_counter()
+    try:
+        seconds = write_wav(output, iter_signal(Path(image).read_bytes()), rate)
+    except (CDTError, OSError) as e:
+        error(f"Error converting tape: {e}")
+        blank_line(1)
+        return
+    debug(f"WAV rendered in {(time.perf_counter() - start) * 1000:.0f} ms")
+    minutes, seconds = divmod(round(seconds), 60)
+    ok(f"'{output}' written ({minutes}:{seconds:02d} at {rate} Hz).")
+    blank_line(1)
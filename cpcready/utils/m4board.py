@@ -18,56 +18,263 @@
 # https://github.com/M4Duke/cpcxfer
 # created by Duke (M4Duke) and Romain Giot
 
+import asyncio
 import requests
 import os
+import posixpath
 import socket
+import threading
+import time
+import uuid
 from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import urlencode
+from requests.adapters import HTTPAdapter
 from cpcready.utils.console import debug, error, warn, ok
 from cpcready.utils.toml_config import ConfigManager
 
+# Segundos durante los que se da por buena la última comprobación de conexión
+CONNECTION_TTL = 10.0
+# Tamaño de los trozos al subir y bajar ficheros
+CHUNK_SIZE = 64 * 1024
+
+
+class RemoteEntry(NamedTuple):
+    """Entrada del listado de un directorio de la tarjeta SD."""
+    name: str
+    is_dir: bool
+    size: str
+
+
+def parse_listing(text):
+    """
+    Parse the dir.txt the M4Board writes for a listing.
+
+    The first line is the listed folder; each other line is
+    'name,type,size' with type 0 for directories.
+    """
+    entries = []
+    for line in text.splitlines()[1:]:
+        fields = line.strip().split(",")
+        if len(fields) < 2 or not fields[0]:
+            continue
+        entries.append(RemoteEntry(fields[0], fields[1] == "0", fields[2] if len(fields) > 2 else ""))
+    return entries
+
+
+def configured_ip():
+    """
+    IP de la M4Board guardada con 'cpc settings' (emulator.m4board_ip), o
+    la antigua m4board.ip; cadena vacía si no hay ninguna.
+    """
+    config = ConfigManager()
+    return config.get("emulator", "m4board_ip", "") or config.get("m4board", "ip", "")
+
+
+def _remote_config(ip):
+    """IP de la M4Board: la indicada o la de la configuración."""
+    if not ip:
+        ip = configured_ip()
+        if not ip:
+            raise ValueError("M4Board IP not configured. Set it with 'cpc settings' or use --ip.")
+    return ip
+
+
+class _MultipartUpload:
+    """
+    Cuerpo multipart/form-data que se lee por trozos del fichero.
+
+    requests lee el cuerpo con read() y usa len() para Content-Length, así
+    que el fichero nunca se carga entero en memoria.
+    """
+
+    def __init__(self, field, filename, fileobj, size):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self._head = (f"--{self.boundary}\r\n"
+                      f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+                      "Content-Type: application/octet-stream\r\n"
+                      "Expires: 0\r\n\r\n").encode()
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._parts = [self._head, fileobj, self._tail]
+        self._size = len(self._head) + size + len(self._tail)
+
+    def __len__(self):
+        return self._size
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = CHUNK_SIZE
+        while self._parts:
+            part = self._parts[0]
+            if isinstance(part, bytes):
+                chunk, self._parts[0] = part[:size], part[size:]
+                if not self._parts[0]:
+                    self._parts.pop(0)
+            else:
+                chunk = part.read(size)
+                if len(chunk) < size:
+                    self._parts.pop(0)
+            if chunk:
+                return chunk
+        return b""
+
 
 class M4Board:
     """M4Board communication manager."""
     
-    def __init__(self, ip=None):
+    def __init__(self, ip=None, port=80, ttl=CONNECTION_TTL, session=None, pool_size=2):
         """
         Initialize M4Board manager.
         
+        Requests go through one pooled keep-alive session, so consecutive
+        operations reuse the same connection. Use the board as a context
+        manager (or call close()) to release it.
+        
         Args:
             ip: M4Board IP address. If None, reads from config.
+            port: HTTP port (the M4Board always uses 80)
+            ttl: Seconds a successful connection check is trusted
+            session: requests.Session to use instead of a new one
+            pool_size: Connections kept open for concurrent requests
         """
-        if ip is None:
-            config = ConfigManager()
-            ip = config.get("m4board", "ip", "")
-            
-            if not ip:
-                raise ValueError("M4Board IP not configured. Edit the configuration file.")
+        self.ip = _remote_config(ip)
+        self.port = port
+        self.ttl = ttl
+        self.pool_size = pool_size
+        self.session = session or self._new_session(pool_size)
+        # (instante, resultado) de la última comprobación
+        self._last_check = None
+        # Cliente asyncio de walk() y batch(), con su bucle: se crea al
+        # primer uso y conserva sus conexiones hasta close()
+        self._loop = None
+        self._async = None
+        self._async_lock = threading.Lock()
+    
+    def _new_session(self, pool_size):
+        """Sesión con un pool pequeño: la M4Board atiende pocas conexiones."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.headers.update(self._get_headers())
+        return session
+    
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
+        with self._async_lock:
+            if self._loop is not None:
+                self._loop.run_until_complete(self._async.close())
+                self._loop.close()
+                self._loop = self._async = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _run_async(self, job):
+        """
+        Ejecuta job(AsyncM4Board) en el cliente asyncio de la placa y
+        devuelve su resultado. Usa la misma comprobación de conexión (con
+        su TTL) que las peticiones síncronas.
+        """
+        if not self.check_connection():
+            raise ConnectionError(f"Cannot connect to M4Board at {self.ip}")
+
+        async def create():
+            return AsyncM4Board(self.ip, self.port, max_connections=self.pool_size)
+
+        with self._async_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._async = self._loop.run_until_complete(create())
+            try:
+                result = self._loop.run_until_complete(job(self._async))
+            except (OSError, asyncio.TimeoutError):
+                self._last_check = None
+                raise
+        self._last_check = (time.monotonic(), True)
+        return result
+    
+    def walk(self, folder="/"):
+        """
+        List every file under a folder of the SD card.
+        
+        The board writes every listing to the same dir.txt, so folders are
+        listed one at a time; only the ls command and the dir.txt fetch of
+        each folder hold the listing lock, and other requests in a batch
+        can run in between.
         
-        self.ip = ip
+        Returns:
+            list: Sorted file paths
+        """
+        return self._run_async(lambda board: board.walk(folder))
+    
+    def batch(self, commands):
+        """
+        Run independent commands at the same time.
+        
+        Args:
+            commands: (method, argument) pairs, e.g. [("mkdir", "/a"), ("rm", "/b.bas")]
+            
+        Returns:
+            list: Result of each command, in order
+        """
+        return self._run_async(lambda board: board.batch(commands))
     
     def _get_url(self, path):
         """Build URL for M4Board endpoint."""
-        return f"http://{self.ip}/{path}"
+        host = self.ip if self.port == 80 else f"{self.ip}:{self.port}"
+        return f"http://{host}/{path}"
     
     def _get_headers(self):
         """Get default headers for requests."""
         return {"user-agent": "cpcready"}
     
-    def check_connection(self, timeout=2):
+    def _request(self, method, path, **kwargs):
+        """
+        Petición por la sesión compartida. Una respuesta confirma la
+        conexión y un fallo de red invalida la comprobación guardada.
+        """
+        try:
+            r = self.session.request(method, self._get_url(path), **kwargs)
+        except requests.ConnectionError:
+            self._last_check = None
+            raise
+        self._last_check = (time.monotonic(), True)
+        return r
+    
+    def check_connection(self, timeout=2, force=False):
         """
         Check if M4Board is reachable.
         
+        The result is cached for `ttl` seconds, and every successful request
+        refreshes it, so a run of operations probes the board only once.
+        
         Args:
             timeout: Connection timeout in seconds
+            force: Probe the board even if a recent result is cached
             
         Returns:
             bool: True if connection is successful, False otherwise
         """
+        if not force and self._last_check is not None:
+            checked_at, reachable = self._last_check
+            if time.monotonic() - checked_at < self.ttl:
+                return reachable
+        reachable = self._probe(timeout)
+        self._last_check = (time.monotonic(), reachable)
+        return reachable
+    
+    def _probe(self, timeout):
+        """Abre y cierra una conexión TCP al puerto HTTP."""
         try:
             # Intentar conectar al socket
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             sock.settimeout(timeout)
-            result = sock.connect_ex((self.ip, 80))
+            result = sock.connect_ex((self.ip, self.port))
             sock.close()
             
             if result == 0:
@@ -88,10 +295,9 @@ class M4Board:
             return False
         
         try:
-            url = self._get_url("config.cgi?mres")
             debug("Resetting M4Board")
             
-            r = requests.get(url, headers=self._get_headers(), timeout=5)
+            r = self._request("GET", "config.cgi?mres", timeout=5)
             
             if r.status_code == 200:
                 ok("M4Board reset successful")
@@ -111,10 +317,9 @@ class M4Board:
             return False
         
         try:
-            url = self._get_url("config.cgi?cres")
             debug("Resetting CPC")
             
-            r = requests.get(url, headers=self._get_headers(), timeout=5)
+            r = self._request("GET", "config.cgi?cres", timeout=5)
             
             if r.status_code == 200:
                 ok("CPC reset successful")
@@ -155,19 +360,13 @@ class M4Board:
         
         try:
             debug(f"Uploading {file_path} to {destination}")
-            url = self._get_url("upload.html")
+            remote_name = f"{destination}/{file_path.name}".replace("//", "/")
             
+            # El fichero se envía por trozos, sin cargarlo en memoria
             with open(file_path, 'rb') as f:
-                files = {
-                    "upfile": (
-                        f"{destination}/{file_path.name}".replace("//", "/"),
-                        f,
-                        "application/octet-stream",
-                        {'Expires': '0'}
-                    )
-                }
-                
-                r = requests.post(url, files=files, timeout=30)
+                body = _MultipartUpload("upfile", remote_name, f, file_path.stat().st_size)
+                r = self._request("POST", "upload.html", data=body,
+                                  headers={"Content-Type": body.content_type}, timeout=30)
             
             if r.status_code == 200:
                 ok(f"File uploaded: {file_path.name}")
@@ -197,22 +396,27 @@ class M4Board:
         
         try:
             debug(f"Downloading {cpc_path}")
-            url = self._get_url(f"sd/{cpc_path}")
+            if local_path is None:
+                local_path = os.path.basename(cpc_path)
+            partial = f"{local_path}.part"
             
-            r = requests.get(url, timeout=30)
+            # Se escribe por trozos en un temporal; si la descarga se corta
+            # no queda un fichero a medias con el nombre final
+            with self._request("GET", f"sd/{cpc_path.lstrip('/')}", stream=True, timeout=30) as r:
+                if r.status_code != 200:
+                    error(f"Download failed with status {r.status_code}")
+                    return False
+                try:
+                    with open(partial, 'wb') as f:
+                        for chunk in r.iter_content(CHUNK_SIZE):
+                            f.write(chunk)
+                    os.replace(partial, local_path)
+                finally:
+                    if os.path.exists(partial):
+                        os.remove(partial)
             
-            if r.status_code == 200:
-                if local_path is None:
-                    local_path = os.path.basename(cpc_path)
-                
-                with open(local_path, 'wb') as f:
-                    f.write(r.content)
-                
-                ok(f"File downloaded: {local_path}")
-                return True
-            else:
-                error(f"Download failed with status {r.status_code}")
-                return False
+            ok(f"File downloaded: {local_path}")
+            return True
                 
         except requests.RequestException as e:
             error(f"Download error: {e}")
@@ -234,9 +438,7 @@ class M4Board:
         
         try:
             debug(f"Executing {cpc_file}")
-            url = self._get_url("config.cgi")
-            
-            r = requests.get(url, params={"run2": cpc_file}, timeout=5)
+            r = self._request("GET", "config.cgi", params={"run2": cpc_file}, timeout=5)
             
             if r.status_code == 200:
                 ok(f"Executing: {cpc_file}")
@@ -268,14 +470,7 @@ class M4Board:
         
         try:
             debug(f"Creating directory {folder}")
-            url = self._get_url("config.cgi")
-            
-            r = requests.get(
-                url,
-                params={"mkdir": folder},
-                headers=self._get_headers(),
-                timeout=5
-            )
+            r = self._request("GET", "config.cgi", params={"mkdir": folder}, timeout=5)
             
             if r.status_code == 200:
                 ok(f"Directory created: {folder}")
@@ -303,8 +498,7 @@ class M4Board:
             return False
         
         try:
-            url = self._get_url("config.cgi")
-            r = requests.get(url, params={"cd": folder}, timeout=5)
+            r = self._request("GET", "config.cgi", params={"cd": folder}, timeout=5)
             
             if r.status_code == 200:
                 debug(f"Changed directory to: {folder}")
@@ -332,8 +526,7 @@ class M4Board:
             return False
         
         try:
-            url = self._get_url("config.cgi")
-            r = requests.get(url, params={"rm": cpc_file}, timeout=5)
+            r = self._request("GET", "config.cgi", params={"rm": cpc_file}, timeout=5)
             
             if r.status_code == 200:
                 ok(f"Removed: {cpc_file}")
@@ -358,8 +551,7 @@ class M4Board:
             return False
         
         try:
-            url = self._get_url("config.cgi")
-            r = requests.get(url, params={"chlt": "CPC+Pause"}, timeout=5)
+            r = self._request("GET", "config.cgi", params={"chlt": "CPC+Pause"}, timeout=5)
             
             if r.status_code == 200:
                 ok("CPC paused")
@@ -387,16 +579,14 @@ class M4Board:
             return None
         
         try:
-            url = self._get_url("config.cgi")
-            r = requests.get(url, params={"ls": folder}, timeout=5)
+            r = self._request("GET", "config.cgi", params={"ls": folder}, timeout=5)
             
             if r.status_code != 200:
                 error(f"ls failed with status {r.status_code}")
                 return None
             
             # Obtener el archivo de directorio
-            url = self._get_url("sd/m4/dir.txt")
-            r = requests.get(url, timeout=5)
+            r = self._request("GET", "sd/m4/dir.txt", timeout=5)
             
             if r.status_code == 200:
                 return r.text
@@ -407,3 +597,221 @@ class M4Board:
         except requests.RequestException as e:
             error(f"ls error: {e}")
             return None
+
+
+class AsyncM4Board:
+    """
+    M4Board client for asyncio.
+
+    Each request has its own timeout, and at most `max_connections` run at
+    the same time over pooled keep-alive connections. Independent commands
+    can be sent together with batch(). Listings are serialized, because
+    the board writes every listing to the same sd/m4/dir.txt.
+
+    Errors are raised (OSError, asyncio.TimeoutError); commands return
+    False when the board answers with an error status.
+    """
+
+    def __init__(self, ip=None, port=80, timeout=5.0, max_connections=2, connect=None):
+        """
+        Args:
+            ip: M4Board IP address. If None, reads from config.
+            port: HTTP port (the M4Board always uses 80)
+            timeout: Seconds allowed for each request
+            max_connections: Requests in flight at the same time
+            connect: Coroutine (host, port) -> (reader, writer); default
+                asyncio.open_connection
+        """
+        self.ip = _remote_config(ip)
+        self.port = port
+        self.timeout = timeout
+        self._connect = connect or asyncio.open_connection
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+        self._listing = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """Close the pooled connections."""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def request(self, method, path, params=None, body=None, headers=None, timeout=None):
+        """
+        Send one HTTP request.
+
+        Args:
+            body: bytes or an object with read() and len()
+
+        Returns:
+            tuple: (status, response body)
+        """
+        async with self._slots:
+            return await asyncio.wait_for(self._exchange(method, path, params, body, headers or {}),
+                                          timeout or self.timeout)
+
+    async def _exchange(self, method, path, params, body, headers):
+        target = "/" + path + ("?" + urlencode(params) if params else "")
+        host = self.ip if self.port == 80 else f"{self.ip}:{self.port}"
+        head = [f"{method} {target} HTTP/1.1", f"Host: {host}", "User-Agent: cpcready"]
+        if body is not None:
+            head.append(f"Content-Length: {len(body)}")
+        head += [f"{key}: {value}" for key, value in headers.items()]
+        request = ("\r\n".join(head) + "\r\n\r\n").encode()
+
+        # Una conexión del pool puede haberla cerrado la placa: se reintenta
+        # una vez con una nueva, solo si no se ha enviado cuerpo todavía
+        while True:
+            reused = bool(self._idle)
+            reader, writer = self._idle.pop() if reused else await self._connect(self.ip, self.port)
+            try:
+                writer.write(request)
+                await self._send_body(writer, body)
+                status, data, keep_alive = await self._read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                writer.close()
+                if reused and (body is None or isinstance(body, bytes)):
+                    debug(f"Stale M4Board connection, retrying: {e}")
+                    continue
+                raise ConnectionError(f"M4Board closed the connection: {e}") from e
+            except BaseException:
+                # Cancelado o fallo a medias: la conexión no se puede reutilizar
+                writer.close()
+                raise
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, data
+
+    @staticmethod
+    async def _send_body(writer, body):
+        if body is None:
+            await writer.drain()
+        elif isinstance(body, bytes):
+            writer.write(body)
+            await writer.drain()
+        else:
+            for chunk in iter(lambda: body.read(CHUNK_SIZE), b""):
+                writer.write(chunk)
+                await writer.drain()
+
+    @staticmethod
+    async def _read_response(reader):
+        """(status, cuerpo, keep-alive) de una respuesta HTTP/1.1."""
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("empty response")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if not size:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                body += await reader.readexactly(size)
+                await reader.readexactly(2)
+            return status, bytes(body), keep_alive
+        if "content-length" in headers:
+            return status, await reader.readexactly(int(headers["content-length"])), keep_alive
+        return status, await reader.read(), False
+
+    async def command(self, **params):
+        """Send a config.cgi command; True if the board accepted it."""
+        status, _ = await self.request("GET", "config.cgi", params=params)
+        return status == 200
+
+    async def execute(self, cpc_file):
+        return await self.command(run2=cpc_file)
+
+    async def mkdir(self, folder):
+        return await self.command(mkdir=folder if folder.startswith("/") else "/" + folder)
+
+    async def cd(self, folder):
+        return await self.command(cd=folder)
+
+    async def rm(self, cpc_file):
+        return await self.command(rm=cpc_file)
+
+    async def pause(self):
+        return await self.command(chlt="CPC+Pause")
+
+    async def reset_m4(self):
+        status, _ = await self.request("GET", "config.cgi?mres")
+        return status == 200
+
+    async def reset_cpc(self):
+        status, _ = await self.request("GET", "config.cgi?cres")
+        return status == 200
+
+    async def ls(self, folder=""):
+        """Raw listing (dir.txt) of a folder, or None if it failed."""
+        async with self._listing:
+            if not await self.command(ls=folder):
+                return None
+            status, data = await self.request("GET", "sd/m4/dir.txt")
+        return data.decode("latin-1") if status == 200 else None
+
+    async def listdir(self, folder=""):
+        """Entries of a folder; empty if it cannot be listed."""
+        return parse_listing(await self.ls(folder) or "")
+
+    async def walk(self, folder="/"):
+        """
+        Sorted paths of every file under folder. Subfolders are visited as
+        they are found; the listing lock only covers the ls command and the
+        dir.txt fetch of each one.
+        """
+        files = []
+
+        async def visit(path):
+            subfolders = []
+            for entry in await self.listdir(path):
+                full = posixpath.join(path, entry.name)
+                (subfolders if entry.is_dir else files).append(full)
+            await asyncio.gather(*(visit(sub) for sub in subfolders))
+
+        await visit(folder)
+        return sorted(files)
+
+    async def download(self, cpc_path):
+        """Contents of a file on the SD card, or None if it does not exist."""
+        status, data = await self.request("GET", f"sd/{cpc_path.lstrip('/')}", timeout=30)
+        return data if status == 200 else None
+
+    async def upload_file(self, file_path, destination="/"):
+        """Upload a file to a folder of the SD card, streaming it from disk."""
+        file_path = Path(file_path)
+        remote_name = f"{destination}/{file_path.name}".replace("//", "/")
+        with open(file_path, "rb") as f:
+            body = _MultipartUpload("upfile", remote_name, f, file_path.stat().st_size)
+            status, _ = await self.request("POST", "upload.html", body=body,
+                                           headers={"Content-Type": body.content_type}, timeout=30)
+        return status == 200
+
+    async def batch(self, commands):
+        """Run (method, argument) pairs concurrently; results in order."""
+        return await asyncio.gather(*(getattr(self, name)(*([arg] if arg is not None else []))
+                                      for name, arg in commands))
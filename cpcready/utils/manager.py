@@ -14,26 +14,103 @@
 
 import os
 import click
+import fnmatch
+import functools
+import shutil
 import subprocess
 from pathlib import Path
 from tabulate import tabulate
 from rich.console import Console
 from cpcready.utils.console import ok, debug,warn, error,info2,blank_line
 from cpcready.utils.toml_config import ConfigManager
+from cpcready.pydsk import DSK, DSKError, DSKFileNotFoundError
+from cpcready.pydsk.basic_viewer import view_basic, view_basic_ascii
+from cpcready.pydsk.classify import classify_file
+from cpcready.pydsk.file_viewer import hex_dump
+from cpcready.pydsk.z80 import disassembly_lines
 
 console = Console()
 
+# Backends disponibles: 'pydsk' trabaja en proceso, 'idsk' lanza el binario
+BACKENDS = ("pydsk", "idsk")
+
+# Tipos de 'idsk -t' -> tipo de DSK.write_file
+IDSK_FILE_TYPES = {0: -1, 1: 2, 2: -1}
+
+
+def _backend(missing=None):
+    """
+    Run the pydsk implementation of a discManager method, falling back to
+    the idsk one ('_idsk_<name>') when idsk is the selected backend or when
+    pydsk cannot read the image and the binary is installed.
+
+    The decorated method receives the loaded DSK instead of the path.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, dsk_file, *args, **kwargs):
+            fallback = getattr(self, f"_idsk_{method.__name__}")
+            if self.backend == "idsk":
+                return fallback(dsk_file, *args, **kwargs)
+            if not Path(dsk_file).exists():
+                error(f"\nDSK file not found: {dsk_file}\n")
+                return missing
+            try:
+                dsk = self._load(dsk_file)
+            except (DSKError, OSError) as e:
+                if not self.idsk_available():
+                    error(f"Cannot read disc '{dsk_file}': {e}")
+                    return missing
+                debug(f"pydsk cannot read '{dsk_file}' ({e}), using {self.idsk_path}")
+                return fallback(dsk_file, *args, **kwargs)
+            return method(self, dsk, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 class discManager:
     """
-    Clase para interactuar con idsk20 desde Python.
-    Permite listar, importar, extraer, borrar y crear imágenes DSK de Amstrad CPC.
+    Clase para gestionar imágenes DSK de Amstrad CPC desde Python.
+    Permite listar, importar, extraer, borrar y crear imágenes DSK.
+
+    Por defecto trabaja con pydsk (cada operación carga la imagen una sola
+    vez, sin lanzar procesos). idsk20 se mantiene como backend opcional y
+    como respaldo para imágenes que pydsk no sabe leer.
     """
 
-    def __init__(self, idsk_path="idsk20"):
+    def __init__(self, idsk_path="idsk20", backend="pydsk"):
         """
-        Inicializa la clase con la ruta del ejecutable idsk20.
+        Inicializa la clase con la ruta del ejecutable idsk20 y el backend.
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Invalid backend '{backend}'. Use: {', '.join(BACKENDS)}")
         self.idsk_path = idsk_path
+        self.backend = backend
+        # Imágenes cargadas: ruta real -> ((mtime_ns, size), DSK)
+        self._images = {}
+
+    def idsk_available(self):
+        """Indica si el binario de idsk está instalado."""
+        return shutil.which(self.idsk_path) is not None
+
+    def _load(self, dsk_file):
+        """Carga la imagen, reutilizando la ya cargada si no ha cambiado en disco."""
+        path = os.path.realpath(dsk_file)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._images.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        dsk = DSK(path)
+        self._images[path] = (stamp, dsk)
+        return dsk
+
+    def _store(self, dsk):
+        """Guarda la imagen y actualiza su sello en el cache."""
+        dsk.save()
+        path = os.path.realpath(dsk.filename)
+        st = os.stat(path)
+        self._images[path] = ((st.st_mtime_ns, st.st_size), dsk)
 
     def _run(self, args):
         """
@@ -50,8 +127,302 @@ class discManager:
             # error(f"Error ejecutando idsk20: {e.stderr.strip()}")
             return None
 
+    def _read(self, dsk, filename, user, keep_header=False):
+        """Lee un archivo del disco mostrando el error si no existe."""
+        try:
+            return dsk.read_file(filename, user, keep_header=keep_header)
+        except DSKFileNotFoundError:
+            error(f"File '{filename}' not found in disc")
+            return None
+
+    def _catalog_rows(self, dsk):
+        """Filas (nombre, tamaño, load, exec, user) del directorio."""
+        entries = dsk.get_directory_entries()
+        rows = []
+        for i, entry in enumerate(entries):
+            if entry.is_deleted or entry.num_page != 0:
+                continue
+
+            # Tamaño total sumando todas las páginas del archivo
+            total_pages = 0
+            p = 0
+            while (i + p) < len(entries) and entries[i + p].num_page >= p:
+                if entries[i + p].user == entry.user:
+                    total_pages += entries[i + p].nb_pages
+                p += 1
+
+            load_addr = "-"
+            exec_addr = "-"
+            if entry.blocks[0] != 0:
+                block = dsk.read_block(entry.blocks[0])
+                if dsk._check_amsdos_header(block):
+                    load_addr = f"&{int.from_bytes(block[0x15:0x17], 'little'):04X}"
+                    exec_addr = f"&{int.from_bytes(block[0x1A:0x1C], 'little'):04X}"
+
+            rows.append((entry.full_name, f"{(total_pages + 7) >> 3}K",
+                         load_addr, exec_addr, str(entry.user)))
+        return rows
+
+    # --- Operaciones con pydsk ---
+
+    @_backend()
+    def cat(self, dsk):
+        """Lista el contenido de la imagen DSK."""
+        return dsk._list_files_table(dsk.get_directory_entries())
+
+    @_backend()
+    def cat_list(self, dsk):
+        """Lista el contenido de la imagen DSK."""
+        return dsk._list_files_simple(dsk.get_directory_entries())
+
+    def new(self, dsk_file):
+        """Crea una nueva imagen DSK vacía."""
+        if self.backend == "idsk":
+            return self._idsk_new(dsk_file)
+        dsk = DSK()
+        dsk.create(nb_tracks=40, nb_sectors=9, format_type=DSK.FORMAT_DATA)
+        dsk.save(str(dsk_file))
+        ok("disc created successfully")
+        return True
+
+    @_backend()
+    def get(self, dsk, filename, user=0):
+        """Extrae un archivo (o archivos con wildcard) de la imagen DSK."""
+        available_files = [
+            entry.full_name for entry in dsk.get_directory_entries()
+            if not entry.is_deleted and entry.num_page == 0 and entry.user == user
+        ]
+
+        # Si contiene wildcard (* o ?), extraer todos los que coincidan
+        if '*' in filename or '?' in filename:
+            files_to_extract = fnmatch.filter(available_files, filename.upper())
+            if not files_to_extract:
+                warn(f"No files match pattern '{filename}'")
+                return None
+
+            extracted_count = 0
+            for file_name in files_to_extract:
+                try:
+                    dsk.export_file(file_name, file_name.replace(' ', ''), user, keep_header=True)
+                    ok(f"Extracted: {file_name}")
+                    extracted_count += 1
+                except (DSKError, OSError):
+                    warn(f"Failed to extract: {file_name}")
+
+            return f"Extracted {extracted_count} of {len(files_to_extract)} file(s)"
+
+        # Extracción simple de un solo archivo
+        amsdos_name = dsk._get_amsdos_filename(filename)
+        try:
+            dsk.export_file(amsdos_name, amsdos_name.replace(' ', ''), user, keep_header=True)
+        except DSKFileNotFoundError:
+            error(f"File '{filename}' not found in disc")
+            return None
+        except (DSKError, OSError) as e:
+            error(f"Error extracting file: {e}")
+            return None
+        return "File extracted successfully"
+
+    @_backend()
+    def era(self, dsk, filename, user=0):
+        """Elimina un archivo del DSK."""
+        try:
+            dsk.delete_file(filename, user=user)
+        except DSKFileNotFoundError:
+            warn(f"File '{filename}' not found in disc, nothing to delete")
+            return None
+        self._store(dsk)
+        ok(f"File '{filename}' erased successfully from disc.")
+        return True
+
+    @_backend()
+    def ren(self, dsk, file_old, file_new, user=0):
+        """Renombra un archivo en el DSK."""
+        try:
+            dsk.rename_file(file_old, file_new, user=user)
+        except DSKFileNotFoundError:
+            error(f"File '{file_old}' not found in disc")
+            return None
+        except DSKError as e:
+            error(f"Error renaming file: {e}")
+            return None
+        self._store(dsk)
+        ok(f"File '{file_old}' renamed successfully to '{file_new}' on disc.")
+        return True
+
+    @_backend()
+    def list(self, dsk, filename, user=0):
+        """Lista el contenido de un archivo BASIC del DSK."""
+        data = self._read(dsk, filename, user)
+        if data is None:
+            return None
+        return view_basic(data)
+
+    @_backend(missing=False)
+    def save(self, dsk, src_file, type_file=None, load_addr=None, exec_addr=None, force=False, readonly=False, system=False, user=None):
+        """
+        Inserta un archivo en la imagen DSK.
+
+        file_type: 0=ASCII, 1=BINARY, 2=raw
+        load_addr, exec_addr: direcciones hex opcionales (ej. '4000', 'C000')
+        """
+        # Validar que el archivo fuente existe
+        if not Path(src_file).exists():
+            blank_line(1)
+            error(f"File not found: {src_file}")
+            return False
+
+        file_type = IDSK_FILE_TYPES.get(int(type_file), -1) if type_file is not None else -1
+        try:
+            dsk.write_file(
+                str(src_file),
+                file_type=file_type,
+                load_addr=int(load_addr, 16) if load_addr else 0,
+                exec_addr=int(exec_addr, 16) if exec_addr else 0,
+                user=user or 0,
+                system=system,
+                read_only=readonly,
+                force=force,
+            )
+        except (DSKError, ValueError) as e:
+            error(str(e))
+            return None
+        self._store(dsk)
+        return True
+
+    @_backend()
+    def list_basic(self, dsk, filename, split=False, user=0):
+        data = self._read(dsk, filename, user)
+        if data is None:
+            return None
+        listing = view_basic(data)
+        if split:
+            # Partir las líneas largas a 80 columnas, como 'idsk -p'
+            listing = "\n".join(
+                line[i:i + 80] for line in listing.splitlines() for i in range(0, max(len(line), 1), 80)
+            )
+        return listing
+
+    @_backend()
+    def list_ascii(self, dsk, filename, user=0):
+        data = self._read(dsk, filename, user)
+        if data is None:
+            return None
+        return view_basic_ascii(data)
+
+    def list_dams(self, dsk_file, filename):
+        dsk_path = Path(dsk_file)
+        if not dsk_path.exists():
+            error(f"\nDSK file not found: {dsk_file}\n")
+            return None
+
+        return self._run([dsk_file, "-d", filename])
+
+    @_backend()
+    def list_hex(self, dsk, filename, user=0):
+        data = self._read(dsk, filename, user)
+        if data is None:
+            return None
+        return hex_dump(data)
+
+    @_backend()
+    def disassemble(self, dsk, filename, user=0):
+        """Desensambla un archivo del DSK como Z80 desde su dirección de carga."""
+        raw = self._read(dsk, filename, user, keep_header=True)
+        if raw is None:
+            return None
+        origin = 0
+        if len(raw) >= 128 and dsk._check_amsdos_header(raw):
+            origin = int.from_bytes(raw[0x15:0x17], "little")
+            raw = raw[128:128 + int.from_bytes(raw[0x18:0x1A], "little")]
+        return "\n".join(disassembly_lines(raw, origin))
+
+    @_backend()
+    def file_type(self, dsk, filename, user=0):
+        """
+        Muestra el tipo de archivo en el DSK.
+
+        Args:
+            dsk_file (str): Ruta al archivo DSK
+            filename (str): Nombre del archivo a consultar
+
+        Returns:
+            str: Tipo de archivo (ej: "8BP.BIN: BINARY")
+                 None si el archivo no existe en el disco
+        """
+        try:
+            info = classify_file(dsk, filename, user)
+        except DSKFileNotFoundError:
+            error(f"File '{filename}' not found in disc")
+            return None
+        return f"{filename}: {info.kind}"
+
+    def cat_table(self, dsk_file):
+        """
+        Muestra el contenido del disco en formato tabla usando Rich.
+
+        Args:
+            dsk_file (str): Ruta al archivo DSK
+        """
+        # Validar que el archivo DSK existe
+        dsk_path = Path(dsk_file)
+        if not dsk_path.exists():
+            error(f"\nDSK file not found: {dsk_file}\n")
+            return False
+
+        return self._print_catalog(dsk_file, self.catalog(dsk_file))
+
+    def _print_catalog(self, dsk_file, catalog):
+        """Pinta la tabla de un catálogo ya leído con catalog()."""
+        from rich.console import Console
+        from rich.table import Table
+        from rich import box
+
+        console = Console()
+
+        if not catalog:
+            warn("Empty disc or no data available")
+            return False
+        rows, free_space = catalog
+
+        # Crear tabla
+        table = Table(
+            title=f"[bold]{Path(dsk_file).name}[/bold]",
+            border_style="bright_blue",
+            box=box.ROUNDED
+        )
+
+        table.add_column("File", style="bold yellow")
+        table.add_column("Size", justify="right", style="green")
+        table.add_column("Load Addr", justify="center", style="bright_magenta")
+        table.add_column("Exec Addr", justify="center", style="bright_magenta")
+        table.add_column("User", justify="center", style="white")
+
+        for row in rows:
+            table.add_row(*row)
+
+        # Añadir línea de separación y espacio libre si existe
+        if free_space:
+            # Marcar la última fila como fin de sección solo si hay filas
+            if len(table.rows) > 0:
+                table.rows[-1].end_section = True
+            table.add_row(
+                f"[bold bright_green]{free_space}[/bold bright_green]",
+                "", "", "", ""
+            )
 
-    def cat(self, dsk_file):
+        # Mostrar tabla
+        console.print(table)
+        return True
+
+    @_backend()
+    def catalog(self, dsk):
+        """Devuelve (filas, espacio libre) del directorio."""
+        return self._catalog_rows(dsk), f"{dsk.get_free_space()}K free"
+
+    # --- Backend idsk ---
+
+    def _idsk_cat(self, dsk_file):
         """Lista el contenido de la imagen DSK."""
         dsk_path = Path(dsk_file)
         if not dsk_path.exists():
@@ -59,7 +430,7 @@ class discManager:
             return None
         return self._run([dsk_file, "-l"])
 
-    def cat_list(self, dsk_file):
+    def _idsk_cat_list(self, dsk_file):
         """Lista el contenido de la imagen DSK."""
         dsk_path = Path(dsk_file)
         if not dsk_path.exists():
@@ -67,30 +438,27 @@ class discManager:
             return None
         return self._run([dsk_file, "--ls"])
 
-    def new(self, dsk_file):
+    def _idsk_new(self, dsk_file):
         """Crea una nueva imagen DSK vacía."""
         self._run([dsk_file, "-n"])
         ok("disc created successfully")
         return True
 
-
-    def get(self, dsk_file, filename):
+    def _idsk_get(self, dsk_file, filename, user=0):
         """Extrae un archivo (o archivos con wildcard) de la imagen DSK."""
         dsk_path = Path(dsk_file)
         if not dsk_path.exists():
             error(f"\nDSK file not found: {dsk_file}\n")
             return None
-        
+
         # Si contiene wildcard (* o ?), obtener lista de archivos y extraer todos
         if '*' in filename or '?' in filename:
-            import fnmatch
-            
             # Obtener listado de archivos del disco
-            listing = self.cat_list(dsk_file)
+            listing = self._idsk_cat_list(dsk_file)
             if not listing:
                 warn(f"Could not read disc contents")
                 return None
-            
+
             # Parsear nombres de archivos del listado
             files_to_extract = []
             for line in listing.splitlines():
@@ -103,15 +471,15 @@ class discManager:
                     else:
                         # NOMBRE.EXT formato
                         file_name = parts[0]
-                    
+
                     # Verificar si coincide con el patrón wildcard
                     if fnmatch.fnmatch(file_name.upper(), filename.upper()):
                         files_to_extract.append(file_name)
-            
+
             if not files_to_extract:
                 warn(f"No files match pattern '{filename}'")
                 return None
-            
+
             # Extraer cada archivo
             extracted_count = 0
             for file_name in files_to_extract:
@@ -124,7 +492,7 @@ class discManager:
                     extracted_count += 1
                 except subprocess.CalledProcessError as e:
                     warn(f"Failed to extract: {file_name}")
-            
+
             return f"Extracted {extracted_count} of {len(files_to_extract)} file(s)"
         else:
             # Extracción simple de un solo archivo - sin mostrar warnings del DSK
@@ -143,13 +511,13 @@ class discManager:
                     error(f"Error extracting file: {error_msg}")
                 return None
 
-    def era(self, dsk_file, filename):
+    def _idsk_era(self, dsk_file, filename, user=0):
         """Elimina un archivo del DSK."""
         dsk_path = Path(dsk_file)
         if not dsk_path.exists():
             error(f"DSK file not found: '{dsk_file}'")
             return None
-        
+
         cmd = [self.idsk_path, dsk_file, "-r", filename]
         try:
             result = subprocess.run(
@@ -165,13 +533,14 @@ class discManager:
             else:
                 error(f"Error ejecutando idsk20: {e.stderr.strip()}")
                 return None
-    def ren(self, dsk_file, file_old, file_new):
+
+    def _idsk_ren(self, dsk_file, file_old, file_new, user=0):
         """Renombra un archivo en el DSK."""
         dsk_path = Path(dsk_file)
         if not dsk_path.exists():
             error(f"DSK file not found: '{dsk_file}'")
             return None
-        
+
         cmd = [self.idsk_path, dsk_file, "-m", file_old, "--to", file_new]
         try:
             result = subprocess.run(
@@ -183,10 +552,10 @@ class discManager:
             # Capturar tanto stdout como stderr
             error_msg = e.stderr.strip() if e.stderr else ""
             output_msg = e.stdout.strip() if e.stdout else ""
-            
+
             # Combinar mensajes
             full_error = error_msg or output_msg or "Unknown error"
-            
+
             # Si el error es porque el archivo no existe en el disco
             if "not found" in full_error.lower() or "file not found" in full_error.lower():
                 error(f"File '{file_old}' not found in disc")
@@ -194,20 +563,19 @@ class discManager:
             else:
                 error(f"Error renaming file: {full_error}")
                 return None
-            
-    def list(self, dsk_file, filename):
+
+    def _idsk_list(self, dsk_file, filename, user=0):
         """Lista el contenido de un archivo BASIC del DSK."""
         dsk_path = Path(dsk_file)
         if not dsk_path.exists():
             error(f"DSK file not found: '{dsk_file}'")
             return None
-        
+
         cmd = [self.idsk_path, dsk_file, "-b", filename]
         try:
             result = subprocess.run(
                 cmd, capture_output=True, text=True, check=True
             )
-            # ok(f"File '{filename}' erased successfully from disc.")
             return result.stdout.strip()
         except subprocess.CalledProcessError as e:
             # Si el error es porque el archivo no existe en el disco, mostrar warning
@@ -215,30 +583,24 @@ class discManager:
                 error(f"File '{filename}' not found in disc")
                 return None
             else:
-                # error(f"Error ejecutando idsk20: {e.stderr.strip()}")
                 return None
 
-    def save(self, dsk_file, src_file, type_file=None, load_addr=None, exec_addr=None, force=False, readonly=False, system=False, user=None):
-        """
-        Inserta un archivo en la imagen DSK.
-
-        file_type: 0=ASCII, 1=BINARY, 2=raw
-        load_addr, exec_addr: direcciones hex opcionales (ej. '4000', 'C000')
-        """
+    def _idsk_save(self, dsk_file, src_file, type_file=None, load_addr=None, exec_addr=None, force=False, readonly=False, system=False, user=None):
+        """Inserta un archivo en la imagen DSK con 'idsk -i'."""
         # Validar que el archivo DSK existe
         dsk_path = Path(dsk_file)
         if not dsk_path.exists():
             blank_line(1)
             error(f"\nDSK file not found: {dsk_file}\n")
             return False
-        
+
         # Validar que el archivo fuente existe
         src_path = Path(src_file)
         if not src_path.exists():
             blank_line(1)
             error(f"File not found: {src_file}")
             return False
-        
+
         args = [dsk_file, "-i", src_file]
 
         if type_file is not None:
@@ -258,67 +620,48 @@ class discManager:
 
         return self._run(args)
 
-    
-    def list_basic(self, dsk_file, filename, split=False):
+    def _idsk_list_basic(self, dsk_file, filename, split=False, user=0):
         dsk_path = Path(dsk_file)
         if not dsk_path.exists():
             error(f"\nDSK file not found: {dsk_file}\n")
             return None
-        
+
         args = [dsk_file, "-b", filename]
         if split:
             args.append("-p")
         return self._run(args)
 
-    def list_ascii(self, dsk_file, filename):
+    def _idsk_list_ascii(self, dsk_file, filename, user=0):
         dsk_path = Path(dsk_file)
         if not dsk_path.exists():
             error(f"\nDSK file not found: {dsk_file}\n")
             return None
-        
+
         return self._run([dsk_file, "-a", filename])
 
-    def list_dams(self, dsk_file, filename):
+    def _idsk_list_hex(self, dsk_file, filename, user=0):
         dsk_path = Path(dsk_file)
         if not dsk_path.exists():
             error(f"\nDSK file not found: {dsk_file}\n")
             return None
-        
-        return self._run([dsk_file, "-d", filename])
 
-    def list_hex(self, dsk_file, filename):
-        dsk_path = Path(dsk_file)
-        if not dsk_path.exists():
-            error(f"\nDSK file not found: {dsk_file}\n")
-            return None
-        
         return self._run([dsk_file, "-h", filename])
 
-    def disassemble(self, dsk_file, filename):
+    def _idsk_disassemble(self, dsk_file, filename, user=0):
         dsk_path = Path(dsk_file)
         if not dsk_path.exists():
             error(f"\nDSK file not found: {dsk_file}\n")
             return None
-        
+
         return self._run([dsk_file, "-z", filename])
 
-    def file_type(self, dsk_file, filename):
-        """
-        Muestra el tipo de archivo en el DSK.
-        
-        Args:
-            dsk_file (str): Ruta al archivo DSK
-            filename (str): Nombre del archivo a consultar
-            
-        Returns:
-            str: Salida del comando con el tipo de archivo (ej: "8BP.BIN: BINARY")
-                 None si el archivo no existe en el disco
-        """
+    def _idsk_file_type(self, dsk_file, filename, user=0):
+        """Muestra el tipo de archivo en el DSK con 'idsk -y'."""
         dsk_path = Path(dsk_file)
         if not dsk_path.exists():
             error(f"\nDSK file not found: {dsk_file}\n")
             return None
-        
+
         cmd = [self.idsk_path, dsk_file, "-y", filename]
         try:
             result = subprocess.run(
@@ -334,111 +677,45 @@ class discManager:
                 error(f"Error ejecutando idsk20: {e.stderr.strip()}")
                 return None
 
-    def cat_table(self, dsk_file):
-        """
-        Muestra el contenido del disco en formato tabla usando Rich.
-        
-        Args:
-            dsk_file (str): Ruta al archivo DSK
-        """
-        from rich.console import Console
-        from rich.table import Table
-        from rich import box
-        
-        console = Console()
-        
-        # Validar que el archivo DSK existe
-        dsk_path = Path(dsk_file)
-        if not dsk_path.exists():
-            error(f"\nDSK file not found: {dsk_file}\n")
-            return False
-        
-        # Obtener el listado del disco
+    def _idsk_catalog(self, dsk_file):
+        """Devuelve (filas, espacio libre) parseando el listado de idsk."""
         try:
-            result = self.cat_list(dsk_file)
+            result = self._idsk_cat_list(dsk_file)
         except RuntimeError as e:
             error(f"Error reading disc: {e}")
-            return False
-        
+            return None
         if not result:
-            warn("Empty disc or no data available")
-            return False
-        
-        # Convertir el resultado en líneas
-        result_lines = result.strip().splitlines()
-        
-        # Crear tabla
-        table = Table(
-            title=f"[bold]{Path(dsk_file).name}[/bold]",
-            border_style="bright_blue",
-            box=box.ROUNDED
-        )
-        
-        table.add_column("File", style="bold yellow")
-        table.add_column("Size", justify="right", style="green")
-        table.add_column("Load Addr", justify="center", style="bright_magenta")
-        table.add_column("Exec Addr", justify="center", style="bright_magenta")
-        table.add_column("User", justify="center", style="white")
-        
-        # Parsear cada línea del listado
+            return None
+
+        rows = []
         free_space = None
-        for line in result_lines:
+        for line in result.strip().splitlines():
             # Detectar línea de espacio libre (ej: "151K free")
             if "free" in line.lower():
                 free_space = line.strip()
                 continue
-            
+
             # Ignorar líneas de advertencia, vacías o líneas de borde
-            if (not line.strip() or 
-                "warning" in line.lower() or 
+            if (not line.strip() or
+                "warning" in line.lower() or
                 "track" in line.lower() or
                 line.strip().startswith("─") or
                 line.strip().startswith("│") or
                 line.strip().startswith("├")):
                 continue
-            
-            # Dividir por espacios
-            parts = line.split()
-            
-            # Ignorar líneas que no cumplan con el formato esperado
+
             # Formato esperado: NOMBRE .EXT TAMAÑO K LOAD EXEC User NUMERO
             # o: NOMBRE.EXT TAMAÑO K LOAD EXEC User NUMERO
-            try:
-                if len(parts) >= 6:
-                    # Verificar si la extensión está separada (empieza con punto)
-                    if parts[1].startswith('.'):
-                        # NOMBRE .EXT TAMAÑO K LOAD EXEC User NUMERO
-                        filename = f"{parts[0]}{parts[1]}"
-                        size_str = f"{parts[2]} {parts[3]}"
-                        load = parts[4]
-                        exec_addr = parts[5]
-                        user = parts[7] if len(parts) > 7 else "0"
-                    else:
-                        # NOMBRE.EXT TAMAÑO K LOAD EXEC User NUMERO
-                        filename = parts[0]
-                        size_str = f"{parts[1]} {parts[2]}"
-                        load = parts[3]
-                        exec_addr = parts[4]
-                        user = parts[6] if len(parts) > 6 else "0"
-                    
-                    table.add_row(filename, size_str, load, exec_addr, user)
-            except (ValueError, IndexError):
-                # Ignorar líneas que no se puedan parsear
+            parts = line.split()
+            if len(parts) < 6:
                 continue
-        
-        # Añadir línea de separación y espacio libre si existe
-        if free_space:
-            # Marcar la última fila como fin de sección solo si hay filas
-            if len(table.rows) > 0:
-                table.rows[-1].end_section = True
-            table.add_row(
-                f"[bold bright_green]{free_space}[/bold bright_green]",
-                "", "", "", ""
-            )
-        
-        # Mostrar tabla
-        console.print(table)
-        return True
+            if parts[1].startswith('.'):
+                rows.append((f"{parts[0]}{parts[1]}", f"{parts[2]} {parts[3]}", parts[4], parts[5],
+                             parts[7] if len(parts) > 7 else "0"))
+            else:
+                rows.append((parts[0], f"{parts[1]} {parts[2]}", parts[3], parts[4],
+                             parts[6] if len(parts) > 6 else "0"))
+        return rows, free_space
 
     def info_disc(self, dsk_file, verbose=False):
         """Print a human-friendly information summary for a DSK file.
@@ -448,38 +725,19 @@ class discManager:
         """
         
         path = Path(dsk_file)
-        disc_manager = discManager(self.idsk_path)
         if not path.exists():
             error(f"\nDSK file not found: {dsk_file}\n")
             return False
 
-        # Use the existing cat method to get listing
-        try:
-            listing_raw = self.cat(dsk_file) or ""
-        except RuntimeError:
-            listing_raw = ""
-
-        if not listing_raw.strip():
-            disc_listing = ["(Empty disc)"]
-            file_lines = []
-        else:
-            # Extract file data lines from the table (lines with │ that contain file info)
-            file_lines = []
-            for line in listing_raw.splitlines():
-                # Skip table borders and headers, look for lines with file data
-                if "│" in line and not line.strip().startswith("│     File") and not "─" in line and not "free" in line.lower():
-                    # Clean the line and extract file info
-                    clean_line = line.replace("│", "").strip()
-                    if clean_line and not clean_line.startswith("File"):
-                        file_lines.append(clean_line)
-            
-            disc_listing = file_lines if file_lines else ["(Empty disc)"]
+        # Filas del directorio (nombre, tamaño, load, exec, user)
+        catalog = self.catalog(dsk_file)
+        rows = catalog[0] if catalog else []
+        extensions = [Path(row[0]).suffix.upper() for row in rows]
 
-        # Count types from the cleaned file lines
-        basic_files = sum(1 for l in file_lines if ".BAS" in l.upper())
-        binary_files = sum(1 for l in file_lines if ".BIN" in l.upper())
-        text_files = sum(1 for l in file_lines if any(ext in l.upper() for ext in (".TXT", ".DOC")))
-        other_files = max(0, len(file_lines) - basic_files - binary_files - text_files) if file_lines else 0
+        basic_files = extensions.count(".BAS")
+        binary_files = extensions.count(".BIN")
+        text_files = sum(1 for ext in extensions if ext in (".TXT", ".DOC"))
+        other_files = len(rows) - basic_files - binary_files - text_files
 
         # File size
         try:
@@ -499,8 +757,7 @@ class discManager:
         print("-" * 60)
         console.print(f"[yellow]disc SUMMARY[/yellow]")
         print("-" * 60)
-        total_files = len(file_lines) if file_lines else 0
-        print(f"Total files: {total_files}")
+        print(f"Total files: {len(rows)}")
         print(f"- BASIC programs: {basic_files}")
         print(f"- Binary files: {binary_files}")
         print(f"- Text files: {text_files}")
@@ -510,8 +767,8 @@ class discManager:
         console.print(f"[yellow]CAT FILES[/yellow]")
         print("-" * 60)
         blank_line(1)
-        # File listing - show the formatted table from cat method
-        disc_manager.cat_table(dsk_file)
+        # Listado con el catálogo ya leído: la imagen no se vuelve a cargar
+        self._print_catalog(dsk_file, catalog)
 
         # # BASIC program short descriptions if verbose
         # if verbose and basic_files > 0 and file_lines:
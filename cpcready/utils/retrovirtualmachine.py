@@ -14,6 +14,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import json
+import os
 import psutil
 import subprocess
 import sys
@@ -22,6 +24,11 @@ import re
 from pathlib import Path
 from cpcready.utils.console import info2, ok, debug, error, warn  # Eliminar si no se usa ninguna función
 
+# Fichero con el PID y la hora de inicio de la última instancia lanzada
+STATE_FILE = Path.home() / ".config" / "cpcready" / "rvm.json"
+# Resultado de la última comprobación de versión, por ejecutable
+VERSION_CACHE = Path.home() / ".config" / "cpcready" / "rvm_version.json"
+
 
 class RVM:
     """RetroVirtualMachine emulator manager."""
@@ -38,17 +45,82 @@ class RVM:
     REQUIRED_VERSION = "Retro Virtual Machine v2.0 BETA-1 r7"
     REQUIRED_BUILD_PATTERN = r"MacOs x64 Build: 6783 - \(Tue Jul\s+9 18:18:12 2019 UTC\)"
     
-    def __init__(self, ruta_ejecutable=None):
+    def __init__(self, ruta_ejecutable=None, state_file=None, version_cache=None):
         """
         Initialize RVM manager.
         
         Args:
             ruta_ejecutable: Path to RetroVirtualMachine executable or .app
+            state_file: File where the launched instance is recorded
+            version_cache: File where version checks are cached
         """
         self.ruta_ejecutable = ruta_ejecutable
+        self.state_file = Path(state_file) if state_file else STATE_FILE
+        self.version_cache = Path(version_cache) if version_cache else VERSION_CACHE
+    
+    def _read_state(self):
+        """PID y hora de inicio de la última instancia, o None."""
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+            return int(state["pid"]), float(state["create_time"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def _write_state(self, pid):
+        """Guarda la instancia lanzada (la hora de inicio evita confundir PIDs reutilizados)."""
+        try:
+            create_time = psutil.Process(pid).create_time()
+        except psutil.Error:
+            return
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_file.with_name(self.state_file.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"pid": pid, "create_time": create_time}, f)
+        os.replace(tmp, self.state_file)
+    
+    def _clear_state(self):
+        try:
+            self.state_file.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def stop_previous(self, timeout=3.0):
+        """
+        Close the instance started by the last launch, if it is still running.
+        
+        Only the recorded process is touched: it is asked to terminate and
+        killed if it has not exited after `timeout` seconds.
+        
+        Returns:
+            bool: True if an instance was closed
+        """
+        state = self._read_state()
+        self._clear_state()
+        if state is None:
+            return False
+        
+        pid, create_time = state
+        try:
+            proc = psutil.Process(pid)
+            # Mismo PID pero otro proceso: el emulador ya se cerró
+            if abs(proc.create_time() - create_time) > 0.01:
+                return False
+            debug(f"Closing: PID {pid} ({proc.name()})")
+            proc.terminate()
+            try:
+                proc.wait(timeout)
+            except psutil.TimeoutExpired:
+                proc.kill()
+                proc.wait(timeout)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.TimeoutExpired):
+            return False
+        
+        info2("Closed previous RetroVirtualMachine instance.")
+        return True
     
     def kill_all_instances(self):
-        """Kill all previous RetroVirtualMachine instances."""
+        """Kill all previous RetroVirtualMachine instances (scans every process)."""
         debug("Searching for previous RetroVirtualMachine instances...")
         
         count = 0
@@ -70,15 +142,57 @@ class RVM:
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 pass
         
+        self._clear_state()
         if count > 0:
             info2(f"Closed {count} RetroVirtualMachine instance(s).")
         
         return count
     
-    def check_version(self):
+    def _bundle_binary(self):
+        """Ejecutable dentro de un .app de macOS, o None si no se encuentra."""
+        macos_dir = Path(self.ruta_ejecutable) / "Contents" / "MacOS"
+        if not macos_dir.exists():
+            return None
+        binaries = [f for f in macos_dir.iterdir() if f.is_file() and not f.name.startswith('.')]
+        return binaries[0] if binaries else None
+    
+    @staticmethod
+    def _binary_key(binary):
+        """Identidad del ejecutable: ruta real, tamaño, fecha e inodo."""
+        path = Path(binary).resolve()
+        st = path.stat()
+        return [str(path), st.st_size, st.st_mtime_ns, st.st_ino]
+    
+    def _cached_version(self, key):
+        try:
+            with open(self.version_cache) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("key") != key:
+            return None
+        return bool(cached.get("valid")), str(cached.get("info", ""))
+    
+    def _store_version(self, key, result):
+        try:
+            self.version_cache.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.version_cache.with_name(self.version_cache.name + ".tmp")
+            with open(tmp, "w") as f:
+                json.dump({"key": key, "valid": result[0], "info": result[1]}, f)
+            os.replace(tmp, self.version_cache)
+        except OSError as e:
+            debug(f"Cannot cache RVM version: {e}")
+    
+    def check_version(self, recheck=False):
         """
         Check if RetroVirtualMachine version is the required one.
         
+        The result is cached for the executable (path, size, mtime and
+        inode), so the binary is only run again when it changes.
+        
+        Args:
+            recheck: Run the executable even if a cached result exists
+        
         Returns:
             tuple: (bool, str) - (is_valid, version_info)
                 is_valid: True if version matches requirements
@@ -91,27 +205,39 @@ class RVM:
         if not Path(self.ruta_ejecutable).exists():
             return False, f"RetroVirtualMachine not found at: {self.ruta_ejecutable}"
         
-        try:
-            # Construir comando según plataforma
-            if sys.platform == "darwin" and self.ruta_ejecutable.endswith(".app"):
-                # macOS con .app: buscar el binario dentro del bundle
-                app_path = Path(self.ruta_ejecutable)
-                macos_dir = app_path / "Contents" / "MacOS"
-                
-                if not macos_dir.exists():
-                    return False, "Cannot find Contents/MacOS directory in .app bundle"
-                
-                # Buscar cualquier archivo ejecutable
-                possible_binaries = [f for f in macos_dir.iterdir() if f.is_file() and not f.name.startswith('.')]
-                
-                if not possible_binaries:
-                    return False, "Cannot find RVM binary inside .app bundle"
-                
-                # Usar el primer ejecutable encontrado
-                comando = [str(possible_binaries[0]), "-nocolor", "--help"]
-            else:
-                comando = [self.ruta_ejecutable, "-nocolor", "--help"]
+        # Construir comando según plataforma
+        if sys.platform == "darwin" and self.ruta_ejecutable.endswith(".app"):
+            # macOS con .app: buscar el binario dentro del bundle
+            if not (Path(self.ruta_ejecutable) / "Contents" / "MacOS").exists():
+                return False, "Cannot find Contents/MacOS directory in .app bundle"
             
+            binary = self._bundle_binary()
+            if binary is None:
+                return False, "Cannot find RVM binary inside .app bundle"
+        else:
+            binary = self.ruta_ejecutable
+        
+        try:
+            key = self._binary_key(binary)
+        except OSError as e:
+            return False, f"Error checking version: {e}"
+        
+        cached = None if recheck else self._cached_version(key)
+        if cached is not None:
+            debug(f"RVM version check cached for {key[0]}")
+            if cached[0]:
+                ok(f"Version verified: {self.REQUIRED_VERSION}")
+            return cached
+        
+        result = self._run_version_check([str(binary), "-nocolor", "--help"])
+        # Solo se guardan respuestas del emulador, no timeouts ni errores
+        if result[0] or result[1].startswith("Version mismatch"):
+            self._store_version(key, result)
+        return result
+    
+    def _run_version_check(self, comando):
+        """Ejecuta el emulador con --help y busca la versión en la salida."""
+        try:
             debug(f"Checking version: {' '.join(comando)}")
             
             # Ejecutar comando y capturar salida
@@ -152,7 +278,8 @@ class RVM:
         except Exception as e:
             return False, f"Error checking version: {e}"
     
-    def launch(self, modelo, archivo_dsk=None, archivo_ejecutar=None, wait_after_kill=0.5):
+    def launch(self, modelo, archivo_dsk=None, archivo_ejecutar=None, kill_all=False, wait_after_kill=0.0,
+               archivo_snapshot=None):
         """
         Launch RetroVirtualMachine with the specified parameters.
         
@@ -160,7 +287,10 @@ class RVM:
             modelo: CPC model (464, 664, 6128)
             archivo_dsk: DSK file to load (optional)
             archivo_ejecutar: File to execute automatically from disk (optional)
-            wait_after_kill: Seconds to wait after killing previous instances
+            kill_all: Close every RVM process on the machine instead of only
+                the one started by the last launch
+            wait_after_kill: Extra seconds to wait after closing previous instances
+            archivo_snapshot: SNA snapshot to start from (optional)
             
         Returns:
             bool: True if launched successfully, False otherwise
@@ -175,8 +305,12 @@ class RVM:
             error("Check the path in configuration file.")
             return False
         
-        # Matar instancias previas
-        self.kill_all_instances()
+        # Cerrar la instancia anterior: la lanzada por nosotros (se espera a
+        # que termine) o, con kill_all, cualquiera que haya en el sistema
+        if kill_all:
+            self.kill_all_instances()
+        else:
+            self.stop_previous()
         if wait_after_kill > 0:
             time.sleep(wait_after_kill)
         
@@ -189,11 +323,21 @@ class RVM:
         if archivo_ejecutar:
             # Comando para ejecutar el archivo: run"archivo"\n
             parametros.append(f'-c=run"{archivo_ejecutar}"\\n')
+
+        if archivo_snapshot:
+            # RVM reconoce el tipo de medio por la extensión: el .sna se carga al arrancar
+            parametros.extend(["-i", archivo_snapshot])
         
         debug(f"Parámetros: {' '.join(parametros)}")
         
         # Detectar si es macOS y la ruta es .app
+        binary = None
         if sys.platform == "darwin" and self.ruta_ejecutable.endswith(".app"):
+            binary = self._bundle_binary()
+        if binary is not None:
+            # Se lanza el binario del bundle para conocer su PID ('open -a' no lo da)
+            comando = [str(binary)] + parametros
+        elif sys.platform == "darwin" and self.ruta_ejecutable.endswith(".app"):
             # En macOS, usar 'open -a' para aplicaciones .app
             comando = ["open", "-a", self.ruta_ejecutable, "--args"] + parametros
         else:
@@ -205,7 +349,7 @@ class RVM:
             if sys.platform.startswith("win"):
                 # Windows: usar DETACHED_PROCESS para desconectar completamente
                 DETACHED_PROCESS = 0x00000008
-                subprocess.Popen(
+                proc = subprocess.Popen(
                     comando, 
                     creationflags=DETACHED_PROCESS,
                     stdout=subprocess.DEVNULL,
@@ -214,7 +358,7 @@ class RVM:
                 )
             else:
                 # Unix/Linux/macOS: usar start_new_session
-                subprocess.Popen(
+                proc = subprocess.Popen(
                     comando,
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL,
@@ -222,6 +366,9 @@ class RVM:
                     start_new_session=True
                 )
             
+            # Con 'open -a' el PID es el de 'open': no sirve para cerrar el emulador
+            if comando[0] != "open":
+                self._write_state(proc.pid)
             ok("RetroVirtualMachine launched successfully.")
             return True
             
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions
 # and limitations under the License.
 
+import hashlib
 import subprocess
 import click
 from cpcready.utils import console
@@ -82,3 +83,21 @@ def run_command(cmd, show_output=True, check=True):
 
     console.ok(f"[OK] Comando completado con código {process.returncode}")
     return subprocess.CompletedProcess(cmd, process.returncode, "\n".join(output_lines), "")
+
+def file_digest(path, extra=b""):
+    """
+    Calcula el SHA-256 de un fichero leyendo por bloques.
+
+    Args:
+        path: Ruta del fichero
+        extra (bytes): Datos adicionales a incluir en el hash (p.ej. parámetros)
+
+    Returns:
+        str: Digest hexadecimal
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    h.update(extra)
+    return h.hexdigest()
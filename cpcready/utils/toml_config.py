@@ -68,6 +68,9 @@ class ConfigManager:
                 "user": 0,
                 "model": "6128",
                 "mode": 1
+            },
+            "update": {
+                "check": True
             }
         }
     
@@ -14,9 +14,20 @@
 
 import requests
 import packaging.version
+import functools
 import os
+import subprocess
+import sys
+import tempfile
 import time
 from pathlib import Path
+
+# Python 3.11+ tiene tomllib incluido, versiones anteriores necesitan tomli
+try:
+    import tomllib
+except ModuleNotFoundError:
+    import tomli as tomllib
+
 from cpcready.utils.version import __version__
 from cpcready.utils.console import warn
 from rich.console import Console
@@ -26,6 +37,16 @@ console = Console()
 CACHE_FILE = Path.home() / ".config" / "cpcready" / "update_cache"
 CACHE_DURATION = 3600 * 6  # 6 horas en segundos
 
+# Marca de refresco en curso: evita lanzar varios procesos a la vez
+LOCK_FILE = CACHE_FILE.with_name("update_cache.lock")
+LOCK_DURATION = 60  # segundos
+
+# Configuración del usuario (sección [update])
+CONFIG_FILE = CACHE_FILE.with_name("cpcready.toml")
+
+# Variable de entorno para desactivar la comprobación (CI, build farms...)
+NO_UPDATE_CHECK_ENV = "CPCREADY_NO_UPDATE_CHECK"
+
 
 def get_latest_version_from_pypi():
     """Obtiene la última versión disponible en PyPI."""
@@ -66,30 +87,149 @@ def read_cached_version():
 
 
 def write_cached_version(version):
-    """Escribe la versión al cache."""
+    """Escribe la versión al cache de forma atómica. Devuelve True si se escribió."""
+    tmp_path = None
     try:
         CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        CACHE_FILE.write_text(version)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_FILE.parent, prefix=".update_cache.")
+        with os.fdopen(fd, "w") as f:
+            f.write(version)
+        # os.replace es atómico: un lector nunca ve el fichero a medias
+        os.replace(tmp_path, CACHE_FILE)
+        tmp_path = None
+        return True
+    except OSError:
+        return False
+    finally:
+        if tmp_path:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+def is_update_check_enabled():
+    """
+    Indica si la comprobación de actualizaciones está activada.
+
+    Se desactiva con la variable de entorno CPCREADY_NO_UPDATE_CHECK o con
+    ``check = false`` en la sección [update] de cpcready.toml.
+    """
+    if os.environ.get(NO_UPDATE_CHECK_ENV, "").strip().lower() not in ("", "0", "false", "no"):
+        return False
+    return _config_update_check()
+
+
+@functools.lru_cache(maxsize=None)
+def _config_update_check():
+    """
+    Lee ``[update] check`` con una sola lectura del TOML, una vez por proceso.
+
+    No usa ConfigManager: se llama en cada comando y no debe crear el
+    directorio ni reescribir la configuración.
+    """
+    try:
+        with open(CONFIG_FILE, "rb") as f:
+            return bool(tomllib.load(f).get("update", {}).get("check", True))
+    except (OSError, ValueError, AttributeError):
+        return True
+
+
+def refresh_cache():
+    """
+    Consulta PyPI y actualiza el cache. Se ejecuta en un proceso aparte.
+
+    Si falla (p.ej. sin red) el lock se conserva, renovado, hasta que pase
+    LOCK_DURATION: así cada comando no lanza otro proceso mientras el
+    cache sigue caducado.
+    """
+    latest_version = get_latest_version_from_pypi()
+    if latest_version and write_cached_version(latest_version):
+        try:
+            LOCK_FILE.unlink()
+        except OSError:
+            pass
+        return True
+    try:
+        LOCK_FILE.touch()
     except OSError:
         pass
+    return False
+
+
+def acquire_lock():
+    """
+    Crea el lock de forma atómica (O_CREAT | O_EXCL): de varios comandos
+    lanzados a la vez solo uno lo consigue. Un lock con más de
+    LOCK_DURATION se considera abandonado y se sustituye.
+    """
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    for _ in range(2):
+        try:
+            os.close(os.open(LOCK_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - LOCK_FILE.stat().st_mtime < LOCK_DURATION:
+                    return False
+                LOCK_FILE.unlink()
+            except FileNotFoundError:
+                # Otro proceso lo acaba de quitar: se vuelve a intentar
+                pass
+    return False
+
+
+def schedule_refresh():
+    """
+    Lanza el refresco del cache en un proceso desacoplado.
+
+    El comando que lo invoca no espera a la red: el resultado estará
+    disponible en el cache para la siguiente ejecución.
+    """
+    try:
+        # Si ya hay un refresco reciente en curso, no lanzar otro
+        if not acquire_lock():
+            return False
+
+        cmd = [sys.executable, "-m", "cpcready.utils.update"]
+        if sys.platform == "win32":
+            subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+            )
+        else:
+            subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+        return True
+    except OSError:
+        return False
 
 
 def check_for_updates():
     """
     Verifica si hay actualizaciones disponibles.
-    Usa cache para evitar consultas frecuentes a PyPI.
+
+    Solo lee el cache: nunca espera a la red. Si el cache ha caducado
+    se programa un refresco en segundo plano y se usa la versión
+    cacheada (aunque sea antigua) mientras tanto.
     """
-    # Si el cache es válido, usar la versión cacheada
-    if is_cache_valid():
-        latest_version = read_cached_version()
-    else:
-        # Consultar PyPI y actualizar cache
-        latest_version = get_latest_version_from_pypi()
-        if latest_version:
-            write_cached_version(latest_version)
-    
+    if not is_update_check_enabled():
+        return False, None
+
+    if not is_cache_valid():
+        schedule_refresh()
+
+    latest_version = read_cached_version()
     if not latest_version:
-        return False
+        return False, None
     
     try:
         current = packaging.version.parse(__version__)
@@ -109,4 +249,8 @@ def show_update_notification():
             console.print("[yellow]Update with: pipx upgrade cpcready[/yellow]", highlight=False)
     except Exception:
         # In case of any error, silently do nothing
-        pass
\ No newline at end of file
+        pass
+
+
+if __name__ == "__main__":
+    refresh_cache()
@@ -0,0 +1,211 @@
+import pytest
+
+from cpcready.pydsk import DSK
+from cpcready.pydsk.basic_crunch import BasicCrunchError, crunch_program, load_program
+from cpcready.pydsk.basic_lint import build_index, lint_lines
+from cpcready.pydsk.basic_tokenizer import (
+    BasicTokenizeError, encode_line, iter_tokenized_lines, lex_line, tokenize_basic,
+)
+from cpcready.pydsk.basic_viewer import basic_line_index, detokenize_basic, iter_basic_lines
+
+
+def basic_line(number, body):
+    """Línea tokenizada: [longitud][número][tokens][0]."""
+    return (len(body) + 5).to_bytes(2, "little") + number.to_bytes(2, "little") + body + b"\x00"
+
+
+PROGRAM = b"".join([
+    # 10 PRINT "HI\x80":a$="X" (bytes >= 0x80 in strings show as spaces)
+    basic_line(10, b'\xbf "HI\x80"\x01\x03\x00\x00\xe1\xef"X"'),
+    # 20 IF a%=1 THEN 10:ELSE GOTO 20
+    basic_line(20, b"\xa1 \x02\x00\x00\xe1\xef\x0f \xeb \x1e\x0a\x00 \x01\x97 \xa0 \x1e\x14\x00"),
+    # 30 x=&FF+&X101-2.5
+    basic_line(30, b"\x0d\x00\x00\xf8\xef\x1c\xff\x00\xf4\x1b\x05\x00\xf5\x1f\x00\x00\x00\x20\x82"),
+    # 40 |DISC:y!=LEN(z)
+    basic_line(40, b"|\x00DIS\xc3\x01\x04\x00\x00\xf9\xef\xff\x0e(\x0d\x00\x00\xfa)"),
+]) + b"\x00\x00"
+
+
+def test_detokenize_listing():
+    assert detokenize_basic(PROGRAM).splitlines() == [
+        '10 PRINT "HI ":a$="X"',
+        "20 IF a%=1 THEN 10 ELSE GOTO 20",
+        "30 x=&FF+&X101-2.5",
+        "40 |DISC:y!=LEN(z)",
+    ]
+
+
+def test_iter_basic_lines_is_lazy():
+    lines = iter_basic_lines(PROGRAM)
+    assert next(lines) == (10, '10 PRINT "HI ":a$="X"')
+    assert [number for number, _ in lines] == [20, 30, 40]
+
+
+def test_truncated_program():
+    # Un programa cortado no debe fallar: se lista lo que haya
+    assert detokenize_basic(PROGRAM[:10]) == '10 PRINT "HI'
+    assert detokenize_basic(b"") == ""
+
+
+def test_line_index_and_range():
+    assert [number for number, _ in basic_line_index(PROGRAM)] == [10, 20, 30, 40]
+    assert [number for number, _ in iter_basic_lines(PROGRAM, 15, 30)] == [20, 30]
+    assert list(iter_basic_lines(PROGRAM, 50)) == []
+
+
+SOURCE = """10 REM Demo
+20 MODE 1:BORDER 0:INK 0,0
+30 DIM a$(10),b%(5)
+40 FOR i=1 TO 10 STEP 2:PRINT i;CHR$(65+i):NEXT i
+50 IF INKEY$="" THEN 50 ELSE GOTO 60
+60 x=&FF+&X1010-2.5*1000:y!=3.14159:z=40000
+70 ON x GOSUB 100,200,300
+80 DATA 1,2,"a:b",hello
+90 |DISC:PRINT "done" 'comment
+100 DEF FNsq(v)=v*v:PRINT FNsq(3)
+110 ON ERROR GOTO 120:ON BREAK GOSUB 130
+130 a=LEN(a$)+ASC("A")-MAX(1,2):PRINT USING "##";a
+"""
+
+
+def test_tokenize_round_trip():
+    assert detokenize_basic(tokenize_basic(SOURCE)) == SOURCE.rstrip()
+
+
+def test_tokenize_encodings():
+    program = tokenize_basic('20 GOTO 10\r\n10 a%=1:PRINT "HI" ELSE 300\r\n')
+    # Líneas ordenadas, número de línea tras GOTO y separador antes de ELSE
+    assert program == (
+        b"\x19\x00\x0a\x00"
+        b"\x02\x00\x00\xe1\xef\x0f\x01\xbf \"HI\" \x01\x97 \x1e\x2c\x01\x00"
+        b"\x0a\x00\x14\x00\xa0 \x1e\x0a\x00\x00"
+        b"\x00\x00"
+    )
+    assert [lexeme.kind for lexeme in lex_line("10 x=2.5")[1]] == ["var", "op", "number"]
+
+
+def test_separator_before_else_and_quote():
+    # Un operando que acaba en 0x01 (300 = &012C) no cuenta como separador
+    assert tokenize_basic("10 PRINT 300'x")[4:-3] == b"\xbf \x1a\x2c\x01\x01\xc0x"
+    assert b"\x1e\x2c\x01\x01\x97 " in tokenize_basic("10 IF a THEN 300ELSE 20")
+    # Un ':' escrito antes de ' se guarda además del separador implícito
+    program = tokenize_basic("10 PRINT \"x\":' c")
+    assert program[4:-3] == b"\xbf \"x\"\x01\x01\xc0 c"
+    assert detokenize_basic(program) == "10 PRINT \"x\":' c"
+    lines = iter_tokenized_lines(program)
+    assert b"".join(encode_line(n, lexemes) for n, lexemes in lines) + b"\x00\x00" == program
+
+
+def test_tokenize_errors():
+    with pytest.raises(BasicTokenizeError):
+        tokenize_basic("PRINT 1")
+    with pytest.raises(BasicTokenizeError):
+        tokenize_basic("10 PRINT " + "1," * 200)
+
+
+def test_write_bytes_adds_basic_header(temp_disk):
+    dsk = DSK(temp_disk)
+    program = tokenize_basic(SOURCE)
+    dsk.write_bytes(program, "demo.bas", file_type=0)
+    raw = dsk.read_file("DEMO.BAS", keep_header=True)
+    assert dsk._check_amsdos_header(raw)
+    assert raw[0x12] == 0 and raw[0x15:0x17] == b"\x70\x01"
+    assert dsk.read_file("DEMO.BAS", keep_header=False) == program
+
+
+def test_tokenized_lexemes_round_trip():
+    # Volver a codificar los lexemas de un programa guardado da los mismos bytes
+    for program in (PROGRAM, tokenize_basic(SOURCE)):
+        lines = iter_tokenized_lines(program)
+        assert b"".join(encode_line(n, lexemes) for n, lexemes in lines) + b"\x00\x00" == program
+
+
+CRUNCH_SOURCE = b"""10 REM Demo
+20 MODE 1:counter=0 ' init
+30 GOSUB 100
+40 FOR index=1 TO 10:counter=counter+index:NEXT index
+50 IF counter>10 THEN 70
+60 PRINT "small"
+70 PRINT "total";counter
+80 END
+90 REM subroutine
+100 REM
+110 DATA  1, 2
+120 PRINT "sub":RETURN
+"""
+
+
+def test_crunch_program():
+    report = crunch_program(CRUNCH_SOURCE)
+    assert detokenize_basic(report.program).splitlines() == [
+        "1 MODE1:a=0:GOSUB4:FORb=1TO10:a=a+b:NEXTb:IFa>10THEN3",
+        '2 PRINT"small"',
+        '3 PRINT"total";a:END',
+        "4 DATA1, 2:PRINT\"sub\":RETURN",
+    ]
+    assert (report.lines_before, report.lines_after) == (12, 4)
+    assert report.comments_removed == 4 and report.variables_renamed == 2
+    assert report.size_after < report.size_before == len(tokenize_basic(CRUNCH_SOURCE.decode()))
+    # Un programa ya compactado (tokenizado) se puede volver a compactar
+    assert crunch_program(report.program).program == report.program
+
+
+def test_crunch_options():
+    report = crunch_program(CRUNCH_SOURCE, rename=False, merge=False, start=100, step=5)
+    lines = detokenize_basic(report.program).splitlines()
+    assert lines[0] == "100 MODE1:counter=0"
+    assert lines[1] == "105 GOSUB135"
+    # Un fichero ASCII leído del disco acaba en ^Z y relleno de ceros
+    padded = crunch_program(b"10 PRINT 1\r\n\x1a" + bytes(127))
+    assert detokenize_basic(padded.program).splitlines() == ["1 PRINT1"]
+
+
+def test_crunch_keeps_types_and_erl():
+    report = crunch_program(b"10 DEFINT i:total=1:item=2\n20 ON ERROR GOTO 40\n30 PRINT item:REM x\n40 IF ERL=30 THEN RESUME NEXT\n")
+    assert not report.renumbered
+    assert detokenize_basic(report.program).splitlines() == [
+        "10 DEFINTi:t=1:i=2",
+        "20 ON ERROR GOTO40",
+        "30 PRINTi",
+        "40 IFERL=30THENRESUMENEXT",
+    ]
+    with pytest.raises(BasicCrunchError):
+        crunch_program(b"10 GOTO 50\n")
+
+
+
+def test_crunch_keeps_line_zero_references():
+    # ON ERROR GOTO 0 desactiva la captura de errores: no es un salto
+    report = crunch_program(b"10 ON ERROR GOTO 30\n20 ON ERROR GOTO 0:END\n30 RESUME 0\n")
+    assert detokenize_basic(report.program).splitlines() == [
+        "1 ON ERROR GOTO2:ON ERROR GOTO0:END",
+        "2 RESUME0",
+    ]
+
+
+LINT_SOURCE = b"""10 MODE 1
+20 FOR i=1 TO 100
+30 FOR j%=1 TO 10:a$=a$+"x":y=SIN(i*2)+SIN(i*2):NEXT j%
+40 GOSUB 500
+50 NEXT i
+60 k=k+1:IF k<10 THEN 60
+""" + b"".join(b"%d PRINT %d\n" % (n, n) for n in range(100, 500, 10)) + b"500 RETURN\n"
+
+
+def test_lint_ranks_hotspots():
+    findings = lint_lines(load_program(LINT_SOURCE))
+    assert [(f.line, f.rule, f.cost) for f in findings] == [
+        (30, "string-concat", 3000),
+        (30, "repeated-expression", 1000),
+        (40, "far-gosub", 430),
+        (20, "float-loop", 200),
+    ]
+    # Con DEFINT el contador ya es entero
+    program = b"5 DEFINT a-z\n" + LINT_SOURCE
+    assert "float-loop" not in {f.rule for f in lint_lines(load_program(program))}
+
+
+def test_lint_backward_jump_is_a_loop():
+    index = build_index(load_program(b"10 CLS\n20 x=1\n30 IF x THEN 20\n40 END\n"))
+    assert index.jump_depth == [0, 1, 1, 0]
+    assert index.callers == {20: [30]}
@@ -0,0 +1,74 @@
+import io
+import struct
+
+import pytest
+
+from cpcready.pydsk.cdt import (
+    CDTError, CDTWriter, TYPE_ASCII, TYPE_BASIC, TYPE_BINARY, TZX_SIGNATURE, TapeFile, crc16,
+    decode_record, encode_record, file_records, from_amsdos, read_cdt, timing_for, to_amsdos,
+    write_to_disc,
+)
+from cpcready.pydsk.dsk import DSK
+
+
+def tape(*files, baud=2000):
+    out = io.BytesIO()
+    writer = CDTWriter(out, timing_for(baud))
+    writer.write_text("test tape")
+    for file in files:
+        writer.add(file)
+    return out.getvalue()
+
+
+def test_crc_and_timings():
+    # CRC-CCITT de "123456789" es &29B1; la cinta guarda su complemento
+    assert crc16(b"123456789") == 0x29B1 ^ 0xFFFF
+    assert timing_for(1000)[:3] == (1167, 2334, 2334)
+    assert timing_for(2000)[:2] == (583, 1166)
+    with pytest.raises(CDTError):
+        timing_for(20000)
+
+
+def test_records_and_headers():
+    game = TapeFile("GAME.BIN", TYPE_BINARY, 0x4000, 0x4010, bytes(range(256)) * 20)
+    records = list(file_records(game))
+    assert [sync for sync, _ in records] == [0x2C, 0x16] * 3
+    # Tercer bloque: número 3, último, 1024 bytes cargados en &5000
+    number, last, kind, length, load, first = struct.unpack_from("<BBBHHB", records[4][1], 16)
+    assert (number, last, kind, length, load, first) == (3, 0xFF, TYPE_BINARY, 1024, 0x5000, 0)
+    record = encode_record(0x16, b"\x01\x02")
+    assert len(record) == 1 + 258 + 4
+    assert decode_record(record) == (0x16, b"\x01\x02".ljust(256, b"\x00"))
+
+
+def test_round_trip():
+    files = [
+        TapeFile("GAME.BIN", TYPE_BINARY, 0x4000, 0x4010, bytes(range(256)) * 20),
+        TapeFile("LOADER", TYPE_BASIC, 0x170, 0, b"\x0a\x00\x0a\x00\xbf\x00\x00\x00"),
+        TapeFile("README.TXT", TYPE_ASCII, 0, 0, b"hello\r\n"),
+    ]
+    image = tape(*files, baud=1000)
+    assert image.startswith(TZX_SIGNATURE + b"\x01\x14")
+    assert list(read_cdt(image)) == files
+
+    # Un byte cambiado en los datos del primer fichero
+    broken = bytearray(image)
+    broken[image.index(bytes(range(200, 210)))] ^= 0xFF
+    with pytest.raises(CDTError, match="CRC"):
+        list(read_cdt(bytes(broken)))
+    with pytest.raises(CDTError):
+        list(read_cdt(b"not a tape"))
+
+
+def test_amsdos_conversion(tmp_path):
+    game = TapeFile("GAME.BIN", TYPE_BINARY, 0x8000, 0x8003, b"\xc9" * 300)
+    assert from_amsdos("GAME.BIN", to_amsdos(game)) == game
+    # Sin cabecera: binario con --load (exec = load) o texto
+    assert from_amsdos("RAW.BIN", b"\x00\x01", load=0x9000)[1:4] == (TYPE_BINARY, 0x9000, 0x9000)
+    assert from_amsdos("NOTES", b"text\r\n\x1a\x1a") == TapeFile("NOTES", TYPE_ASCII, 0, 0, b"text\r\n")
+
+    dsk = DSK()
+    dsk.create(40, 9)
+    assert write_to_disc(dsk, game) == "GAME.BIN"
+    assert dsk.read_file("GAME.BIN", keep_header=False)[:300] == game.data
+    assert from_amsdos("GAME.BIN", dsk.read_file("GAME.BIN")) == game
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from cpcready.pydsk import DSK, DSKFileNotFoundError
+from cpcready.pydsk.basic_tokenizer import tokenize_basic
+from cpcready.pydsk.classify import classify_disc, classify_discs, classify_file, classify_sample
+
+
+def test_classify_sample_without_header():
+    assert classify_sample(b'10 PRINT "HI"\r\n20 GOTO 10\r\n') == "BASIC-ASCII"
+    assert classify_sample(b"Hello world\r\nSecond line\r\n") == "ASCII"
+    assert classify_sample(bytes(range(1, 32)) * 4) == "BINARY"
+    assert classify_sample(bytes(512)) == "RAW"
+    assert classify_sample(random.Random(1).randbytes(512)) == "PACKED"
+    # Mnemónicos tokenizados y líneas acabadas en CR
+    assert classify_sample(b"\x81 A,B\r\x85 (HL)\r\x90 &4000\r" * 8) == "DAMS"
+
+
+def test_classify_disc_reads_header_and_first_block(temp_disk):
+    dsk = DSK(temp_disk)
+    dsk.write_bytes(tokenize_basic('10 PRINT "HI"\n20 GOTO 10\n'), "prog.bas", file_type=0)
+    dsk.write_bytes(bytes(range(64)), "code.bin", file_type=2, load_addr=0x4000, exec_addr=0x4010)
+    dsk.write_bytes(bytes(1024) + b"\xff" * 15360, "screen.scr", file_type=2, load_addr=0xC000)
+    dsk.write_bytes(random.Random(2).randbytes(2048), "data.pck", file_type=2, load_addr=0x4000)
+    dsk.write_bytes(b"10 CLS\r\n20 END\r\n\x1a", "src.bas", file_type=-1)
+
+    infos = {info.name: info for info in classify_disc(dsk)}
+    assert {name: info.kind for name, info in infos.items()} == {
+        "PROG.BAS": "BASIC-TOKENIZED",
+        "CODE.BIN": "BINARY",
+        "SCREEN.SCR": "SCREEN",
+        "DATA.PCK": "PACKED",
+        "SRC.BAS": "BASIC-ASCII",
+    }
+    assert infos["CODE.BIN"][3:] == (2, 0x4000, 0x4010, 64)
+    assert [path for path, _ in classify_discs([])] == []
+
+
+def test_classify_file_cache_follows_changes(temp_disk):
+    dsk = DSK(temp_disk)
+    dsk.write_bytes(b"plain text\r\n", "notes.txt", file_type=-1)
+    first = classify_file(dsk, "notes.txt")
+    assert first.kind == "ASCII"
+    assert classify_file(dsk, "NOTES.TXT") is first
+
+    dsk.write_bytes(bytes(range(1, 32)) * 4, "notes.txt", file_type=2, force=True)
+    assert classify_file(dsk, "notes.txt").kind == "BINARY"
+    with pytest.raises(DSKFileNotFoundError):
+        classify_file(dsk, "missing.bin")
+
+
+def test_classify_file_reuses_given_entries(temp_disk, monkeypatch):
+    dsk = DSK(temp_disk)
+    dsk.write_bytes(b"plain text\r\n", "notes.txt", file_type=-1)
+    entries = dsk.get_directory_entries()
+    monkeypatch.setattr(dsk, "get_directory_entries", lambda: pytest.fail("catalog read again"))
+    assert classify_file(dsk, "notes.txt", entries=entries).kind == "ASCII"
@@ -105,3 +105,283 @@ def test_save(temp_disk, temp_bas):
 def test_user():
     out, err, code = run_cpc(["user", "0"])
     assert code == 0 or code == 1
+
+def test_batch(temp_disk):
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    bas_file = os.path.join(os.path.dirname(temp_disk), "prog.bas")
+    with open(bas_file, "w") as f:
+        f.write("10 PRINT \"HELLO\"\n")
+    script = f"save {bas_file}\nren prog.bas batch.bas\n"
+    result = subprocess.run(CPC + ["batch", "-"], input=script, capture_output=True, text=True)
+    assert result.returncode == 0
+    from cpcready.pydsk.dsk import DSK
+    names = [e.full_name for e in DSK(temp_disk).get_directory_entries() if not e.is_deleted]
+    assert "BATCH.BAS" in names
+
+def test_batch_strict(temp_disk):
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    result = subprocess.run(CPC + ["batch", "--strict", "-"], input="era nothere.bin\n",
+                            capture_output=True, text=True)
+    assert result.returncode == 1
+
+def test_build(tmp_path):
+    (tmp_path / "main.bas").write_text('10 PRINT "HELLO"\n')
+    (tmp_path / "cpcready.toml").write_text(
+        '[build]\ndisc = "game.dsk"\n\n[[build.files]]\nsrc = "main.bas"\n'
+    )
+    env = {**os.environ, "PYTHONPATH": os.path.dirname(os.path.dirname(os.path.abspath(__file__)))}
+    result = subprocess.run(CPC + ["build"], cwd=tmp_path, capture_output=True, text=True, env=env)
+    assert result.returncode == 0
+    disc = tmp_path / "game.dsk"
+    first = disc.read_bytes()
+    mtime = disc.stat().st_mtime_ns
+    result = subprocess.run(CPC + ["build"], cwd=tmp_path, capture_output=True, text=True, env=env)
+    assert "up to date" in result.stdout
+    assert disc.read_bytes() == first
+    assert disc.stat().st_mtime_ns == mtime
+
+def test_sync(temp_disk):
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    src = os.path.join(os.path.dirname(temp_disk), "src")
+    os.mkdir(src)
+    with open(os.path.join(src, "main.bas"), "w") as f:
+        f.write("10 PRINT \"HELLO\"\n")
+    out, err, code = run_cpc(["sync", src])
+    assert code == 0
+    from cpcready.pydsk.dsk import DSK
+    names = [e.full_name for e in DSK(temp_disk).get_directory_entries() if not e.is_deleted]
+    assert "MAIN.BAS" in names
+
+def test_sync_failed_push_stays_pending(temp_disk, tmp_path, monkeypatch):
+    from cpcready.pydsk.dsk import DSK
+    from cpcready.sync.sync import DiscSync
+    (tmp_path / "game.bin").write_bytes(b"\x01\x02")
+    syncer = DiscSync(tmp_path, temp_disk)
+    changed = syncer.pending(["game.bin"])
+
+    def fail(self):
+        raise OSError("disc full")
+    monkeypatch.setattr(DSK, "save", fail)
+    with pytest.raises(OSError):
+        syncer.push(changed)
+    # No se marca como enviado: el siguiente push lo reintenta
+    assert syncer.pushed == {} and syncer.pending(["game.bin"]) == changed
+    monkeypatch.undo()
+    assert syncer.push(changed) == 1 and syncer.pending(["game.bin"]) == []
+
+def test_sync_remembers_pushed_files(temp_disk, tmp_path):
+    from cpcready.pydsk.dsk import DSK
+    from cpcready.sync.sync import DiscSync
+    (tmp_path / "game.bin").write_bytes(b"\x01\x02")
+    syncer = DiscSync(tmp_path, temp_disk)
+    assert syncer.push(syncer.pending(["game.bin"])) == 1
+    # Otra ejecución no vuelve a escribir lo que ya está en el disco
+    assert DiscSync(tmp_path, temp_disk).pending(["game.bin"]) == []
+    dsk = DSK(temp_disk)
+    dsk.delete_file("GAME.BIN")
+    dsk.save()
+    assert [name for name, _ in DiscSync(tmp_path, temp_disk).pending(["game.bin"])] == ["game.bin"]
+
+def test_sync_watch_does_not_retry_failed_push_in_a_loop(temp_disk, tmp_path, monkeypatch):
+    from click.testing import CliRunner
+    from cpcready.pydsk.dsk import DSK
+    import importlib
+    sync_module = importlib.import_module("cpcready.sync.sync")
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    (tmp_path / "game.bin").write_bytes(b"\x01")
+    saves = []
+
+    def fail(self, *args):
+        saves.append(True)
+        raise OSError("disc busy")
+    monkeypatch.setattr(DSK, "save", fail)
+    scans = iter([{"game.bin": (1, 1)}] * 3 + [{"game.bin": (2, 1)}])
+
+    def wait(self, previous, interval, debounce):
+        # Como el watcher real: solo vuelve cuando algo cambia
+        for current in scans:
+            if current != previous:
+                return current
+        raise KeyboardInterrupt
+    monkeypatch.setattr(sync_module.DirectoryWatcher, "wait_for_changes", wait)
+    result = CliRunner().invoke(sync_module.sync, [str(tmp_path), "--watch"])
+    assert result.exit_code == 0, result.output
+    # Un intento al arrancar y uno por cada cambio, sin reintentos en bucle
+    assert len(saves) == 3 and "retried with the next change" in result.output
+
+def test_list_range(temp_disk):
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    src = os.path.join(os.path.dirname(temp_disk), "range.bas")
+    with open(src, "w") as f:
+        f.write("".join(f"{n} PRINT {n}\n" for n in range(10, 60, 10)))
+    run_cpc(["save", src])
+    out, err, code = run_cpc(["list", "range.bas", "--from", "20", "--to", "30", "--plain"])
+    assert code == 0
+    assert out.splitlines() == ["20 PRINT 20", "30 PRINT 30"]
+    out, err, code = run_cpc(["list", "range.bas", "--search", "print 4", "--plain"])
+    assert out.splitlines() == ["40 PRINT 40"]
+
+def test_save_tokenize(temp_disk):
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    src = os.path.join(os.path.dirname(temp_disk), "tok.bas")
+    with open(src, "w") as f:
+        f.write('10 PRINT "HELLO"\n20 GOTO 10\n')
+    out, err, code = run_cpc(["save", src, "--tokenize"])
+    assert code == 0
+    out, err, code = run_cpc(["list", "tok.bas", "--plain"])
+    assert out.splitlines() == ['10 PRINT "HELLO"', "20 GOTO 10"]
+
+
+def test_basic_crunch(temp_disk):
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    src = os.path.join(os.path.dirname(temp_disk), "game.bas")
+    with open(src, "w") as f:
+        f.write("10 REM game\n20 counter = 1\n30 PRINT counter : GOTO 20\n")
+    out, err, code = run_cpc(["basic", "crunch", src, "--host", "-o", "crunch.bas"])
+    assert code == 0
+    assert "Saved" in out
+    out, err, code = run_cpc(["list", "crunch.bas", "--plain"])
+    assert out.splitlines() == ["1 a=1:PRINTa:GOTO1"]
+
+
+def test_basic_lint(temp_disk):
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    src = os.path.join(os.path.dirname(temp_disk), "slow.bas")
+    with open(src, "w") as f:
+        f.write('10 FOR i=1 TO 100:a$=a$+"x":NEXT\n')
+    out, err, code = run_cpc(["save", src])
+    assert code == 0
+    out, err, code = run_cpc(["basic", "lint", "slow.bas"])
+    assert code == 0
+    assert "concatenated" in out and "is a float" in out, err
+
+
+def test_list_disasm(temp_disk):
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    src = os.path.join(os.path.dirname(temp_disk), "code.bin")
+    with open(src, "wb") as f:
+        f.write(bytes.fromhex("3E01CD5ABBC9"))
+    out, err, code = run_cpc(["save", src, "b", "0x8000"])
+    assert code == 0
+    out, err, code = run_cpc(["list", "code.bin", "--disasm", "--start", "&8002", "--plain"])
+    assert out.splitlines()[:2] == ["8002  CD 5A BB     CALL &BB5A", "8005  C9           RET"]
+
+
+def test_list_hex(temp_disk):
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    src = os.path.join(os.path.dirname(temp_disk), "data.bin")
+    with open(src, "wb") as f:
+        f.write(bytes(range(0x20, 0x60)))
+    out, err, code = run_cpc(["save", src, "b", "0x4000"])
+    assert code == 0
+    out, err, code = run_cpc(["list", "data.bin", "--hex", "--offset", "&20", "--length", "16"])
+    assert [line for line in out.splitlines() if line] == ["#0020  40 41 42 43 44 45 46 47 48 49 4A 4B 4C 4D 4E 4F  @ABCDEFGHIJKLMNO"]
+
+
+def test_screens_export(temp_disk, tmp_path):
+    from cpcready.pydsk import DSK
+    dsk = DSK(temp_disk)
+    dsk.write_bytes(bytes(range(256)) * 64, "title.scr", file_type=2, load_addr=0xC000)
+    dsk.write_bytes(bytes(range(64)), "code.bin", file_type=2, load_addr=0x4000)
+    dsk.save()
+    out, err, code = run_cpc(["screens", "export", temp_disk, "-o", str(tmp_path), "-m", "0"])
+    assert code == 0
+    assert "Exported 1 screen(s)" in out, err
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["TITLE.SCR.png", "TITLE.SCR.thumb.png"]
+
+
+def test_gfx_convert(temp_disk, tmp_path):
+    from cpcready.pydsk.screen import THUMB_SIZE, save_png
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    png = str(tmp_path / "hero.png")
+    save_png(png, *THUMB_SIZE, [b"\x00\x00\x80" * 80 + b"\xff\xff\x00" * 80] * 100)
+    out, err, code = run_cpc(["gfx", "convert", png, "--sprite", "-m", "1"])
+    assert code == 0
+    assert "HERO.SPR" in out and "1,24" in out, err
+    out, err, code = run_cpc(["list", "hero.spr", "--hex", "--length", "4", "--plain"])
+    assert out.split()[1:5] == ["28", "64", "00", "00"]
+
+
+def test_pack(temp_disk, tmp_path):
+    from cpcready.pydsk.zx0 import decompress
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    source = tmp_path / "title.scr"
+    source.write_bytes(bytes(range(64)) * 256)
+    out, err, code = run_cpc(["pack", str(source), "--host", "-o", str(tmp_path / "title.zx0")])
+    assert code == 0 and "verified" in out, err
+    assert decompress((tmp_path / "title.zx0").read_bytes()) == source.read_bytes()
+
+    out, err, code = run_cpc(["pack", str(source), "--host", "--disc", "--load", "&8000"])
+    assert "TITLE.ZX0" in out and "&8000" in out, err
+    out, err, code = run_cpc(["list", "title.zx0", "--hex", "--length", "1", "--plain"])
+    assert code == 0
+
+
+def test_pack_host_without_disc(tmp_path):
+    from cpcready.pydsk.zx0 import decompress
+    run_cpc(["drive", "eject", "-A"])
+    run_cpc(["drive", "eject", "-B"])
+    source = tmp_path / "title.scr"
+    source.write_bytes(bytes(range(64)) * 64)
+    out, err, code = run_cpc(["pack", str(source), "--host", "-o", str(tmp_path / "title.zx0")])
+    assert code == 0 and "No disc" not in out and "verified" in out, err
+    assert decompress((tmp_path / "title.zx0").read_bytes()) == source.read_bytes()
+
+    out, err, code = run_cpc(["pack", str(source), "--host", "--disc"])
+    assert "No disc" in out + err
+
+
+def test_tape_from_disc_and_extract(temp_disk, tmp_path):
+    from cpcready.pydsk.cdt import read_cdt
+    from cpcready.pydsk.dsk import DSK
+    dsk = DSK(temp_disk)
+    dsk.write_bytes(bytes(range(256)) * 12, "GAME.BIN", file_type=2, load_addr=0x4000)
+    dsk.save()
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    run_cpc(["user", "0"])
+    cdt = str(tmp_path / "game.cdt")
+    out, err, code = run_cpc(["tape", "from-disc", cdt, "--baud", "1000"])
+    assert code == 0 and "(1000" in out, err
+    assert [f.name for f in read_cdt(cdt)] == ["GAME.BIN"]
+
+    out, err, code = run_cpc(["tape", "extract", cdt, "-o", str(tmp_path / "out")])
+    assert "GAME.BIN" in out
+    assert (tmp_path / "out" / "GAME.BIN").read_bytes()[128:] == bytes(range(256)) * 12
+
+    out, err, code = run_cpc(["tape", "wav", cdt, "--rate", "22050"])
+    assert code == 0 and "22050 Hz" in out, err
+    assert (tmp_path / "game.wav").stat().st_size > 22050
+
+
+def test_snapshot_from_disc(temp_disk, tmp_path):
+    from cpcready.pydsk.dsk import DSK
+    from cpcready.pydsk.sna import read_snapshot
+    dsk = DSK(temp_disk)
+    dsk.write_bytes(b"\xf3\x18\xfe", "LOOP.BIN", file_type=2, load_addr=0x4000, exec_addr=0x4000)
+    dsk.write_bytes(bytes(range(16)), "DATA.BIN", file_type=2, load_addr=0x8000)
+    dsk.save()
+    run_cpc(["disc", "insert", temp_disk, "-A"])
+    run_cpc(["drive", "a"])
+    run_cpc(["user", "0"])
+    sna = tmp_path / "loop.sna"
+    out, err, code = run_cpc(["snapshot", "LOOP.BIN", "DATA.BIN", "-o", str(sna), "--model", "464", "-m", "2"])
+    assert code == 0 and "&4000" in out, err
+    snapshot = read_snapshot(sna.read_bytes())
+    assert (snapshot.model, snapshot.pc, snapshot.mode) == ("464", 0x4000, 2)
+    assert snapshot.memory[0x4000:0x4003] == b"\xf3\x18\xfe" and snapshot.memory[0x8000:0x8010] == bytes(range(16))
+
+    out, err, code = run_cpc(["snapshot", "DATA.BIN", "LOOP.BIN", "-o", str(sna), "--exec", "&4001"])
+    assert code == 0 and read_snapshot(sna.read_bytes()).pc == 0x4001, err
@@ -0,0 +1,56 @@
+import importlib
+import os
+import threading
+
+import pytest
+
+from cpcready.pydsk.dsk import DSK
+
+# cpcready.console exporta el comando con el mismo nombre que el módulo
+console = importlib.import_module("cpcready.console.console")
+
+
+@pytest.fixture
+def toolbar(tmp_path, monkeypatch, temp_disk):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    config = console.ConfigManager()
+    config.set("drive", "drive_a", temp_disk)
+    config.set("drive", "selected_drive", "a")
+    return console.ToolbarState()
+
+
+def test_refresh_unchanged_stamp_is_noop(toolbar, monkeypatch):
+    before = toolbar.get()
+    # Sin cambios no se vuelve a leer la imagen
+    monkeypatch.setattr(console, "DSK", lambda path: pytest.fail("disc image read again"))
+    assert toolbar.refresh() is False
+    assert toolbar.get() is before
+
+
+def test_refresh_touched_image_updates_catalog(toolbar, temp_disk):
+    assert "(0F " in toolbar.get().value
+    free = DSK(temp_disk).get_free_space()
+
+    dsk = DSK(temp_disk)
+    dsk.write_bytes(bytes(3000), "GAME.BIN", file_type=2)
+    dsk.save()
+    stat = os.stat(temp_disk)
+    os.utime(temp_disk, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert toolbar.refresh() is True
+    used = free - DSK(temp_disk).get_free_space()
+    assert used > 0
+    assert f"(1F {free - used}K)" in toolbar.get().value
+
+
+def test_refresh_from_several_threads(toolbar, temp_disk):
+    stat = os.stat(temp_disk)
+    os.utime(temp_disk, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(toolbar.refresh())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Sólo uno de los hilos reconstruye la barra
+    assert results.count(True) == 1
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from cpcready.utils import manager
+from cpcready.utils.manager import discManager
+
+
+@pytest.fixture
+def disc(temp_disk, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "prog.bas").write_bytes(b'10 PRINT "HI"\r\n20 GOTO 10\r\n')
+    (tmp_path / "code.bin").write_bytes(bytes(range(32)))
+    dm = discManager()
+    assert dm.save(temp_disk, "prog.bas", 0)
+    assert dm.save(temp_disk, "code.bin", 1, "4000", "4010")
+    (tmp_path / "prog.bas").unlink()
+    (tmp_path / "code.bin").unlink()
+    return temp_disk
+
+
+def test_catalog_without_subprocess(disc, monkeypatch):
+    monkeypatch.setattr(manager.subprocess, "run", lambda *a, **k: pytest.fail("idsk used"))
+    dm = discManager("idsk")
+    rows, free = dm.catalog(disc)
+    assert rows == [
+        ("PROG.BAS", "1K", "-", "-", "0"),
+        ("CODE.BIN", "1K", "&4000", "&4010", "0"),
+    ]
+    assert free == "176K free"
+    assert "CODE.BIN" in dm.cat(disc)
+    assert dm.list_basic(disc, "prog.bas").splitlines() == ['10 PRINT "HI"', "20 GOTO 10"]
+    assert dm.file_type(disc, "code.bin") == "code.bin: BINARY"
+    assert dm.list_hex(disc, "code.bin").startswith("#0000  00 01 02")
+    assert dm.disassemble(disc, "code.bin").splitlines()[:2] == [
+        "4000  00           NOP",
+        "4001  01 02 03     LD BC,&0302",
+    ]
+
+
+def test_info_disc_counts_catalog_rows(disc, capsys, monkeypatch):
+    loads = []
+    original = discManager._load
+    monkeypatch.setattr(discManager, "_load", lambda self, path: loads.append(path) or original(self, path))
+    assert discManager().info_disc(disc)
+    out = capsys.readouterr().out
+    # Resumen y tabla salen de una sola lectura del catálogo
+    assert loads == [disc] and "CODE.BIN" in out
+    assert "Total files: 2" in out
+    assert "- BASIC programs: 1" in out and "- Binary files: 1" in out and "- Other files: 0" in out
+
+
+def test_wildcard_get_extracts_all(disc):
+    assert discManager().get(disc, "*.*") == "Extracted 2 of 2 file(s)"
+    assert sorted(os.listdir(".")) == ["CODE.BIN", "PROG.BAS"]
+    # Se extraen con cabecera AMSDOS
+    with open("CODE.BIN", "rb") as f:
+        data = f.read()
+    assert data[1:9] == b"CODE    " and data[128:160] == bytes(range(32))
+
+
+def test_era_and_ren_write_back(disc):
+    dm = discManager()
+    assert dm.ren(disc, "code.bin", "game.bin")
+    assert dm.era(disc, "prog.bas")
+    assert dm.era(disc, "prog.bas") is None
+    assert [row[0] for row in discManager().catalog(disc)[0]] == ["GAME.BIN"]
+
+
+def test_unreadable_image_falls_back_to_idsk(tmp_path, monkeypatch):
+    bad = tmp_path / "bad.dsk"
+    bad.write_bytes(b"junk")
+    dm = discManager()
+    monkeypatch.setattr(dm, "idsk_available", lambda: True)
+    monkeypatch.setattr(dm, "_run", lambda args: f"idsk {' '.join(args[1:])}")
+    assert dm.cat(str(bad)) == "idsk -l"
+    monkeypatch.setattr(dm, "idsk_available", lambda: False)
+    assert dm.cat(str(bad)) is None
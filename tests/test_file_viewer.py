@@ -0,0 +1,34 @@
+from cpcready.pydsk import DSK
+from cpcready.pydsk.file_viewer import iter_ascii_text, iter_hex_dump, slice_chunks
+
+
+def test_slice_chunks():
+    chunks = [b"abc", b"defg", b"hi"]
+    assert b"".join(slice_chunks(chunks, 2, 5)) == b"cdefg"
+    assert b"".join(slice_chunks(chunks, 8)) == b"i"
+    assert list(slice_chunks(chunks, 0, 0)) == []
+
+
+def test_hex_dump_rows_across_chunks():
+    rows = list(iter_hex_dump([bytes(range(10)), b"ABCDEFGHIJ"], offset=2, width=8))
+    assert rows == [
+        "#0002  02 03 04 05 06 07 08 09  ........",
+        "#000A  41 42 43 44 45 46 47 48  ABCDEFGH",
+        "#0012  49 4A                    IJ",
+    ]
+
+
+def test_ascii_text_stops_at_eof_or_padding():
+    assert "".join(iter_ascii_text([b"10 CLS\r\n\x07", b"20 END\x1ajunk"])) == "10 CLS\r\n20 END"
+    # Racha de ceros partida entre dos trozos
+    assert "".join(iter_ascii_text([b"HELLO" + bytes(6), bytes(6) + b"junk"])) == "HELLO"
+
+
+def test_iter_file_chunks_strips_header(temp_disk, tmp_path):
+    src = tmp_path / "data.bin"
+    src.write_bytes(bytes(range(256)) * 10)
+    dsk = DSK(temp_disk)
+    dsk.write_file(str(src), file_type=2, load_addr=0x4000, exec_addr=0x4000)
+    chunks = list(dsk.iter_file_chunks("DATA.BIN", keep_header=False))
+    assert [len(chunk) for chunk in chunks] == [896, 1024, 640]
+    assert b"".join(chunks) == dsk.read_file("DATA.BIN", keep_header=False) == src.read_bytes()
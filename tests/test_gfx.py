@@ -0,0 +1,92 @@
+import io
+import struct
+import zlib
+
+import pytest
+
+from cpcready.pydsk.gfx import convert_image, hardware_colours, quantize, resize
+from cpcready.pydsk.png import Image, PNGError, read_png, write_png
+from cpcready.pydsk.screen import (
+    Screen, ScreenError, decode_screen, encode_pixels, encode_screen, export_screen, firmware_rgb,
+)
+
+
+def png_file(width, height, colour_type, raw, depth=8, palette=None):
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    data = b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, depth, colour_type, 0, 0, 0))
+    if palette:
+        data += chunk(b"PLTE", palette)
+    return data + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+def test_read_png_filters_palette_and_alpha():
+    # Sub en la primera fila, Up en la segunda
+    raw = b"\x01" + bytes((10, 20, 30, 5, 5, 5)) + b"\x02" + bytes((1, 1, 1, 2, 2, 2))
+    assert read_png(png_file(2, 2, 2, raw)) == Image(2, 2, bytes((10, 20, 30, 15, 25, 35,
+                                                                  11, 21, 31, 17, 27, 37)))
+    # Paleta de 2 bits: índices 0, 1, 2, 3 en un byte
+    palette = b"\x00\x00\x00\xff\x00\x00\x00\xff\x00\x00\x00\xff"
+    assert read_png(png_file(4, 1, 3, b"\x00\x1b", depth=2, palette=palette)).rgb == palette
+    # RGBA: el píxel transparente queda en negro
+    rgba = b"\x00" + bytes((200, 100, 50, 255, 200, 100, 50, 0))
+    assert read_png(png_file(2, 1, 6, rgba)).rgb == bytes((200, 100, 50, 0, 0, 0))
+
+    out = io.BytesIO()
+    write_png(out, 1, 1, [b"\x01\x02\x03"])
+    assert read_png(out.getvalue()) == Image(1, 1, b"\x01\x02\x03")
+    with pytest.raises(PNGError):
+        read_png(b"GIF89a")
+
+
+@pytest.mark.parametrize("mode", [0, 1, 2])
+def test_encode_is_inverse_of_decode(mode):
+    data = bytes(i * 13 + 7 & 0xFF for i in range(0x4000))
+    screen = decode_screen(data, mode, use_numpy=False)
+    encoded = encode_screen(screen, use_numpy=False)
+    # Los 48 bytes libres de cada banco no forman parte de la imagen
+    assert all(encoded[bank * 0x800:bank * 0x800 + 2000] == data[bank * 0x800:bank * 0x800 + 2000]
+               for bank in range(8))
+    with pytest.raises(ScreenError):
+        encode_pixels(bytes(3), 3, 1)
+
+
+def test_numpy_encoder_matches_fallback():
+    pytest.importorskip("numpy")
+    pixels = bytes(i % 16 for i in range(160 * 4))
+    assert encode_pixels(pixels, 160, 0, use_numpy=True) == encode_pixels(pixels, 160, 0, use_numpy=False)
+
+
+def test_quantize_picks_most_used_inks():
+    rgb = firmware_rgb(26) * 5 + firmware_rgb(6) * 2 + b"\x70\x10\x10" + firmware_rgb(1) * 4
+    image = Image(12, 1, rgb)
+    assert hardware_colours(image)[:8] == bytes([26] * 5 + [6] * 2 + [3])
+    artwork = quantize(image, 2)
+    # Modo 2: solo dos inks; los rojos quedan más cerca del azul que del blanco
+    assert artwork.inks == [26, 1]
+    assert artwork.screen.pixels == bytes([0] * 5 + [1] * 7)
+    assert quantize(image, 1, inks=[0, 26, 6, 3]).screen.pixels[5:8] == b"\x02\x02\x03"
+    with pytest.raises(ScreenError):
+        quantize(image, 2, inks=[0, 1, 2])
+
+
+def test_dither_mixes_levels():
+    grey = Image(4, 4, b"\x40" * 48)
+    assert set(hardware_colours(grey)) == {13}
+    assert set(hardware_colours(grey, dither=True)) == {0, 13}
+
+
+def test_convert_round_trip(tmp_path):
+    screen = Screen(1, 320, 200, bytes((x // 8 + y) % 4 for y in range(200) for x in range(320)))
+    png = str(tmp_path / "title.png")
+    export_screen(encode_screen(screen), 1, png)
+    result = convert_image(png, 1, inks=[1, 24, 20, 6])
+    assert decode_screen(result.data, 1) == screen
+
+    # Miniatura de 160x100 como sprite de modo 1: 40 bytes por fila
+    sprite = convert_image(str(tmp_path / "title.thumb.png"), 1, sprite=True)
+    assert (sprite.width, sprite.height) == (160, 100)
+    assert sprite.data[:2] == bytes((40, 100)) and len(sprite.data) == 2 + 40 * 100
+    with pytest.raises(ScreenError):
+        convert_image(png, 2, sprite=True)
+    assert resize(Image(2, 1, b"\x01\x02\x03\x04\x05\x06"), 1, 2).rgb == b"\x01\x02\x03\x01\x02\x03"
@@ -0,0 +1,267 @@
+import asyncio
+import posixpath
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
+
+from cpcready.utils.m4board import AsyncM4Board, M4Board, parse_listing
+
+
+class FakeM4:
+    """Servidor HTTP que imita las rutas de la M4Board."""
+
+    def __init__(self):
+        self.files = {"/GAME.DSK": b"disc"}
+        self.commands = []
+        self.uploads = {}
+        self.connections = set()
+        state = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, body=b""):
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                state.connections.add(self.client_address)
+                url = urlparse(self.path)
+                if url.path == "/config.cgi":
+                    state.commands.append(url.query)
+                    query = parse_qs(url.query)
+                    if "ls" in query:
+                        state.list_folder(query["ls"][0])
+                    self.reply(200, b"ok")
+                elif url.path == "/sd/slow":
+                    time.sleep(0.5)
+                    self.reply(200)
+                elif url.path.startswith("/sd/") and unquote(url.path[3:]) in state.files:
+                    self.reply(200, state.files[unquote(url.path[3:])])
+                else:
+                    self.reply(404)
+
+            def do_POST(self):
+                state.connections.add(self.client_address)
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                boundary = self.headers["Content-Type"].split("boundary=")[1].encode()
+                part = body.split(b"--" + boundary)[1]
+                head, data = part.split(b"\r\n\r\n", 1)
+                name = head.split(b'filename="')[1].split(b'"')[0].decode()
+                state.uploads[name] = data[:-2]
+                self.reply(200, b"ok")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def list_folder(self, folder):
+        """Escribe dir.txt como la placa: 'nombre,tipo,tamaño', tipo 0 = carpeta."""
+        folder = folder.rstrip("/") or "/"
+        entries = {}
+        for path, data in self.files.items():
+            if path.startswith("/m4/") or posixpath.dirname(path) == path:
+                continue
+            rel = posixpath.relpath(path, folder)
+            if rel.startswith(".."):
+                continue
+            name, _, rest = rel.partition("/")
+            entries[name] = f"{name},0,0" if rest else f"{name},1,{len(data)}"
+        self.files["/m4/dir.txt"] = ("\n".join([folder, *entries.values()]) + "\n").encode()
+
+
+@pytest.fixture
+def fake_m4():
+    server = FakeM4()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def test_operations_share_one_connection(fake_m4, tmp_path, monkeypatch):
+    probes = []
+    with M4Board("127.0.0.1", port=fake_m4.port) as board:
+        original = board._probe
+        monkeypatch.setattr(board, "_probe", lambda timeout: probes.append(timeout) or original(timeout))
+        assert board.execute("/GAME.DSK")
+        assert board.mkdir("games")
+        assert "GAME.DSK" in board.ls("/")
+    assert fake_m4.commands == ["run2=%2FGAME.DSK", "mkdir=%2Fgames", "ls=%2F"]
+    # Una sola comprobación TCP y una sola conexión HTTP para todo
+    assert len(probes) == 1
+    assert len(fake_m4.connections) == 1
+
+
+def test_connection_check_is_cached(fake_m4):
+    board = M4Board("127.0.0.1", port=fake_m4.port, ttl=60)
+    assert board.check_connection()
+    fake_m4.server.shutdown()
+    fake_m4.server.server_close()
+    assert board.check_connection()
+    assert not board.check_connection(force=True)
+    board.ttl = 0
+    assert not board.check_connection()
+
+
+def test_streaming_upload_and_download(fake_m4, tmp_path):
+    payload = bytes(range(256)) * 1000
+    source = tmp_path / "game.dsk"
+    source.write_bytes(payload)
+    with M4Board("127.0.0.1", port=fake_m4.port) as board:
+        assert board.upload_file(source, "/games")
+        assert fake_m4.uploads == {"/games/game.dsk": payload}
+
+        fake_m4.files["/games/game.dsk"] = payload
+        target = tmp_path / "copy.dsk"
+        assert board.download_file("/games/game.dsk", str(target))
+        assert target.read_bytes() == payload
+        assert not board.download_file("/missing.dsk", str(tmp_path / "missing.dsk"))
+    assert not (tmp_path / "missing.dsk").exists()
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_sync_uploads_only_changes(fake_m4, tmp_path):
+    from cpcready.m4.m4 import plan_sync, sync_tree
+    local = tmp_path / "game"
+    (local / "data").mkdir(parents=True)
+    (local / "disc.dsk").write_bytes(b"D" * 5000)
+    (local / "data" / "level1.bin").write_bytes(b"L1")
+    (local / ".hidden").write_bytes(b"x")
+
+    with M4Board("127.0.0.1", port=fake_m4.port) as board:
+        plan, manifest, failed = sync_tree(board, local, "/dev", {})
+        assert not failed and sorted(plan.upload) == ["data/level1.bin", "disc.dsk"]
+        assert set(fake_m4.uploads) == {"/dev/disc.dsk", "/dev/data/level1.bin"}
+        assert "mkdir=%2Fdev%2Fdata" in fake_m4.commands
+
+        # Sin cambios no hay tráfico
+        fake_m4.uploads.clear()
+        fake_m4.commands.clear()
+        assert plan_sync(local, manifest).upload == []
+
+        (local / "data" / "level1.bin").write_bytes(b"L1 v2")
+        (local / "disc.dsk").unlink()
+        plan, manifest, failed = sync_tree(board, local, "/dev", manifest)
+    assert list(fake_m4.uploads) == ["/dev/data/level1.bin"]
+    assert fake_m4.commands == ["rm=%2Fdev%2Fdisc.dsk"]
+    assert set(manifest) == {"data/level1.bin"}
+
+
+def test_parse_listing():
+    text = "/games\nSUB,0,0\nGAME.DSK,1,190K\n\n"
+    assert parse_listing(text) == [("SUB", True, "0"), ("GAME.DSK", False, "190K")]
+
+
+def test_async_batch_walk_and_transfers(fake_m4, tmp_path):
+    fake_m4.files.update({"/games/a/one.bas": b"1", "/games/a/b/two.bin": b"22", "/games/three.dsk": b"333"})
+    source = tmp_path / "new.bas"
+    source.write_bytes(b"10 PRINT\r\n" * 500)
+
+    async def main():
+        async with AsyncM4Board("127.0.0.1", port=fake_m4.port, max_connections=3) as board:
+            results = await board.batch([("mkdir", "x"), ("rm", "/old.bas"), ("pause", None)])
+            files = await board.walk("/games")
+            uploaded = await board.upload_file(source, "/games")
+            data = await board.download("/games/three.dsk")
+            missing = await board.download("/nothing")
+            return results, files, uploaded, data, missing
+
+    results, files, uploaded, data, missing = asyncio.run(main())
+    assert results == [True, True, True]
+    assert sorted(fake_m4.commands[:3]) == ["chlt=CPC%2BPause", "mkdir=%2Fx", "rm=%2Fold.bas"]
+    assert files == ["/games/a/b/two.bin", "/games/a/one.bas", "/games/three.dsk"]
+    assert uploaded and fake_m4.uploads["/games/new.bas"] == source.read_bytes()
+    assert data == b"333" and missing is None
+    # Todo por conexiones reutilizadas, sin pasar del límite
+    assert len(fake_m4.connections) <= 3
+
+
+def test_async_timeout_per_request(fake_m4):
+    async def main():
+        async with AsyncM4Board("127.0.0.1", port=fake_m4.port, timeout=0.1) as board:
+            with pytest.raises(asyncio.TimeoutError):
+                await board.request("GET", "sd/slow")
+            # La conexión cancelada se descarta y la siguiente petición funciona
+            return await board.execute("/GAME.DSK")
+
+    assert asyncio.run(main())
+
+
+def test_sync_wrapper_walk(fake_m4):
+    fake_m4.files["/dev/src/main.bas"] = b"10 CLS"
+    with M4Board("127.0.0.1", port=fake_m4.port, ttl=60) as board:
+        probes = []
+        original = board._probe
+        board._probe = lambda timeout: probes.append(timeout) or original(timeout)
+        assert board.walk("/dev") == ["/dev/src/main.bas"]
+        client = board._async
+        assert board.batch([("cd", "/dev"), ("execute", "/dev/src/main.bas")]) == [True, True]
+        assert board.walk("/dev") == ["/dev/src/main.bas"]
+        # Un solo cliente asyncio y una sola comprobación de conexión
+        assert board._async is client and len(probes) == 1
+        assert len(fake_m4.connections) <= board.pool_size
+    assert board._loop is None
+
+
+def test_ls_command(fake_m4, monkeypatch):
+    import functools
+    import importlib
+    from click.testing import CliRunner
+    m4_module = importlib.import_module("cpcready.m4.m4")
+    monkeypatch.setattr(m4_module, "M4Board", functools.partial(M4Board, port=fake_m4.port))
+    fake_m4.files.update({"/games/a/one.bas": b"1", "/games/three.dsk": b"333"})
+    runner = CliRunner()
+
+    result = runner.invoke(m4_module.m4, ["ls", "/games", "--ip", "127.0.0.1"])
+    assert result.exit_code == 0, result.output
+    assert "a/" in result.output and "three.dsk" in result.output
+
+    result = runner.invoke(m4_module.m4, ["ls", "/games", "--recursive", "--ip", "127.0.0.1"])
+    assert result.exit_code == 0, result.output
+    assert "/games/a/one.bas" in result.output and "/games/three.dsk" in result.output
+
+
+def test_ip_from_settings_and_dry_run_without_board(tmp_path, monkeypatch):
+    import importlib
+    from click.testing import CliRunner
+    from cpcready.utils.m4board import configured_ip
+    from cpcready.utils.toml_config import ConfigManager
+    m4_module = importlib.import_module("cpcready.m4.m4")
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(m4_module, "M4Board", lambda *a, **kw: pytest.fail("board used"))
+    local = tmp_path / "proj"
+    local.mkdir()
+    (local / "main.bas").write_bytes(b"10 CLS")
+    runner = CliRunner()
+
+    result = runner.invoke(m4_module.m4, ["sync", str(local), "/games", "--dry-run"])
+    assert result.exit_code == 0 and "main.bas" in result.output, result.output
+
+    # La IP que guarda 'cpc settings'
+    ConfigManager().set("emulator", "m4board_ip", "192.168.1.40")
+    assert configured_ip() == "192.168.1.40"
+    assert M4Board().ip == "192.168.1.40"
+
+    # Los subcomandos sin terminar no aparecen en la ayuda
+    help_text = runner.invoke(m4_module.m4, ["--help"]).output
+    assert "sync" in help_text and "status" in help_text and "pause" not in help_text and "reset-cpc" not in help_text
+
+
+def test_status_command(fake_m4, monkeypatch):
+    import functools
+    import importlib
+    from click.testing import CliRunner
+    m4_module = importlib.import_module("cpcready.m4.m4")
+    monkeypatch.setattr(m4_module, "M4Board", functools.partial(M4Board, port=fake_m4.port))
+    fake_m4.files.update({"/games/a/one.bas": b"1", "/games/three.dsk": b"333"})
+    result = CliRunner().invoke(m4_module.m4, ["status", "/games", "--ip", "127.0.0.1"])
+    assert result.exit_code == 0, result.output
+    assert "reachable" in result.output and "2 file(s)" in result.output
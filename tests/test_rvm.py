@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+import time
+
+import psutil
+import pytest
+
+from cpcready.utils.retrovirtualmachine import RVM
+
+pytestmark = pytest.mark.skipif(sys.platform.startswith("win"), reason="uses a shell script as emulator")
+
+
+@pytest.fixture
+def fake_rvm(tmp_path):
+    script = tmp_path / "retrovirtualmachine"
+    script.write_text("#!/bin/sh\nexec sleep 30\n")
+    script.chmod(0o755)
+    rvm = RVM(str(script), state_file=tmp_path / "rvm.json")
+    yield rvm
+    state = rvm._read_state()
+    if state:
+        try:
+            psutil.Process(state[0]).kill()
+        except psutil.Error:
+            pass
+
+
+def test_launch_closes_only_the_recorded_instance(fake_rvm):
+    assert fake_rvm.launch("6128")
+    first_pid, _ = fake_rvm._read_state()
+    first = psutil.Process(first_pid)
+
+    assert fake_rvm.launch("6128")
+    second_pid, _ = fake_rvm._read_state()
+    assert second_pid != first_pid
+    # La instancia anterior ha terminado antes de lanzar la nueva
+    assert not first.is_running() or first.status() == psutil.STATUS_ZOMBIE
+    assert psutil.Process(second_pid).is_running()
+
+
+def test_stale_state_is_ignored(fake_rvm):
+    # Mismo PID (este proceso) pero otra hora de inicio: no se toca
+    fake_rvm.state_file.write_text(json.dumps({"pid": os.getpid(), "create_time": 1.0}))
+    assert not fake_rvm.stop_previous()
+    assert not fake_rvm.state_file.exists()
+    fake_rvm.state_file.write_text("not json")
+    assert not fake_rvm.stop_previous()
+
+
+def test_version_check_is_cached(tmp_path):
+    calls = tmp_path / "calls"
+    script = tmp_path / "rvm"
+    script.write_text(f"#!/bin/sh\necho run >> {calls}\n"
+                      f"echo '{RVM.REQUIRED_VERSION}'\n"
+                      "echo 'MacOs x64 Build: 6783 - (Tue Jul  9 18:18:12 2019 UTC)'\n")
+    script.chmod(0o755)
+    rvm = RVM(str(script), version_cache=tmp_path / "version.json")
+
+    assert rvm.check_version() == (True, RVM.REQUIRED_VERSION)
+    assert rvm.check_version() == (True, RVM.REQUIRED_VERSION)
+    assert len(calls.read_text().split()) == 1
+    rvm.check_version(recheck=True)
+    assert len(calls.read_text().split()) == 2
+
+    # Otro binario en la misma ruta: se vuelve a comprobar
+    script.write_text("#!/bin/sh\necho 'Retro Virtual Machine v2.1 BETA-1 r1'\n")
+    valid, info = rvm.check_version()
+    assert not valid and "v2.1" in info
+    assert not rvm.check_version()[0]
+    assert len(calls.read_text().split()) == 2
+
+
+def test_launch_with_snapshot(tmp_path):
+    args = tmp_path / "args"
+    script = tmp_path / "retrovirtualmachine"
+    script.write_text(f"#!/bin/sh\necho \"$@\" > {args}\n")
+    script.chmod(0o755)
+    rvm = RVM(str(script), state_file=tmp_path / "rvm.json")
+    assert rvm.launch("464", archivo_snapshot="/tmp/game.sna")
+    for _ in range(100):
+        if args.exists() and args.read_text():
+            break
+        time.sleep(0.05)
+    assert args.read_text().split() == ["-b=cpc464", "-i", "/tmp/game.sna"]
@@ -0,0 +1,87 @@
+import io
+import struct
+import zlib
+
+import pytest
+
+from cpcready.pydsk.png import write_png
+from cpcready.pydsk.screen import (
+    FULL_SIZE, THUMB_SIZE, ScreenError, decode_screen, export_screen, firmware_rgb, render_rgb,
+)
+
+
+def screen_with(*pokes):
+    data = bytearray(0x4000)
+    for address, value in pokes:
+        data[address] = value
+    return bytes(data)
+
+
+def pixel(screen, x, y):
+    return screen.pixels[y * screen.width + x]
+
+
+def test_decode_interleaved_rows_and_modes():
+    # Fila 9 = banco 1 (&800) + fila de caracteres 1 (80)
+    mode2 = decode_screen(screen_with((0x800 + 80 + 1, 0x80)), 2, use_numpy=False)
+    assert (mode2.width, mode2.height) == (640, 200)
+    assert pixel(mode2, 8, 9) == 1 and sum(mode2.pixels) == 1
+
+    mode1 = decode_screen(screen_with((0, 0x88), (1, 0x44)), 1, use_numpy=False)
+    assert [pixel(mode1, x, 0) for x in range(8)] == [3, 0, 0, 0, 0, 3, 0, 0]
+
+    mode0 = decode_screen(screen_with((0, 0x80 | 0x20), (1, 0x02 | 0x01)), 0, use_numpy=False)
+    assert [pixel(mode0, x, 0) for x in range(4)] == [5, 0, 8, 8]
+
+    with pytest.raises(ScreenError):
+        decode_screen(b"", 1)
+    with pytest.raises(ScreenError):
+        decode_screen(bytes(16), 3)
+
+
+def test_numpy_decoder_matches_fallback():
+    pytest.importorskip("numpy")
+    data = bytes(i * 7 & 0xFF for i in range(0x4000))
+    for mode in (0, 1, 2):
+        assert decode_screen(data, mode, use_numpy=True) == decode_screen(data, mode, use_numpy=False)
+
+
+def test_render_sizes_and_palette():
+    screen = decode_screen(screen_with((0, 0x80)), 1)
+    full = list(render_rgb(screen, size=FULL_SIZE))
+    assert len(full) == 400 and all(len(row) == 640 * 3 for row in full)
+    # Pen 1 = amarillo brillante, pen 0 = azul; cada píxel de modo 1 ocupa 2x2
+    assert full[0][:12] == firmware_rgb(24) * 2 + firmware_rgb(1) * 2
+    assert full[1] == full[0]
+    thumb = list(render_rgb(screen, [0, 26], THUMB_SIZE))
+    assert len(thumb) == 100 and thumb[0][:3] == b"\xff\xff\xff"
+    assert firmware_rgb(13) == b"\x80\x80\x80"
+
+
+def read_png(data):
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    pos, idat, header = 8, b"", None
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        assert struct.unpack(">I", data[pos + 8 + length:pos + 12 + length])[0] == zlib.crc32(kind + body)
+        if kind == b"IHDR":
+            header = struct.unpack(">II", body[:8])
+        elif kind == b"IDAT":
+            idat += body
+        pos += 12 + length
+    return header, zlib.decompress(idat)
+
+
+def test_png_writer_and_export(tmp_path):
+    out = io.BytesIO()
+    write_png(out, 2, 2, [b"\x01\x02\x03\x04\x05\x06", b"\x07\x08\x09\x0a\x0b\x0c"])
+    size, raw = read_png(out.getvalue())
+    assert size == (2, 2)
+    assert raw == b"\x00\x01\x02\x03\x04\x05\x06\x00\x07\x08\x09\x0a\x0b\x0c"
+    with pytest.raises(ValueError):
+        write_png(io.BytesIO(), 2, 2, [b"\x00" * 6])
+
+    written = export_screen(screen_with((0, 0xFF)), 0, str(tmp_path / "title.png"))
+    assert [p.rsplit("/", 1)[-1] for p in written] == ["title.png", "title.thumb.png"]
+    assert read_png((tmp_path / "title.thumb.png").read_bytes())[0] == THUMB_SIZE
@@ -0,0 +1,58 @@
+import struct
+
+import pytest
+
+from cpcready.pydsk.sna import (
+    FIRMWARE_TO_HARDWARE, INTERRUPT_STUB, SNAError, Segment, _unpack_rle, build_snapshot, read_snapshot,
+)
+
+
+def test_build_lays_out_memory_and_state():
+    data = build_snapshot([Segment("A", 0x4000, b"\x01\x02\x03"), Segment("B", 0x8000, b"\xff")],
+                          0x4000, model="6128", mode=0, inks=[0, 26])
+    assert data[:8] == b"MV - SNA" and data[0x10] == 3
+    assert len(data) == 0x100 + 128 * 1024
+    snapshot = read_snapshot(data)
+    assert snapshot[:6] == (3, "6128", 0x4000, 0xC000, 0, False)
+    assert snapshot.memory[0x4000:0x4003] == b"\x01\x02\x03" and snapshot.memory[0x8000] == 0xFF
+    assert snapshot.memory[0x38:0x3A] == INTERRUPT_STUB
+    # Pens 0 y 1 con los inks pedidos, el resto y el borde con los del firmware
+    assert data[0x2F:0x32] == bytes((FIRMWARE_TO_HARDWARE[0], FIRMWARE_TO_HARDWARE[26], FIRMWARE_TO_HARDWARE[20]))
+    assert data[0x2F + 16] == FIRMWARE_TO_HARDWARE[1]
+    # ROMs desconectadas y modo 0; CRTC con la pantalla en &C000
+    assert data[0x40] == 0x8C and data[0x43:0x45] == bytes((63, 40)) and data[0x43 + 12] == 0x30
+
+    v1 = build_snapshot([Segment("A", 0x38, b"\xc9")], 0x38, model="464", version=1)
+    assert len(v1) == 0x100 + 64 * 1024 and v1[0x6D] == 0
+    assert read_snapshot(v1)[:2] == (1, None) and read_snapshot(v1).memory[0x38:0x3A] == b"\xc9\x00"
+
+
+def test_build_rejects_bad_layouts():
+    with pytest.raises(SNAError):
+        build_snapshot([Segment("A", 0xFFF0, bytes(32))], 0)
+    with pytest.raises(SNAError):
+        build_snapshot([Segment("A", 0x4000, bytes(16)), Segment("B", 0x400F, b"\x00")], 0x4000)
+    with pytest.raises(SNAError):
+        build_snapshot([], 0, model="6128plus")
+    with pytest.raises(SNAError):
+        read_snapshot(b"MV - SNA" + bytes(0xF8))
+
+
+def test_base_snapshot_keeps_machine_state():
+    base = bytearray(build_snapshot([Segment("FW", 0xB900, b"\xaa" * 16)], 0x0000, model="464", version=2))
+    base[0x1C] = 1  # IFF1: la máquina base tiene las interrupciones activas
+    data = build_snapshot([Segment("GAME", 0x1000, b"\x3e\x01")], 0x1000, model="6128", base=bytes(base))
+    snapshot = read_snapshot(data)
+    assert (snapshot.version, snapshot.model, snapshot.pc, snapshot.interrupts) == (3, "464", 0x1000, True)
+    assert snapshot.memory[0xB900] == 0xAA and snapshot.memory[0x1000:0x1002] == b"\x3e\x01"
+    assert len(snapshot.memory) == 64 * 1024
+
+
+def test_read_compressed_memory_chunks():
+    assert _unpack_rle(b"\x01\xe5\x00\xe5\x04\x07") == b"\x01\xe5\x07\x07\x07\x07"
+    header = bytearray(build_snapshot([], 0, model="464")[:0x100])
+    header[0x6B:0x6D] = b"\x00\x00"
+    block = b"\x09" + b"\xe5\xff\x00" * 257
+    chunk = b"MEM0" + struct.pack("<I", len(block)) + block
+    memory = read_snapshot(bytes(header) + chunk).memory
+    assert len(memory) == 0x10000 and memory[0] == 9 and not any(memory[1:])
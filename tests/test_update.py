@@ -0,0 +1,82 @@
+import os
+import time
+
+import pytest
+
+from cpcready.utils import update
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache_file = tmp_path / "update_cache"
+    monkeypatch.setattr(update, "CACHE_FILE", cache_file)
+    monkeypatch.setattr(update, "LOCK_FILE", tmp_path / "update_cache.lock")
+    monkeypatch.setattr(update, "CONFIG_FILE", tmp_path / "cpcready.toml")
+    monkeypatch.delenv(update.NO_UPDATE_CHECK_ENV, raising=False)
+    update._config_update_check.cache_clear()
+    yield cache_file
+    update._config_update_check.cache_clear()
+
+
+def test_check_reads_cache_without_network(cache, monkeypatch):
+    update.write_cached_version("999.0.0")
+    monkeypatch.setattr(update, "get_latest_version_from_pypi", lambda: pytest.fail("network used"))
+    assert update.check_for_updates() == (True, "999.0.0")
+
+
+def test_stale_cache_schedules_background_refresh(cache, monkeypatch):
+    update.write_cached_version("0.0.1")
+    old = time.time() - update.CACHE_DURATION - 10
+    os.utime(cache, (old, old))
+    scheduled = []
+    monkeypatch.setattr(update, "schedule_refresh", lambda: scheduled.append(True))
+    assert update.check_for_updates() == (False, "0.0.1")
+    assert scheduled
+
+
+def test_env_disables_check(cache, monkeypatch):
+    update.write_cached_version("999.0.0")
+    monkeypatch.setenv(update.NO_UPDATE_CHECK_ENV, "1")
+    assert update.check_for_updates() == (False, None)
+
+
+def test_refresh_writes_cache_atomically(cache, monkeypatch):
+    monkeypatch.setattr(update, "get_latest_version_from_pypi", lambda: "1.2.3")
+    update.LOCK_FILE.touch()
+    update.refresh_cache()
+    assert update.read_cached_version() == "1.2.3"
+    assert not update.LOCK_FILE.exists()
+    assert [p.name for p in cache.parent.iterdir()] == ["update_cache"]
+
+
+def test_offline_refresh_keeps_lock(cache, monkeypatch):
+    monkeypatch.setattr(update, "get_latest_version_from_pypi", lambda: None)
+    update.LOCK_FILE.touch()
+    assert not update.refresh_cache()
+    # Sin red el lock sigue: los siguientes comandos no lanzan otro proceso
+    assert update.LOCK_FILE.exists() and not cache.exists()
+    spawned = []
+    monkeypatch.setattr(update.subprocess, "Popen", lambda *a, **kw: spawned.append(a))
+    assert not update.schedule_refresh() and not spawned
+    old = time.time() - update.LOCK_DURATION - 1
+    os.utime(update.LOCK_FILE, (old, old))
+    assert update.schedule_refresh() and len(spawned) == 1
+
+
+def test_config_disables_check_with_one_read(cache, monkeypatch):
+    update.write_cached_version("999.0.0")
+    (cache.parent / "cpcready.toml").write_text("[update]\ncheck = false\n")
+    import cpcready.utils.toml_config as toml_config
+    monkeypatch.setattr(toml_config, "ConfigManager", lambda *a: pytest.fail("full config loaded"))
+    assert update.check_for_updates() == (False, None)
+    # Se lee una vez por proceso
+    (cache.parent / "cpcready.toml").write_text("[update]\ncheck = true\n")
+    assert not update.is_update_check_enabled()
+
+
+def test_lock_is_taken_once(cache, monkeypatch):
+    spawned = []
+    monkeypatch.setattr(update.subprocess, "Popen", lambda *a, **kw: spawned.append(a))
+    assert update.schedule_refresh()
+    assert not update.schedule_refresh()
+    assert len(spawned) == 1
@@ -0,0 +1,59 @@
+import wave
+
+import pytest
+
+from cpcready.pydsk.cdt import Bits, CDTError, Pause, Pulses, TapeFile, Tone, iter_signal, timing_for, write_cdt
+from cpcready.pydsk.wav import HIGH, LOW, write_wav
+
+H, L = bytes((HIGH,)), bytes((LOW,))
+
+
+def frames(path):
+    with wave.open(path) as f:
+        assert (f.getnchannels(), f.getsampwidth()) == (1, 1)
+        return f.getframerate(), f.readframes(f.getnframes())
+
+
+def test_pulses_become_square_wave(tmp_path):
+    # 35000 Hz: una muestra cada 100 T-states
+    path = str(tmp_path / "t.wav")
+    signal = [Tone(200, 3), Pulses((100,)), Pause(1), Bits(100, 300, b"\x80\xc0", 2)]
+    seconds = write_wav(path, signal, 35000, use_numpy=False)
+    rate, samples = frames(path)
+    # Tras la pausa la señal vuelve a empezar en alto; del último byte solo van 2 bits
+    one, zero = H * 3 + L * 3, H + L
+    expected = H * 2 + L * 2 + H * 2 + L + L * 35 + one + zero * 7 + one * 2
+    assert rate == 35000 and samples == expected
+    assert seconds == len(expected) / 35000
+    assert not (tmp_path / "t.wav.part").exists()
+
+
+def test_clock_does_not_drift(tmp_path):
+    # 79 T-states no son un número entero de muestras a 44100 Hz
+    path = str(tmp_path / "t.wav")
+    write_wav(path, [Tone(79, 100001)], 44100, use_numpy=False)
+    assert len(frames(path)[1]) == 79 * 100001 * 44100 // 3500000
+
+
+def test_numpy_matches_fallback(tmp_path):
+    pytest.importorskip("numpy")
+    cdt = str(tmp_path / "t.cdt")
+    write_cdt(cdt, [TapeFile("GAME", 2, 0x4000, 0x4000, bytes(range(256)) * 20)], timing_for(2000))
+    data = open(cdt, "rb").read()
+    for use_numpy in (False, True):
+        write_wav(str(tmp_path / f"{use_numpy}.wav"), iter_signal(data), 48000, use_numpy=use_numpy)
+    assert frames(str(tmp_path / "False.wav")) == frames(str(tmp_path / "True.wav"))
+
+
+def test_tape_signal(tmp_path):
+    cdt = str(tmp_path / "t.cdt")
+    write_cdt(cdt, [TapeFile("GAME", 2, 0x4000, 0x4000, b"\x01\x02")], timing_for(1000))
+    signal = list(iter_signal(open(cdt, "rb").read()))
+    # Cabecera y datos: tono, sincronismo, bits y pausa cada uno
+    assert [type(s) for s in signal] == [Tone, Pulses, Bits, Pause] * 2
+    assert signal[0].length == 2 * signal[2].zero == signal[2].one
+    with pytest.raises(CDTError):
+        list(iter_signal(b"ZXTape!\x1a\x01\x14\x15" + bytes(8)))
+    with pytest.raises(CDTError):
+        write_wav(str(tmp_path / "bad.wav"), iter_signal(b"ZXTape!\x1a\x01\x14\x99"))
+    assert not (tmp_path / "bad.wav").exists() and not (tmp_path / "bad.wav.part").exists()
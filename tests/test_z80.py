@@ -0,0 +1,57 @@
+import itertools
+
+from cpcready.pydsk.z80 import decode, disassemble, disassembly_lines, trace_code
+
+CODE = bytes.fromhex(
+    "3E01"      # LD A,&01
+    "CD5ABB"    # CALL &BB5A
+    "DD7E05"    # LD A,(IX+&05)
+    "FDCBFF16"  # RL (IY-&01)
+    "ED4B0040"  # LD BC,(&4000)
+    "DDE9"      # JP (IX)
+)
+
+
+def test_decode_prefixes():
+    assert [(ins.address, ins.text) for ins in disassemble(CODE, 0x4000)] == [
+        (0x4000, "LD A,&01"),
+        (0x4002, "CALL &BB5A"),
+        (0x4005, "LD A,(IX+&05)"),
+        (0x4008, "RL (IY-&01)"),
+        (0x400C, "LD BC,(&4000)"),
+        (0x4010, "JP (IX)"),
+    ]
+    assert decode(bytes.fromhex("18FE"), 0, 0x8000).target == 0x8000
+    assert decode(bytes.fromhex("DDCB03C6"), 0).text == "SET 0,(IX+&03)"
+    assert decode(bytes.fromhex("DD24"), 0).text == "INC IXH"
+    assert decode(bytes.fromhex("DD66FF"), 0).text == "LD H,(IX-&01)"
+
+
+def test_every_opcode_decodes():
+    # Todas las combinaciones de prefijo y opcode dan texto, nunca una excepción
+    for prefix in (b"", b"\xcb", b"\xed", b"\xdd", b"\xfd", b"\xdd\xcb\x05", b"\xfd\xcb\x05"):
+        for op in range(256):
+            ins = decode(prefix + bytes([op]) + b"\x34\x12", 0)
+            assert ins.text and len(ins.data) >= 1
+
+
+def test_truncated_code_is_data():
+    assert [ins.text for ins in disassemble(bytes.fromhex("CD5A"))] == ["DB &CD,&5A"]
+
+
+def test_range_and_laziness():
+    lines = disassembly_lines(CODE, 0x4000, start=0x4005, end=0x400B)
+    assert next(lines) == "4005  DD 7E 05     LD A,(IX+&05)"
+    assert list(lines) == ["4008  FD CB FF 16  RL (IY-&01)"]
+    # Un binario enorme no se decodifica entero para ver las primeras líneas
+    big = itertools.islice(disassemble(bytes(1 << 20)), 3)
+    assert [ins.text for ins in big] == ["NOP", "NOP", "NOP"]
+
+
+def test_follow_entry_separates_data():
+    # JR sobre un texto, RET; los bytes del texto no se desensamblan
+    code = bytes.fromhex("1803") + b"HI$" + bytes.fromhex("C9")
+    assert trace_code(code, 0x4000, [0x4000]) == {0, 5}
+    assert [ins.text for ins in disassemble(code, 0x4000, entries=[0x4000])] == [
+        "JR &4005", "DB &48,&49,&24", "RET",
+    ]
@@ -0,0 +1,54 @@
+import random
+import time
+
+import pytest
+
+from cpcready.pydsk.zx0 import Block, ZX0Error, compress, decompress, encode_blocks, optimal_parse
+
+
+def test_known_encodings():
+    # Literal + marcador de fin: el primer indicador de literales no se escribe
+    assert compress(b"a") == bytes((0xD5, 0x61, 0x55, 0x60))
+    data = b"abcabcabcabc"
+    assert optimal_parse(data) == [Block(0, 3), Block(3, 9)]
+    assert decompress(encode_blocks(data, [Block(0, 3), Block(3, 9)])) == data
+
+
+@pytest.mark.parametrize("data", [
+    b"\x00" * 16384,
+    b"The quick brown fox jumps over the lazy dog. " * 50,
+    bytes(random.Random(1).randrange(256) for _ in range(4000)),
+    bytes(random.Random(2).choice(b"ab") for _ in range(4000)),
+    bytes(range(256)) * 200,
+])
+def test_round_trip(data):
+    packed = compress(data)
+    assert decompress(packed) == data
+
+
+def test_repeat_offset_after_literals():
+    # abcX abcY abc...: copia con offset nuevo, literal y copia con el mismo offset
+    data = b"abcdefgh" + b"abcdXfgh" * 3
+    blocks = optimal_parse(data)
+    assert any(block.repeat for block in blocks)
+    assert decompress(compress(data)) == data
+
+
+def test_screen_packs_in_reasonable_time():
+    rng = random.Random(3)
+    screen = bytes(rng.choice((0, 0, 0, 0xF0, 0x0F, rng.randrange(256))) for _ in range(0x4000))
+    start = time.perf_counter()
+    packed = compress(screen)
+    assert time.perf_counter() - start < 10
+    assert len(packed) < len(screen)
+    assert decompress(packed) == screen
+
+
+def test_invalid_data():
+    with pytest.raises(ZX0Error):
+        compress(b"")
+    with pytest.raises(ZX0Error):
+        decompress(compress(b"hello hello")[:-1])
+    # Copia antes del inicio de los datos
+    with pytest.raises(ZX0Error):
+        decompress(encode_blocks(b"ab", [Block(0, 1), Block(5, 2)]))